@@ -0,0 +1,179 @@
+"""
+Cold-start benchmark of the endpoint-audit CLI.
+
+Measures, in fresh interpreters, the wall-clock time of `endpoint-audit --help` and of a
+scan-only audit (Graylog and Jira not configured), and breaks the import time down per
+module with `python -X importtime`.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--projects-path PATH] [--json results.json]
+                                     [--baseline results.json --max-regression 0.25]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PROJECTS_PATH = REPO_ROOT / "tests" / "fixtures" / "clients"
+
+# Modules that must only be loaded by the stages that need them
+HEAVY_MODULES = ("fastmcp", "mcp", "atlassian", "httpx")
+
+# Environment variables enabling the integrations, removed so the audit is scan-only
+INTEGRATION_VARIABLES = (
+    "GRAYLOG_BASE_URL",
+    "GRAYLOG_TOKEN",
+    "GRAYLOG_MCP_BASE_URL",
+    "GRAYLOG_TARGETS",
+    "JIRA_BASE_URL",
+    "JIRA_EMAIL",
+    "JIRA_TOKEN",
+)
+
+_RUN_CLI = "from endpoint_auditor.cli import cli; cli()"
+
+
+def _scenarios() -> Dict[str, List[str]]:
+    return {
+        "help": ["--help"],
+        "scan_only_audit": [
+            "audit",
+            "--endpoint", "/api/v1/users",
+            "--http-method", "GET",
+            "--log", "Fetching user {}",
+            "--application-name", "benchmark",
+        ],
+    }
+
+
+def _environment(projects_path: str) -> Dict[str, str]:
+    env = {key: value for key, value in os.environ.items() if key.upper() not in INTEGRATION_VARIABLES}
+    env["DEFAULT_PROJECTS_PATHS"] = projects_path
+    return env
+
+
+def _run(args: List[str], env: Dict[str, str], cwd: str, importtime: bool = False) -> Tuple[float, str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", _RUN_CLI, *args]
+
+    start = time.perf_counter()
+    completed = subprocess.run(command, env=env, cwd=cwd, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{completed.stderr}")
+    return elapsed, completed.stderr
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse the output of `python -X importtime`.
+
+    Returns:
+        Dict mapping each imported module to its (self, cumulative) import time in microseconds
+    """
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        modules[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return modules
+
+
+def measure(projects_path: str, runs: int) -> Dict[str, Dict]:
+    env = _environment(projects_path)
+    results: Dict[str, Dict] = {}
+
+    # Run outside the repository so that a local .env does not enable the integrations
+    with tempfile.TemporaryDirectory() as cwd:
+        for name, args in _scenarios().items():
+            timings = [_run(args, env, cwd)[0] for _ in range(runs)]
+            _, stderr = _run(args, env, cwd, importtime=True)
+            modules = parse_importtime(stderr)
+
+            top_level = {module: times for module, times in modules.items() if module.startswith("endpoint_auditor")}
+            results[name] = {
+                "median_seconds": round(statistics.median(timings), 4),
+                "min_seconds": round(min(timings), 4),
+                "import_seconds": round(sum(self_us for self_us, _ in modules.values()) / 1_000_000, 4),
+                "heavy_modules_loaded": sorted(
+                    heavy for heavy in HEAVY_MODULES if heavy in modules
+                ),
+                "slowest_project_modules": [
+                    {"module": module, "cumulative_seconds": round(cumulative / 1_000_000, 4)}
+                    for module, (_, cumulative) in sorted(
+                        top_level.items(), key=lambda item: item[1][1], reverse=True
+                    )[:5]
+                ],
+            }
+
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """
+    Returns:
+        One message per scenario whose median is more than `max_regression` slower than the baseline
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name, {}).get("median_seconds")
+        if reference and result["median_seconds"] > reference * (1 + max_regression):
+            regressions.append(
+                f"{name}: {result['median_seconds']:.3f}s vs baseline {reference:.3f}s "
+                f"(+{(result['median_seconds'] / reference - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def _print_results(results: Dict[str, Dict]) -> None:
+    for name, result in results.items():
+        print(
+            f"{name:<18} median {result['median_seconds']:.3f}s  min {result['min_seconds']:.3f}s  "
+            f"imports {result['import_seconds']:.3f}s  heavy modules: {', '.join(result['heavy_modules_loaded']) or 'none'}"
+        )
+        for entry in result["slowest_project_modules"]:
+            print(f"    {entry['module']:<55} {entry['cumulative_seconds']:.4f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per scenario")
+    parser.add_argument("--projects-path", default=str(DEFAULT_PROJECTS_PATH), help="Project scanned by the audit")
+    parser.add_argument("--json", dest="json_output", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results of a previous run to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Tolerated slowdown, e.g. 0.25 for 25%%")
+    args = parser.parse_args(argv)
+
+    results = measure(projects_path=args.projects_path, runs=args.runs)
+    _print_results(results)
+
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
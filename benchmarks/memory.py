@@ -0,0 +1,237 @@
+"""
+Memory profile of scanning and reporting at scale, with tracemalloc.
+
+Runs each stage on large synthetic inputs and reports:
+- peak:     highest traced memory while the stage runs, above what was allocated before it
+- retained: memory still allocated once the stage returned, i.e. the size of its result
+- the allocation sites holding most of the retained memory
+
+Stages:
+- scan:            scan_code_usage() on a synthetic monorepo (see synthetic_monorepo.py),
+                   with an endpoint prefix matching every client so the match lists are large
+- report:          generate_base_report() on a code usage listing `--report-files` files
+- format:          format_report() of that report, file list truncated as when posted to Jira
+- json:            json.dumps() of that report, as written to the history and NDJSON output
+
+Unlike timings, tracemalloc figures barely depend on the machine, so the peaks can be
+checked against a stored baseline: the run fails when a peak grows by more than
+`--max-regression`.
+
+Usage:
+    python benchmarks/memory.py [--preset medium] [--report-files 100000] [--top 5] [--json results.json]
+                                [--baseline benchmarks/baselines/memory.json --max-regression 0.1]
+                                [--update-baseline benchmarks/baselines/memory.json]
+"""
+import argparse
+import gc
+import json
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_monorepo import PRESETS, generate_monorepo  # noqa: E402
+
+from endpoint_auditor.integrations.jira_service import format_report  # noqa: E402
+from endpoint_auditor.models import (  # noqa: E402
+    AuditRequest,
+    ClusterUsage,
+    CodeUsage,
+    LogExtraction,
+    RuntimeUsage,
+)
+from endpoint_auditor.reporters.base_reporter import generate_base_report  # noqa: E402
+from endpoint_auditor.scanners.usage_scanner import scan_code_usage  # noqa: E402
+
+# Frames kept per allocation, enough to tell the caller of a generic helper (asdict, sorted, ...)
+_TRACEBACK_FRAMES = 5
+
+_MB = 1024 * 1024
+
+
+def measure(name: str, run: Callable[[], Any], top: int) -> Dict[str, Any]:
+    """
+    Run one stage under tracemalloc.
+
+    Returns:
+        Peak and retained memory of the stage, its duration and its top allocation sites.
+        The result of `run` is kept alive until the retained memory is measured.
+    """
+    gc.collect()
+    tracemalloc.start(_TRACEBACK_FRAMES)
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline_bytes, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    sites = [
+        {
+            "site": f"{stat.traceback[-1].filename}:{stat.traceback[-1].lineno}",
+            "caller": _first_project_frame(stat.traceback),
+            "size_bytes": stat.size_diff,
+            "count": stat.count_diff,
+        }
+        for stat in after.compare_to(before, "traceback")[:top]
+        if stat.size_diff > 0
+    ]
+    del result
+
+    return {
+        "stage": name,
+        "seconds": round(seconds, 3),
+        "peak_bytes": peak_bytes - baseline_bytes,
+        "retained_bytes": current_bytes - baseline_bytes,
+        "top_sites": sites,
+    }
+
+
+def _first_project_frame(traceback: tracemalloc.Traceback) -> Optional[str]:
+    """The innermost frame in endpoint_auditor, which tells which part of the auditor allocated."""
+    # Frames are ordered from the oldest to the most recent call
+    for frame in reversed(traceback):
+        if "endpoint_auditor" in frame.filename:
+            return f"{frame.filename.split('endpoint_auditor', 1)[1].lstrip('/')}:{frame.lineno}"
+    return None
+
+
+def synthetic_code_usage(files_count: int) -> CodeUsage:
+    """A code usage with `files_count` referencing files spread over 50 projects."""
+    projects = [f"/srv/monorepo/service-{index:03d}" for index in range(50)]
+    matches_per_file = {
+        f"{projects[index % len(projects)]}/module-{index % 7}/src/main/java/com/acme/clients/"
+        f"generated/v{index % 3}/Resource{index:07d}Client.java": 1 + index % 4
+        for index in range(files_count)
+    }
+    return CodeUsage(
+        projects_paths=projects,
+        matches_count=sum(matches_per_file.values()),
+        files=sorted(matches_per_file),
+        matches_per_file=matches_per_file,
+    )
+
+
+def _runtime_usage() -> RuntimeUsage:
+    days = {f"2026-01-{day:02d}": day * 10 for day in range(1, 31)}
+    clusters = [
+        ClusterUsage(name=name, total_occurrences=sum(days.values()), last_seen="2026-01-30T10:00:00Z",
+                     daily_occurrences=dict(days))
+        for name in ("eu", "us", "ap")
+    ]
+    return RuntimeUsage(enabled=True, provider="Graylog", days=30, total_occurrences=3 * sum(days.values()),
+                        last_seen="2026-01-30T10:00:00Z", daily_occurrences=days, clusters=clusters)
+
+
+def run_stages(preset: str, report_files: int, top: int, root: Optional[str] = None) -> List[Dict[str, Any]]:
+    results = []
+
+    with tempfile.TemporaryDirectory() as temp_root:
+        repo = generate_monorepo(root or temp_root, PRESETS[preset])
+        results.append(measure("scan", lambda: scan_code_usage("/api/", repo.projects_paths), top))
+
+    code_usage = synthetic_code_usage(report_files)
+    audit_request = AuditRequest(endpoint="/api/v1/users", http_method="GET", log="User {}", application_name="svc")
+    log_extraction = LogExtraction(log_template=["User "], extracted=True)
+    runtime_usage = _runtime_usage()
+
+    results.append(measure(
+        "report",
+        lambda: generate_base_report(log_extraction, runtime_usage, code_usage, audit_request=audit_request),
+        top,
+    ))
+
+    report = generate_base_report(log_extraction, runtime_usage, code_usage, audit_request=audit_request)
+    results.append(measure("format", lambda: format_report(report), top))
+    results.append(measure("json", lambda: json.dumps(report), top))
+    return results
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], max_regression: float) -> List[str]:
+    """
+    Returns:
+        One message per stage whose peak is more than `max_regression` above the baseline
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result["stage"], {}).get("peak_bytes")
+        if reference and result["peak_bytes"] > reference * (1 + max_regression):
+            regressions.append(
+                f"{result['stage']}: peak {result['peak_bytes'] / _MB:.1f} MB vs baseline {reference / _MB:.1f} MB "
+                f"(+{(result['peak_bytes'] / reference - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def _print_results(results: List[Dict[str, Any]]) -> None:
+    for result in results:
+        print(
+            f"{result['stage']:<12} peak {result['peak_bytes'] / _MB:8.1f} MB  "
+            f"retained {result['retained_bytes'] / _MB:8.1f} MB  {result['seconds']:.3f}s"
+        )
+        for site in result["top_sites"]:
+            caller = f" (from {site['caller']})" if site["caller"] and site["caller"] not in site["site"] else ""
+            print(f"    {site['size_bytes'] / _MB:7.2f} MB in {site['count']:>8} blocks  {site['site']}{caller}")
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"Process max RSS: {maxrss / (_MB if sys.platform == 'darwin' else 1024):.1f} MB")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="medium", help="Synthetic monorepo scanned")
+    parser.add_argument("--report-files", type=int, default=100_000, help="Referencing files in the synthetic report")
+    parser.add_argument("--top", type=int, default=5, help="Allocation sites listed per stage")
+    parser.add_argument("--root", help="Generate the tree here and keep it, instead of a temporary directory")
+    parser.add_argument("--json", dest="json_output", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Baselines to compare with, e.g. benchmarks/baselines/memory.json")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="Tolerated growth, e.g. 0.1 for 10%%")
+    parser.add_argument("--update-baseline", help="Store the peaks of this configuration as baseline in this file")
+    args = parser.parse_args(argv)
+
+    results = run_stages(args.preset, args.report_files, args.top, root=args.root)
+    _print_results(results)
+
+    key = f"{args.preset}/{args.report_files}"
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as f:
+            json.dump({key: results}, f, indent=2)
+
+    if args.update_baseline:
+        path = Path(args.update_baseline)
+        baselines = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        baselines[key] = {
+            result["stage"]: {"peak_bytes": result["peak_bytes"], "retained_bytes": result["retained_bytes"]}
+            for result in results
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get(key)
+        if baseline is None:
+            print(f"No baseline for '{key}' in {args.baseline}")
+            return 1
+        regressions = compare(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
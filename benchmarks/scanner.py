@@ -0,0 +1,186 @@
+"""
+Throughput benchmark of the code scanner on a synthetic monorepo.
+
+Generates a seeded project tree (see synthetic_monorepo.py) and measures:
+- walk:   _find_client_files(), the directory walk, in Java files visited per second
+- walk_warm: the same walk with a directory snapshot of the unchanged tree, in Java files/s
+- search: _search_endpoint_in_file(), counting and locating the matches of every client file, in files/s and MB/s
+- scan:   scan_code_usage(), walk and search together, in files/s and MB/s
+
+Each benchmark runs once to warm the page cache, then `--repeat` times. Throughputs are
+computed from the fastest run, as timeit does: slower runs measure other processes.
+Results can be compared with a stored baseline: the check fails when a throughput drops
+by more than `--max-regression`. Baselines depend on the machine, record them with
+`--update-baseline` on the machine running the check.
+
+Usage:
+    python benchmarks/scanner.py [--preset medium] [--repeat 10] [--json results.json]
+                                 [--baseline benchmarks/baselines/scanner.json --max-regression 0.3]
+                                 [--update-baseline benchmarks/baselines/scanner.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_monorepo import PRESETS, GeneratedMonorepo, generate_monorepo  # noqa: E402
+
+from endpoint_auditor.scanners.languages import client_file_matcher  # noqa: E402
+from endpoint_auditor.scanners.usage_scanner import (  # noqa: E402
+    _find_client_files,
+    _search_endpoint_in_file,
+    scan_code_usage,
+)
+from endpoint_auditor.scanners.walk_snapshot import DirectorySnapshot  # noqa: E402
+
+# Throughputs compared with the baseline
+_CHECKED_METRICS = ("files_per_second", "mb_per_second")
+
+
+def _timings(run: Callable[[], object], repeat: int) -> List[float]:
+    run()  # Warm-up: page cache, regex cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _throughput(timings: List[float], files: int, size_bytes: Optional[int] = None) -> Dict[str, float]:
+    best = min(timings)
+    result = {
+        "best_seconds": round(best, 4),
+        "median_seconds": round(statistics.median(timings), 4),
+        "files_per_second": round(files / best, 1),
+    }
+    if size_bytes is not None:
+        result["mb_per_second"] = round(size_bytes / 1024 / 1024 / best, 2)
+    return result
+
+
+def run_benchmarks(repo: GeneratedMonorepo, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Run the scanner benchmarks on a generated tree.
+
+    Raises:
+        RuntimeError: If the scanner does not find what the generator wrote
+    """
+    client_files = _find_client_files(repo.projects_paths)
+    if len(client_files) != repo.client_files:
+        raise RuntimeError(f"walk found {len(client_files)} client files, {repo.client_files} were generated")
+
+    code_usage = scan_code_usage(repo.probe_endpoint, repo.projects_paths)
+    if code_usage.matches_count != repo.probe_matches:
+        raise RuntimeError(f"scan found {code_usage.matches_count} matches, {repo.probe_matches} were generated")
+
+    def search_all() -> None:
+        for file_path in client_files:
+            _search_endpoint_in_file(file_path, repo.probe_endpoint)
+
+    matcher = client_file_matcher()
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        # The tree was just generated: a clock ahead keeps its directories from looking racy
+        snapshot = DirectorySnapshot(snapshot_dir, clock=lambda: time.time() + 60)
+
+        def walk_warm() -> None:
+            for project_path in repo.projects_paths:
+                snapshot.find_files(project_path, matcher)
+
+        walk_warm_timings = _timings(walk_warm, repeat)
+
+    return {
+        "walk": _throughput(_timings(lambda: _find_client_files(repo.projects_paths), repeat), repo.java_files),
+        "walk_warm": _throughput(walk_warm_timings, repo.java_files),
+        "search": _throughput(_timings(search_all, repeat), repo.client_files, repo.client_bytes),
+        "scan": _throughput(
+            _timings(lambda: scan_code_usage(repo.probe_endpoint, repo.projects_paths), repeat),
+            repo.client_files,
+            repo.client_bytes,
+        ),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """
+    Returns:
+        One message per throughput more than `max_regression` below the baseline
+    """
+    regressions = []
+    for name, result in results.items():
+        for metric in _CHECKED_METRICS:
+            reference = baseline.get(name, {}).get(metric)
+            value = result.get(metric)
+            if reference and value is not None and value < reference * (1 - max_regression):
+                regressions.append(
+                    f"{name} {metric}: {value:,.1f} vs baseline {reference:,.1f} "
+                    f"(-{(1 - value / reference) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def _print_results(repo: GeneratedMonorepo, results: Dict[str, Dict]) -> None:
+    print(
+        f"{len(repo.projects_paths)} projects, {repo.java_files} Java files, {repo.client_files} clients "
+        f"({repo.client_bytes / 1024 / 1024:.1f} MB), {repo.total_bytes / 1024 / 1024:.1f} MB in total"
+    )
+    for name, result in results.items():
+        line = (
+            f"{name:<9} best {result['best_seconds']:.4f}s  median {result['median_seconds']:.4f}s  "
+            f"{result['files_per_second']:>12,.1f} files/s"
+        )
+        if "mb_per_second" in result:
+            line += f"  {result['mb_per_second']:>8,.2f} MB/s"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="medium", help="Shape of the synthetic monorepo")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per benchmark")
+    parser.add_argument("--root", help="Generate the tree here and keep it, instead of a temporary directory")
+    parser.add_argument("--json", dest="json_output", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Baselines to compare with, e.g. benchmarks/baselines/scanner.json")
+    parser.add_argument("--max-regression", type=float, default=0.3, help="Tolerated slowdown, e.g. 0.3 for 30%%")
+    parser.add_argument("--update-baseline", help="Store the results of this preset as baseline in this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_root:
+        repo = generate_monorepo(args.root or temp_root, PRESETS[args.preset])
+        results = run_benchmarks(repo, args.repeat)
+    _print_results(repo, results)
+
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as f:
+            json.dump({args.preset: results}, f, indent=2)
+
+    if args.update_baseline:
+        path = Path(args.update_baseline)
+        baselines = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        baselines[args.preset] = results
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get(args.preset)
+        if baseline is None:
+            print(f"No baseline for preset '{args.preset}' in {args.baseline}")
+            return 1
+        regressions = compare(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Benchmark of the search backends of the code scanner, on a synthetic monorepo.
+
+Generates a seeded project tree (see synthetic_monorepo.py), makes it a git work tree and
+runs scan_code_usage() with each available backend (python, git, ripgrep when `rg` is on
+the PATH) for two endpoints:
+- probe:  called from many clients, most files are searched by Python anyway
+- absent: called from no client, the backends rule out every file
+
+Every backend must give the same CodeUsage: the benchmark fails otherwise. Throughputs are
+in client files/s and MB/s, computed from the fastest of `--repeat` runs after a warm-up,
+with the number of files ruled out by the backend. Results can be compared with a stored
+baseline: the check fails when a throughput drops by more than `--max-regression`.
+Baselines depend on the machine, record them with `--update-baseline` on the machine
+running the check.
+
+Usage:
+    python benchmarks/search_backends.py [--preset medium] [--repeat 5] [--json results.json]
+                                         [--baseline benchmarks/baselines/search_backends.json]
+                                         [--update-baseline benchmarks/baselines/search_backends.json]
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from scanner import _throughput, _timings  # noqa: E402
+from synthetic_monorepo import PRESETS, GeneratedMonorepo, generate_monorepo  # noqa: E402
+
+from endpoint_auditor.scanners.search_backends import search_backend  # noqa: E402
+from endpoint_auditor.scanners.usage_scanner import ScanStats, scan_code_usage  # noqa: E402
+
+# Throughputs compared with the baseline
+_CHECKED_METRICS = ("files_per_second", "mb_per_second")
+
+# Endpoint no generated client calls
+_ABSENT_ENDPOINT = "/api/v9/absent/{id}/resource"
+
+
+def _available_backends() -> List[str]:
+    backends = ["python"]
+    if shutil.which("git"):
+        backends.append("git")
+    if shutil.which("rg"):
+        backends.append("ripgrep")
+    return backends
+
+
+def _init_work_tree(root: str) -> None:
+    """Track the generated tree in git, as projects checked out from a repository are."""
+    for command in (["init", "-q"], ["add", "-A"]):
+        subprocess.run(["git", "-C", root, *command], check=True, capture_output=True)
+
+
+def run_benchmarks(repo: GeneratedMonorepo, repeat: int, backends: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Run scan_code_usage() with each backend on a generated tree.
+
+    Raises:
+        RuntimeError: If a backend does not give the results of the Python backend
+    """
+    results = {}
+    for endpoint_name, endpoint in (("probe", repo.probe_endpoint), ("absent", _ABSENT_ENDPOINT)):
+        reference = scan_code_usage(endpoint, repo.projects_paths, backend=search_backend("python"))
+        if endpoint_name == "probe" and reference.matches_count != repo.probe_matches:
+            raise RuntimeError(f"scan found {reference.matches_count} matches, {repo.probe_matches} were generated")
+
+        for name in backends:
+            backend = search_backend(name)
+            stats = ScanStats()
+            code_usage = scan_code_usage(endpoint, repo.projects_paths, stats=stats, backend=backend)
+            if code_usage != reference:
+                raise RuntimeError(f"backend {name} found other matches than python for {endpoint}")
+
+            timings = _timings(lambda: scan_code_usage(endpoint, repo.projects_paths, backend=backend), repeat)
+            result = _throughput(timings, repo.client_files, repo.client_bytes)
+            result["filtered_files"] = stats.filtered_files
+            results[f"{name}_{endpoint_name}"] = result
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """
+    Returns:
+        One message per throughput more than `max_regression` below the baseline
+    """
+    regressions = []
+    for name, result in results.items():
+        for metric in _CHECKED_METRICS:
+            reference = baseline.get(name, {}).get(metric)
+            value = result.get(metric)
+            if reference and value is not None and value < reference * (1 - max_regression):
+                regressions.append(
+                    f"{name} {metric}: {value:,.1f} vs baseline {reference:,.1f} "
+                    f"(-{(1 - value / reference) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def _print_results(repo: GeneratedMonorepo, results: Dict[str, Dict]) -> None:
+    print(
+        f"{len(repo.projects_paths)} projects, {repo.client_files} clients "
+        f"({repo.client_bytes / 1024 / 1024:.1f} MB), probe endpoint {repo.probe_endpoint}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<16} best {result['best_seconds']:.4f}s  median {result['median_seconds']:.4f}s  "
+            f"{result['files_per_second']:>12,.1f} files/s  {result['mb_per_second']:>8,.2f} MB/s  "
+            f"{result['filtered_files']:>7} ruled out"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="medium", help="Shape of the synthetic monorepo")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per backend and endpoint")
+    parser.add_argument("--json", dest="json_output", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Baselines to compare with, e.g. benchmarks/baselines/search_backends.json")
+    parser.add_argument("--max-regression", type=float, default=0.3, help="Tolerated slowdown, e.g. 0.3 for 30%%")
+    parser.add_argument("--update-baseline", help="Store the results of this preset as baseline in this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_root:
+        repo = generate_monorepo(temp_root, PRESETS[args.preset])
+        backends = _available_backends()
+        if "git" in backends:
+            _init_work_tree(repo.root)
+        results = run_benchmarks(repo, args.repeat, backends)
+    _print_results(repo, results)
+
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as f:
+            json.dump({args.preset: results}, f, indent=2)
+
+    if args.update_baseline:
+        path = Path(args.update_baseline)
+        baselines = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        baselines[args.preset] = results
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get(args.preset)
+        if baseline is None:
+            print(f"No baseline for preset '{args.preset}' in {args.baseline}")
+            return 1
+        regressions = compare(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Benchmark of the symbol index resolving String constants, on a synthetic monorepo.
+
+Generates a seeded project tree whose modules declare chains of constants (see
+`constants_per_module` in synthetic_monorepo.py) and measures:
+- build:       SymbolIndex.refresh() of a new index, reading every Java file, in files/s
+- refresh:     SymbolIndex.refresh() of a built index when nothing changed, in files/s
+- lookup_cold: first SymbolTable.value() of every constant, evaluating the chains, in lookups/s
+- lookup_warm: SymbolTable.value() of constants already evaluated, in lookups/s
+
+Each benchmark runs once to warm the page cache, then `--repeat` times, and throughputs are
+computed from the fastest run. Results can be compared with a stored baseline: the check
+fails when a throughput drops by more than `--max-regression`. Baselines depend on the
+machine, record them with `--update-baseline` on the machine running the check.
+
+Usage:
+    python benchmarks/symbols.py [--preset medium] [--constants 40] [--repeat 10] [--json results.json]
+                                 [--baseline benchmarks/baselines/symbols.json --max-regression 0.3]
+                                 [--update-baseline benchmarks/baselines/symbols.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from scanner import _throughput, _timings  # noqa: E402
+from synthetic_monorepo import PRESETS, GeneratedMonorepo, generate_monorepo  # noqa: E402
+
+from endpoint_auditor.scanners.symbol_index import SymbolIndex, SymbolTable  # noqa: E402
+
+# Throughputs compared with the baseline
+_CHECKED_METRICS = ("files_per_second", "lookups_per_second")
+
+
+def _lookups(repo: GeneratedMonorepo, index: SymbolIndex) -> List[Tuple[SymbolTable, str]]:
+    """Every constant of the generated tree, as (table of its project, qualified name)."""
+    constants_per_module = repo.spec["constants_per_module"]
+    names = ["CommonPaths.API", "CommonPaths.V1"]
+    for module_index in range(repo.spec["modules_per_project"]):
+        names.append(f"Module{module_index}Paths.BASE")
+        names += [f"Module{module_index}Paths.PATH_{index}" for index in range(constants_per_module - 1)]
+    return [(index.table(project_path), name) for project_path in repo.projects_paths for name in names]
+
+
+def _lookup_rate(timings: List[float], lookups: int) -> Dict[str, float]:
+    best = min(timings)
+    return {
+        "best_seconds": round(best, 6),
+        "median_seconds": round(statistics.median(timings), 6),
+        "lookups_per_second": round(lookups / best, 1),
+        "microseconds_per_lookup": round(best / lookups * 1_000_000, 3),
+    }
+
+
+def _cold_lookup_timings(repo: GeneratedMonorepo, repeat: int) -> List[float]:
+    """Lookups on a new index each time, so that every constant is evaluated; the build is not timed."""
+    timings = []
+    for _ in range(repeat + 1):
+        index = SymbolIndex()
+        index.refresh(repo.projects_paths)
+        lookups = _lookups(repo, index)
+        start = time.perf_counter()
+        for table, name in lookups:
+            table.value(name)
+        timings.append(time.perf_counter() - start)
+    return timings[1:]
+
+
+def run_benchmarks(repo: GeneratedMonorepo, repeat: int) -> Dict[str, Dict[str, float]]:
+    """
+    Run the symbol index benchmarks on a generated tree.
+
+    Raises:
+        RuntimeError: If the index does not resolve what the generator wrote
+    """
+    index = SymbolIndex()
+    index.refresh(repo.projects_paths)
+    lookups = _lookups(repo, index)
+    indexed = sum(len(index.table(project_path)) for project_path in repo.projects_paths)
+    if indexed != repo.constants:
+        raise RuntimeError(f"index found {indexed} constants, {repo.constants} were generated")
+    value = index.table(repo.projects_paths[0]).value(repo.probe_constant)
+    if value != repo.probe_constant_value:
+        raise RuntimeError(f"{repo.probe_constant} resolved to {value!r}, not {repo.probe_constant_value!r}")
+
+    def build() -> None:
+        SymbolIndex().refresh(repo.projects_paths)
+
+    def lookup_all() -> None:
+        for table, name in lookups:
+            table.value(name)
+
+    return {
+        "build": _throughput(_timings(build, repeat), repo.java_files),
+        "refresh": _throughput(_timings(lambda: index.refresh(repo.projects_paths), repeat), repo.java_files),
+        "lookup_cold": _lookup_rate(_cold_lookup_timings(repo, repeat), len(lookups)),
+        "lookup_warm": _lookup_rate(_timings(lookup_all, repeat), len(lookups)),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """
+    Returns:
+        One message per throughput more than `max_regression` below the baseline
+    """
+    regressions = []
+    for name, result in results.items():
+        for metric in _CHECKED_METRICS:
+            reference = baseline.get(name, {}).get(metric)
+            value = result.get(metric)
+            if reference and value is not None and value < reference * (1 - max_regression):
+                regressions.append(
+                    f"{name} {metric}: {value:,.1f} vs baseline {reference:,.1f} "
+                    f"(-{(1 - value / reference) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def _print_results(repo: GeneratedMonorepo, results: Dict[str, Dict]) -> None:
+    print(f"{len(repo.projects_paths)} projects, {repo.java_files} Java files, {repo.constants} constants")
+    for name, result in results.items():
+        line = f"{name:<12} best {result['best_seconds']:.4f}s  median {result['median_seconds']:.4f}s  "
+        if "files_per_second" in result:
+            line += f"{result['files_per_second']:>12,.1f} files/s"
+        else:
+            line += (
+                f"{result['lookups_per_second']:>12,.1f} lookups/s  "
+                f"{result['microseconds_per_lookup']:.3f} us/lookup"
+            )
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="medium", help="Shape of the synthetic monorepo")
+    parser.add_argument("--constants", type=int, default=40, help="Constants declared by each module")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed runs per benchmark")
+    parser.add_argument("--root", help="Generate the tree here and keep it, instead of a temporary directory")
+    parser.add_argument("--json", dest="json_output", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Baselines to compare with, e.g. benchmarks/baselines/symbols.json")
+    parser.add_argument("--max-regression", type=float, default=0.3, help="Tolerated slowdown, e.g. 0.3 for 30%%")
+    parser.add_argument("--update-baseline", help="Store the results of this preset as baseline in this file")
+    args = parser.parse_args(argv)
+
+    spec = replace(PRESETS[args.preset], constants_per_module=args.constants)
+    with tempfile.TemporaryDirectory() as temp_root:
+        repo = generate_monorepo(args.root or temp_root, spec)
+        results = run_benchmarks(repo, args.repeat)
+    _print_results(repo, results)
+
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as f:
+            json.dump({args.preset: results}, f, indent=2)
+
+    if args.update_baseline:
+        path = Path(args.update_baseline)
+        baselines = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+        baselines[args.preset] = results
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get(args.preset)
+        if baseline is None:
+            print(f"No baseline for preset '{args.preset}' in {args.baseline}")
+            return 1
+        regressions = compare(results, baseline, args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+Seeded generator of synthetic Java project trees, used to benchmark the code scanner.
+
+The trees look like the monorepos the auditor scans in production: Maven/Gradle modules
+with deep package directories, a mix of *Client* classes calling endpoints and other
+classes, a few huge generated API clients, and build output directories (target/,
+build/) holding generated sources and compiled classes.
+
+The same spec and seed always produce the same tree, so benchmark runs are comparable.
+
+Usage:
+    python benchmarks/synthetic_monorepo.py OUTPUT_DIR [--preset medium] [--seed 42]
+"""
+import argparse
+import json
+import random
+import sys
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class MonorepoSpec:
+    """
+    Shape of a synthetic monorepo
+
+    :var seed: Seed of the random generator
+    :var projects: Number of projects (one scanned path each)
+    :var modules_per_project: Maven/Gradle modules of each project
+    :var package_depth: Directories between src/main/java and the classes
+    :var files_per_module: Java files of each module
+    :var client_ratio: Share of the Java files named *Client*
+    :var mean_file_kb: Mean size of a regular Java file
+    :var huge_clients: Generated API clients listing every endpoint, one per project at most
+    :var huge_client_mb: Size of each huge generated client
+    :var build_output: Whether modules have target/ and build/ directories with generated sources and classes
+    :var endpoints: Number of distinct endpoints called by the clients
+    :var endpoint_calls_per_client: Mean number of endpoint literals in a client file
+    :var constants_per_module: String constants of a ModuleNPaths class in each module, built from the
+        constants of a CommonPaths class of the project; 0 for none
+    """
+    seed: int = 42
+    projects: int = 8
+    modules_per_project: int = 3
+    package_depth: int = 4
+    files_per_module: int = 150
+    client_ratio: float = 0.3
+    mean_file_kb: float = 4.0
+    huge_clients: int = 2
+    huge_client_mb: float = 2.0
+    build_output: bool = True
+    endpoints: int = 400
+    endpoint_calls_per_client: int = 6
+    constants_per_module: int = 0
+
+
+PRESETS: Dict[str, MonorepoSpec] = {
+    "small": MonorepoSpec(projects=3, modules_per_project=2, files_per_module=60, huge_clients=1, huge_client_mb=0.5),
+    "medium": MonorepoSpec(),
+    "large": MonorepoSpec(projects=20, modules_per_project=5, files_per_module=300, huge_clients=6, huge_client_mb=8.0),
+}
+
+
+@dataclass
+class GeneratedMonorepo:
+    """
+    What was generated, to compute throughputs and check scan results
+
+    :var root: Root directory of the tree
+    :var projects_paths: Path of every project, as passed to scan_code_usage()
+    :var java_files: Number of .java files, client or not
+    :var client_files: Number of files the scanner reads (*Client*.java)
+    :var client_bytes: Total size of those files
+    :var total_bytes: Total size of the tree
+    :var probe_endpoint: Endpoint called from many clients, to benchmark scans with
+    :var probe_matches: Occurrences of `probe_endpoint` in the client files
+    :var constants: Number of String constants declared
+    :var probe_constant: Qualified name of the last constant of the first project, the longest to evaluate
+    :var probe_constant_value: Its value
+    """
+    root: str
+    projects_paths: List[str]
+    java_files: int = 0
+    client_files: int = 0
+    client_bytes: int = 0
+    total_bytes: int = 0
+    probe_endpoint: str = ""
+    probe_matches: int = 0
+    constants: int = 0
+    probe_constant: str = ""
+    probe_constant_value: str = ""
+    spec: Dict = field(default_factory=dict)
+
+
+_RESOURCES = ("users", "orders", "payments", "invoices", "documents", "cases", "accounts", "products",
+              "shipments", "claims", "contracts", "customers", "tickets", "reports", "sessions", "devices")
+_SUFFIXES = ("", "/{id}", "/{id}/status", "/search", "/{id}/history", "/export", "/{id}/items", "/batch")
+_NOUNS = ("Order", "User", "Payment", "Invoice", "Document", "Case", "Account", "Product", "Shipment",
+          "Claim", "Contract", "Customer", "Ticket", "Report", "Session", "Device")
+_KINDS = ("Service", "Repository", "Mapper", "Controller", "Config", "Validator", "Dto", "Utils")
+_HTTP_METHODS = ("GET", "POST", "PUT", "DELETE", "PATCH")
+
+
+def generate_monorepo(root: str, spec: MonorepoSpec) -> GeneratedMonorepo:
+    """
+    Write a synthetic monorepo under `root`, which must be empty or missing.
+
+    Args:
+        root: Directory to create the projects in
+        spec: Shape of the tree
+
+    Returns:
+        Description of the generated tree
+    """
+    rng = random.Random(spec.seed)
+    root_dir = Path(root)
+    endpoints = _endpoints(rng, spec.endpoints)
+    # Called from about one client in ten, as a shared endpoint would be
+    probe_endpoint = endpoints[0]
+
+    result = GeneratedMonorepo(root=str(root_dir), projects_paths=[], probe_endpoint=probe_endpoint, spec=asdict(spec))
+
+    def write(path: Path, content: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = content.encode("utf-8")
+        path.write_bytes(data)
+        result.total_bytes += len(data)
+        if path.suffix == ".java":
+            result.java_files += 1
+            if "Client" in path.name:
+                result.client_files += 1
+                result.client_bytes += len(data)
+                result.probe_matches += content.count(probe_endpoint)
+
+    for project_index in range(spec.projects):
+        project_dir = root_dir / f"service-{project_index:03d}"
+        result.projects_paths.append(str(project_dir))
+        write(project_dir / "pom.xml", f"<project><artifactId>service-{project_index:03d}</artifactId></project>\n")
+
+        for module_index in range(spec.modules_per_project):
+            module_dir = project_dir / f"module-{module_index}"
+            package = ["com", "acme"] + [rng.choice(_RESOURCES) for _ in range(max(0, spec.package_depth - 2))]
+            source_dir = module_dir.joinpath("src", "main", "java", *package)
+
+            for file_index in range(spec.files_per_module):
+                noun = rng.choice(_NOUNS)
+                if rng.random() < spec.client_ratio:
+                    class_name = f"{noun}{file_index}Client"
+                    content = _client_source(rng, package, class_name, endpoints, probe_endpoint, spec)
+                else:
+                    class_name = f"{noun}{file_index}{rng.choice(_KINDS)}"
+                    content = _class_source(rng, package, class_name, spec.mean_file_kb)
+                write(source_dir / f"{class_name}.java", content)
+
+            if spec.constants_per_module:
+                # Written last, without drawing from `rng`, so the rest of the tree stays the same
+                constants_file = source_dir / f"Module{module_index}Paths.java"
+                write(constants_file, _constants_source(package, module_index, spec, result))
+
+            if spec.build_output:
+                # Generated sources are scanned like any other client, compiled classes are not
+                generated_dir = module_dir.joinpath("target", "generated-sources", "openapi", *package)
+                write(generated_dir / "GeneratedApiClient.java",
+                      _client_source(rng, package, "GeneratedApiClient", endpoints, probe_endpoint, spec))
+                classes_dir = module_dir.joinpath("target", "classes", *package)
+                for file_index in range(spec.files_per_module // 10):
+                    write(classes_dir / f"Compiled{file_index}.class", "\xca\xfe\xba\xbe" + "\0" * rng.randint(512, 4096))
+                write(module_dir / "build" / "tmp" / "compileJava" / "previous-compilation-data.bin", "\0" * 2048)
+
+        if spec.constants_per_module:
+            common_dir = project_dir.joinpath("common", "src", "main", "java", "com", "acme", "common")
+            write(common_dir / "CommonPaths.java", _COMMON_PATHS_SOURCE)
+            result.constants += 2
+
+        if project_index < spec.huge_clients:
+            huge_dir = project_dir.joinpath("module-0", "src", "main", "java", "com", "acme", "generated")
+            write(huge_dir / "HugeGeneratedApiClient.java",
+                  _huge_client_source(endpoints, int(spec.huge_client_mb * 1024 * 1024)))
+
+    return result
+
+
+_COMMON_PATHS_SOURCE = """package com.acme.common;
+
+public final class CommonPaths {
+    public static final String API = "/api";
+    public static final String V1 = API + "/v1";
+}
+"""
+
+
+def _constants_source(package: List[str], module_index: int, spec: MonorepoSpec, result: GeneratedMonorepo) -> str:
+    """A ModuleNPaths class whose constants extend one another, from the CommonPaths of the project."""
+    resource = _RESOURCES[module_index % len(_RESOURCES)]
+    lines = [
+        f"package {'.'.join(package)};",
+        "",
+        "import static com.acme.common.CommonPaths.V1;",
+        "",
+        f"public final class Module{module_index}Paths {{",
+        f'    public static final String BASE = V1 + "/{resource}";',
+    ]
+    value = f"/api/v1/{resource}"
+    for index in range(spec.constants_per_module - 1):
+        previous = "BASE" if index == 0 else f"PATH_{index - 1}"
+        lines.append(f'    public static final String PATH_{index} = {previous} + "/{index}";')
+        value += f"/{index}"
+    lines.append("}")
+
+    result.constants += spec.constants_per_module
+    if not result.probe_constant:
+        last = f"PATH_{spec.constants_per_module - 2}" if spec.constants_per_module > 1 else "BASE"
+        result.probe_constant = f"Module{module_index}Paths.{last}"
+        result.probe_constant_value = value
+    return "\n".join(lines) + "\n"
+
+
+def _endpoints(rng: random.Random, count: int) -> List[str]:
+    endpoints = []
+    for index in range(count):
+        version = rng.choice(("v1", "v2", "v3"))
+        resource = _RESOURCES[index % len(_RESOURCES)]
+        endpoints.append(f"/api/{version}/{resource}{index // len(_RESOURCES)}{rng.choice(_SUFFIXES)}")
+    return endpoints
+
+
+def _client_source(
+    rng: random.Random,
+    package: List[str],
+    class_name: str,
+    endpoints: List[str],
+    probe_endpoint: str,
+    spec: MonorepoSpec,
+) -> str:
+    lines = [
+        f"package {'.'.join(package)};",
+        "",
+        "import org.springframework.web.reactive.function.client.WebClient;",
+        "",
+        f"public class {class_name} {{",
+        "    private final WebClient webClient;",
+        "",
+    ]
+    calls = max(1, int(rng.expovariate(1 / spec.endpoint_calls_per_client)))
+    for call in range(calls):
+        endpoint = probe_endpoint if rng.random() < 0.02 else rng.choice(endpoints)
+        method = rng.choice(_HTTP_METHODS)
+        lines += [
+            f"    public Object call{call}(String id) {{",
+            f"        // {method} {endpoint}",
+            f"        return webClient.method(HttpMethod.{method}).uri(\"{endpoint}\", id)",
+            "                .retrieve().bodyToMono(Object.class).block();",
+            "    }",
+            "",
+        ]
+    lines.append(_filler(rng, spec.mean_file_kb / 2))
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _class_source(rng: random.Random, package: List[str], class_name: str, mean_file_kb: float) -> str:
+    return (
+        f"package {'.'.join(package)};\n\n"
+        f"public class {class_name} {{\n"
+        f"{_filler(rng, mean_file_kb)}\n"
+        "}\n"
+    )
+
+
+def _huge_client_source(endpoints: List[str], size_bytes: int) -> str:
+    """An OpenAPI-generated style client repeating every endpoint until it reaches its size."""
+    lines = ["package com.acme.generated;", "", "public class HugeGeneratedApiClient {"]
+    size = 0
+    index = 0
+    while size < size_bytes:
+        endpoint = endpoints[index % len(endpoints)]
+        block = (
+            f"    /** Generated operation {index} */\n"
+            f"    public ApiResponse<Object> operation{index}WithHttpInfo(Map<String, Object> params) {{\n"
+            f"        String localVarPath = \"{endpoint}\";\n"
+            "        return apiClient.invokeAPI(localVarPath, \"GET\", params, null, null);\n"
+            "    }\n"
+        )
+        lines.append(block)
+        size += len(block)
+        index += 1
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _filler(rng: random.Random, mean_kb: float) -> str:
+    """Java methods without endpoints, about `mean_kb` kilobytes in total (exponentially distributed)."""
+    target = int(rng.expovariate(1 / max(mean_kb, 0.1)) * 1024)
+    lines = []
+    size = 0
+    index = 0
+    while size < target:
+        line = (
+            f"    private int helper{index}(int value) {{ return value * {rng.randint(2, 97)} "
+            f"+ {rng.randint(0, 9999)}; }} // {rng.choice(_NOUNS)} {rng.choice(_KINDS)}"
+        )
+        lines.append(line)
+        size += len(line) + 1
+        index += 1
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_dir", help="Directory to generate the projects in")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="medium", help="Shape of the tree")
+    parser.add_argument("--seed", type=int, help="Overrides the seed of the preset")
+    args = parser.parse_args(argv)
+
+    spec = PRESETS[args.preset]
+    if args.seed is not None:
+        spec = replace(spec, seed=args.seed)
+
+    generated = generate_monorepo(args.output_dir, spec)
+    print(json.dumps(asdict(generated), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
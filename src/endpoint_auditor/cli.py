@@ -1,12 +1,204 @@
 import asyncio
+import json
+import sys
+from concurrent.futures import Future
+from contextlib import nullcontext, redirect_stdout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 import click
 
-from config import settings, is_graylog_enabled, is_jira_enabled
-from pipline import run_pipeline
-from integrations.jira_service import post_report_to_jira
+from endpoint_auditor.config import get_client_languages, get_settings, is_graylog_enabled, is_jira_enabled
+from endpoint_auditor.models import AuditRequest, HttpMethod
+from endpoint_auditor.history.incremental import DEFAULT_RUNTIME_MAX_AGE_SECONDS
+from endpoint_auditor.history.store import HistoryStore
+from endpoint_auditor.pipline import run_pipeline, iter_batch_pipeline
+from endpoint_auditor.profiling import Tracer, use_tracer
+from endpoint_auditor.reporters.metrics_exporter import write_prometheus_textfile
+from endpoint_auditor.reporters.ndjson_writer import NdjsonReportWriter
+from endpoint_auditor.reporters.report_diff import diff_reports, diff_to_dict, format_diff_text
+from endpoint_auditor.scanners.client_index import ClientReferenceIndex
+from endpoint_auditor.scanners.controller_scanner import scan_controllers
+from endpoint_auditor.scanners.diff_guard import git_diff, guard_diff, load_registry
+from endpoint_auditor.scanners.languages import client_file_matcher
+from endpoint_auditor.scanners.search_backends import search_backend
+from endpoint_auditor.scanners.usage_scanner import ClientFileIndex
+from endpoint_auditor.scanners.walk_snapshot import DirectorySnapshot
+
+# Integrations pulling heavy dependencies (fastmcp, atlassian-python-api) are imported
+# inside the commands and stages that use them, to keep `endpoint-audit --help` and
+# scan-only audits fast to start.
+
+
+def _profiling_options(command):
+    """Add the profiling and metrics options shared by the audit commands."""
+    command = click.option(
+        "--metrics-textfile",
+        default=None,
+        type=click.Path(dir_okay=False),
+        help="Write run metrics in Prometheus textfile collector format to this file "
+        "(e.g. /var/lib/node_exporter/textfile/endpoint_audit.prom)",
+    )(command)
+    command = click.option(
+        "--cprofile-output",
+        default=None,
+        type=click.Path(dir_okay=False),
+        help="Write cProfile stats of the code scan stage to this file (implies --profile)",
+    )(command)
+    command = click.option(
+        "--trace-output",
+        default=None,
+        type=click.Path(dir_okay=False),
+        help="Write a Chrome trace (chrome://tracing, Perfetto) of the audit to this file (implies --profile)",
+    )(command)
+    command = click.option(
+        "--profile",
+        is_flag=True,
+        default=False,
+        help="Measure the time spent in each audit stage and add it to the report metadata",
+    )(command)
+    return command
+
+
+def _history_options(command):
+    """Add the history options shared by the audit commands."""
+    command = click.option(
+        "--runtime-max-age-hours",
+        default=DEFAULT_RUNTIME_MAX_AGE_SECONDS / 3600,
+        show_default=True,
+        help="With --incremental, reuse stored runtime usage younger than this",
+    )(command)
+    command = click.option(
+        "--incremental",
+        is_flag=True,
+        default=False,
+        help="Reuse the last stored report of each endpoint for unchanged projects and recent runtime usage",
+    )(command)
+    command = click.option(
+        "--history-db",
+        default=None,
+        type=click.Path(dir_okay=False),
+        help="SQLite file in which to record the reports (defaults to HISTORY_DB_PATH)",
+    )(command)
+    return command
+
+
+def _match_calls_option(command):
+    """Add the option choosing how client code is matched, shared by the audit commands."""
+    return click.option(
+        "--match-calls",
+        is_flag=True,
+        default=False,
+        help="Count only the client calls (Feign, RestTemplate, WebClient) with the HTTP method and path "
+        "template of the endpoint, instead of every occurrence of the path text",
+    )(command)
+
+
+def _client_file_index() -> ClientFileIndex:
+    """
+    Index of the client files of the configured languages (CLIENT_LANGUAGES), walked once per
+    project with the directory snapshot of WALK_SNAPSHOT_DIR, searched with the configured
+    backend (SEARCH_BACKEND).
+    """
+    settings = get_settings()
+    try:
+        backend = search_backend(settings.search_backend)
+        matcher = client_file_matcher(get_client_languages())
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    snapshot = DirectorySnapshot(settings.walk_snapshot_dir) if settings.walk_snapshot_dir else None
+    return ClientFileIndex(matcher=matcher, backend=backend, snapshot=snapshot)
+
+
+def _reference_index(match_calls: bool, projects_paths: List[str]) -> Optional[ClientReferenceIndex]:
+    if not match_calls:
+        return None
+    reference_index = ClientReferenceIndex()
+    reference_index.refresh(projects_paths)
+    return reference_index
+
+
+def _load_audit_requests(requests_file: str) -> List[AuditRequest]:
+    """
+    Read the audits of a --file.
+
+    Raises:
+        click.BadParameter: If the file is not a JSON list, naming the first malformed entry otherwise
+    """
+    with open(requests_file, "r", encoding="utf-8") as f:
+        try:
+            entries = json.load(f)
+        except ValueError as e:
+            raise click.BadParameter(f"{requests_file} is not valid JSON: {e}", param_hint="--file")
+    if not isinstance(entries, list):
+        raise click.BadParameter(f"{requests_file} must be a JSON list of audits", param_hint="--file")
+
+    audit_requests = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise click.BadParameter(f"entry {index} is not an object: {entry!r}", param_hint="--file")
+        try:
+            audit_requests.append(AuditRequest.from_dict(entry))
+        except ValueError as e:
+            raise click.BadParameter(f"entry {index} ({entry.get('endpoint') or 'no endpoint'}): {e}", param_hint="--file")
+    return audit_requests
+
+
+def _open_history(history_db: Optional[str], required: bool) -> Optional[HistoryStore]:
+    path = history_db or get_settings().history_db_path
+    if not path:
+        if required:
+            raise click.UsageError("This option needs a history database (--history-db or HISTORY_DB_PATH)")
+        return None
+    return HistoryStore(path)
+
+
+def _create_tracer(
+    profile: bool,
+    trace_output: Optional[str],
+    cprofile_output: Optional[str],
+    metrics_textfile: Optional[str]
+) -> Optional[Tracer]:
+    if not (profile or trace_output or cprofile_output or metrics_textfile):
+        return None
+    return Tracer(cprofile_output=cprofile_output)
+
 
+def _export_run(
+    tracer: Optional[Tracer],
+    reports: List[Dict[str, Any]],
+    profile: Dict[str, Any],
+    show_profile: bool,
+    trace_output: Optional[str],
+    metrics_textfile: Optional[str]
+) -> None:
+    if not tracer:
+        return
 
-@click.command()
+    if show_profile:
+        _print_profile(profile)
+    if trace_output:
+        tracer.dump_chrome_trace(trace_output)
+        print(f"Trace written to {trace_output}")
+    if metrics_textfile:
+        write_prometheus_textfile(path=metrics_textfile, reports=reports, tracer=tracer)
+        print(f"Metrics written to {metrics_textfile}")
+
+
+def _print_profile(profile: Dict[str, Any]) -> None:
+    print("Profile:")
+    for name, stage in profile["stages"].items():
+        measures = ", ".join(f"{key}={value}" for key, value in stage.items() if key not in ("calls", "seconds"))
+        print(f"  {name:<28} {stage['seconds']:>10.4f}s  calls={stage['calls']}" + (f", {measures}" if measures else ""))
+
+
+@click.group()
+def cli():
+    """
+    Endpoint Deprecation Auditor: assess whether API endpoints can be safely deprecated.
+    """
+
+
+@cli.command()
 @click.option(
     "--endpoint",
     required=True,
@@ -38,34 +230,635 @@ from integrations.jira_service import post_report_to_jira
     default=None,
     help="Jira ticket ID (optional) to post the report",
 )
+@click.option(
+    "--jira-delta",
+    is_flag=True,
+    default=False,
+    help="Post only what changed since the last recorded report of the endpoint (needs the history)",
+)
+@_match_calls_option
+@_history_options
+@_profiling_options
 def audit(
-    endpoint, http_method, log, application_name, days, jira
+    endpoint, http_method, log, application_name, days, jira, jira_delta, match_calls,
+    history_db, incremental, runtime_max_age_hours,
+    profile, trace_output, cprofile_output, metrics_textfile
 ):
     """
     Audit a given endpoint to determine whether it can be deprecated.
     """
     print(f"Running deprecation audit for endpoint: {endpoint}")
 
+    try:
+        http_method = HttpMethod.from_str(http_method).value
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--http-method")
+
     # Get the projects paths from the environment
-    projects_paths = settings.default_projects_paths.split(",")
+    projects_paths = get_settings().default_projects_paths.split(",")
+
+    tracer = _create_tracer(profile, trace_output, cprofile_output, metrics_textfile)
+    history = _open_history(history_db, incremental or jira_delta)
+    previous = history.latest(endpoint, http_method) if history is not None and jira_delta else None
+    reference_index = _reference_index(match_calls, projects_paths)
 
     # Start pipeline execution
-    result = asyncio.run(run_pipeline(
-        endpoint=endpoint,
-        log=log,
-        application_name=application_name,
-        projects_paths=projects_paths,
-        days=days,
-    ))
+    with use_tracer(tracer) if tracer else nullcontext(), history or nullcontext():
+        result = asyncio.run(run_pipeline(
+            endpoint=endpoint,
+            log=log,
+            application_name=application_name,
+            projects_paths=projects_paths,
+            days=days,
+            http_method=http_method,
+            history=history,
+            incremental=incremental,
+            runtime_max_age_seconds=runtime_max_age_hours * 3600,
+            reference_index=reference_index,
+            file_index=_client_file_index(),
+        ))
+
+    _export_run(
+        tracer,
+        reports=[result],
+        profile=result["metadata"].get("profile", {}),
+        show_profile=bool(profile or trace_output or cprofile_output),
+        trace_output=trace_output,
+        metrics_textfile=metrics_textfile,
+    )
 
     if is_jira_enabled() and jira:
-        print(f"Posting report to Jira ticket: {jira}")
-        post_report_to_jira(issue_key=jira, report=result)
-        print(f"Report posted to {jira}")
+        from endpoint_auditor.integrations.jira_service import post_diff_to_jira, post_report_to_jira
+
+        if previous is not None:
+            print(f"Posting changes since {previous.generated_at} to Jira ticket: {jira}")
+            post_diff_to_jira(issue_key=jira, diff=diff_reports(previous.report, result))
+            print(f"Report posted to {jira}")
+        else:
+            print(f"Posting report to Jira ticket: {jira}")
+            print(_describe_jira_outcome(jira, post_report_to_jira(issue_key=jira, report=result)))
 
     print("Audit complete.")
 
 
+@cli.command()
+@click.option(
+    "--file",
+    "requests_file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON file with a list of audits, each with endpoint, http_method, log, "
+    "application_name and optionally jira",
+)
+@click.option(
+    "--controllers",
+    "controllers_paths",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Audit every endpoint declared by the Spring controllers of this service directory "
+    "instead of a file (repeatable, needs --application-name)",
+)
+@click.option(
+    "--application-name",
+    default=None,
+    help="With --controllers, name of the application emitting the logs",
+)
+@click.option(
+    "--catalog-cache",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="With --controllers, JSON file caching the parsed controllers between runs",
+)
+@click.option(
+    "--days",
+    default=30,
+    help="Number of days to look back for runtime usage in Graylog",
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "ndjson"]),
+    default="text",
+    help="'ndjson' writes each report to stdout as one JSON line as soon as its audit "
+    "completes, followed by a summary line; progress messages go to stderr",
+)
+@click.option(
+    "--concurrency",
+    default=1,
+    help="Number of audits running at the same time; reports are output in completion order",
+)
+@click.option(
+    "--jira-workers",
+    default=4,
+    show_default=True,
+    help="Number of reports posted to Jira at the same time, over one shared connection pool",
+)
+@click.option(
+    "--jira-background",
+    is_flag=True,
+    default=False,
+    help="Post reports to Jira while the remaining audits run instead of waiting for each comment; "
+    "the batch waits for every comment before exiting",
+)
+@_match_calls_option
+@_history_options
+@_profiling_options
+def batch(
+    requests_file, controllers_paths, application_name, catalog_cache,
+    days, output_format, concurrency, jira_workers, jira_background, match_calls,
+    history_db, incremental, runtime_max_age_hours,
+    profile, trace_output, cprofile_output, metrics_textfile
+):
+    """
+    Audit several endpoints in one run, listed in a file or found in the controllers of a service.
+    """
+    if bool(requests_file) == bool(controllers_paths):
+        raise click.UsageError("Give either --file or --controllers")
+    if controllers_paths and not application_name:
+        raise click.UsageError("--controllers needs --application-name")
+
+    ndjson = output_format == "ndjson"
+    writer = NdjsonReportWriter(sys.stdout) if ndjson else None
+
+    # In NDJSON mode stdout carries the reports only, everything else goes to stderr
+    with redirect_stdout(sys.stderr) if ndjson else nullcontext():
+        if requests_file:
+            audit_requests = _load_audit_requests(requests_file)
+        else:
+            audit_requests = [
+                endpoint.to_audit_request(application_name)
+                for endpoint in scan_controllers(list(controllers_paths), cache_path=catalog_cache)
+            ]
+
+        print(f"Running deprecation audit for {len(audit_requests)} endpoints")
+
+        projects_paths = get_settings().default_projects_paths.split(",")
+
+        tracer = _create_tracer(profile, trace_output, cprofile_output, metrics_textfile)
+        history = _open_history(history_db, incremental)
+        # Client files are parsed once for the whole batch
+        reference_index = _reference_index(match_calls, projects_paths)
+
+        # Only the recommendation of each report is kept, for the metrics
+        recommendations: List[Dict[str, Any]] = []
+
+        # One poster, and so one connection pool, for all the comments of the batch
+        poster = None
+        if is_jira_enabled() and any(audit_request.jira for audit_request in audit_requests):
+            from endpoint_auditor.integrations.jira_poster import JiraCommentPoster
+
+            poster = JiraCommentPoster(max_workers=jira_workers)
+        postings: List[Tuple[str, Future]] = []
+
+        def handle_report(audit_request: AuditRequest, report: Dict[str, Any]) -> None:
+            if writer:
+                writer.write_report(report)
+            else:
+                print(f"{audit_request.http_method} {audit_request.endpoint}: {report['recommendation']['status']}")
+            recommendations.append({"recommendation": report["recommendation"]})
+
+            if poster is not None and audit_request.jira:
+                from endpoint_auditor.integrations.jira_service import post_report_to_jira, submit_report_to_jira
+
+                if jira_background:
+                    postings.append((audit_request.jira, submit_report_to_jira(audit_request.jira, report, poster)))
+                else:
+                    outcome = post_report_to_jira(issue_key=audit_request.jira, report=report, poster=poster)
+                    print(_describe_jira_outcome(audit_request.jira, outcome))
+
+        try:
+            with use_tracer(tracer) if tracer else nullcontext(), history or nullcontext(), poster or nullcontext():
+                asyncio.run(_run_batch(
+                    audit_requests=audit_requests,
+                    projects_paths=projects_paths,
+                    days=days,
+                    concurrency=concurrency,
+                    handle_report=handle_report,
+                    history=history,
+                    incremental=incremental,
+                    runtime_max_age_seconds=runtime_max_age_hours * 3600,
+                    reference_index=reference_index,
+                ))
+            # Closing the poster waited for the background comments
+            _report_postings(postings)
+        except Exception as e:
+            if not writer:
+                raise
+            writer.write_summary(error=str(e))
+            raise click.ClickException(str(e))
+
+        if writer:
+            writer.write_summary()
+
+        _export_run(
+            tracer,
+            reports=recommendations,
+            profile=tracer.summary() if tracer else {},
+            show_profile=bool(profile or trace_output or cprofile_output),
+            trace_output=trace_output,
+            metrics_textfile=metrics_textfile,
+        )
+
+        print("Batch audit complete.")
+
+
+@cli.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--application-name",
+    default=None,
+    help="Added to every entry, so the JSON output can be given to 'batch --file'",
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    help="'json' writes the catalog as a list of audits, with the controller, handler and source location",
+)
+@click.option(
+    "--cache",
+    "cache_path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="JSON file caching the parsed controllers; only changed controllers are parsed again",
+)
+def catalog(paths, application_name, output_format, cache_path):
+    """
+    List the endpoints declared by the Spring controllers (*Controller*.java) under PATHS.
+    """
+    endpoints = scan_controllers(list(paths), cache_path=cache_path)
+
+    if output_format == "json":
+        entries = []
+        for endpoint in endpoints:
+            entry = {"endpoint": endpoint.path, "http_method": endpoint.http_method, "log": endpoint.log}
+            if application_name:
+                entry["application_name"] = application_name
+            entry.update(controller=endpoint.controller, handler=endpoint.handler, file=endpoint.file, line=endpoint.line)
+            entries.append(entry)
+        click.echo(json.dumps(entries, indent=2))
+        return
+
+    for endpoint in endpoints:
+        log = f'  "{endpoint.log}"' if endpoint.log else ""
+        click.echo(
+            f"{endpoint.http_method or 'ANY':<7} {endpoint.path}  "
+            f"{endpoint.controller}.{endpoint.handler} ({endpoint.file}:{endpoint.line}){log}"
+        )
+    click.echo(f"{len(endpoints)} endpoints")
+
+
+@cli.command()
+@click.option(
+    "--registry",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON list of the deprecated endpoints, objects with an 'endpoint' key (a batch file works)",
+)
+@click.option(
+    "--range",
+    "diff_range",
+    default=None,
+    help="Revisions to diff, e.g. 'origin/main...HEAD' for the changes of a pull request",
+)
+@click.option(
+    "--diff-file",
+    default=None,
+    type=click.Path(dir_okay=False, allow_dash=True),
+    help="Unified diff to check instead of running git diff; '-' reads it from stdin",
+)
+@click.option("--repo", "repository_path", default=".", help="Repository to diff with --range")
+@click.option(
+    "--languages",
+    default=None,
+    help="Comma-separated language profiles whose client files are checked (all by default)",
+)
+@click.option(
+    "--all-files",
+    is_flag=True,
+    default=False,
+    help="Check every changed file, not only the client files",
+)
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    help="'json' writes the violations as a list of objects with the file, line and endpoint",
+)
+def guard(registry, diff_range, diff_file, repository_path, languages, all_files, output_format):
+    """
+    Fail when a change adds a reference to a deprecated endpoint, for CI.
+
+    Only the lines added by the diff are searched, so the check costs the size of the
+    change and not the size of the projects. Exits with status 1 when a reference is found.
+    No configuration is needed, so it runs in any CI job.
+    """
+    if bool(diff_range) == bool(diff_file):
+        raise click.UsageError("Give either --range or --diff-file")
+
+    try:
+        file_matcher = None
+        if not all_files:
+            file_matcher = client_file_matcher(tuple(languages.split(",")) if languages else None)
+        endpoints = load_registry(registry)
+        if diff_file:
+            with click.open_file(diff_file, "r", encoding="utf-8", errors="replace") as f:
+                diff_text = f.read()
+        else:
+            diff_text = git_diff(repository_path, diff_range)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    violations = guard_diff(diff_text, endpoints, file_matcher)
+
+    if output_format == "json":
+        click.echo(json.dumps([violation.to_dict() for violation in violations], indent=2))
+    else:
+        for violation in violations:
+            deprecated = violation.endpoint
+            method = f"{deprecated.http_method} " if deprecated.http_method else ""
+            jira = f" ({deprecated.jira})" if deprecated.jira else ""
+            click.echo(f"{violation.file}:{violation.line}: deprecated endpoint {method}{deprecated.endpoint}{jira}")
+            click.echo(f"    {violation.text}")
+        click.echo(f"{len(violations)} references to deprecated endpoints added", err=True)
+
+    if violations:
+        sys.exit(1)
+
+
+def _describe_jira_outcome(issue_key: str, outcome: str) -> str:
+    """Progress message for the outcome of post_report_to_jira()."""
+    if outcome == "updated":
+        return f"Report updated on {issue_key}"
+    if outcome == "unchanged":
+        return f"Report on {issue_key} unchanged, nothing posted"
+    return f"Report posted to {issue_key}"
+
+
+def _report_postings(postings: List[Tuple[str, Future]]) -> None:
+    """Print the outcome of the comments posted in the background, failing if any was not posted."""
+    failures = 0
+    for issue_key, future in postings:
+        error = future.exception()
+        if error is None:
+            print(_describe_jira_outcome(issue_key, future.result()))
+        else:
+            failures += 1
+            print(f"Failed to post report to {issue_key}: {error}")
+
+    if failures:
+        raise RuntimeError(f"{failures} of {len(postings)} reports could not be posted to Jira")
+
+
+async def _run_batch(
+    audit_requests: List[AuditRequest],
+    projects_paths: List[str],
+    days: int,
+    concurrency: int,
+    handle_report: Callable[[AuditRequest, Dict[str, Any]], None],
+    history: Optional[HistoryStore],
+    incremental: bool,
+    runtime_max_age_seconds: float,
+    reference_index: Optional[ClientReferenceIndex] = None,
+) -> None:
+    async for audit_request, report in iter_batch_pipeline(
+        audit_requests=audit_requests,
+        projects_paths=projects_paths,
+        days=days,
+        max_concurrency=concurrency,
+        history=history,
+        incremental=incremental,
+        runtime_max_age_seconds=runtime_max_age_seconds,
+        reference_index=reference_index,
+        file_index=_client_file_index(),
+    ):
+        handle_report(audit_request, report)
+
+
+@cli.command()
+@click.option(
+    "--history-db",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="SQLite file in which the reports were recorded (defaults to HISTORY_DB_PATH)",
+)
+@click.option("--endpoint", default=None, help="Only audits of this endpoint")
+@click.option("--http-method", default=None, help="Only audits of this HTTP method")
+@click.option(
+    "--status",
+    default=None,
+    type=click.Choice(
+        ["candidate_for_deprecation", "still_referenced_in_code", "runtime_usage_detected", "needs_review"]
+    ),
+    help="Only audits with this recommendation",
+)
+@click.option("--since", default=None, help="Only audits generated since this date (e.g. '2026-01-01')")
+@click.option("--limit", default=50, help="Maximum number of audits shown")
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    help="Output format",
+)
+def history(history_db, endpoint, http_method, status, since, limit, output_format):
+    """
+    Show the recorded audits, most recent first, to follow endpoints over time.
+    """
+    path = history_db or get_settings().history_db_path
+    if not path:
+        raise click.UsageError("No history database: pass --history-db or set HISTORY_DB_PATH")
+
+    if http_method:
+        try:
+            http_method = HttpMethod.from_str(http_method).value
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--http-method")
+
+    with HistoryStore(path) as store:
+        audits = store.timeline(
+            endpoint=endpoint,
+            http_method=http_method,
+            status=status,
+            since=since,
+            limit=limit,
+        )
+
+    if output_format == "json":
+        print(json.dumps(audits, indent=2))
+        return
+
+    if not audits:
+        print("No audits recorded.")
+        return
+
+    print(f"{'Generated at':<26} {'Endpoint':<40} {'Status':<26} {'Runtime':>8} {'Code':>6}")
+    for entry in audits:
+        runtime = entry["runtime_occurrences"] if entry["runtime_enabled"] else "-"
+        target = f"{entry['http_method'] or ''} {entry['endpoint']}".strip()
+        print(
+            f"{entry['generated_at']:<26} {target:<40} {entry['status']:<26} "
+            f"{runtime if runtime is not None else '?':>8} {entry['code_matches']:>6}"
+        )
+
+
+@cli.command()
+@click.argument("report_files", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--history-db",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Compare the two most recent recorded reports of --endpoint instead of two report files",
+)
+@click.option("--endpoint", default=None, help="Endpoint whose recorded reports are compared")
+@click.option("--http-method", default=None, help="HTTP method of the endpoint")
+@click.option(
+    "--output",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    help="Output format",
+)
+@click.option("--jira", default=None, help="Jira ticket ID to post the changes to")
+def diff(report_files, history_db, endpoint, http_method, output_format, jira):
+    """
+    Show what changed between two audits of an endpoint.
+
+    Pass two report JSON files (OLD NEW), or --endpoint to compare its two most recent
+    recorded reports.
+    """
+    if report_files:
+        if len(report_files) != 2:
+            raise click.UsageError("Pass exactly two report files: OLD NEW")
+        old, new = (_load_report(path) for path in report_files)
+    else:
+        if not endpoint:
+            raise click.UsageError("Pass two report files, or --endpoint to compare recorded reports")
+        path = history_db or get_settings().history_db_path
+        if not path:
+            raise click.UsageError("No history database: pass --history-db or set HISTORY_DB_PATH")
+        if http_method:
+            try:
+                http_method = HttpMethod.from_str(http_method).value
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--http-method")
+        with HistoryStore(path) as store:
+            snapshots = store.snapshots(endpoint, http_method, limit=2)
+        if len(snapshots) < 2:
+            raise click.ClickException(f"Less than two recorded audits of {endpoint}")
+        new, old = (snapshot.report for snapshot in snapshots)
+
+    report_diff = diff_reports(old, new)
+
+    if output_format == "json":
+        print(json.dumps(diff_to_dict(report_diff), indent=2))
+    else:
+        print(format_diff_text(report_diff))
+
+    if jira:
+        if not is_jira_enabled():
+            raise click.ClickException("Jira integration is not configured")
+        from endpoint_auditor.integrations.jira_service import post_diff_to_jira
+
+        post_diff_to_jira(issue_key=jira, diff=report_diff)
+        print(f"Changes posted to {jira}", file=sys.stderr)
+
+
+def _load_report(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", help="Interface to listen on")
+@click.option("--port", default=8765, help="Port to listen on")
+@click.option(
+    "--max-concurrency",
+    default=4,
+    help="Maximum number of audits running at the same time",
+)
+@click.option(
+    "--max-pending",
+    default=100,
+    help="Maximum number of audits running or queued; further requests are rejected with 503",
+)
+@click.option(
+    "--days",
+    default=30,
+    help="Default number of days to look back when a request does not specify it",
+)
+def serve(host, port, max_concurrency, max_pending, days):
+    """
+    Run the audit service, keeping the file index and Graylog sessions warm between audits.
+    """
+    from endpoint_auditor.service.server import run_server
+
+    projects_paths = get_settings().default_projects_paths.split(",")
+
+    try:
+        asyncio.run(run_server(
+            projects_paths=projects_paths,
+            host=host,
+            port=port,
+            max_concurrency=max_concurrency,
+            max_pending=max_pending,
+            default_days=days,
+            file_index=_client_file_index(),
+        ))
+    except KeyboardInterrupt:
+        print("Audit service stopped.")
+
+
+@cli.command()
+@click.option(
+    "--url",
+    default="http://127.0.0.1:8765",
+    help="URL of the audit service started with 'serve'",
+)
+@click.option("--endpoint", default=None, help="The full path of the endpoint (e.g. '/v1/users/verify')")
+@click.option("--http-method", default=None, help="The HTTP method of the endpoint")
+@click.option("--log", default=None, help="One log that appear when the endpoint is reached")
+@click.option("--application-name", default=None, help="Name of the application that is emitting the logs")
+@click.option(
+    "--file",
+    "requests_file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="JSON file with a list of audits, sent as one batch instead of a single audit",
+)
+@click.option(
+    "--days",
+    default=30,
+    help="Number of days to look back for runtime usage in Graylog",
+)
+def client(url, endpoint, http_method, log, application_name, requests_file, days):
+    """
+    Send audits to a running audit service and print the reports as JSON.
+    """
+    from endpoint_auditor.service.client import AuditServiceClient
+
+    service = AuditServiceClient(base_url=url)
+
+    try:
+        if requests_file:
+            audit_requests = _load_audit_requests(requests_file)
+            result = service.audit_batch(audit_requests, days=days)
+        else:
+            audit_request = AuditRequest.from_dict({
+                "endpoint": endpoint,
+                "http_method": http_method,
+                "log": log,
+                "application_name": application_name,
+            })
+            result = service.audit(audit_request, days=days)
+    except (ValueError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+
+    print(json.dumps(result, indent=2))
+
+
 if __name__ == "__main__":
     # Ensure the command is run in a valid environment
     if not is_graylog_enabled() and not is_jira_enabled():
@@ -73,4 +866,4 @@ if __name__ == "__main__":
         exit(1)
 
     # Run the CLI command
-    audit()
+    cli()
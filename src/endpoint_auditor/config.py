@@ -1,7 +1,24 @@
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field, field_validator
+from pydantic import BaseModel, Field, field_validator
+
+
+class GraylogTarget(BaseModel):
+    """
+    A single Graylog cluster queried for runtime usage.
+
+    :var name: Label of the cluster (e.g. the region) used in the report breakdown
+    :var base_url: Graylog API base URL
+    :var token: Graylog API token
+    :var mcp_base_url: URL of the Graylog MCP server fronting this cluster
+    :var timeout_seconds: Maximum time to wait for this cluster before skipping it
+    """
+    name: str
+    base_url: str
+    token: str
+    mcp_base_url: str
+    timeout_seconds: Optional[float] = None
 
 
 class Settings(BaseSettings):
@@ -19,15 +36,46 @@ class Settings(BaseSettings):
     jira_base_url: Optional[str] = None
     jira_email: Optional[str] = None
     jira_token: Optional[str] = None
+    # Larger file lists are truncated in the comment and attached in full
+    jira_comment_max_files: int = 50
 
     # Graylog Configuration
     graylog_base_url: Optional[str] = None
     graylog_token: Optional[str] = None
     graylog_mcp_base_url: Optional[str] = None
 
+    # Multiple Graylog clusters as a JSON list of GraylogTarget objects.
+    # When set, it takes precedence over the single-cluster variables above.
+    graylog_targets: List[GraylogTarget] = []
+    graylog_target_timeout_seconds: float = 30.0
+
+    # Runtime stage resilience: overall time budget, retries of transient errors
+    # and circuit breaker shared by all audits of a batch
+    graylog_runtime_budget_seconds: float = 120.0
+    graylog_max_attempts: int = 3
+    graylog_backoff_base_seconds: float = 0.5
+    graylog_backoff_max_seconds: float = 5.0
+    graylog_breaker_failure_threshold: int = 3
+    graylog_breaker_reset_seconds: float = 60.0
+
+    # SQLite file in which every report is recorded (the --history-db option wins)
+    history_db_path: Optional[str] = None
+
     # Project paths for scanning codebase
     default_projects_paths: str
 
+    # Languages whose client files are scanned (comma-separated profile names), every
+    # profile if unset. Names are checked against the profiles when the scan is set up
+    client_languages: Optional[str] = None
+
+    # Tool ruling out the client files without the endpoint: auto, python, git or ripgrep,
+    # checked by the scanners when the backend is created
+    search_backend: str = "auto"
+
+    # Directory of the snapshots of the walked directories, shared by audit, batch and serve;
+    # warm walks only list the directories changed since. Every directory is listed if unset
+    walk_snapshot_dir: Optional[str] = None
+
     @field_validator('default_projects_paths')
     @classmethod
     def validate_default_projects_paths(cls, v: str) -> str:
@@ -35,15 +83,75 @@ class Settings(BaseSettings):
             raise ValueError('default_projects_paths cannot be empty')
         return v
 
+    @field_validator('client_languages')
+    @classmethod
+    def validate_client_languages(cls, v: Optional[str]) -> Optional[str]:
+        if v is None:
+            return v
+        names = [name.strip() for name in v.split(",") if name.strip()]
+        if not names:
+            raise ValueError('client_languages cannot be empty')
+        return ",".join(names)
+
+    @field_validator('search_backend')
+    @classmethod
+    def validate_search_backend(cls, v: str) -> str:
+        return v.strip().lower()
+
+
+# Loaded on the first call of get_settings()
+settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """
+    Returns the settings, loading them from the environment on first use.
+
+    Settings are not loaded at import time, so `--help` and the commands that do not need
+    them neither read .env nor fail on missing variables.
+    """
+    global settings
+    if settings is None:
+        settings = Settings()
+    return settings
+
+
+def get_graylog_targets() -> List[GraylogTarget]:
+    """
+    Returns the Graylog clusters to query.
+
+    GRAYLOG_TARGETS wins when present, otherwise the single-cluster variables are exposed as
+    one target named "default". Targets without an explicit timeout get the global one.
+    """
+    settings = get_settings()
+    targets = list(settings.graylog_targets)
+    if not targets and settings.graylog_base_url and settings.graylog_token and settings.graylog_mcp_base_url:
+        targets = [GraylogTarget(
+            name="default",
+            base_url=settings.graylog_base_url,
+            token=settings.graylog_token,
+            mcp_base_url=settings.graylog_mcp_base_url,
+        )]
+
+    return [
+        target if target.timeout_seconds is not None
+        else target.model_copy(update={"timeout_seconds": settings.graylog_target_timeout_seconds})
+        for target in targets
+    ]
+
 
-settings = Settings()
+def get_client_languages() -> Optional[Tuple[str, ...]]:
+    """Returns the names of the language profiles whose client files are scanned, None for all of them."""
+    client_languages = get_settings().client_languages
+    return tuple(client_languages.split(",")) if client_languages is not None else None
 
 
 def is_graylog_enabled() -> bool:
     """Returns whether Graylog integration is enabled based on configuration."""
-    return bool(settings.graylog_base_url and settings.graylog_token and settings.graylog_mcp_base_url)
+    return bool(get_graylog_targets())
 
 
 def is_jira_enabled() -> bool:
     """Returns whether Jira integration is enabled based on configuration."""
+    settings = get_settings()
     return bool(settings.jira_base_url and settings.jira_email and settings.jira_token)
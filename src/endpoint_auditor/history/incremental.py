@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from endpoint_auditor.history.store import StoredAudit, project_resolver
+from endpoint_auditor.models import CodeLocation, CodeUsage, RuntimeUsage
+from endpoint_auditor.scanners.usage_scanner import (
+    ClientFileIndex,
+    ScanStats,
+    fingerprint_project,
+    scan_code_usage,
+)
+
+
+# Runtime results younger than this are reused by incremental audits
+DEFAULT_RUNTIME_MAX_AGE_SECONDS = 24 * 3600
+
+
+def scan_code_usage_incrementally(
+    endpoint: str,
+    projects_paths: List[str],
+    previous: Optional[StoredAudit],
+    file_index: Optional[ClientFileIndex] = None,
+    stats: Optional[ScanStats] = None,
+) -> Tuple[CodeUsage, Dict[str, str], List[str]]:
+    """
+    Scan code usage, reusing the matches of the previous audit for unchanged projects.
+
+    A project is unchanged when the fingerprint of its client files (paths, sizes and
+    modification times) equals the one stored with the previous audit of the endpoint.
+    `stats` only counts the files of the projects actually scanned.
+
+    Returns:
+        The code usage of all projects, the fingerprint of each project and the projects
+        whose matches were reused
+    """
+    fingerprints = {project: fingerprint_project(project, file_index) for project in projects_paths}
+
+    previous_matches = _previous_matches_per_file(previous)
+    reused = [
+        project for project in projects_paths
+        if previous_matches is not None and previous.project_fingerprints.get(project) == fingerprints[project]
+    ]
+    to_scan = [project for project in projects_paths if project not in reused]
+
+    matches_per_file: Dict[str, int] = {}
+    locations: List[CodeLocation] = []
+    if to_scan:
+        scanned = scan_code_usage(endpoint, to_scan, file_index=file_index, stats=stats)
+        matches_per_file.update(scanned.matches_per_file)
+        locations.extend(scanned.locations)
+    if reused:
+        resolve_project = project_resolver(projects_paths)
+        matches_per_file.update({
+            file_path: matches
+            for file_path, matches in previous_matches.items()
+            if resolve_project(file_path) in reused
+        })
+        # Reports stored before locations were recorded have none
+        locations.extend(
+            CodeLocation(**location)
+            for location in previous.report.get("code_usage", {}).get("locations", [])
+            if resolve_project(location["file"]) in reused
+        )
+
+    code_usage = CodeUsage(
+        projects_paths=projects_paths,
+        matches_count=sum(matches_per_file.values()),
+        files=sorted(matches_per_file),
+        matches_per_file=dict(sorted(matches_per_file.items())),
+        locations=sorted(locations, key=lambda location: (location.file, location.line, location.column or 0)),
+    )
+    return code_usage, fingerprints, reused
+
+
+def reusable_runtime_usage(
+    previous: Optional[StoredAudit],
+    days: int,
+    application_name: str,
+    max_age_seconds: float,
+    now: Optional[datetime] = None,
+) -> Optional[RuntimeUsage]:
+    """
+    Returns the runtime usage of the previous audit when it can stand for a new query: it
+    was actually measured, over the same number of days and stream, less than
+    `max_age_seconds` ago.
+    """
+    if previous is None:
+        return None
+
+    runtime = previous.report.get("runtime_usage", {})
+    audit = previous.report.get("audit") or {}
+    if not runtime.get("enabled") or runtime.get("days") != days or audit.get("application_name") != application_name:
+        return None
+
+    generated_at = datetime.fromisoformat(previous.generated_at)
+    if ((now or datetime.now(timezone.utc)) - generated_at).total_seconds() > max_age_seconds:
+        return None
+
+    return RuntimeUsage.from_dict(runtime)
+
+
+def _previous_matches_per_file(previous: Optional[StoredAudit]) -> Optional[Dict[str, int]]:
+    """Matches per file of the previous audit, None when they cannot be reused."""
+    if previous is None:
+        return None
+    code = previous.report.get("code_usage", {})
+    if "matches_per_file" not in code:
+        return None  # Stored before per-file matches were recorded
+    return code["matches_per_file"]
@@ -0,0 +1,254 @@
+import json
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    id INTEGER PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    http_method TEXT,
+    application_name TEXT,
+    generated_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    runtime_enabled INTEGER NOT NULL,
+    runtime_days INTEGER,
+    runtime_occurrences INTEGER,
+    runtime_last_seen TEXT,
+    code_matches INTEGER NOT NULL,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audits_endpoint ON audits (endpoint, http_method, generated_at);
+CREATE INDEX IF NOT EXISTS idx_audits_status ON audits (status, generated_at);
+CREATE INDEX IF NOT EXISTS idx_audits_generated_at ON audits (generated_at);
+
+CREATE TABLE IF NOT EXISTS audit_files (
+    audit_id INTEGER NOT NULL REFERENCES audits (id) ON DELETE CASCADE,
+    project_path TEXT,
+    file_path TEXT NOT NULL,
+    matches INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_audit_files_audit ON audit_files (audit_id);
+CREATE INDEX IF NOT EXISTS idx_audit_files_path ON audit_files (file_path);
+
+CREATE TABLE IF NOT EXISTS audit_projects (
+    audit_id INTEGER NOT NULL REFERENCES audits (id) ON DELETE CASCADE,
+    project_path TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    PRIMARY KEY (audit_id, project_path)
+);
+"""
+
+
+@dataclass(frozen=True)
+class StoredAudit:
+    """
+    An audit report read back from the history
+
+    :var id: Row ID of the audit
+    :var generated_at: When the report was generated (ISO 8601, UTC)
+    :var report: The report, as produced by generate_base_report()
+    :var project_fingerprints: Fingerprint of the client files of each scanned project
+    """
+    id: int
+    generated_at: str
+    report: Dict[str, Any]
+    project_fingerprints: Dict[str, str]
+
+
+class HistoryStore:
+    """
+    Local SQLite history of the audit reports.
+
+    Besides the full report, the columns used to follow an endpoint over time (status,
+    runtime occurrences, code matches) and the matches of each file are stored in indexed
+    columns and tables, so history queries never parse the stored reports.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file, created on first use
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def record(self, report: Dict[str, Any], project_fingerprints: Optional[Dict[str, str]] = None) -> int:
+        """
+        Store a report.
+
+        Args:
+            report: Report produced by generate_base_report(), with its `audit` section
+            project_fingerprints: Fingerprint of each scanned project, used by incremental audits
+
+        Returns:
+            Row ID of the stored audit
+        """
+        audit = report.get("audit") or {}
+        runtime = report["runtime_usage"]
+        code = report["code_usage"]
+        resolve_project = project_resolver(code.get("projects_paths", []))
+        matches_per_file = code.get("matches_per_file") or {path: 0 for path in code.get("files", [])}
+
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO audits (endpoint, http_method, application_name, generated_at, status, "
+                "runtime_enabled, runtime_days, runtime_occurrences, runtime_last_seen, code_matches, report) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    audit.get("endpoint"),
+                    audit.get("http_method"),
+                    audit.get("application_name"),
+                    report["metadata"]["generated_at"],
+                    report["recommendation"]["status"],
+                    int(runtime["enabled"]),
+                    runtime.get("days"),
+                    runtime.get("total_occurrences"),
+                    runtime.get("last_seen"),
+                    code["matches_count"],
+                    json.dumps(report),
+                ),
+            )
+            audit_id = cursor.lastrowid
+
+            self._connection.executemany(
+                "INSERT INTO audit_files (audit_id, project_path, file_path, matches) VALUES (?, ?, ?, ?)",
+                [
+                    (audit_id, resolve_project(file_path), file_path, matches)
+                    for file_path, matches in matches_per_file.items()
+                ],
+            )
+            self._connection.executemany(
+                "INSERT INTO audit_projects (audit_id, project_path, fingerprint) VALUES (?, ?, ?)",
+                [(audit_id, project, fingerprint) for project, fingerprint in (project_fingerprints or {}).items()],
+            )
+
+        return audit_id
+
+    def latest(self, endpoint: str, http_method: Optional[str]) -> Optional[StoredAudit]:
+        """Returns the most recent audit of an endpoint, None if it was never audited."""
+        snapshots = self.snapshots(endpoint, http_method, limit=1)
+        return snapshots[0] if snapshots else None
+
+    def snapshots(self, endpoint: str, http_method: Optional[str], limit: int = 2) -> List[StoredAudit]:
+        """Returns the most recent audits of an endpoint, most recent first."""
+        rows = self._connection.execute(
+            "SELECT id, generated_at, report FROM audits "
+            "WHERE endpoint = ? AND http_method IS ? "
+            "ORDER BY generated_at DESC, id DESC LIMIT ?",
+            (endpoint, http_method, limit),
+        ).fetchall()
+        return [self._stored_audit(row) for row in rows]
+
+    def get(self, audit_id: int) -> Optional[StoredAudit]:
+        """Returns a stored audit by its row ID."""
+        row = self._connection.execute(
+            "SELECT id, generated_at, report FROM audits WHERE id = ?", (audit_id,)
+        ).fetchone()
+        return self._stored_audit(row) if row is not None else None
+
+    def timeline(
+        self,
+        endpoint: Optional[str] = None,
+        http_method: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the stored audits, most recent first.
+
+        Args:
+            endpoint: Only audits of this endpoint
+            http_method: Only audits of this HTTP method
+            status: Only audits with this recommendation status
+            since: Only audits generated at or after this ISO 8601 timestamp or date
+            limit: Maximum number of audits returned
+
+        Returns:
+            One dict per audit with its indexed columns (no full report)
+        """
+        clauses = []
+        params: List[Any] = []
+        for column, value in (("endpoint", endpoint), ("http_method", http_method), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("generated_at >= ?")
+            params.append(since)
+
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        rows = self._connection.execute(
+            "SELECT id, endpoint, http_method, application_name, generated_at, status, runtime_enabled, "
+            "runtime_days, runtime_occurrences, runtime_last_seen, code_matches FROM audits "
+            f"{where}ORDER BY generated_at DESC, id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+
+        return [{**dict(row), "runtime_enabled": bool(row["runtime_enabled"])} for row in rows]
+
+    def files(self, audit_id: int) -> Dict[str, int]:
+        """Returns the matches of each file referencing the endpoint in a stored audit."""
+        return {
+            row["file_path"]: row["matches"]
+            for row in self._connection.execute(
+                "SELECT file_path, matches FROM audit_files WHERE audit_id = ? ORDER BY file_path", (audit_id,)
+            )
+        }
+
+    def _stored_audit(self, row: sqlite3.Row) -> StoredAudit:
+        fingerprints = {
+            project_row["project_path"]: project_row["fingerprint"]
+            for project_row in self._connection.execute(
+                "SELECT project_path, fingerprint FROM audit_projects WHERE audit_id = ?", (row["id"],)
+            )
+        }
+        return StoredAudit(
+            id=row["id"],
+            generated_at=row["generated_at"],
+            report=json.loads(row["report"]),
+            project_fingerprints=fingerprints,
+        )
+
+
+def project_of(file_path: str, projects_paths: List[str]) -> Optional[str]:
+    """Returns the project containing a file, the most specific one when projects are nested."""
+    return project_resolver(projects_paths)(file_path)
+
+
+def project_resolver(projects_paths: List[str]) -> Callable[[str], Optional[str]]:
+    """
+    Returns project_of() for a fixed list of projects, to resolve many files.
+
+    The parent directories of a file are looked up in a dict, deepest first, so resolving a
+    file costs its depth instead of the number of projects.
+    """
+    projects = {project.rstrip("/"): project for project in projects_paths}
+
+    def resolve(file_path: str) -> Optional[str]:
+        # An entry of an archive project, `<archive>!/<entry>`, belongs to the archive
+        file_path = file_path.split("!/", 1)[0]
+        project = projects.get(file_path.rstrip("/"))
+        index = len(file_path)
+        while project is None and index > 0:
+            index = file_path.rfind("/", 0, index)
+            if index < 0:
+                break
+            project = projects.get(file_path[:index])
+        return project
+
+    return resolve
@@ -1,9 +1,45 @@
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
 import json
+import time
 from fastmcp import Client
 from fastmcp.client.transports import StreamableHttpTransport
 
-from endpoint_auditor.config import settings
+from endpoint_auditor.config import GraylogTarget, get_settings
+from endpoint_auditor.profiling import get_tracer
+
+
+class StreamIdCache:
+    """
+    Stream IDs by (MCP server URL, stream name), shared by all clients of the process.
+
+    Resolving a stream costs a full `get_streams` round trip, while stream IDs almost never
+    change: entries are kept for `ttl_seconds`.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+    def get(self, key: Tuple[str, str]) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stream_id, stored_at = entry
+        if self._clock() - stored_at > self._ttl_seconds:
+            del self._entries[key]
+            return None
+        return stream_id
+
+    def put(self, key: Tuple[str, str], stream_id: str) -> None:
+        self._entries[key] = (stream_id, self._clock())
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+stream_id_cache = StreamIdCache()
 
 
 class GraylogMCPClient:
@@ -13,20 +49,37 @@ class GraylogMCPClient:
     Uses FastMCP to communicate with Graylog API endpoints.
     """
 
-    def __init__(self):
-        """Initialize the Graylog MCP client with configuration from settings."""
+    def __init__(self, target: Optional[GraylogTarget] = None):
+        """
+        Initialize the Graylog MCP client.
+
+        Args:
+            target: Graylog cluster to connect to. Defaults to the single-cluster settings.
+        """
         self._client: Optional[Client] = None
+        self._target = target
         self._initialize_client()
 
     def _initialize_client(self) -> None:
         """Create and configure the MCP client if Graylog is enabled."""
+        if self._target is not None:
+            mcp_base_url = self._target.mcp_base_url
+            base_url = self._target.base_url
+            token = self._target.token
+        else:
+            settings = get_settings()
+            mcp_base_url = settings.graylog_mcp_base_url
+            base_url = settings.graylog_base_url
+            token = settings.graylog_token
+        self._mcp_base_url = mcp_base_url
+
         try:
             transport = StreamableHttpTransport(
-                url=settings.graylog_mcp_base_url,
+                url=mcp_base_url,
                 headers={
-                    "Authorization": f"Bearer {settings.graylog_token}",
-                    "X-GRAYLOG-API-BASE-URL": settings.graylog_base_url,
-                    "X-GRAYLOG-API-TOKEN": settings.graylog_token,
+                    "Authorization": f"Bearer {token}",
+                    "X-GRAYLOG-API-BASE-URL": base_url,
+                    "X-GRAYLOG-API-TOKEN": token,
                 },
             )
             self._client = Client(transport)
@@ -34,6 +87,20 @@ class GraylogMCPClient:
             raise ValueError(f"Failed to initialize Graylog MCP client: {e}")
 
 
+    async def connect(self) -> None:
+        """
+        Open the MCP session and keep it open until disconnect().
+
+        Queries made in between reuse the session instead of opening their own.
+        """
+        await self._client.__aenter__()
+
+
+    async def disconnect(self) -> None:
+        """Close the session opened by connect()."""
+        await self._client.__aexit__(None, None, None)
+
+
     async def get_log_count_by_stream_name(self, stream_name: str, query: str, days: int) -> int:
         """
         Get log count by stream name in a single connection.
@@ -47,10 +114,51 @@ class GraylogMCPClient:
             Number of log occurrences
         """
         async with self._client:
-            stream_id = await self._find_stream_by_name(stream_name)
+            stream_id = await self._resolve_stream_id(stream_name)
             return await self._search_logs(stream_id, query, days)
 
 
+    async def get_log_rows_by_stream_name(self, stream_name: str, query: str, days: int) -> List[Any]:
+        """
+        Get the matching log rows by stream name in a single connection.
+
+        Unlike get_log_count_by_stream_name, the rows are returned so that callers can derive
+        the last occurrence and a per-day histogram from their timestamps.
+
+        Args:
+            stream_name: Name of the stream
+            query: Lucene query
+            days: Number of days to search
+
+        Returns:
+            List of data rows returned by Graylog
+        """
+        async with self._client:
+            stream_id = await self._resolve_stream_id(stream_name)
+            return await self._search_log_rows(stream_id, query, days)
+
+
+    async def _resolve_stream_id(self, stream_name: str) -> str:
+        """
+        Find stream ID by name, going through the process-wide stream ID cache.
+
+        Args:
+            stream_name: Name of the stream to find
+
+        Returns:
+            Stream ID
+        """
+        key = (str(self._mcp_base_url), stream_name)
+        with get_tracer().span("graylog.stream_cache") as span:
+            stream_id = stream_id_cache.get(key)
+            span.add("hits" if stream_id is not None else "misses")
+
+        if stream_id is None:
+            stream_id = await self._find_stream_by_name(stream_name)
+            stream_id_cache.put(key, stream_id)
+        return stream_id
+
+
     async def _find_stream_by_name(self, stream_name: str) -> str:
         """
         Find stream ID by name.
@@ -64,8 +172,12 @@ class GraylogMCPClient:
         Raises:
             ValueError: If stream not found
         """
-        streams_result = await self._client.call_tool("get_streams", {})
-        streams_data = json.loads(getattr(streams_result, "data", streams_result))
+        with get_tracer().span("graylog.stream_resolution") as span:
+            streams_result = await self._client.call_tool("get_streams", {})
+            raw = getattr(streams_result, "data", streams_result)
+            span.add("round_trips")
+            span.add("bytes_received", len(raw))
+        streams_data = json.loads(raw)
 
         for stream in streams_data:
             if stream["title"] == stream_name:
@@ -86,14 +198,72 @@ class GraylogMCPClient:
         Returns:
             Number of log occurrences
         """
+        return len(await self._search_log_rows(stream_id, query, days))
+
+
+    async def _search_log_rows(self, stream_id: str, query: str, days: int) -> List[Any]:
+        """
+        Search logs in a stream and return the matching rows.
+
+        Args:
+            stream_id: ID of the stream
+            query: Lucene query
+            days: Number of days to search
+
+        Returns:
+            List of data rows, each holding the message, caseId and timestamp fields
+        """
         range_in_seconds = days * 24 * 60 * 60
-        search_result = await self._client.call_tool("search_messages_relative", {
-            "stream_id": stream_id,
-            "lucene_query": query,
-            "range_in_seconds": range_in_seconds,
-            "size": 300,
-            "fields": ["message", "caseId", "timestamp"]
-        })
-
-        search_data = json.loads(getattr(search_result, "data", search_result))
-        return len(search_data.get("datarows", []))
+        with get_tracer().span("graylog.search") as span:
+            search_result = await self._client.call_tool("search_messages_relative", {
+                "stream_id": stream_id,
+                "lucene_query": query,
+                "range_in_seconds": range_in_seconds,
+                "size": 300,
+                "fields": ["message", "caseId", "timestamp"]
+            })
+            raw = getattr(search_result, "data", search_result)
+            span.add("round_trips")
+            span.add("bytes_received", len(raw))
+
+        search_data = json.loads(raw)
+        return search_data.get("datarows", [])
+
+
+class GraylogSessionPool:
+    """
+    One connected GraylogMCPClient per cluster, kept open for the lifetime of a
+    long-running process so that audits skip the MCP session handshake.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, GraylogMCPClient] = {}
+        # One lock per cluster, so concurrent first uses open a single session
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, target: GraylogTarget) -> GraylogMCPClient:
+        """Returns the connected client of the cluster, connecting it on first use."""
+        client = self._clients.get(target.name)
+        if client is not None:
+            return client
+
+        async with self._locks.setdefault(target.name, asyncio.Lock()):
+            client = self._clients.get(target.name)
+            if client is None:
+                client = GraylogMCPClient(target=target)
+                await client.connect()
+                self._clients[target.name] = client
+        return client
+
+    async def discard(self, name: str) -> None:
+        """Drop the session of a cluster after a failure, the next query reconnects."""
+        client = self._clients.pop(name, None)
+        if client is not None:
+            try:
+                await client.disconnect()
+            except Exception as e:
+                print(f"Error closing Graylog session '{name}': {e}")
+
+    async def close(self) -> None:
+        for name in list(self._clients):
+            await self.discard(name)
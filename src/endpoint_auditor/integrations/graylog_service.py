@@ -1,53 +1,291 @@
-from endpoint_auditor.models import LogExtraction, RuntimeUsage
-from endpoint_auditor.integrations.graylog_mcp_client import GraylogMCPClient
-from endpoint_auditor.config import is_graylog_enabled
+from __future__ import annotations
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from endpoint_auditor.models import LogExtraction, RuntimeUsage, ClusterUsage
+from endpoint_auditor.integrations.resilience import (
+    CircuitBreakerRegistry,
+    Deadline,
+    RetryPolicy,
+    is_transient_error,
+)
+from endpoint_auditor.config import GraylogTarget, get_graylog_targets, get_settings, is_graylog_enabled
+
+if TYPE_CHECKING:
+    from endpoint_auditor.integrations.graylog_mcp_client import GraylogSessionPool
+
+# Position of the timestamp when Graylog returns rows as lists of the requested fields
+_TIMESTAMP_FIELD_INDEX = 2
 
 
 async def count_log_occurrences(
     log_extracted: LogExtraction,
     days: int,
-    application_name: str
+    application_name: str,
+    breakers: Optional[CircuitBreakerRegistry] = None,
+    deadline: Optional[Deadline] = None,
+    retry_policy: Optional[RetryPolicy] = None,
+    sessions: Optional[GraylogSessionPool] = None
 ) -> RuntimeUsage:
     """
     Count log occurrences for a given endpoint in Graylog.
 
+    All configured Graylog clusters are queried concurrently and their results merged.
+    Each attempt is bounded by the cluster timeout and by the remaining runtime budget,
+    transient errors are retried with jittered exponential backoff, and a cluster whose
+    circuit breaker is open is skipped right away. A cluster that still fails is reported
+    in the per-cluster breakdown without failing the whole analysis.
+
     Args:
         log_extracted: The log extraction data containing endpoint and query
         days: Number of days to search
         application_name: Name of the Graylog stream
+        breakers: Circuit breakers per cluster; pass the same registry to every audit of a batch
+        deadline: Time by which the runtime stage must be done, defaults to the configured budget
+        retry_policy: Retry configuration, defaults to the configured one
+        sessions: Open Graylog sessions to reuse, a new session per query when omitted
 
     Returns:
-        RuntimeUsage with the count of occurrences
+        RuntimeUsage with the count of occurrences, or the reason why it was skipped
     """
 
-    if not is_graylog_enabled() or not log_extracted.extracted or not log_extracted.log_template:
-        return _create_default_runtime_usage(days=days)
+    if not is_graylog_enabled():
+        return _create_default_runtime_usage(days=days, skipped_reason="Graylog integration is not configured")
+    if not log_extracted.extracted or not log_extracted.log_template:
+        return _create_default_runtime_usage(days=days, skipped_reason="No log template to search for")
 
-    try:
-        client = GraylogMCPClient()
-        count = await client.get_log_count_by_stream_name(
-            stream_name=application_name,
-            query=_build_query(log_extracted.log_template),
-            days=days
+    breakers = breakers or create_circuit_breakers()
+    deadline = deadline or Deadline(get_settings().graylog_runtime_budget_seconds)
+    retry_policy = retry_policy or create_retry_policy()
+
+    query = _build_query(log_extracted.log_template)
+    clusters = await asyncio.gather(*[
+        _query_target(
+            target=target,
+            query=query,
+            days=days,
+            application_name=application_name,
+            breakers=breakers,
+            deadline=deadline,
+            retry_policy=retry_policy,
+            sessions=sessions,
         )
+        for target in get_graylog_targets()
+    ])
+
+    return _merge_cluster_usages(clusters=list(clusters), days=days)
+
+
+def create_circuit_breakers() -> CircuitBreakerRegistry:
+    """Create a circuit breaker registry configured from settings."""
+    settings = get_settings()
+    return CircuitBreakerRegistry(
+        failure_threshold=settings.graylog_breaker_failure_threshold,
+        reset_timeout_seconds=settings.graylog_breaker_reset_seconds,
+    )
+
+
+def create_retry_policy() -> RetryPolicy:
+    """Create the retry policy configured from settings."""
+    settings = get_settings()
+    return RetryPolicy(
+        max_attempts=settings.graylog_max_attempts,
+        base_delay_seconds=settings.graylog_backoff_base_seconds,
+        max_delay_seconds=settings.graylog_backoff_max_seconds,
+    )
+
+
+async def _query_target(
+    target: GraylogTarget,
+    query: str,
+    days: int,
+    application_name: str,
+    breakers: CircuitBreakerRegistry,
+    deadline: Deadline,
+    retry_policy: RetryPolicy,
+    sessions: Optional[GraylogSessionPool] = None
+) -> ClusterUsage:
+    """
+    Query a single Graylog cluster with retries, never raising.
+
+    Only transient failures (timeouts, network and throttling errors) are retried and
+    counted by the circuit breaker; a permanent error such as a missing stream ends the
+    query at once.
+
+    Returns:
+        ClusterUsage for the cluster, with error set when the query failed or timed out
+    """
+    breaker = breakers.get(target.name)
+    is_trial = breaker.state == breaker.HALF_OPEN
+    if not breaker.allow_request():
+        error = f"circuit open after {breaker.consecutive_failures} consecutive failures"
+        print(f"Graylog cluster '{target.name}' skipped: {error}")
+        return ClusterUsage(name=target.name, total_occurrences=None, error=error)
+
+    try:
+        error = "runtime budget exhausted"
+        transient = False
+        attempts = 0
+
+        while attempts < retry_policy.max_attempts:
+            timeout = min(target.timeout_seconds, deadline.remaining())
+            if timeout <= 0:
+                error = "runtime budget exhausted"
+                break
+
+            attempts += 1
+            try:
+                rows = await asyncio.wait_for(
+                    _fetch_rows(
+                        target=target,
+                        query=query,
+                        days=days,
+                        application_name=application_name,
+                        sessions=sessions
+                    ),
+                    timeout=timeout
+                )
+                breaker.record_success()
+                return _summarize_rows(name=target.name, rows=rows)
+            except asyncio.TimeoutError:
+                error = f"timed out after {timeout:g}s"
+                transient = True
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                transient = is_transient_error(e)
+
+            if sessions is not None and transient:
+                await sessions.discard(target.name)
+
+            if not transient or attempts >= retry_policy.max_attempts:
+                break
+
+            delay = retry_policy.backoff_delay(attempts - 1)
+            if delay >= deadline.remaining():
+                break
+            await asyncio.sleep(delay)
+
+        if transient:
+            breaker.record_failure()
+        if attempts > 1:
+            error = f"{error} ({attempts} attempts)"
+
+        print(f"Graylog cluster '{target.name}' skipped: {error}")
+        return ClusterUsage(name=target.name, total_occurrences=None, error=error)
+    finally:
+        # A trial ended by a permanent error or by the budget recorded neither a success nor a
+        # failure: without this, the breaker would wait for its end forever
+        if is_trial:
+            breaker.release_trial()
 
-        return RuntimeUsage(
-            enabled=True,
-            provider="Graylog",
+
+async def _fetch_rows(
+    target: GraylogTarget,
+    query: str,
+    days: int,
+    application_name: str,
+    sessions: Optional[GraylogSessionPool]
+) -> List[Any]:
+    if sessions is not None:
+        client = await sessions.get(target)
+    else:
+        # fastmcp is slow to import: load it only when a cluster is actually queried
+        from endpoint_auditor.integrations.graylog_mcp_client import GraylogMCPClient
+        client = GraylogMCPClient(target=target)
+
+    return await client.get_log_rows_by_stream_name(
+        stream_name=application_name,
+        query=query,
+        days=days
+    )
+
+
+def _summarize_rows(name: str, rows: List[Any]) -> ClusterUsage:
+    """
+    Build the usage of one cluster from the rows returned by its search.
+
+    Args:
+        name: Name of the cluster
+        rows: Data rows returned by Graylog, either dicts or lists of field values
+
+    Returns:
+        ClusterUsage with count, last occurrence and per-day histogram
+    """
+    daily_occurrences: Dict[str, int] = {}
+    last_seen: Optional[str] = None
+
+    for row in rows:
+        timestamp = _row_timestamp(row)
+        if not timestamp:
+            continue
+        day = timestamp[:10]
+        daily_occurrences[day] = daily_occurrences.get(day, 0) + 1
+        if last_seen is None or timestamp > last_seen:
+            last_seen = timestamp
+
+    return ClusterUsage(
+        name=name,
+        total_occurrences=len(rows),
+        last_seen=last_seen,
+        daily_occurrences=dict(sorted(daily_occurrences.items())),
+    )
+
+
+def _row_timestamp(row: Any) -> Optional[str]:
+    if isinstance(row, dict):
+        timestamp = row.get("timestamp")
+    elif isinstance(row, (list, tuple)) and len(row) > _TIMESTAMP_FIELD_INDEX:
+        timestamp = row[_TIMESTAMP_FIELD_INDEX]
+    else:
+        timestamp = None
+    return str(timestamp) if timestamp else None
+
+
+def _merge_cluster_usages(clusters: List[ClusterUsage], days: int) -> RuntimeUsage:
+    """
+    Merge per-cluster results into a single RuntimeUsage.
+
+    Falls back to the default (disabled) usage only when no cluster answered.
+    """
+    answered = [cluster for cluster in clusters if cluster.error is None]
+    if not answered:
+        reasons = "; ".join(f"{cluster.name}: {cluster.error}" for cluster in clusters)
+        return _create_default_runtime_usage(
             days=days,
-            total_occurrences=count
+            skipped_reason=f"No Graylog cluster answered ({reasons})" if reasons else "No Graylog cluster configured",
+            clusters=clusters
         )
-    except Exception as e:
-        print(f"{e}")
-        return _create_default_runtime_usage(days=days)
 
+    daily_occurrences: Dict[str, int] = {}
+    for cluster in answered:
+        for day, count in cluster.daily_occurrences.items():
+            daily_occurrences[day] = daily_occurrences.get(day, 0) + count
+
+    last_seen_values = [cluster.last_seen for cluster in answered if cluster.last_seen]
 
-def _create_default_runtime_usage(days: int) -> RuntimeUsage:
+    return RuntimeUsage(
+        enabled=True,
+        provider="Graylog",
+        days=days,
+        total_occurrences=sum(cluster.total_occurrences or 0 for cluster in answered),
+        last_seen=max(last_seen_values) if last_seen_values else None,
+        daily_occurrences=dict(sorted(daily_occurrences.items())),
+        clusters=clusters,
+    )
+
+
+def _create_default_runtime_usage(
+    days: int,
+    skipped_reason: Optional[str] = None,
+    clusters: Optional[List[ClusterUsage]] = None
+) -> RuntimeUsage:
     return RuntimeUsage(
         enabled=False,
         provider=None,
         days=days,
-        total_occurrences=None
+        total_occurrences=None,
+        skipped_reason=skipped_reason,
+        clusters=clusters or []
     )
 
 
@@ -1,6 +1,9 @@
+from typing import BinaryIO, List, Optional
+
+import requests
 from atlassian import Jira
 
-from endpoint_auditor.config import settings
+from endpoint_auditor.config import get_settings
 
 
 class JiraClient:
@@ -10,13 +13,22 @@ class JiraClient:
     Uses atlassian-python-api under the hood (the same library mcp-atlassian wraps).
     """
 
-    def __init__(self):
-        """Initialize the Jira client with configuration from settings."""
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        Initialize the Jira client with configuration from settings.
+
+        Args:
+            session: HTTP session to send the requests with, e.g. one with a connection pool
+                shared by several threads. A new session is created when omitted.
+        """
+        settings = get_settings()
+        options = {"session": session} if session is not None else {}
         try:
             self._jira = Jira(
                 url=settings.jira_base_url,
                 username=settings.jira_email,
                 password=settings.jira_token,
+                **options,
             )
         except Exception as e:
             raise ValueError(f"Failed to initialize Jira client: {e}")
@@ -33,3 +45,61 @@ class JiraClient:
             The response from the Jira API as a dict
         """
         return self._jira.issue_add_comment(issue_key, comment)
+
+    def list_comments(self, issue_key: str, page_size: int = 100) -> List[dict]:
+        """
+        List all the comments of a Jira issue, oldest first.
+
+        Args:
+            issue_key: Jira issue key (e.g. 'PROJ-123')
+            page_size: Comments fetched per request
+
+        Returns:
+            The comments as returned by the Jira API (id, body, author, ...)
+        """
+        url = f"{self._jira.resource_url('issue')}/{issue_key}/comment"
+        comments: List[dict] = []
+        while True:
+            page = self._jira.get(url, params={"startAt": len(comments), "maxResults": page_size}) or {}
+            batch = page.get("comments", [])
+            comments.extend(batch)
+            if not batch or len(comments) >= page.get("total", 0):
+                return comments
+
+    def edit_comment(self, issue_key: str, comment_id: str, comment: str) -> dict:
+        """
+        Replace the text of an existing comment.
+
+        Args:
+            issue_key: Jira issue key (e.g. 'PROJ-123')
+            comment_id: ID of the comment to edit
+            comment: New comment text in Jira wiki markup format
+
+        Returns:
+            The response from the Jira API as a dict
+        """
+        return self._jira.issue_edit_comment(issue_key, comment_id, comment)
+
+    def add_attachment(self, issue_key: str, filename: str, content: BinaryIO, content_type: str) -> List[dict]:
+        """
+        Attach a file to a Jira issue.
+
+        Args:
+            issue_key: Jira issue key (e.g. 'PROJ-123')
+            filename: Name of the attachment on the issue
+            content: Binary stream with the content of the file
+            content_type: MIME type of the file
+
+        Returns:
+            The created attachments (id, filename, ...)
+        """
+        url = f"{self._jira.resource_url('issue')}/{issue_key}/attachments"
+        return self._jira.post(url, headers=self._jira.no_check_headers, files={"file": (filename, content, content_type)})
+
+    def list_attachments(self, issue_key: str) -> List[dict]:
+        """Returns the attachments of a Jira issue as dicts with 'filename' and 'attachment_id'."""
+        return self._jira.get_attachments_ids_from_issue(issue_key)
+
+    def remove_attachment(self, attachment_id: str) -> None:
+        """Delete an attachment."""
+        self._jira.remove_attachment(attachment_id)
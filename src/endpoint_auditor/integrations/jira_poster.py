@@ -0,0 +1,193 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Mapping, Optional, TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from endpoint_auditor.integrations.jira_mcp_client import JiraClient
+from endpoint_auditor.integrations.resilience import RetryPolicy
+
+
+T = TypeVar("T")
+
+# Statuses Jira answers when throttling. Other errors are not retried: a comment whose
+# request reached Jira may have been added already.
+_THROTTLING_STATUS_CODES = {429, 503}
+
+# Pause of every worker when Jira reports being close to the rate limit
+_NEAR_LIMIT_PAUSE_SECONDS = 1.0
+
+
+class JiraRateLimiter:
+    """
+    Pause shared by all the workers posting to Jira.
+
+    Every response is observed: a `Retry-After` header, or an exhausted quota
+    (`X-RateLimit-Remaining: 0` until `X-RateLimit-Reset`), holds every worker until
+    Jira accepts requests again, instead of each worker hitting the limit on its own.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Update the pause from the status and headers of a Jira response."""
+        pause = _retry_after_seconds(headers)
+        if pause is None and headers.get("X-RateLimit-Remaining") == "0":
+            pause = _seconds_until_reset(headers)
+        if pause is None and headers.get("X-RateLimit-NearLimit", "").lower() == "true":
+            pause = _NEAR_LIMIT_PAUSE_SECONDS
+        if pause is None:
+            return
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + pause)
+
+    @property
+    def paused(self) -> bool:
+        return self.remaining() > 0
+
+    def remaining(self) -> float:
+        """Seconds left before requests may be sent again, never negative."""
+        with self._lock:
+            return max(0.0, self._paused_until - self._clock())
+
+    def wait(self) -> None:
+        """Block until requests may be sent again."""
+        while (remaining := self.remaining()) > 0:
+            self._sleep(remaining)
+
+
+class JiraCommentPoster:
+    """
+    Posts Jira comments from a bounded pool of worker threads.
+
+    All workers share a single JiraClient whose HTTP session keeps a connection pool sized
+    for the workers, so a batch reuses the same TLS connections instead of opening one per
+    report. Throttled requests (429, 503) are retried once Jira allows it again.
+    """
+
+    def __init__(
+        self,
+        client: Optional[JiraClient] = None,
+        max_workers: int = 4,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[JiraRateLimiter] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            client: Jira client, defaults to one configured from settings with a pooled session
+            max_workers: Maximum number of comments posted at the same time
+            retry_policy: Retries of throttled requests
+            rate_limiter: Pause shared by the workers, fed by the responses of `client`
+        """
+        self._rate_limiter = rate_limiter or JiraRateLimiter(sleep=sleep)
+        self._client = client or JiraClient(session=create_pooled_session(max_workers, self._rate_limiter))
+        self._retry_policy = retry_policy or RetryPolicy(max_attempts=5, base_delay_seconds=1.0, max_delay_seconds=30.0)
+        self._sleep = sleep
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jira")
+
+    def post(self, issue_key: str, comment: str) -> dict:
+        """
+        Post a comment, waiting out the rate limit and retrying throttled requests.
+
+        Raises:
+            requests.HTTPError: If Jira rejects the comment, or still throttles after the last attempt
+        """
+        return self.run(lambda client: client.add_comment(issue_key=issue_key, comment=comment))
+
+    def run(self, operation: Callable[[JiraClient], T]) -> T:
+        """
+        Run Jira requests with the shared client, waiting out the rate limit and running the
+        whole operation again when one of its requests is throttled. Operations whose requests
+        must not be repeated (e.g. uploads) keep track of those already sent.
+
+        Args:
+            operation: Requests to send, given the shared client
+
+        Raises:
+            requests.HTTPError: If Jira rejects a request, or still throttles after the last attempt
+        """
+        attempt = 0
+        while True:
+            self._rate_limiter.wait()
+            try:
+                return operation(self._client)
+            except requests.HTTPError as e:
+                status_code = e.response.status_code if e.response is not None else None
+                attempt += 1
+                if status_code not in _THROTTLING_STATUS_CODES or attempt >= self._retry_policy.max_attempts:
+                    raise
+                # Without a Retry-After header, back off on our own
+                if not self._rate_limiter.paused:
+                    self._sleep(self._retry_policy.backoff_delay(attempt - 1))
+
+    def submit(self, operation: Callable[[JiraClient], T]) -> "Future[T]":
+        """Run an operation in the background; the future holds the result of run()."""
+        return self._executor.submit(self.run, operation)
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the workers, by default after the submitted comments are posted."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self) -> "JiraCommentPoster":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def create_pooled_session(pool_size: int, rate_limiter: Optional[JiraRateLimiter] = None) -> requests.Session:
+    """
+    Create an HTTP session keeping up to `pool_size` connections to Jira alive.
+
+    Args:
+        pool_size: Number of connections kept, one per worker thread
+        rate_limiter: Fed with the status and headers of every response
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    if rate_limiter is not None:
+        def observe(response: requests.Response, *args: Any, **kwargs: Any) -> None:
+            rate_limiter.observe(response.status_code, response.headers)
+
+        session.hooks["response"].append(observe)
+
+    return session
+
+
+def _retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None  # HTTP-date form, not sent by Jira
+
+
+def _seconds_until_reset(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get("X-RateLimit-Reset")
+    if value is None:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if reset_at.tzinfo is None:
+        reset_at = reset_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
@@ -1,29 +1,66 @@
-from typing import Any, Dict
-
-from endpoint_auditor.config import is_jira_enabled
+import gzip
+import hashlib
+import json
+import re
+import tempfile
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, BinaryIO, Dict, List, Optional, Set, Tuple
+
+from endpoint_auditor.config import get_settings, is_jira_enabled
+from endpoint_auditor.history.store import project_resolver
 from endpoint_auditor.integrations.jira_mcp_client import JiraClient
+from endpoint_auditor.integrations.jira_poster import JiraCommentPoster
+from endpoint_auditor.reporters.report_diff import ReportDiff
+
+
+# Outcomes of posting a report
+COMMENT_CREATED = "created"
+COMMENT_UPDATED = "updated"
+COMMENT_UNCHANGED = "unchanged"
+
+# Report comments end with an invisible anchor identifying the endpoint and the content of
+# the report, so that re-audits find and update their comment instead of adding one
+_MARKER_PATTERN = re.compile(r"\{anchor:endpoint-audit-(?P<endpoint>[0-9a-f]{16})-(?P<content>[0-9a-f]{16})\}")
+
+# Files listed in a comment before the list is truncated and attached in full
+DEFAULT_COMMENT_MAX_FILES = 50
+
+# Jira rejects comments over 32,767 characters: the file list may take at most this much
+_FILES_SECTION_MAX_CHARS = 20_000
 
+# Lines of the matches listed next to each file
+_MAX_LINES_PER_FILE = 5
 
 _STATUS_LABELS = {
     "candidate_for_deprecation": "Candidate for Deprecation",
     "still_referenced_in_code": "Still Referenced in Code",
     "runtime_usage_detected": "Runtime Usage Detected",
+    "needs_review": "Needs Review",
 }
 
 _STATUS_ICONS = {
     "candidate_for_deprecation": "(/)",
     "still_referenced_in_code": "(warning)",
     "runtime_usage_detected": "(x)",
+    "needs_review": "(?)",
 }
 
 
-def post_report_to_jira(issue_key: str, report: Dict[str, Any]) -> None:
+def post_report_to_jira(issue_key: str, report: Dict[str, Any], poster: Optional[JiraCommentPoster] = None) -> str:
     """
     Format the audit report and post it as a comment on the given Jira issue.
 
+    The comment of a previous audit of the same endpoint on the issue is edited in place,
+    and left untouched when the report did not change.
+
     Args:
         issue_key: Jira issue key (e.g. 'PROJ-123')
         report: Base report dictionary produced by generate_base_report()
+        poster: Shared poster of a batch; a one-off client is used when omitted
+
+    Returns:
+        COMMENT_CREATED, COMMENT_UPDATED or COMMENT_UNCHANGED
 
     Raises:
         RuntimeError: If Jira is not enabled or posting fails
@@ -31,21 +68,268 @@ def post_report_to_jira(issue_key: str, report: Dict[str, Any]) -> None:
     if not is_jira_enabled():
         raise RuntimeError("Jira integration is not enabled")
 
-    comment = format_report(report)
-    client = JiraClient()
+    operation = _report_comment_operation(issue_key, report)
+    return poster.run(operation) if poster is not None else operation(JiraClient())
+
+
+def post_diff_to_jira(issue_key: str, diff: ReportDiff, poster: Optional[JiraCommentPoster] = None) -> None:
+    """
+    Post only what changed since the previous audit as a comment on the given Jira issue.
+
+    Args:
+        issue_key: Jira issue key (e.g. 'PROJ-123')
+        diff: Differences between the previous and the new report, from diff_reports()
+        poster: Shared poster of a batch; a one-off client is used when omitted
+
+    Raises:
+        RuntimeError: If Jira is not enabled or posting fails
+    """
+    _post_comment(issue_key, format_diff(diff), poster)
+
+
+def submit_report_to_jira(issue_key: str, report: Dict[str, Any], poster: JiraCommentPoster) -> "Future[str]":
+    """
+    Post the audit report in the background, on one of the workers of `poster`, as
+    post_report_to_jira() does.
+
+    The report is formatted right away, and compressed when it is attached in full, so the
+    caller may drop it once this returns.
+
+    Raises:
+        RuntimeError: If Jira is not enabled
+    """
+    if not is_jira_enabled():
+        raise RuntimeError("Jira integration is not enabled")
+
+    return poster.submit(_report_comment_operation(issue_key, report))
+
+
+def _report_comment_operation(issue_key: str, report: Dict[str, Any]):
+    """The Jira requests posting a report, as a function of the client sending them."""
+    audit = report.get("audit")
+    endpoint_key = _short_hash(f"{audit.get('http_method') or ''} {audit.get('endpoint')}") if audit else None
+
+    # Reports too large for a comment are attached in full, the comment lists the top files
+    code = report.get("code_usage", {})
+    max_files = get_settings().jira_comment_max_files
+    attachment_name = None
+    if not _fits_in_comment(code.get("files", []), max_files):
+        attachment_name = f"endpoint-audit-{endpoint_key or 'report'}.json.gz"
+
+    body = _format_report_body(report, max_files=max_files, attachment_name=attachment_name)
+    comment = "\n".join([body, _format_metadata_section(report.get("metadata", {}))])
+    attachment = _ReportAttachment(attachment_name, report) if attachment_name else None
+
+    if endpoint_key is None:
+        # Reports without their audit section cannot be matched to a previous comment
+        return partial(_add_comment, issue_key=issue_key, comment=comment, attachment=attachment)
+
+    # The footer changes at every run: only the content above it is compared, along with
+    # the files left out of the comment
+    content_hash = _content_hash(body, code if attachment is not None else None)
+    comment += f"\n{{anchor:endpoint-audit-{endpoint_key}-{content_hash}}}"
+    return partial(
+        _upsert_comment,
+        issue_key=issue_key,
+        comment=comment,
+        endpoint_key=endpoint_key,
+        content_hash=content_hash,
+        attachment=attachment,
+    )
+
+
+def _add_comment(
+    client: JiraClient,
+    issue_key: str,
+    comment: str,
+    attachment: Optional["_ReportAttachment"] = None,
+) -> str:
+    if attachment is not None:
+        attachment.attach(client, issue_key)
     client.add_comment(issue_key=issue_key, comment=comment)
+    return COMMENT_CREATED
+
+
+def _upsert_comment(
+    client: JiraClient,
+    issue_key: str,
+    comment: str,
+    endpoint_key: str,
+    content_hash: str,
+    attachment: Optional["_ReportAttachment"] = None,
+) -> str:
+    existing = _find_report_comment(client.list_comments(issue_key), endpoint_key)
+    if existing is not None and existing[1] == content_hash:
+        return COMMENT_UNCHANGED
+
+    if attachment is not None:
+        attachment.attach(client, issue_key, replace=True)
+
+    if existing is None:
+        client.add_comment(issue_key=issue_key, comment=comment)
+        return COMMENT_CREATED
+
+    client.edit_comment(issue_key=issue_key, comment_id=existing[0], comment=comment)
+    return COMMENT_UPDATED
 
 
-def format_report(report: Dict[str, Any]) -> str:
+class _ReportAttachment:
+    """
+    The full report attached to a report comment.
+
+    The report is compressed when the attachment is created, so that only the compressed
+    file is kept until the operation runs. The poster runs the whole operation again when
+    one of its requests is throttled: the report is uploaded on the first attempt only,
+    later attempts go on with the comment.
+    """
+
+    def __init__(self, name: str, report: Dict[str, Any]):
+        """
+        The JSON is encoded and compressed chunk by chunk into a temporary file: neither the
+        JSON text nor the file list are built in memory.
+        """
+        self.name = name
+        self._content: BinaryIO = tempfile.TemporaryFile()
+        _write_gzipped_json(report, self._content)
+        self._uploaded_ids: Optional[Set[str]] = None
+
+    def attach(self, client: JiraClient, issue_key: str, replace: bool = False) -> None:
+        """
+        Attach the full report as gzipped JSON, unless an earlier attempt did.
+
+        With `replace`, the attachments of previous reports with the same name are removed
+        once the new one is uploaded.
+        """
+        if self._uploaded_ids is None:
+            self._content.seek(0)
+            uploaded = client.add_attachment(issue_key, self.name, self._content, "application/gzip")
+            self._uploaded_ids = {str(attachment.get("id")) for attachment in uploaded or []}
+            self._content.close()
+
+        if not replace:
+            return
+        for attachment in client.list_attachments(issue_key):
+            if attachment["filename"] == self.name and str(attachment["attachment_id"]) not in self._uploaded_ids:
+                client.remove_attachment(attachment["attachment_id"])
+
+
+def _write_gzipped_json(value: Any, stream: BinaryIO) -> None:
+    with gzip.open(stream, "wt", encoding="utf-8") as text:
+        for chunk in json.JSONEncoder().iterencode(value):
+            text.write(chunk)
+
+
+def _find_report_comment(comments: List[dict], endpoint_key: str) -> Optional[Tuple[str, str]]:
+    """(id, content hash) of the most recent report comment of an endpoint, None if there is none."""
+    for comment in reversed(comments):
+        match = _MARKER_PATTERN.search(comment.get("body") or "")
+        if match and match.group("endpoint") == endpoint_key:
+            return comment["id"], match.group("content")
+    return None
+
+
+def _short_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _content_hash(body: str, code: Optional[Dict[str, Any]] = None) -> str:
+    """Short hash of a report comment body, and of the code usage when it is attached."""
+    digest = hashlib.sha256(body.encode("utf-8"))
+    if code is not None:
+        # Hashed chunk by chunk, as the attachment is written: the JSON text is never built
+        for chunk in json.JSONEncoder(sort_keys=True).iterencode(code):
+            digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _post_comment(issue_key: str, comment: str, poster: Optional[JiraCommentPoster]) -> None:
+    if not is_jira_enabled():
+        raise RuntimeError("Jira integration is not enabled")
+
+    if poster is not None:
+        poster.post(issue_key, comment)
+    else:
+        JiraClient().add_comment(issue_key=issue_key, comment=comment)
+
+
+def format_diff(diff: ReportDiff) -> str:
+    """
+    Convert a report diff into a Jira comment.
+
+    Args:
+        diff: Differences between two reports, from diff_reports()
+
+    Returns:
+        Jira wiki markup string
+    """
+    target = f"{diff.http_method or ''} {diff.endpoint or ''}".strip()
+    lines = [
+        f"h2. Endpoint Deprecation Audit Update: {{{{{target}}}}}",
+        f"_Changes since the audit of {diff.old_generated_at}_",
+        "",
+    ]
+
+    if not diff.has_changes:
+        lines.append("No changes since the previous audit.")
+    else:
+        if diff.old_status != diff.new_status:
+            old_label = _STATUS_LABELS.get(diff.old_status, diff.old_status)
+            new_label = _STATUS_LABELS.get(diff.new_status, diff.new_status)
+            icon = _STATUS_ICONS.get(diff.new_status, "(?)")
+            lines.append(f"*Recommendation:* {old_label} -> {icon} *{new_label}*")
+
+        lines.append("||Runtime||Previous||Now||Delta||")
+        for change in diff.runtime:
+            delta = f"{change.delta:+d}" if change.delta is not None else "-"
+            old = change.old if change.old is not None else "-"
+            new = change.new if change.new is not None else "-"
+            lines.append(f"|{change.name}|{old}|{new}|{delta}|")
+
+        lines.append(f"*Code matches:* {diff.old_matches} -> {diff.new_matches}")
+        if diff.added_files:
+            lines.append("*New references:*")
+            lines.extend(f"* (+) {{{{{change.path}}}}} ({change.new_matches})" for change in diff.added_files)
+        if diff.removed_files:
+            lines.append("*Removed references:*")
+            lines.extend(f"* (-) {{{{{change.path}}}}}" for change in diff.removed_files)
+        if diff.changed_files:
+            lines.append("*Changed references:*")
+            lines.extend(
+                f"* {{{{{change.path}}}}} ({change.old_matches} -> {change.new_matches})"
+                for change in diff.changed_files
+            )
+
+    lines.append(f"\n----\n_Generated at {diff.new_generated_at} | endpoint-deprecation-auditor_")
+    return "\n".join(lines)
+
+
+def format_report(
+    report: Dict[str, Any],
+    max_files: int = DEFAULT_COMMENT_MAX_FILES,
+    attachment_name: Optional[str] = None,
+) -> str:
     """
     Convert the base report dict into a Markdown comment suitable for Jira.
 
     Args:
         report: Base report dictionary from generate_base_report()
+        max_files: Beyond this many referencing files, only the files with the most matches
+            are listed, grouped by project
+        attachment_name: Name of the attachment holding the full report, linked from a truncated list
 
     Returns:
         Markdown-formatted string
     """
+    body = _format_report_body(report, max_files=max_files, attachment_name=attachment_name)
+    return "\n".join([body, _format_metadata_section(report.get("metadata", {}))])
+
+
+def _format_report_body(
+    report: Dict[str, Any],
+    max_files: int = DEFAULT_COMMENT_MAX_FILES,
+    attachment_name: Optional[str] = None,
+) -> str:
+    """Every section of the report comment but the metadata footer."""
     recommendation = report.get("recommendation", {})
     status = recommendation.get("status", "unknown")
     rationale = recommendation.get("rationale", "")
@@ -56,7 +340,6 @@ def format_report(report: Dict[str, Any]) -> str:
     code = report.get("code_usage", {})
     log_extraction = report.get("log_extraction", {})
     warnings = report.get("warnings", [])
-    metadata = report.get("metadata", {})
 
     sections = [
         f"h2. {icon} Endpoint Deprecation Audit Report",
@@ -65,37 +348,56 @@ def format_report(report: Dict[str, Any]) -> str:
         f"_{rationale}_",
         "",
         _format_runtime_section(runtime),
-        _format_code_usage_section(code),
+        _format_code_usage_section(code, max_files, attachment_name),
         _format_log_extraction_section(log_extraction),
     ]
 
     if warnings:
         sections.append(_format_warnings_section(warnings))
 
-    sections.append(_format_metadata_section(metadata))
-
     return "\n".join(sections)
 
 
 def _format_runtime_section(runtime: Dict[str, Any]) -> str:
     if not runtime.get("enabled"):
+        reason = runtime.get("skipped_reason") or "provider not enabled"
         return (
             "h3. Runtime Usage\n"
-            "Runtime analysis was not performed (provider not enabled)."
+            f"Runtime analysis was not performed ({reason})."
         )
 
     provider = runtime.get("provider", "N/A")
     days = runtime.get("days", "N/A")
     occurrences = runtime.get("total_occurrences", 0)
+    last_seen = runtime.get("last_seen")
+    clusters = runtime.get("clusters", [])
 
-    return (
-        "h3. Runtime Usage\n"
-        f"||Provider||Time Window||Occurrences||\n"
-        f"|{provider}|{days} days|{occurrences}|"
-    )
+    lines = [
+        "h3. Runtime Usage",
+        "||Provider||Time Window||Occurrences||",
+        f"|{provider}|{days} days|{occurrences}|",
+    ]
+
+    if last_seen:
+        lines.append(f"*Last seen:* {last_seen}")
 
+    if len(clusters) > 1:
+        lines.append("||Cluster||Occurrences||Last Seen||")
+        for cluster in clusters:
+            if cluster.get("error"):
+                count = f"(warning) {cluster['error']}"
+            else:
+                count = cluster.get("total_occurrences", 0)
+            lines.append(f"|{cluster.get('name')}|{count}|{cluster.get('last_seen') or '-'}|")
 
-def _format_code_usage_section(code: Dict[str, Any]) -> str:
+    return "\n".join(lines)
+
+
+def _format_code_usage_section(
+    code: Dict[str, Any],
+    max_files: int = DEFAULT_COMMENT_MAX_FILES,
+    attachment_name: Optional[str] = None,
+) -> str:
     matches = code.get("matches_count", 0)
     files = code.get("files", [])
     paths = code.get("projects_paths", [])
@@ -106,14 +408,75 @@ def _format_code_usage_section(code: Dict[str, Any]) -> str:
         f"*Matches found:* {matches}",
     ]
 
-    if files:
+    if files and _fits_in_comment(files, max_files):
         lines.append("*Files with references:*")
+        lines_per_file = _lines_per_file(code)
         for f in files:
-            lines.append(f"* {{{{{f}}}}}")
+            file_lines = lines_per_file.get(f)
+            suffix = ""
+            if file_lines:
+                shown = ", ".join(str(line) for line in file_lines[:_MAX_LINES_PER_FILE])
+                more = ", ..." if len(file_lines) > _MAX_LINES_PER_FILE else ""
+                suffix = f" (line {shown}{more})" if len(file_lines) == 1 else f" (lines {shown}{more})"
+            lines.append(f"* {{{{{f}}}}}{suffix}")
+    elif files:
+        lines.extend(_format_top_files(code, max_files, attachment_name))
 
     return "\n".join(lines)
 
 
+def _lines_per_file(code: Dict[str, Any]) -> Dict[str, List[int]]:
+    """Distinct lines of the matches of each file, from the locations of the report."""
+    lines_per_file: Dict[str, List[int]] = {}
+    for location in code.get("locations") or []:
+        file_lines = lines_per_file.setdefault(location["file"], [])
+        if location["line"] not in file_lines:
+            file_lines.append(location["line"])
+    return lines_per_file
+
+
+def _fits_in_comment(files: List[str], max_files: int) -> bool:
+    if len(files) > max_files:
+        return False
+    return sum(len(f) + 7 for f in files) <= _FILES_SECTION_MAX_CHARS
+
+
+def _format_top_files(code: Dict[str, Any], max_files: int, attachment_name: Optional[str]) -> List[str]:
+    """The files with the most matches, grouped by project, with the totals of every project."""
+    files = code.get("files", [])
+    resolve_project = project_resolver(code.get("projects_paths", []))
+    matches_per_file = code.get("matches_per_file") or {}
+
+    project_files: Dict[str, int] = {}
+    project_matches: Dict[str, int] = {}
+    for f in files:
+        project = resolve_project(f) or "Other"
+        project_files[project] = project_files.get(project, 0) + 1
+        project_matches[project] = project_matches.get(project, 0) + matches_per_file.get(f, 0)
+
+    listed: Dict[str, List[str]] = {}
+    size = 0
+    for f in sorted(files, key=lambda path: (-matches_per_file.get(path, 0), path))[:max_files]:
+        size += len(f) + 12
+        if size > _FILES_SECTION_MAX_CHARS:
+            break
+        listed.setdefault(resolve_project(f) or "Other", []).append(f)
+
+    shown = sum(len(project_list) for project_list in listed.values())
+    header = f"*Files with references:* {len(files)} files, the {shown} with the most matches are listed"
+    if attachment_name:
+        header += f", all of them are in [^{attachment_name}]"
+    lines = [header]
+
+    for project in sorted(project_files):
+        lines.append(f"*{project}* ({project_files[project]} files, {project_matches[project]} matches)")
+        for f in listed.get(project, []):
+            count = matches_per_file.get(f)
+            lines.append(f"* {{{{{f}}}}}" + (f" ({count})" if count is not None else ""))
+
+    return lines
+
+
 def _format_log_extraction_section(log_extraction: Dict[str, Any]) -> str:
     extracted = log_extraction.get("extracted", False)
     template = log_extraction.get("log_template")
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+
+# HTTP statuses worth retrying: throttling and gateway/availability errors
+_TRANSIENT_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class Deadline:
+    """
+    Absolute point in time by which a stage must be finished.
+
+    Uses a monotonic clock so that wall-clock changes do not affect the budget.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self._expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry configuration for transient failures.
+
+    :var max_attempts: Total attempts, including the first one
+    :var base_delay_seconds: Delay cap of the first retry, doubled at each attempt
+    :var max_delay_seconds: Upper bound of a single backoff delay
+    """
+    max_attempts: int = 3
+    base_delay_seconds: float = 0.5
+    max_delay_seconds: float = 5.0
+
+    def backoff_delay(self, attempt: int, rng: Optional[random.Random] = None) -> float:
+        """
+        Jittered exponential backoff ("full jitter") before the retry following `attempt`.
+
+        Args:
+            attempt: Zero-based index of the attempt that just failed
+            rng: Random generator, injectable for deterministic tests
+
+        Returns:
+            Delay in seconds, uniformly drawn in [0, min(max_delay, base * 2^attempt)]
+        """
+        cap = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** attempt))
+        return (rng or random).uniform(0, cap)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency after repeated transient failures.
+
+    The breaker opens after `failure_threshold` consecutive failures and rejects calls
+    until `reset_timeout_seconds` have elapsed. A single trial call is then let through
+    (half-open): success closes the breaker, failure opens it again. A trial ending
+    otherwise (permanent error, no time left to call) must be released, so that another
+    call can be tried.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self._reset_timeout_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self._consecutive_failures
+
+    def allow_request(self) -> bool:
+        """Returns whether a call may be attempted now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """End a call that neither succeeded nor failed transiently; the breaker state is unchanged."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._consecutive_failures += 1
+        self._trial_in_flight = False
+        if self._opened_at is not None or self._consecutive_failures >= self._failure_threshold:
+            self._opened_at = self._clock()
+
+
+class CircuitBreakerRegistry:
+    """
+    One circuit breaker per dependency name, shared by all audits of a batch.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_seconds: float = 60.0):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_seconds = reset_timeout_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(
+                failure_threshold=self._failure_threshold,
+                reset_timeout_seconds=self._reset_timeout_seconds,
+            )
+        return self._breakers[name]
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Returns whether an error is worth retrying (timeouts, network and throttling errors).
+
+    Errors such as a missing stream or a malformed response are permanent: retrying them
+    would only consume the latency budget.
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+
+    # An httpx error can only have been raised once httpx is loaded: no need to import it here
+    httpx = sys.modules.get("httpx")
+    if httpx is None:
+        return False
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _TRANSIENT_STATUS_CODES
+    return False
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional, List
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, List
 from enum import Enum
 
 
@@ -30,6 +30,98 @@ class HttpMethod(str, Enum):
             raise ValueError(f"Invalid HTTP method: {value}") from e
 
 
+@dataclass(frozen=True)
+class AuditRequest:
+    """
+    Input of a single endpoint audit
+
+    :var endpoint: Full path of the endpoint
+    :var http_method: HTTP method of the endpoint, if known
+    :var log: Representative log emitted when the endpoint is reached
+    :var application_name: Name of the application / log stream emitting the log
+    :var jira: Jira issue key to post the report to, if any
+    """
+    endpoint: str
+    http_method: Optional[str]
+    log: str
+    application_name: str
+    jira: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditRequest":
+        """
+        Build an audit request from a dict, e.g. one entry of a batch file or of the JSON catalog.
+
+        As for ControllerEndpoint.to_audit_request(), the log and the HTTP method may be
+        missing or null: the runtime analysis is then skipped, and the code usage is not
+        narrowed to one method.
+
+        Raises:
+            ValueError: If the endpoint or the application name is missing, or the HTTP method is invalid
+        """
+        missing = [key for key in ("endpoint", "application_name") if not data.get(key)]
+        if missing:
+            raise ValueError(f"Audit request is missing: {', '.join(missing)}")
+
+        http_method = data.get("http_method")
+        return cls(
+            endpoint=data["endpoint"],
+            http_method=HttpMethod.from_str(http_method).value if http_method else None,
+            log=data.get("log") or "",
+            application_name=data["application_name"],
+            jira=data.get("jira"),
+        )
+
+
+@dataclass(frozen=True)
+class ControllerEndpoint:
+    """
+    An endpoint declared by a handler method of a Spring controller
+
+    :var http_method: HTTP method of the mapping, None when the mapping accepts every method
+    :var path: Full path, class-level and method-level mappings joined
+    :var log: First log message of the handler (e.g. "Getting payment {}"), None if it logs nothing
+    :var controller: Name of the controller class
+    :var handler: Name of the handler method
+    :var file: Path of the controller source file
+    :var line: Line of the handler method declaration
+    """
+    http_method: Optional[str]
+    path: str
+    log: Optional[str]
+    controller: str
+    handler: str
+    file: str
+    line: int
+
+    def to_audit_request(self, application_name: str) -> AuditRequest:
+        """Audit request of this endpoint; without a log, the runtime analysis is skipped."""
+        return AuditRequest(
+            endpoint=self.path,
+            http_method=self.http_method,
+            log=self.log or "",
+            application_name=application_name,
+        )
+
+
+@dataclass(frozen=True)
+class ClientReference:
+    """
+    A call to an endpoint found in a client file
+
+    :var http_method: HTTP method of the call, None when it cannot be told from the source
+    :var path: Path template of the call, variable parts as placeholders (e.g. "/api/v1/orders/{}")
+    :var file: Path of the client file
+    :var line: Line of the call
+    :var kind: How the call is made: 'feign', 'rest_template' (RestTemplate and similar clients) or 'web_client'
+    """
+    http_method: Optional[str]
+    path: str
+    file: str
+    line: int
+    kind: str
+
+
 @dataclass(frozen=True)
 class LogExtraction:
     """
@@ -42,6 +134,24 @@ class LogExtraction:
     extracted: bool
 
 
+@dataclass(frozen=True)
+class ClusterUsage:
+    """
+    Runtime usage measured on a single log cluster
+
+    :var name: Name of the cluster (e.g. the region)
+    :var total_occurrences: Occurrences found on this cluster, None if the query failed
+    :var last_seen: Timestamp of the most recent occurrence, if any
+    :var daily_occurrences: Occurrences per day (YYYY-MM-DD), when timestamps are available
+    :var error: Why the cluster could not be queried
+    """
+    name: str
+    total_occurrences: Optional[int]
+    last_seen: Optional[str] = None
+    daily_occurrences: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
 @dataclass(frozen=True)
 class RuntimeUsage:
     """
@@ -51,12 +161,43 @@ class RuntimeUsage:
     :var provider: The name of the log provider
     :var days: Amount of days in which search the log
     :var total_occurrences: Totale occurences of the log in the last n days
-    :var skipped_reason: Description
+    :var skipped_reason: Why the analysis was not performed, when enabled is False
+    :var last_seen: Timestamp of the most recent occurrence across all clusters
+    :var daily_occurrences: Occurrences per day merged across all clusters
+    :var clusters: Per-cluster breakdown of the occurrences
     """
     enabled: bool
     provider: Optional[str]
     days: int
     total_occurrences: Optional[int]
+    skipped_reason: Optional[str] = None
+    last_seen: Optional[str] = None
+    daily_occurrences: Dict[str, int] = field(default_factory=dict)
+    clusters: List[ClusterUsage] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RuntimeUsage":
+        """Rebuild a runtime usage from its report section, e.g. from a stored report."""
+        return cls(**{
+            **data,
+            "clusters": [ClusterUsage(**cluster) for cluster in data.get("clusters", [])],
+        })
+
+
+@dataclass(frozen=True)
+class CodeLocation:
+    """
+    Where a match was found in a file
+
+    :var file: Path of the file
+    :var line: Line of the match (1-based)
+    :var column: Column of the match (1-based), None when only the line is known
+    :var snippet: The line of the match, cut around the match on long lines
+    """
+    file: str
+    line: int
+    column: Optional[int] = None
+    snippet: str = ""
 
 
 @dataclass(frozen=True)
@@ -67,10 +208,14 @@ class CodeUsage:
     :var projects_paths: List of projects in which search
     :var matches_count: Count of matches
     :var files: Name of the files in which the match was found
+    :var matches_per_file: Count of matches in each of these files
+    :var locations: Location of the matches, by file and line; at most 100 per file
     """
     projects_paths: List[str]
     matches_count: int
     files: List[str]
+    matches_per_file: Dict[str, int] = field(default_factory=dict)
+    locations: List[CodeLocation] = field(default_factory=list)
 
 
 @dataclass(frozen=True)
@@ -81,5 +226,6 @@ class Recommendation:
     :var status: Status for the deprecation
     :var rationale: Motivation related with the status
     """
-    status: str  # "candidate_for_deprecation" | "still_referenced_in_code" | "runtime_usage_detected"
+    # "candidate_for_deprecation" | "still_referenced_in_code" | "runtime_usage_detected" | "needs_review"
+    status: str
     rationale: str
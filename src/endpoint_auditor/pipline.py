@@ -1,11 +1,24 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+import asyncio
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
 from endpoint_auditor.scanners.log_extractor import extract_log
-from endpoint_auditor.scanners.usage_scanner import scan_code_usage
+from endpoint_auditor.scanners.usage_scanner import ClientFileIndex, ScanStats, scan_code_usage
 from endpoint_auditor.reporters.base_reporter import generate_base_report
-from endpoint_auditor.models import LogExtraction, RuntimeUsage, CodeUsage
-from endpoint_auditor.integrations.graylog_service import count_log_occurrences
+from endpoint_auditor.models import AuditRequest, LogExtraction, RuntimeUsage, CodeUsage
+from endpoint_auditor.integrations.graylog_service import count_log_occurrences, create_circuit_breakers
+from endpoint_auditor.integrations.resilience import CircuitBreakerRegistry
+from endpoint_auditor.history.incremental import (
+    DEFAULT_RUNTIME_MAX_AGE_SECONDS,
+    reusable_runtime_usage,
+    scan_code_usage_incrementally,
+)
+from endpoint_auditor.history.store import HistoryStore, StoredAudit
+from endpoint_auditor.profiling import get_tracer
+
+if TYPE_CHECKING:
+    from endpoint_auditor.integrations.graylog_mcp_client import GraylogSessionPool
+    from endpoint_auditor.scanners.client_index import ClientReferenceIndex
 
 
 async def run_pipeline(
@@ -14,21 +27,233 @@ async def run_pipeline(
     application_name: str,
     projects_paths: List[str],
     days: int,
+    http_method: Optional[str] = None,
+    breakers: Optional[CircuitBreakerRegistry] = None,
+    file_index: Optional[ClientFileIndex] = None,
+    graylog_sessions: Optional[GraylogSessionPool] = None,
+    history: Optional[HistoryStore] = None,
+    incremental: bool = False,
+    runtime_max_age_seconds: float = DEFAULT_RUNTIME_MAX_AGE_SECONDS,
+    reference_index: Optional[ClientReferenceIndex] = None,
 ) -> Dict[str, Any]:
     """
     Orchestrates the endpoint deprecation audit.
 
     The pipeline always performs static analysis. Runtime analysis (Graylog) is executed only if enabled.
     Returns a JSON-serializable report dictionary.
+
+    Runtime analysis and static analysis are independent, so the code scan runs in a worker
+    thread while the Graylog queries are in flight. When profiling is enabled, the timing of
+    each stage is added to the report metadata, as are the scan statistics (files searched
+    and files whose identical content had already been searched).
+
+    Long-running processes can pass a file index and open Graylog sessions to keep warm
+    between audits.
+
+    When a history store is given, the report is recorded in it. With `incremental`, the
+    previous report of the endpoint is reused for the projects whose client files did not
+    change, and for the runtime usage when it is younger than `runtime_max_age_seconds`.
+
+    With a refreshed reference index, the code usage is looked up in it: only the parsed
+    calls with the HTTP method and path template of the endpoint count, instead of every
+    occurrence of the path text.
+    """
+    tracer = get_tracer()
+    previous = history.latest(endpoint, http_method) if history is not None and incremental else None
+    scan_stats = ScanStats()
+
+    with tracer.collect() as audit_spans, tracer.span("audit"):
+        with tracer.span("log_extraction"):
+            log_extracted: LogExtraction = extract_log(log=log)
+
+        reused_runtime_usage = reusable_runtime_usage(
+            previous=previous,
+            days=days,
+            application_name=application_name,
+            max_age_seconds=runtime_max_age_seconds,
+        )
+
+        runtime_usage: RuntimeUsage
+        code_usage: CodeUsage
+        fingerprints: Dict[str, str]
+        reused_projects: List[str]
+        runtime_usage, (code_usage, fingerprints, reused_projects) = await asyncio.gather(
+            _run_runtime_stage(
+                log_extracted=log_extracted,
+                days=days,
+                application_name=application_name,
+                breakers=breakers,
+                graylog_sessions=graylog_sessions,
+                reused_runtime_usage=reused_runtime_usage,
+            ),
+            asyncio.to_thread(
+                _run_scan_stage, endpoint, projects_paths, file_index, history is not None, previous, scan_stats,
+                http_method, reference_index,
+            ),
+        )
+
+        with tracer.span("report"):
+            report = generate_base_report(
+                log_extracted=log_extracted,
+                runtime_usage=runtime_usage,
+                code_usage=code_usage,
+                audit_request=AuditRequest(
+                    endpoint=endpoint,
+                    http_method=http_method,
+                    log=log,
+                    application_name=application_name,
+                )
+            )
+
+    report["metadata"]["scan"] = scan_stats.to_dict()
+    if incremental:
+        report["metadata"]["incremental"] = {
+            "reused_projects": reused_projects,
+            "runtime_reused_from": previous.generated_at if reused_runtime_usage is not None else None,
+        }
+    if tracer.enabled:
+        report["metadata"]["profile"] = tracer.summary(spans=audit_spans)
+
+    if history is not None:
+        history.record(report, project_fingerprints=fingerprints)
+
+    return report
+
+
+async def _run_runtime_stage(
+    log_extracted: LogExtraction,
+    days: int,
+    application_name: str,
+    breakers: Optional[CircuitBreakerRegistry],
+    graylog_sessions: Optional[GraylogSessionPool],
+    reused_runtime_usage: Optional[RuntimeUsage],
+) -> RuntimeUsage:
+    with get_tracer().span("runtime") as span:
+        if reused_runtime_usage is not None:
+            span.add("reused")
+            return reused_runtime_usage
+        return await count_log_occurrences(
+            log_extracted=log_extracted,
+            days=days,
+            application_name=application_name,
+            breakers=breakers,
+            sessions=graylog_sessions
+        )
+
+
+def _run_scan_stage(
+    endpoint: str,
+    projects_paths: List[str],
+    file_index: Optional[ClientFileIndex],
+    fingerprint: bool = False,
+    previous: Optional[StoredAudit] = None,
+    stats: Optional[ScanStats] = None,
+    http_method: Optional[str] = None,
+    reference_index: Optional[ClientReferenceIndex] = None,
+) -> Tuple[CodeUsage, Dict[str, str], List[str]]:
+    tracer = get_tracer()
+    with tracer.span("scan") as span, tracer.profiled():
+        if reference_index is not None:
+            code_usage = reference_index.code_usage(endpoint, http_method)
+            span.add("references", code_usage.matches_count)
+            return code_usage, {}, []
+
+        if not fingerprint:
+            code_usage = scan_code_usage(
+                endpoint=endpoint, projects_paths=projects_paths, file_index=file_index, stats=stats
+            )
+            return code_usage, {}, []
+
+        # Fingerprinting and scanning share one walk of each project
+        code_usage, fingerprints, reused_projects = scan_code_usage_incrementally(
+            endpoint=endpoint,
+            projects_paths=projects_paths,
+            previous=previous,
+            file_index=file_index or ClientFileIndex(),
+            stats=stats,
+        )
+        span.add("reused_projects", len(reused_projects))
+        return code_usage, fingerprints, reused_projects
+
+
+async def run_batch_pipeline(
+    audit_requests: List[AuditRequest],
+    projects_paths: List[str],
+    days: int,
+) -> List[Dict[str, Any]]:
+    """
+    Runs the audit pipeline for several endpoints, one after the other.
+
+    All audits share the same Graylog circuit breakers, so a degraded cluster is skipped
+    by the following audits instead of consuming their runtime budget again.
+    """
+    return [
+        report
+        async for _, report in iter_batch_pipeline(
+            audit_requests=audit_requests,
+            projects_paths=projects_paths,
+            days=days,
+        )
+    ]
+
+
+async def iter_batch_pipeline(
+    audit_requests: Iterable[AuditRequest],
+    projects_paths: List[str],
+    days: int,
+    max_concurrency: int = 1,
+    history: Optional[HistoryStore] = None,
+    incremental: bool = False,
+    runtime_max_age_seconds: float = DEFAULT_RUNTIME_MAX_AGE_SECONDS,
+    reference_index: Optional[ClientReferenceIndex] = None,
+    file_index: Optional[ClientFileIndex] = None,
+) -> AsyncIterator[Tuple[AuditRequest, Dict[str, Any]]]:
+    """
+    Runs the audit pipeline for several endpoints and yields each report as soon as its
+    audit completes.
+
+    At most `max_concurrency` audits are in flight and audit requests are consumed lazily,
+    so memory does not grow with the number of endpoints. With more than one audit in
+    flight, reports are yielded in completion order.
+
+    All audits share the same Graylog circuit breakers (see run_batch_pipeline). The history
+    options, the reference index and the file index are passed to every audit (see
+    run_pipeline): with a file index, each project is walked once for the whole batch.
     """
-    log_extracted: LogExtraction = extract_log(log=log)
+    breakers = create_circuit_breakers()
+    requests = iter(audit_requests)
+    in_flight: Dict[asyncio.Future, AuditRequest] = {}
 
-    runtime_usage: RuntimeUsage = await count_log_occurrences(log_extracted=log_extracted, days=days, application_name=application_name)
+    def start_next() -> None:
+        audit_request = next(requests, None)
+        if audit_request is None:
+            return
+        task = asyncio.ensure_future(run_pipeline(
+            endpoint=audit_request.endpoint,
+            log=audit_request.log,
+            application_name=audit_request.application_name,
+            projects_paths=projects_paths,
+            days=days,
+            http_method=audit_request.http_method,
+            breakers=breakers,
+            history=history,
+            incremental=incremental,
+            runtime_max_age_seconds=runtime_max_age_seconds,
+            reference_index=reference_index,
+            file_index=file_index,
+        ))
+        in_flight[task] = audit_request
 
-    code_usage: CodeUsage = scan_code_usage(endpoint=endpoint, projects_paths=projects_paths)
+    for _ in range(max(1, max_concurrency)):
+        start_next()
 
-    return generate_base_report(
-        log_extracted=log_extracted,
-        runtime_usage=runtime_usage,
-        code_usage=code_usage
-    )
+    try:
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                audit_request = in_flight.pop(task)
+                start_next()
+                yield audit_request, task.result()
+    finally:
+        for task in in_flight:
+            task.cancel()
@@ -0,0 +1,238 @@
+import asyncio
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Span:
+    """
+    A timed section of the audit.
+
+    :var name: Name of the stage (e.g. 'scan.walk')
+    :var start: Start time in seconds, relative to the tracer origin
+    :var duration: Duration in seconds, set when the span ends
+    :var attributes: Numeric measures collected during the span (files, bytes, ...)
+    """
+    __slots__ = ("name", "start", "duration", "attributes", "track")
+
+    def __init__(self, name: str, start: float, track: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.track = track
+        self.attributes = attributes
+
+    def add(self, key: str, value: float = 1) -> None:
+        """Increment a measure of the span."""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+
+class Tracer:
+    """
+    Records spans around the audit stages.
+
+    Spans are appended to an in-memory list and aggregated on demand, so recording costs
+    two clock reads. Per-file work is not traced individually: stages accumulate counts
+    on their own span instead. Spans may be recorded from several threads at once (scans
+    of concurrent audits run in worker threads).
+    """
+
+    enabled = True
+
+    def __init__(self, cprofile_output: Optional[str] = None):
+        """
+        Args:
+            cprofile_output: File in which to dump cProfile stats of the profiled stages
+        """
+        self._origin = time.perf_counter()
+        self._spans: List[Span] = []
+        self._tracks: Dict[int, int] = {}
+        self._cprofile_output = cprofile_output
+        self._profiler: Optional[cProfile.Profile] = None
+        self._lock = threading.Lock()
+        # Held for the whole of a profiled section, see profiled()
+        self._profile_lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        span = Span(name, time.perf_counter() - self._origin, self._current_track(), attributes)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - self._origin - span.start
+            with self._lock:
+                self._spans.append(span)
+            for collected in _collectors.get():
+                collected.append(span)
+
+    @contextmanager
+    def collect(self) -> Iterator[List[Span]]:
+        """
+        Collect the spans recorded by the enclosed code and the tasks and threads it starts,
+        leaving out those of concurrent audits. Pass the list to summary() to aggregate them.
+        """
+        collected: List[Span] = []
+        token = _collectors.set(_collectors.get() + (collected,))
+        try:
+            yield collected
+        finally:
+            _collectors.reset(token)
+
+    @contextmanager
+    def profiled(self) -> Iterator[None]:
+        """
+        Run the enclosed code under cProfile when a cProfile output was requested.
+
+        Stats accumulate over every profiled section (e.g. all scans of a batch) and are
+        written to the output file after each of them.
+
+        Profiled sections run one at a time: a profiler cannot be enabled from two threads
+        at once (Python 3.12+ refuses a second active profiler), so a section entered while
+        another thread profiles one waits for it to end. Sections must not be nested.
+        """
+        if not self._cprofile_output:
+            yield
+            return
+
+        with self._profile_lock:
+            if self._profiler is None:
+                self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            try:
+                yield
+            finally:
+                self._profiler.disable()
+                self._profiler.dump_stats(self._cprofile_output)
+
+    def spans(self, name: str) -> List[Span]:
+        """Every recorded span of the given stage, e.g. to build latency distributions."""
+        return [span for span in self._recorded_spans() if span.name == name]
+
+    def summary(self, spans: Optional[List[Span]] = None) -> Dict[str, Any]:
+        """
+        Aggregate the recorded spans per stage.
+
+        Args:
+            spans: Spans to aggregate, e.g. collected by collect(); every recorded span by default
+
+        Returns:
+            Dict with, for each stage, the number of calls, the total seconds and the sum
+            of every numeric measure recorded on its spans
+        """
+        stages: Dict[str, Dict[str, Any]] = {}
+        for span in self._recorded_spans() if spans is None else spans:
+            stage = stages.setdefault(span.name, {"calls": 0, "seconds": 0.0})
+            stage["calls"] += 1
+            stage["seconds"] += span.duration
+            for key, value in span.attributes.items():
+                if isinstance(value, (int, float)):
+                    stage[key] = stage.get(key, 0) + value
+
+        for stage in stages.values():
+            stage["seconds"] = round(stage["seconds"], 6)
+
+        return {"stages": stages}
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        Export the spans in the Chrome trace event format (chrome://tracing, Perfetto).
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "ph": "X",
+                "ts": round(span.start * 1_000_000, 3),
+                "dur": round(span.duration * 1_000_000, 3),
+                "pid": pid,
+                "tid": span.track,
+                "args": span.attributes,
+            }
+            for span in self._recorded_spans()
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def _recorded_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def _current_track(self) -> int:
+        """
+        Small integer identifying the asyncio task (or thread) running the span, so that
+        concurrent Graylog queries show up on separate rows of the trace.
+        """
+        try:
+            key = id(asyncio.current_task())
+        except RuntimeError:
+            key = threading.get_ident()
+        with self._lock:
+            return self._tracks.setdefault(key, len(self._tracks) + 1)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def add(self, key: str, value: float = 1) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+class _NullTracer:
+    """
+    Tracer used when profiling is disabled: every call returns shared no-op objects.
+    """
+
+    enabled = False
+    _span = _NullSpan()
+
+    def span(self, name: str, **attributes: Any) -> _NullSpan:
+        return self._span
+
+    def profiled(self) -> _NullSpan:
+        return self._span
+
+    def spans(self, name: str) -> List[Span]:
+        return []
+
+    def collect(self) -> _NullSpan:
+        return self._span
+
+    def summary(self, spans: Optional[List[Span]] = None) -> Dict[str, Any]:
+        return {"stages": {}}
+
+
+NULL_TRACER = _NullTracer()
+
+# Span lists of the enclosing Tracer.collect() blocks
+_collectors: ContextVar = ContextVar("endpoint_auditor_span_collectors", default=())
+
+_current_tracer: ContextVar = ContextVar("endpoint_auditor_tracer", default=NULL_TRACER)
+
+
+def get_tracer():
+    """Returns the tracer of the current audit, a no-op tracer when profiling is disabled."""
+    return _current_tracer.get()
+
+
+@contextmanager
+def use_tracer(tracer: Tracer) -> Iterator[Tracer]:
+    """Make `tracer` the current tracer for the enclosed code (and the tasks it starts)."""
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
@@ -1,8 +1,15 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from dataclasses import asdict
 from datetime import datetime, timezone
 
-from endpoint_auditor.models import LogExtraction, RuntimeUsage, CodeUsage, Recommendation
+from endpoint_auditor.models import (
+    AuditRequest,
+    LogExtraction,
+    RuntimeUsage,
+    CodeUsage,
+    Recommendation,
+    ClusterUsage,
+)
 
 
 def _utc_now_iso() -> str:
@@ -11,7 +18,9 @@ def _utc_now_iso() -> str:
 
 def _generate_warnings(
     is_log_extracted: bool,
-    is_runtime_analysis_enabled: bool
+    is_runtime_analysis_enabled: bool,
+    failed_clusters: Optional[List[ClusterUsage]] = None,
+    runtime_skipped_reason: Optional[str] = None
 ) -> List[str]:
     """
     Generate a list of warnings based on if the log analysis went fine or not.
@@ -21,19 +30,31 @@ def _generate_warnings(
     if not is_log_extracted:
         warnings.append("Problems while extracting logs: Skipping log analysis")
     if not is_runtime_analysis_enabled:
-        warnings.append("Problems while connecting to log extractor: Skipping log analysis")
+        if runtime_skipped_reason:
+            warnings.append(f"Runtime analysis skipped: {runtime_skipped_reason}")
+        else:
+            warnings.append("Problems while connecting to log extractor: Skipping log analysis")
+        failed_clusters = None
+    for cluster in failed_clusters or []:
+        warnings.append(f"Log cluster '{cluster.name}' was skipped: {cluster.error}")
     return warnings
 
 
 def generate_base_report(
     log_extracted: LogExtraction,
     runtime_usage: RuntimeUsage,
-    code_usage: CodeUsage
+    code_usage: CodeUsage,
+    audit_request: Optional[AuditRequest] = None
 ) -> Dict[str, Any]:
     """
     Generate the base report that then is managed to be converted to some specific format
     or reported to an external platform (ex. Jira).
+
+    When the audit request is given, it is included so that reports of a batch can be told apart.
+    An endpoint without any usage is only a candidate for deprecation when every configured
+    log cluster answered: the clusters that were skipped may have logged it.
     """
+    failed_clusters = [cluster for cluster in runtime_usage.clusters if cluster.error]
 
     if runtime_usage.enabled and (runtime_usage.total_occurrences or 0) > 0:
         recommendation = Recommendation(
@@ -45,13 +66,19 @@ def generate_base_report(
             status="still_referenced_in_code",
             rationale="Static references to the endpoint were found in the scanned codebases.",
         )
+    elif failed_clusters:
+        recommendation = Recommendation(
+            status="needs_review",
+            rationale="No usage found, but the runtime usage of skipped log clusters is unknown: "
+                      f"{', '.join(cluster.name for cluster in failed_clusters)}.",
+        )
     else:
         recommendation = Recommendation(
             status="candidate_for_deprecation",
             rationale="No runtime usage detected and no static references found in scanned codebases.",
         )
 
-    return {
+    report: Dict[str, Any] = {
         "metadata": {
             "generated_at": _utc_now_iso(),
             "version": "0.1.0",
@@ -60,5 +87,15 @@ def generate_base_report(
         "runtime_usage": asdict(runtime_usage),
         "code_usage": asdict(code_usage),
         "recommendation": asdict(recommendation),
-        "warnings": _generate_warnings(log_extracted.extracted, runtime_usage.enabled),
+        "warnings": _generate_warnings(
+            log_extracted.extracted,
+            runtime_usage.enabled,
+            failed_clusters=failed_clusters,
+            runtime_skipped_reason=runtime_usage.skipped_reason,
+        ),
     }
+
+    if audit_request is not None:
+        report["audit"] = asdict(audit_request)
+
+    return report
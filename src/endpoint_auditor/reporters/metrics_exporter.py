@@ -0,0 +1,173 @@
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from endpoint_auditor.profiling import Tracer
+
+
+METRIC_PREFIX = "endpoint_audit"
+
+# Upper bounds (seconds) of the Graylog request latency histogram buckets
+GRAYLOG_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_RECOMMENDATION_STATUSES = (
+    "candidate_for_deprecation",
+    "still_referenced_in_code",
+    "runtime_usage_detected",
+    "needs_review",
+)
+
+_GRAYLOG_REQUEST_STAGES = ("graylog.stream_resolution", "graylog.search")
+
+
+def write_prometheus_textfile(path: str, reports: List[Dict[str, Any]], tracer: Tracer) -> None:
+    """
+    Write the metrics of an audit run in the Prometheus textfile collector format.
+
+    The file is written next to its final location and then renamed, so that the
+    node_exporter textfile collector never reads a partially written file.
+
+    Args:
+        path: Destination file, usually `<textfile collector directory>/endpoint_audit.prom`
+        reports: Reports produced by the run (one for `audit`, several for `batch`)
+        tracer: Tracer that recorded the run
+    """
+    content = render_prometheus_metrics(reports=reports, tracer=tracer)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def render_prometheus_metrics(
+    reports: List[Dict[str, Any]],
+    tracer: Tracer,
+    now: Optional[float] = None
+) -> str:
+    """
+    Render the metrics of an audit run in the Prometheus text exposition format.
+
+    Returns:
+        Metrics text, ending with a newline
+    """
+    stages = tracer.summary()["stages"]
+    lines: List[str] = []
+
+    _gauge(
+        lines,
+        "last_run_timestamp_seconds",
+        "Unix time at which the last audit run finished.",
+        [({}, now if now is not None else time.time())],
+    )
+    _gauge(
+        lines,
+        "audits",
+        "Number of endpoints audited by the last run.",
+        [({}, len(reports))],
+    )
+    _gauge(
+        lines,
+        "stage_duration_seconds",
+        "Time spent in each audit stage during the last run.",
+        [({"stage": name}, stage["seconds"]) for name, stage in sorted(stages.items())],
+    )
+
+    scan_files = stages.get("scan.files", {})
+    scanned_bytes = scan_files.get("bytes", 0)
+    scan_seconds = scan_files.get("seconds", 0.0)
+    _gauge(
+        lines,
+        "files_scanned",
+        "Client files scanned by the last run.",
+        [({}, scan_files.get("files", 0))],
+    )
+    _gauge(
+        lines,
+        "bytes_scanned",
+        "Bytes of client files scanned by the last run.",
+        [({}, scanned_bytes)],
+    )
+    _gauge(
+        lines,
+        "scan_throughput_megabytes_per_second",
+        "Code scan throughput of the last run in MB/s.",
+        [({}, scanned_bytes / 1_000_000 / scan_seconds if scan_seconds > 0 else 0)],
+    )
+
+    latencies = [
+        span.duration
+        for stage in _GRAYLOG_REQUEST_STAGES
+        for span in tracer.spans(stage)
+        if span.attributes.get("round_trips")
+    ]
+    _histogram(
+        lines,
+        "graylog_request_duration_seconds",
+        "Latency of the Graylog MCP requests of the last run.",
+        latencies,
+        GRAYLOG_LATENCY_BUCKETS,
+    )
+
+    cache = stages.get("graylog.stream_cache", {})
+    hits = cache.get("hits", 0)
+    lookups = hits + cache.get("misses", 0)
+    _gauge(
+        lines,
+        "stream_cache_hit_ratio",
+        "Share of Graylog stream lookups answered by the stream ID cache in the last run.",
+        [({}, hits / lookups if lookups else 0)],
+    )
+
+    statuses = [report.get("recommendation", {}).get("status") for report in reports]
+    _gauge(
+        lines,
+        "recommendations",
+        "Recommendations produced by the last run, per status.",
+        [({"status": status}, statuses.count(status)) for status in _RECOMMENDATION_STATUSES],
+    )
+
+    return "\n".join(lines) + "\n"
+
+
+def _gauge(lines: List[str], name: str, help_text: str, samples: Iterable[tuple]) -> None:
+    metric = f"{METRIC_PREFIX}_{name}"
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} gauge")
+    for labels, value in samples:
+        lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+
+
+def _histogram(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    observations: Sequence[float],
+    buckets: Sequence[float]
+) -> None:
+    metric = f"{METRIC_PREFIX}_{name}"
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} histogram")
+    for bound in buckets:
+        count = sum(1 for value in observations if value <= bound)
+        lines.append(f"{metric}_bucket{_format_labels({'le': _format_value(bound)})} {count}")
+    lines.append(f'{metric}_bucket{{le="+Inf"}} {len(observations)}')
+    lines.append(f"{metric}_sum {_format_value(sum(observations))}")
+    lines.append(f"{metric}_count {len(observations)}")
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape_label_value(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(round(value, 6))
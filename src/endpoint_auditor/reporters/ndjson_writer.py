@@ -0,0 +1,58 @@
+import json
+import time
+from typing import Any, Dict, Optional, TextIO
+
+
+class NdjsonReportWriter:
+    """
+    Writes audit reports as newline-delimited JSON, one report per line.
+
+    Each line is flushed as soon as it is written so that downstream tools (jq, log
+    shippers, ...) can consume the reports while the batch is still running. Only
+    per-status counts are kept in memory to build the final summary line.
+    """
+
+    def __init__(self, stream: TextIO, clock=time.monotonic):
+        """
+        Args:
+            stream: Text stream to write to, e.g. sys.stdout or an open file
+        """
+        self._stream = stream
+        self._clock = clock
+        self._started_at = clock()
+        self._audits = 0
+        self._statuses: Dict[str, int] = {}
+
+    def write_report(self, report: Dict[str, Any]) -> None:
+        """Write one report, as produced by generate_base_report(), on its own line."""
+        self._write_line(report)
+
+        self._audits += 1
+        status = report.get("recommendation", {}).get("status")
+        if status:
+            self._statuses[status] = self._statuses.get(status, 0) + 1
+
+    def write_summary(self, error: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write the final summary line: `{"summary": {...}}`.
+
+        Args:
+            error: Reason why the batch stopped before auditing every endpoint
+
+        Returns:
+            The summary
+        """
+        summary: Dict[str, Any] = {
+            "audits": self._audits,
+            "statuses": dict(sorted(self._statuses.items())),
+            "duration_seconds": round(self._clock() - self._started_at, 3),
+        }
+        if error:
+            summary["error"] = error
+
+        self._write_line({"summary": summary})
+        return summary
+
+    def _write_line(self, payload: Dict[str, Any]) -> None:
+        self._stream.write(json.dumps(payload, separators=(",", ":")) + "\n")
+        self._stream.flush()
@@ -0,0 +1,239 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class FileChange:
+    """
+    A client file whose references to the endpoint changed between two audits
+
+    :var path: Path of the file
+    :var old_matches: Matches in the old report, None if the file was not referencing the endpoint
+    :var new_matches: Matches in the new report, None if the file no longer references the endpoint
+    """
+    path: str
+    old_matches: Optional[int]
+    new_matches: Optional[int]
+
+
+@dataclass(frozen=True)
+class CountChange:
+    """
+    Runtime occurrences of the whole endpoint or of one cluster in both audits
+
+    :var name: 'total' or the name of the cluster
+    :var old: Occurrences in the old report, None if not measured
+    :var new: Occurrences in the new report, None if not measured
+    """
+    name: str
+    old: Optional[int]
+    new: Optional[int]
+
+    @property
+    def delta(self) -> Optional[int]:
+        if self.old is None or self.new is None:
+            return None
+        return self.new - self.old
+
+
+@dataclass(frozen=True)
+class ReportDiff:
+    """
+    What changed between two reports of the same endpoint
+
+    :var endpoint: Audited endpoint
+    :var http_method: HTTP method of the endpoint
+    :var old_generated_at: Generation time of the old report
+    :var new_generated_at: Generation time of the new report
+    :var old_status: Recommendation of the old report
+    :var new_status: Recommendation of the new report
+    :var old_matches: Code matches of the old report
+    :var new_matches: Code matches of the new report
+    :var added_files: Files newly referencing the endpoint
+    :var removed_files: Files no longer referencing the endpoint
+    :var changed_files: Files whose number of references changed
+    :var runtime: Occurrence changes, the total first and then every cluster whose count changed
+    """
+    endpoint: Optional[str]
+    http_method: Optional[str]
+    old_generated_at: Optional[str]
+    new_generated_at: Optional[str]
+    old_status: Optional[str]
+    new_status: Optional[str]
+    old_matches: int
+    new_matches: int
+    added_files: List[FileChange] = field(default_factory=list)
+    removed_files: List[FileChange] = field(default_factory=list)
+    changed_files: List[FileChange] = field(default_factory=list)
+    runtime: List[CountChange] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(
+            self.old_status != self.new_status
+            or self.old_matches != self.new_matches
+            or self.added_files
+            or self.removed_files
+            or self.changed_files
+            or any(change.old != change.new for change in self.runtime)
+        )
+
+
+def diff_reports(old: Dict[str, Any], new: Dict[str, Any]) -> ReportDiff:
+    """
+    Compare two reports produced by generate_base_report().
+
+    File lists are compared with a single sorted merge, so the diff stays linear in the
+    number of referencing files.
+
+    Args:
+        old: Earlier report
+        new: Later report
+
+    Returns:
+        The differences between both reports
+    """
+    audit = new.get("audit") or old.get("audit") or {}
+
+    added: List[FileChange] = []
+    removed: List[FileChange] = []
+    changed: List[FileChange] = []
+    for change in _merge_file_matches(_file_matches(old), _file_matches(new)):
+        if change.old_matches is None:
+            added.append(change)
+        elif change.new_matches is None:
+            removed.append(change)
+        elif change.old_matches != change.new_matches:
+            changed.append(change)
+
+    return ReportDiff(
+        endpoint=audit.get("endpoint"),
+        http_method=audit.get("http_method"),
+        old_generated_at=old.get("metadata", {}).get("generated_at"),
+        new_generated_at=new.get("metadata", {}).get("generated_at"),
+        old_status=old.get("recommendation", {}).get("status"),
+        new_status=new.get("recommendation", {}).get("status"),
+        old_matches=old.get("code_usage", {}).get("matches_count", 0),
+        new_matches=new.get("code_usage", {}).get("matches_count", 0),
+        added_files=added,
+        removed_files=removed,
+        changed_files=changed,
+        runtime=_runtime_changes(old.get("runtime_usage", {}), new.get("runtime_usage", {})),
+    )
+
+
+def format_diff_text(diff: ReportDiff) -> str:
+    """
+    Render a diff as compact text: '+' for new references, '-' for removed ones and '~'
+    for files whose number of references changed.
+    """
+    target = f"{diff.http_method or ''} {diff.endpoint or ''}".strip() or "Report"
+    lines = [f"{target}: {diff.old_generated_at} -> {diff.new_generated_at}"]
+
+    if not diff.has_changes:
+        lines.append("No changes.")
+        return "\n".join(lines)
+
+    if diff.old_status != diff.new_status:
+        lines.append(f"Status: {diff.old_status} -> {diff.new_status}")
+
+    for change in diff.runtime:
+        if change.old is None and change.new is None:
+            continue
+        label = "Runtime occurrences" if change.name == "total" else f"  {change.name}"
+        lines.append(f"{label}: {_format_count_change(change)}")
+
+    if diff.old_matches != diff.new_matches:
+        lines.append(f"Code matches: {diff.old_matches} -> {diff.new_matches} ({diff.new_matches - diff.old_matches:+d})")
+    for change in diff.added_files:
+        lines.append(f"+ {change.path} ({_format_matches(change.new_matches)})")
+    for change in diff.removed_files:
+        lines.append(f"- {change.path} ({_format_matches(change.old_matches)})")
+    for change in diff.changed_files:
+        lines.append(f"~ {change.path} ({change.old_matches} -> {change.new_matches})")
+
+    return "\n".join(lines)
+
+
+def diff_to_dict(diff: ReportDiff) -> Dict[str, Any]:
+    """JSON-serializable form of a diff, with the deltas precomputed."""
+    return {
+        "endpoint": diff.endpoint,
+        "http_method": diff.http_method,
+        "old_generated_at": diff.old_generated_at,
+        "new_generated_at": diff.new_generated_at,
+        "has_changes": diff.has_changes,
+        "status": {"old": diff.old_status, "new": diff.new_status},
+        "code_matches": {"old": diff.old_matches, "new": diff.new_matches},
+        "added_files": {change.path: change.new_matches for change in diff.added_files},
+        "removed_files": {change.path: change.old_matches for change in diff.removed_files},
+        "changed_files": {
+            change.path: {"old": change.old_matches, "new": change.new_matches} for change in diff.changed_files
+        },
+        "runtime": {
+            change.name: {"old": change.old, "new": change.new, "delta": change.delta} for change in diff.runtime
+        },
+    }
+
+
+def _file_matches(report: Dict[str, Any]) -> List[Tuple[str, Optional[int]]]:
+    """(path, matches) of the referencing files of a report, sorted by path."""
+    code = report.get("code_usage", {})
+    matches_per_file = code.get("matches_per_file")
+    if matches_per_file is not None:
+        return sorted(matches_per_file.items())
+    # Reports without per-file matches: only presence can be compared
+    return [(path, None) for path in sorted(code.get("files", []))]
+
+
+def _merge_file_matches(
+    old: Iterable[Tuple[str, Optional[int]]],
+    new: Iterable[Tuple[str, Optional[int]]],
+) -> Iterator[FileChange]:
+    """Walk two path-sorted lists in step, yielding a change for every path of either list."""
+    old_iter, new_iter = iter(old), iter(new)
+    old_item, new_item = next(old_iter, None), next(new_iter, None)
+
+    while old_item is not None or new_item is not None:
+        if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+            yield FileChange(path=old_item[0], old_matches=_present(old_item[1]), new_matches=None)
+            old_item = next(old_iter, None)
+        elif old_item is None or new_item[0] < old_item[0]:
+            yield FileChange(path=new_item[0], old_matches=None, new_matches=_present(new_item[1]))
+            new_item = next(new_iter, None)
+        else:
+            yield FileChange(path=old_item[0], old_matches=_present(old_item[1]), new_matches=_present(new_item[1]))
+            old_item, new_item = next(old_iter, None), next(new_iter, None)
+
+
+def _present(matches: Optional[int]) -> int:
+    # A listed file without a known count still references the endpoint
+    return matches if matches is not None else 0
+
+
+def _runtime_changes(old: Dict[str, Any], new: Dict[str, Any]) -> List[CountChange]:
+    changes = [CountChange(
+        name="total",
+        old=old.get("total_occurrences") if old.get("enabled") else None,
+        new=new.get("total_occurrences") if new.get("enabled") else None,
+    )]
+
+    old_clusters = {cluster["name"]: cluster.get("total_occurrences") for cluster in old.get("clusters", [])}
+    new_clusters = {cluster["name"]: cluster.get("total_occurrences") for cluster in new.get("clusters", [])}
+    for name in sorted(old_clusters.keys() | new_clusters.keys()):
+        change = CountChange(name=name, old=old_clusters.get(name), new=new_clusters.get(name))
+        if change.old != change.new:
+            changes.append(change)
+
+    return changes
+
+
+def _format_count_change(change: CountChange) -> str:
+    text = f"{_format_matches(change.old)} -> {_format_matches(change.new)}"
+    if change.delta is not None:
+        text += f" ({change.delta:+d})"
+    return text
+
+
+def _format_matches(value: Optional[int]) -> str:
+    return "n/a" if value is None else str(value)
@@ -0,0 +1,182 @@
+import functools
+import hashlib
+import os
+import re
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from endpoint_auditor.scanners.languages import ClientFileMatcher, endpoint_pattern
+from endpoint_auditor.scanners.line_index import count_and_locate
+
+# Archives scanned as projects: source jars, shaded client jars, zipped SDKs
+ARCHIVE_SUFFIXES = (".jar", ".zip")
+
+# Between the archive path and the entry name in the reported file paths, as in jar: URLs
+ENTRY_SEPARATOR = "!/"
+
+# Read size when computing archive checksums
+_CHECKSUM_CHUNK_BYTES = 1024 * 1024
+_MAX_WORKERS = 8
+
+# Matches per entry, (line, column, snippet) of the matches per entry, client entries
+_ArchiveResult = Tuple[Dict[str, int], Dict[str, List[Tuple[int, int, str]]], int]
+
+
+def is_archive(path: str) -> bool:
+    """Whether a project path designates an archive rather than a directory."""
+    return path.lower().endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path)
+
+
+class ArchiveScanCache:
+    """
+    Matches found in archives, by archive checksum and endpoint.
+
+    An archive whose content did not change is not opened again for an endpoint it was
+    already searched for, even under another path or after being copied again into the
+    artifact cache. Checksums are computed once per archive size and modification time.
+    The least recently used results are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self._max_entries = max_entries
+        self._results: "OrderedDict[Tuple[str, str, Tuple[str, ...]], _ArchiveResult]" = OrderedDict()
+        self._checksums: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def checksum(self, archive_path: str) -> str:
+        """Digest of the content of an archive."""
+        stat = os.stat(archive_path)
+        key = (archive_path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            checksum = self._checksums.get(key)
+        if checksum is None:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(archive_path, "rb") as f:
+                while chunk := f.read(_CHECKSUM_CHUNK_BYTES):
+                    digest.update(chunk)
+            checksum = digest.hexdigest()
+            with self._lock:
+                self._checksums[key] = checksum
+        return checksum
+
+    def get(self, key: Tuple[str, str, Tuple[str, ...]]) -> Optional[_ArchiveResult]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def put(self, key: Tuple[str, str, Tuple[str, ...]], result: _ArchiveResult) -> None:
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self._max_entries:
+                self._results.popitem(last=False)
+
+
+def scan_archives(
+    archives_paths: List[str],
+    endpoint: str,
+    matcher: ClientFileMatcher,
+    cache: Optional[ArchiveScanCache] = None,
+) -> Tuple[Dict[str, int], Dict[str, List[Tuple[int, int, str]]], int, int]:
+    """
+    Search an endpoint in the client entries of several archives, in parallel.
+
+    Entries are selected from the central directory of each archive by the patterns of the
+    language profiles, compiled client classes included (`*Client*.class`, whose string
+    constants are stored as is), and are decompressed and searched in memory: nothing is
+    extracted to disk.
+
+    Args:
+        archives_paths: Paths of .jar and .zip files
+        endpoint: The endpoint path to search for
+        matcher: Client file patterns of the languages to search
+        cache: Results of previous searches, by archive checksum
+
+    Returns:
+        Matches per file, as `<archive>!/<entry>`; (line, column, snippet) of the matches
+        per source file; the number of client entries, and of entries actually searched
+        (not found in the cache)
+    """
+    languages = tuple(profile.name for profile in matcher.profiles)
+
+    def scan(archive_path: str) -> Tuple[_ArchiveResult, bool]:
+        try:
+            key = (cache.checksum(archive_path), endpoint, languages) if cache is not None else None
+            result = cache.get(key) if key is not None else None
+            if result is not None:
+                return result, False
+            result = _scan_archive(archive_path, endpoint, matcher)
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"Error scanning {archive_path}: {e}")
+            return ({}, {}, 0), False
+        if key is not None:
+            cache.put(key, result)
+        return result, True
+
+    workers = min(len(archives_paths), os.cpu_count() or 1, _MAX_WORKERS)
+    if workers > 1:
+        # zlib releases the GIL while inflating, so archives are decompressed concurrently
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="archive") as executor:
+            results = list(executor.map(scan, archives_paths))
+    else:
+        results = [scan(archive_path) for archive_path in archives_paths]
+
+    matches_per_file: Dict[str, int] = {}
+    locations_per_file: Dict[str, List[Tuple[int, int, str]]] = {}
+    entries = searched_entries = 0
+    for archive_path, ((matches_per_entry, locations_per_entry, archive_entries), searched) in zip(
+        archives_paths, results
+    ):
+        for entry, count in matches_per_entry.items():
+            matches_per_file[f"{archive_path}{ENTRY_SEPARATOR}{entry}"] = count
+        for entry, locations in locations_per_entry.items():
+            locations_per_file[f"{archive_path}{ENTRY_SEPARATOR}{entry}"] = locations
+        entries += archive_entries
+        if searched:
+            searched_entries += archive_entries
+    return matches_per_file, locations_per_file, entries, searched_entries
+
+
+def _scan_archive(archive_path: str, endpoint: str, matcher: ClientFileMatcher) -> _ArchiveResult:
+    matches_per_entry: Dict[str, int] = {}
+    locations_per_entry: Dict[str, List[Tuple[int, int, str]]] = {}
+    entries = 0
+    # infolist() comes from the central directory: entries that are not clients are never read
+    with zipfile.ZipFile(archive_path) as archive:
+        for info in archive.infolist():
+            name = info.filename.rsplit("/", 1)[-1]
+            if info.is_dir() or not matcher.matches_entry(name):
+                continue
+            entries += 1
+            try:
+                content = archive.read(info)
+            except (RuntimeError, NotImplementedError, zipfile.BadZipFile, zlib.error) as e:
+                # Encrypted entries, unsupported compression methods, corrupt data: the
+                # other entries of the archive are still searched
+                print(f"Error scanning {archive_path}{ENTRY_SEPARATOR}{info.filename}: {e}")
+                continue
+            suffix = Path(name).suffix
+            if matcher.profile(name) is None:
+                # Compiled classes have no lines to point at: their bytes are searched as they are
+                count = len(_bytes_pattern(endpoint, suffix).findall(content))
+            else:
+                # Counted and located in the same text, as usage_scanner does for files
+                count, locations = count_and_locate(content.decode("utf-8", errors="ignore"), endpoint_pattern(endpoint, suffix))
+                if locations:
+                    locations_per_entry[info.filename] = locations
+            if count > 0:
+                matches_per_entry[info.filename] = count
+    return matches_per_entry, locations_per_entry, entries
+
+
+@functools.lru_cache(maxsize=256)
+def _bytes_pattern(endpoint: str, suffix: str) -> re.Pattern:
+    """The endpoint pattern of a language, searching entry bytes without decoding them."""
+    return re.compile(endpoint_pattern(endpoint, suffix).pattern.encode("utf-8"))
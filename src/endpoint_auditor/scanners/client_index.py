@@ -0,0 +1,321 @@
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from endpoint_auditor.models import ClientReference, CodeLocation, CodeUsage, HttpMethod
+from endpoint_auditor.scanners.archive_scanner import is_archive
+from endpoint_auditor.scanners.controller_scanner import parse_controller_source
+from endpoint_auditor.scanners.languages import client_file_matcher
+from endpoint_auditor.scanners.java_source import (
+    LineCounter,
+    Token,
+    closing_index,
+    qualified_name,
+    split_operands,
+    split_top_level,
+    tokenize,
+    unquote,
+)
+from endpoint_auditor.scanners.route_trie import VARIABLE, RouteTrie, split_segments
+from endpoint_auditor.scanners.symbol_index import SymbolIndex, SymbolTable
+from endpoint_auditor.scanners.usage_scanner import ClientFileIndex, _find_client_files
+
+
+# Methods of RestTemplate, WebClient and similar HTTP clients, and the HTTP method they send.
+# None: the HTTP method is an argument (exchange, execute) or set with WebClient.method()
+_CALL_METHODS: Dict[str, Optional[str]] = {
+    "get": "GET",
+    "getForObject": "GET",
+    "getForEntity": "GET",
+    "post": "POST",
+    "postForObject": "POST",
+    "postForEntity": "POST",
+    "postForLocation": "POST",
+    "put": "PUT",
+    "delete": "DELETE",
+    "patch": "PATCH",
+    "patchForObject": "PATCH",
+    "head": "HEAD",
+    "headForHeaders": "HEAD",
+    "options": "OPTIONS",
+    "optionsForAllow": "OPTIONS",
+    "exchange": None,
+    "execute": None,
+    "method": None,
+}
+
+# Variables and fields holding an HTTP client: restTemplate, webClient, httpClient, ...
+_CLIENT_RECEIVER = re.compile(r"(?:template|client)$", re.IGNORECASE)
+_HTTP_METHODS = {method.value for method in HttpMethod}
+
+_SCHEME_AND_HOST = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*://[^/]*")
+_UNRESOLVED = VARIABLE
+
+# Depth of variables referencing other variables followed when resolving a URL
+_MAX_BINDING_DEPTH = 5
+
+
+def parse_client_source(
+    source: str,
+    file: str = "",
+    symbols: Optional[SymbolTable] = None,
+) -> List[ClientReference]:
+    """
+    Extract the endpoint calls of a client source file.
+
+    Recognizes the mappings of @FeignClient interfaces, RestTemplate-style calls
+    (`restTemplate.getForObject(url, ...)`, `exchange(url, HttpMethod.GET, ...)`) and
+    WebClient chains (`webClient.get().uri(url, ...)`). URLs built by concatenation or with
+    String.format() are resolved through the String variables and constants of the file,
+    then through the constants of the project (`ApiPaths.PAYMENT + "/confirmation"`); the
+    parts that cannot be resolved (method parameters, calls) become placeholders, and a
+    leading scheme and host or unresolved base URL is dropped.
+
+    Args:
+        source: Java source code
+        file: Path of the source file, copied to the references
+        symbols: Constants of the project declaring the file, None to resolve the file's own only
+
+    Returns:
+        The calls whose URL resolves to a path, in source order
+    """
+    tokens = tokenize(source)
+    bindings = _string_bindings(tokens)
+    lines = LineCounter(source)
+    references: List[ClientReference] = []
+    constant = (lambda name: symbols.value(name, file)) if symbols is not None else None
+
+    if "FeignClient" in source:
+        references.extend(
+            ClientReference(endpoint.http_method, endpoint.path, file, endpoint.line, "feign")
+            for endpoint in parse_controller_source(source, file, symbols)
+        )
+
+    for index, token in enumerate(tokens):
+        if token.kind != "word" or not _CLIENT_RECEIVER.search(token.text) or index + 3 >= len(tokens):
+            continue
+        call = tokens[index + 2].text
+        if tokens[index + 1].text != "." or call not in _CALL_METHODS or tokens[index + 3].text != "(":
+            continue
+
+        end = closing_index(tokens, index + 3, "(", ")")
+        arguments = split_top_level(tokens[index + 4:end])
+        http_method = _CALL_METHODS[call]
+
+        if call == "method" or not arguments[0]:
+            # WebClient: the URL comes with the following .uri(...)
+            if end + 3 >= len(tokens) or tokens[end + 2].text != "uri" or tokens[end + 3].text != "(":
+                continue
+            if call == "method":
+                http_method = _http_method(arguments[0])
+            uri_end = closing_index(tokens, end + 3, "(", ")")
+            url = split_top_level(tokens[end + 4:uri_end])[0]
+            kind = "web_client"
+        else:
+            url = arguments[0]
+            if http_method is None:
+                http_method = _http_method(arguments[1]) if len(arguments) > 1 else None
+            kind = "rest_template"
+
+        path = _path_template(url, bindings, token.position, constant)
+        if path is not None:
+            references.append(ClientReference(http_method, path, file, lines.line(token.position), kind))
+
+    return sorted(references, key=lambda reference: reference.line)
+
+
+class ClientReferenceIndex:
+    """
+    Calls of the client files of a set of projects, indexed by path template and HTTP method.
+
+    Every client file is parsed once when the index is refreshed, and the path templates of
+    the calls are inserted in a route trie: finding the callers of an endpoint is then a
+    few lookups per path segment instead of a search of every file. A call matches when
+    its template may designate the endpoint: '/api/v1/orders/' + id and "/api/v1/orders/42"
+    both match '/api/v1/orders/{id}'. Refreshing again parses only the files whose size or
+    modification time changed, or whose project's constants changed.
+    """
+
+    def __init__(self, file_index: Optional[ClientFileIndex] = None, symbols: Optional[SymbolIndex] = None):
+        """
+        Args:
+            file_index: In-memory index of the client files to use instead of walking the projects
+            symbols: Constants of the projects, shared with a controller scan; a new index if None
+        """
+        self._file_index = file_index
+        self._symbols = symbols if symbols is not None else SymbolIndex()
+        self._projects_paths: List[str] = []
+        self._files: Dict[str, Tuple[int, int, str, List[ClientReference]]] = {}
+        self._routes: RouteTrie[ClientReference] = RouteTrie()
+        self._lock = threading.Lock()
+
+    def refresh(self, projects_paths: List[str]) -> None:
+        """
+        Index the client files of the projects, parsing only new and changed files.
+
+        Archives are left out: their entries are searched by scan_code_usage only.
+
+        Raises:
+            ValueError: If a project path does not exist
+        """
+        directories_paths = [project_path for project_path in projects_paths if not is_archive(project_path)]
+        self._symbols.refresh(directories_paths)
+        # Calls are parsed in Java sources only, the clients of other languages are left out
+        if self._file_index is not None:
+            client_files = [path for path in self._file_index.files(directories_paths) if path.suffix == ".java"]
+        else:
+            client_files = _find_client_files(directories_paths, client_file_matcher(("java",)))
+
+        files: Dict[str, Tuple[int, int, str, List[ClientReference]]] = {}
+        for client_file in client_files:
+            path = str(client_file)
+            try:
+                stat = client_file.stat()
+                table = self._symbols.table(path)
+                fingerprint = table.fingerprint if table is not None else ""
+                entry = self._files.get(path)
+                if entry is None or entry[:3] != (stat.st_size, stat.st_mtime_ns, fingerprint):
+                    source = client_file.read_text(encoding="utf-8", errors="ignore")
+                    entry = (stat.st_size, stat.st_mtime_ns, fingerprint, parse_client_source(source, path, table))
+                files[path] = entry
+            except OSError as e:
+                print(f"Error scanning {client_file}: {e}")
+
+        routes: RouteTrie[ClientReference] = RouteTrie()
+        for *_, references in files.values():
+            for reference in references:
+                # A template without literal segment ('/' + id) could be any endpoint and tells nothing
+                if any(VARIABLE not in segment for segment in split_segments(reference.path)):
+                    routes.insert(reference.path, reference)
+
+        with self._lock:
+            self._projects_paths = list(projects_paths)
+            self._files = files
+            self._routes = routes
+
+    def references(self, endpoint: str, http_method: Optional[str] = None) -> Dict[str, int]:
+        """
+        Number of calls to an endpoint in each client file.
+
+        Args:
+            endpoint: Path of the endpoint, variables may be named ('/api/v1/orders/{id}')
+            http_method: Only calls with this method, and calls whose method is unknown; all calls if None
+
+        Returns:
+            Calls per file path, sorted by path
+        """
+        matches_per_file: Dict[str, int] = {}
+        for reference in self._matching_references(endpoint, http_method):
+            matches_per_file[reference.file] = matches_per_file.get(reference.file, 0) + 1
+        return dict(sorted(matches_per_file.items()))
+
+    def code_usage(self, endpoint: str, http_method: Optional[str] = None) -> CodeUsage:
+        """
+        Code usage of an endpoint in the indexed projects, as scan_code_usage() reports it.
+
+        Locations give the line of each call; the column and snippet are left out.
+        """
+        references = self._matching_references(endpoint, http_method)
+        matches_per_file: Dict[str, int] = {}
+        for reference in references:
+            matches_per_file[reference.file] = matches_per_file.get(reference.file, 0) + 1
+        return CodeUsage(
+            projects_paths=list(self._projects_paths),
+            matches_count=len(references),
+            files=sorted(matches_per_file),
+            matches_per_file=dict(sorted(matches_per_file.items())),
+            locations=sorted(
+                (CodeLocation(reference.file, reference.line) for reference in references),
+                key=lambda location: (location.file, location.line),
+            ),
+        )
+
+    def _matching_references(self, endpoint: str, http_method: Optional[str]) -> List[ClientReference]:
+        with self._lock:
+            routes = self._routes
+        return [
+            reference for reference in routes.match(endpoint)
+            if http_method is None or reference.http_method in (http_method, None)
+        ]
+
+
+def _string_bindings(tokens: List[Token]) -> Dict[str, List[Tuple[int, List[Token]]]]:
+    """Initializer of every `String name = ...;` and `var name = ...;` of the file, by name."""
+    bindings: Dict[str, List[Tuple[int, List[Token]]]] = {}
+    for index in range(len(tokens) - 2):
+        if tokens[index].text not in ("String", "var") or tokens[index + 1].kind != "word" \
+                or tokens[index + 2].text != "=":
+            continue
+        end = index + 3
+        nesting = 0
+        while end < len(tokens) and not (tokens[end].text == ";" and nesting == 0):
+            if tokens[end].text in ("(", "{", "["):
+                nesting += 1
+            elif tokens[end].text in (")", "}", "]"):
+                nesting -= 1
+            end += 1
+        bindings.setdefault(tokens[index + 1].text, []).append((tokens[index].position, tokens[index + 3:end]))
+    return bindings
+
+
+def _path_template(
+    tokens: List[Token],
+    bindings: Dict[str, List[Tuple[int, List[Token]]]],
+    position: int,
+    constant: Optional[Callable[[str], Optional[str]]],
+) -> Optional[str]:
+    value = _resolve(tokens, bindings, position, constant, depth=0)
+    # Base URLs: a literal scheme and host, or a variable that could not be resolved
+    value = _SCHEME_AND_HOST.sub("", value)
+    while value.startswith(_UNRESOLVED):
+        value = value[len(_UNRESOLVED):]
+    value = value.split("?", 1)[0].split("#", 1)[0]
+    return value if value.startswith("/") else None
+
+
+def _resolve(
+    tokens: List[Token],
+    bindings: Dict[str, List[Tuple[int, List[Token]]]],
+    position: int,
+    constant: Optional[Callable[[str], Optional[str]]],
+    depth: int,
+) -> str:
+    """Value of a String expression, with a placeholder for each operand that cannot be resolved."""
+    parts = []
+    for operand in split_operands(tokens):
+        name = qualified_name(operand)
+        if len(operand) == 1 and operand[0].kind == "string":
+            parts.append(unquote(operand[0].text))
+        elif _is_format_call(operand) and depth < _MAX_BINDING_DEPTH:
+            # String.format("/v1/users/%s/verify", id): the placeholders are path variables
+            format_string = split_top_level(operand[4:-1])[0]
+            parts.append(_resolve(format_string, bindings, position, constant, depth + 1))
+        elif name in bindings and depth < _MAX_BINDING_DEPTH:
+            definition = _binding(bindings[name], position)
+            parts.append(_resolve(definition, bindings, position, constant, depth + 1))
+        else:
+            # A constant of another file: ApiPaths.BASE, or BASE inherited or statically imported
+            value = constant(name) if constant is not None and name is not None else None
+            parts.append(value if value is not None else _UNRESOLVED)
+    return "".join(parts)
+
+
+def _is_format_call(operand: List[Token]) -> bool:
+    return (
+        len(operand) > 5 and operand[-1].text == ")"
+        and [token.text for token in operand[:4]] == ["String", ".", "format", "("]
+    )
+
+
+def _binding(definitions: List[Tuple[int, List[Token]]], position: int) -> List[Token]:
+    """The definition closest before `position`, e.g. the local variable of the calling method."""
+    before = [tokens for defined_at, tokens in definitions if defined_at < position]
+    return before[-1] if before else definitions[0][1]
+
+
+def _http_method(tokens: List[Token]) -> Optional[str]:
+    """HTTP method of an argument such as `HttpMethod.GET`."""
+    for token in tokens:
+        if token.kind == "word" and token.text in _HTTP_METHODS:
+            return token.text
+    return None
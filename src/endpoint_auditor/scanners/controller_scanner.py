@@ -0,0 +1,385 @@
+import json
+import os
+import re
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from endpoint_auditor.models import ControllerEndpoint, HttpMethod
+from endpoint_auditor.scanners.java_source import (
+    LineCounter,
+    Token,
+    closing_index,
+    concatenated_string,
+    split_top_level,
+    tokenize,
+)
+from endpoint_auditor.scanners.languages import find_project_files
+from endpoint_auditor.scanners.symbol_index import SymbolIndex, SymbolTable
+
+
+# Bumped when the parser changes, so cached results of older versions are parsed again
+_CACHE_VERSION = 2
+
+# Mapping annotations and the HTTP method they imply; @RequestMapping states it with `method`
+_MAPPING_ANNOTATIONS: Dict[str, Optional[str]] = {
+    "RequestMapping": None,
+    "GetMapping": "GET",
+    "PostMapping": "POST",
+    "PutMapping": "PUT",
+    "DeleteMapping": "DELETE",
+    "PatchMapping": "PATCH",
+}
+
+_HTTP_METHODS = {method.value for method in HttpMethod}
+_LOG_LEVELS = {"trace", "debug", "info", "warn", "error"}
+_LOGGER_NAME = re.compile(r"^_?(?:log|logger)$", re.IGNORECASE)
+_TYPE_KEYWORDS = {"class", "interface", "enum", "record"}
+
+# Value of a constant by the name the code uses, None if unknown
+_Lookup = Callable[[str], Optional[str]]
+
+
+@dataclass
+class _Mapping:
+    paths: List[str]
+    methods: List[Optional[str]]
+
+
+@dataclass
+class _TypeScope:
+    name: str
+    body_depth: int
+    mapping: Optional[_Mapping]
+
+
+@dataclass
+class _Handler:
+    name: str
+    position: int
+    mapping: _Mapping
+    body_depth: int
+    log: Optional[str] = None
+
+
+@dataclass
+class _ParseState:
+    """Where the parser stands between two tokens."""
+    depth: int = 0
+    parens: int = 0
+    types: List[_TypeScope] = field(default_factory=list)
+    annotations: List[Tuple[str, List[Token]]] = field(default_factory=list)
+    expecting_type_name: bool = False
+    declared_type: Optional[Tuple[str, List[Tuple[str, List[Token]]]]] = None
+    member: Optional[Tuple[str, int]] = None
+    handler: Optional[_Handler] = None
+
+
+def parse_controller_source(
+    source: str,
+    file: str = "",
+    symbols: Optional[SymbolTable] = None,
+) -> List[ControllerEndpoint]:
+    """
+    Extract the endpoints declared by a Spring controller source file.
+
+    The source is tokenized in a single pass. Class-level @RequestMapping paths are joined
+    with the @GetMapping, @PostMapping, ... (or @RequestMapping) paths of each handler
+    method, and the first LOGGER/log call of the handler gives its log message. Paths built
+    from constants (`ApiPaths.BASE + "/confirmation"`) are resolved with the symbol table;
+    those that cannot be resolved are left out.
+
+    Args:
+        source: Java source code
+        file: Path of the source file, copied to the endpoints
+        symbols: Constants of the project declaring the file, None to resolve literals only
+
+    Returns:
+        One endpoint per path and HTTP method of every handler, in source order
+    """
+    tokens = tokenize(source)
+    endpoints: List[ControllerEndpoint] = []
+    lines = LineCounter(source)
+    state = _ParseState()
+
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+
+        if token.kind == "annotation":
+            name = token.text.lstrip("@ \t\r\n").rsplit(".", 1)[-1]
+            arguments: List[Token] = []
+            if index + 1 < len(tokens) and tokens[index + 1].text == "(":
+                end = closing_index(tokens, index + 1, "(", ")")
+                arguments = tokens[index + 2:end]
+                index = end
+            if name == "interface":
+                # @interface declares an annotation type
+                state.expecting_type_name = True
+            elif state.parens == 0 and state.handler is None:
+                state.annotations.append((name, arguments))
+
+        elif token.kind == "word":
+            previous = tokens[index - 1].text if index else ""
+            if state.handler is not None:
+                log = _log_message(tokens, index)
+                if log is not None and state.handler.log is None:
+                    state.handler.log = log
+            elif token.text in _TYPE_KEYWORDS and previous != "." and state.parens == 0:
+                state.expecting_type_name = True
+            elif state.expecting_type_name:
+                state.declared_type = (token.text, state.annotations)
+                state.annotations = []
+                state.expecting_type_name = False
+            elif (
+                state.types and state.depth == state.types[-1].body_depth and state.parens == 0
+                and index + 1 < len(tokens) and tokens[index + 1].text == "("
+            ):
+                state.member = (token.text, token.position)
+
+        elif token.text == "(":
+            state.parens += 1
+        elif token.text == ")":
+            state.parens = max(0, state.parens - 1)
+
+        elif token.text == ";" and state.parens == 0 and state.handler is None:
+            # Abstract handler of a controller interface: declared without a body
+            mapping = _member_mapping(state, symbols, file)
+            if mapping is not None and state.member is not None:
+                endpoints.extend(_endpoints(state.types, state.member, mapping, None, file, lines))
+            state.annotations = []
+            state.member = None
+
+        elif token.text == "{":
+            state.depth += 1
+            if state.declared_type is not None:
+                name, annotations = state.declared_type
+                mapping = _class_mapping(annotations, _lookup(symbols, file, name))
+                state.types.append(_TypeScope(name, state.depth, mapping))
+                state.declared_type = None
+            elif state.handler is None and state.parens == 0 and state.types \
+                    and state.depth == state.types[-1].body_depth + 1:
+                mapping = _member_mapping(state, symbols, file)
+                if mapping is not None and state.member is not None:
+                    state.handler = _Handler(state.member[0], state.member[1], mapping, state.depth)
+                state.annotations = []
+                state.member = None
+
+        elif token.text == "}":
+            handler = state.handler
+            if handler is not None and state.depth == handler.body_depth:
+                member = (handler.name, handler.position)
+                endpoints.extend(_endpoints(state.types, member, handler.mapping, handler.log, file, lines))
+                state.handler = None
+            if state.types and state.depth == state.types[-1].body_depth:
+                state.types.pop()
+                state.annotations = []
+                state.member = None
+            state.depth = max(0, state.depth - 1)
+
+        index += 1
+
+    return endpoints
+
+
+def scan_controllers(
+    projects_paths: List[str],
+    cache_path: Optional[str] = None,
+    symbols: Optional[SymbolIndex] = None,
+) -> List[ControllerEndpoint]:
+    """
+    Build the endpoint catalog of the controllers (*Controller*.java) of some projects.
+
+    With a cache file, controllers are parsed again only when their size or modification
+    time changed since they were cached, so cataloguing a large service again is mostly stats.
+    A change to the constants of a project parses its controllers again too, as their paths
+    may use them.
+
+    Args:
+        projects_paths: Directories of the projects declaring the controllers
+        cache_path: JSON file keeping the parsed controllers between runs, created if missing
+        symbols: Constants of the projects, refreshed here; a new index if None
+
+    Returns:
+        Endpoints sorted by path and HTTP method
+
+    Raises:
+        ValueError: If a project path does not exist
+    """
+    if symbols is None:
+        symbols = SymbolIndex()
+    symbols.refresh(projects_paths)
+    cached = _load_cache(cache_path) if cache_path else {}
+    files: Dict[str, Dict[str, Any]] = {}
+
+    for project_path in projects_paths:
+        for controller_file in _find_controller_files_in_project(project_path):
+            path = str(controller_file)
+            try:
+                stat = controller_file.stat()
+                table = symbols.table(path)
+                fingerprint = table.fingerprint if table is not None else ""
+                entry = cached.get(path)
+                if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns \
+                        or entry["symbols"] != fingerprint:
+                    source = controller_file.read_text(encoding="utf-8", errors="ignore")
+                    entry = {
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns,
+                        "symbols": fingerprint,
+                        "endpoints": [asdict(endpoint) for endpoint in parse_controller_source(source, path, table)],
+                    }
+                files[path] = entry
+            except OSError as e:
+                print(f"Error scanning {controller_file}: {e}")
+
+    if cache_path and files != cached:
+        _save_cache(cache_path, files)
+
+    endpoints = [ControllerEndpoint(**endpoint) for entry in files.values() for endpoint in entry["endpoints"]]
+    return sorted(endpoints, key=lambda endpoint: (endpoint.path, endpoint.http_method or "", endpoint.file))
+
+
+def _find_controller_files_in_project(project_path: str) -> List[Path]:
+    return find_project_files(project_path, lambda name: name.endswith(".java") and "Controller" in name)
+
+
+def _load_cache(cache_path: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != _CACHE_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def _save_cache(cache_path: str, files: Dict[str, Dict[str, Any]]) -> None:
+    """Write the cache atomically, so an interrupted run never leaves a truncated file."""
+    directory = os.path.dirname(os.path.abspath(cache_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": _CACHE_VERSION, "files": files}, f)
+        os.replace(temp_path, cache_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _endpoints(
+    types: List[_TypeScope],
+    member: Tuple[str, int],
+    mapping: _Mapping,
+    log: Optional[str],
+    file: str,
+    lines: LineCounter,
+) -> List[ControllerEndpoint]:
+    scope = types[-1]
+    base = scope.mapping or _Mapping(paths=[""], methods=[None])
+    methods = mapping.methods if mapping.methods != [None] else base.methods
+    line = lines.line(member[1])
+    return [
+        ControllerEndpoint(
+            http_method=method,
+            path=_join_paths(base_path, path),
+            log=log,
+            controller=scope.name,
+            handler=member[0],
+            file=file,
+            line=line,
+        )
+        for base_path in base.paths
+        for path in mapping.paths
+        for method in methods
+    ]
+
+
+def _class_mapping(annotations: List[Tuple[str, List[Token]]], constant: Optional[_Lookup]) -> Optional[_Mapping]:
+    for name, arguments in annotations:
+        if name == "RequestMapping":
+            return _parse_mapping(name, arguments, constant)
+        if name == "FeignClient":
+            # The value of @FeignClient names the remote service, only `path` prefixes the mappings
+            paths = [path for key, value in _annotation_elements(arguments) if key == "path"
+                     for path in _string_values(value, constant)]
+            return _Mapping(paths=paths or [""], methods=[None])
+    return None
+
+
+def _member_mapping(state: _ParseState, symbols: Optional[SymbolTable], file: str) -> Optional[_Mapping]:
+    if not state.types:
+        return None
+    for name, arguments in state.annotations:
+        if name in _MAPPING_ANNOTATIONS:
+            return _parse_mapping(name, arguments, _lookup(symbols, file, state.types[-1].name))
+    return None
+
+
+def _lookup(symbols: Optional[SymbolTable], file: str, owner: str) -> Optional[_Lookup]:
+    """Value of the constants referenced from the type `owner`, None without symbol table."""
+    if symbols is None:
+        return None
+    return lambda name: symbols.value(name, file, owner)
+
+
+def _parse_mapping(name: str, arguments: List[Token], constant: Optional[_Lookup]) -> _Mapping:
+    """Paths and HTTP methods of a mapping annotation, given the tokens between its parentheses."""
+    paths: List[str] = []
+    methods: List[Optional[str]] = []
+    has_path = False
+    for key, value in _annotation_elements(arguments):
+        if key in (None, "value", "path"):
+            has_path = True
+            paths.extend(_string_values(value, constant))
+        elif key == "method":
+            methods.extend(token.text for token in value if token.kind == "word" and token.text in _HTTP_METHODS)
+
+    implied_method = _MAPPING_ANNOTATIONS[name]
+    if implied_method is not None:
+        methods = [implied_method]
+    # Without a path element the mapping is the base path; with only constants it has no usable path
+    return _Mapping(paths=paths if has_path else [""], methods=methods or [None])
+
+
+def _annotation_elements(arguments: List[Token]) -> List[Tuple[Optional[str], List[Token]]]:
+    """Split annotation arguments into (name, value tokens); the name is None for the default element."""
+    elements = []
+    for part in split_top_level(arguments):
+        if len(part) >= 2 and part[0].kind == "word" and part[1].text == "=":
+            elements.append((part[0].text, part[2:]))
+        elif part:
+            elements.append((None, part))
+    return elements
+
+
+def _string_values(tokens: List[Token], constant: Optional[_Lookup] = None) -> List[str]:
+    """String values of an element value, `"/a"`, `"/a" + BASE` or `{"/a", "/b"}`; unknown constants are skipped."""
+    if tokens and tokens[0].text == "{":
+        tokens = tokens[1:-1] if tokens[-1].text == "}" else tokens[1:]
+    values = []
+    for part in split_top_level(tokens):
+        value = concatenated_string(part, constant)
+        if value is not None:
+            values.append(value)
+    return values
+
+
+def _log_message(tokens: List[Token], index: int) -> Optional[str]:
+    """Message of a `LOGGER.info("...", ...)` call starting at `index`, None if there is none."""
+    if not _LOGGER_NAME.match(tokens[index].text) or index + 3 >= len(tokens):
+        return None
+    if tokens[index + 1].text != "." or tokens[index + 2].text not in _LOG_LEVELS or tokens[index + 3].text != "(":
+        return None
+
+    end = closing_index(tokens, index + 3, "(", ")")
+    first_argument = split_top_level(tokens[index + 4:end])[0]
+    return concatenated_string(first_argument)
+
+
+def _join_paths(base: str, path: str) -> str:
+    parts = [part.strip("/") for part in (base, path) if part.strip("/")]
+    return "/" + "/".join(parts)
@@ -0,0 +1,206 @@
+import json
+import re
+import subprocess
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from endpoint_auditor.scanners.languages import ClientFileMatcher, endpoint_pattern
+
+# `@@ -12,3 +14,5 @@`: the added lines of the hunk start at line 14 of the new file
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+
+@dataclass(frozen=True)
+class DeprecatedEndpoint:
+    """
+    An endpoint that code must not start using again
+
+    :var endpoint: Full path of the endpoint
+    :var http_method: HTTP method of the endpoint, if known; shown in the violations only
+    :var jira: Jira issue tracking the deprecation, if any
+    """
+    endpoint: str
+    http_method: Optional[str] = None
+    jira: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class GuardViolation:
+    """
+    A deprecated endpoint referenced by a line added in a diff
+
+    :var file: Path of the changed file, relative to the repository root
+    :var line: Line number in the new version of the file (1-based)
+    :var endpoint: The deprecated endpoint referenced
+    :var text: The added line, stripped
+    """
+    file: str
+    line: int
+    endpoint: DeprecatedEndpoint
+    text: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "file": self.file,
+            "line": self.line,
+            "endpoint": self.endpoint.endpoint,
+            "http_method": self.endpoint.http_method,
+            "jira": self.endpoint.jira,
+            "text": self.text,
+        }
+
+
+def load_registry(path: str) -> List[DeprecatedEndpoint]:
+    """
+    Read the deprecated endpoints from a JSON list of objects with an "endpoint" key.
+
+    A batch file or the JSON output of `catalog` can be used as is: other keys are ignored.
+
+    Raises:
+        ValueError: If the file is not a list, or an entry has no endpoint
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if not isinstance(entries, list):
+        raise ValueError(f"registry {path} must be a JSON list of endpoints")
+
+    endpoints = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("endpoint"):
+            raise ValueError(f"registry entry without endpoint: {entry!r}")
+        endpoints.append(DeprecatedEndpoint(entry["endpoint"], entry.get("http_method"), entry.get("jira")))
+    return endpoints
+
+
+class DeprecatedEndpointMatcher:
+    """
+    All the deprecated endpoints, combined in one regex per language.
+
+    An added line is matched once, whatever the number of endpoints in the registry. Where
+    several endpoints match at the same position (`/api/users` and `/api/users/{id}`), the
+    longest one is reported.
+    """
+
+    def __init__(self, endpoints: Iterable[DeprecatedEndpoint]):
+        # The same path may be listed once per HTTP method, it is reported once
+        by_path: Dict[str, DeprecatedEndpoint] = {}
+        for endpoint in endpoints:
+            by_path.setdefault(endpoint.endpoint, endpoint)
+        self.endpoints: Tuple[DeprecatedEndpoint, ...] = tuple(
+            sorted(by_path.values(), key=lambda endpoint: len(endpoint.endpoint), reverse=True)
+        )
+        self._patterns: Dict[str, re.Pattern] = {}
+
+    def find(self, text: str, suffix: str) -> List[DeprecatedEndpoint]:
+        """Deprecated endpoints referenced in a line of a file with a suffix, one per match."""
+        if not self.endpoints:
+            return []
+        pattern = self._patterns.get(suffix)
+        if pattern is None:
+            # Path variables match the interpolations of the file's language, as in scan_code_usage
+            pattern = re.compile("|".join(
+                f"(?P<e{index}>{endpoint_pattern(endpoint.endpoint, suffix).pattern})"
+                for index, endpoint in enumerate(self.endpoints)
+            ))
+            self._patterns[suffix] = pattern
+        return [self.endpoints[int(match.lastgroup[1:])] for match in pattern.finditer(text)]
+
+
+def parse_added_lines(diff: str) -> Dict[str, List[Tuple[int, str]]]:
+    """
+    Extract the added lines of a unified diff.
+
+    Args:
+        diff: Output of `git diff`, with any number of context lines
+
+    Returns:
+        (line number in the new file, line) of the added lines, by file path
+    """
+    added_lines: Dict[str, List[Tuple[int, str]]] = {}
+    file: Optional[str] = None
+    line_number = 0
+    previous = ""
+
+    for line in diff.splitlines():
+        previous, is_new_file_header = line, line.startswith("+++ ") and previous.startswith("--- ")
+        # An added line may start with '++ ' too: '+++ ' names a file only after the '--- ' line
+        if is_new_file_header:
+            path = line[4:].rstrip("\t")
+            if path.startswith('"') and path.endswith('"'):
+                path = path[1:-1]
+            # Deleted files have no new version
+            file = None if path == "/dev/null" else path[2:] if path.startswith("b/") else path
+            continue
+        if line.startswith("--- ") or line.startswith("diff --git"):
+            continue
+        header = _HUNK_HEADER.match(line)
+        if header:
+            line_number = int(header.group(1))
+            continue
+        if file is None:
+            continue
+        if line.startswith("+"):
+            added_lines.setdefault(file, []).append((line_number, line[1:]))
+            line_number += 1
+        elif line.startswith(" "):
+            line_number += 1
+        # '-' lines are not in the new file, '\ No newline at end of file' is no line at all
+
+    return added_lines
+
+
+def git_diff(repository_path: str, diff_range: str) -> str:
+    """
+    Diff of a range of a git repository, without context lines.
+
+    Args:
+        repository_path: Directory inside the repository
+        diff_range: Revisions given to `git diff`, e.g. `origin/main...HEAD`
+
+    Raises:
+        ValueError: If git fails, e.g. on an unknown revision
+    """
+    command = [
+        "git", "-C", repository_path, "diff", "--unified=0", "--no-color", "--no-ext-diff",
+        "--diff-filter=d", diff_range, "--",
+    ]
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    except OSError as e:
+        raise ValueError(f"git cannot be run: {e}")
+    if completed.returncode != 0:
+        raise ValueError(f"git diff {diff_range} failed: {completed.stderr.strip()}")
+    return completed.stdout
+
+
+def guard_diff(
+    diff: str,
+    endpoints: Iterable[DeprecatedEndpoint],
+    file_matcher: Optional[ClientFileMatcher] = None,
+) -> List[GuardViolation]:
+    """
+    Find the deprecated endpoints referenced by the lines a diff adds.
+
+    Only added lines are searched, so the cost depends on the size of the change and not
+    on the size of the projects; references that already existed are not reported.
+
+    Args:
+        diff: Unified diff, e.g. from git_diff()
+        endpoints: The deprecated endpoints
+        file_matcher: Search only the client files of these languages; every changed file if None
+
+    Returns:
+        The violations, by file and line
+    """
+    matcher = DeprecatedEndpointMatcher(endpoints)
+    violations = []
+    for file, lines in parse_added_lines(diff).items():
+        name = PurePosixPath(file).name
+        if file_matcher is not None and file_matcher.profile(name) is None:
+            continue
+        suffix = PurePosixPath(file).suffix
+        for line_number, text in lines:
+            for endpoint in matcher.find(text, suffix):
+                violations.append(GuardViolation(file, line_number, endpoint, text.strip()))
+    return sorted(violations, key=lambda violation: (violation.file, violation.line))
@@ -0,0 +1,142 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "0": "\0"}
+
+# One pass over the source: comments and character literals are matched so that their
+# content is never mistaken for code, everything else between tokens is skipped
+_TOKEN = re.compile(
+    r"""
+      (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>\"\"\".*?\"\"\"|"(?:\\.|[^"\\\n])*")
+    | (?P<char>'(?:\\.|[^'\\\n])+')
+    | (?P<annotation>@\s*[A-Za-z_$][\w$.]*)
+    | (?P<word>[A-Za-z_$][\w$]*)
+    | (?P<punct>[{}()\[\];=,+.])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str
+    text: str
+    position: int
+
+
+def tokenize(source: str) -> List[Token]:
+    """Tokens of a Java source, without comments and character literals."""
+    return [
+        Token(match.lastgroup, match.group(), match.start())
+        for match in _TOKEN.finditer(source)
+        if match.lastgroup not in ("comment", "char")
+    ]
+
+
+class LineCounter:
+    """Line numbers of increasing positions, counting newlines only once."""
+
+    def __init__(self, source: str):
+        self._source = source
+        self._position = 0
+        self._line = 1
+
+    def line(self, position: int) -> int:
+        if position < self._position:
+            return self._source.count("\n", 0, position) + 1
+        self._line += self._source.count("\n", self._position, position)
+        self._position = position
+        return self._line
+
+
+def split_top_level(tokens: List[Token]) -> List[List[Token]]:
+    """Split tokens at the commas that are not nested in parentheses or braces."""
+    parts: List[List[Token]] = [[]]
+    nesting = 0
+    for token in tokens:
+        if token.text in ("(", "{"):
+            nesting += 1
+        elif token.text in (")", "}"):
+            nesting -= 1
+        if token.text == "," and nesting == 0:
+            parts.append([])
+        else:
+            parts[-1].append(token)
+    return parts
+
+
+def split_operands(tokens: List[Token]) -> List[List[Token]]:
+    """Split an expression at the '+' that are not nested in parentheses."""
+    operands: List[List[Token]] = [[]]
+    nesting = 0
+    for token in tokens:
+        if token.text == "(":
+            nesting += 1
+        elif token.text == ")":
+            nesting -= 1
+        if token.text == "+" and nesting == 0:
+            operands.append([])
+        else:
+            operands[-1].append(token)
+    return [operand for operand in operands if operand]
+
+
+def qualified_name(tokens: List[Token]) -> Optional[str]:
+    """Name of a `NAME`, `Type.NAME` or `this.NAME` operand, None for any other expression."""
+    if len(tokens) % 2 == 0:
+        return None
+    for position, token in enumerate(tokens):
+        if (position % 2 == 0 and token.kind != "word") or (position % 2 == 1 and token.text != "."):
+            return None
+    names = [token.text for token in tokens[::2]]
+    return ".".join(names[1:] if names[0] == "this" and len(names) > 1 else names)
+
+
+def concatenated_string(
+    tokens: List[Token],
+    constant: Optional[Callable[[str], Optional[str]]] = None,
+) -> Optional[str]:
+    """
+    Value of literals joined with '+', None if the expression uses anything else.
+
+    Args:
+        tokens: Tokens of the expression
+        constant: Value of a named constant (`BASE`, `ApiPaths.BASE`), None if unknown;
+            without it, names make the expression unresolvable
+    """
+    operands = split_operands(tokens)
+    if not operands:
+        return None
+    parts = []
+    for operand in operands:
+        if len(operand) == 1 and operand[0].kind == "string":
+            parts.append(unquote(operand[0].text))
+            continue
+        name = qualified_name(operand) if constant is not None else None
+        value = constant(name) if name is not None else None
+        if value is None:
+            return None
+        parts.append(value)
+    return "".join(parts)
+
+
+def unquote(literal: str) -> str:
+    """Value of a string literal or text block."""
+    text = literal[3:-3].strip() if literal.startswith('"""') else literal[1:-1]
+    return re.sub(r"\\(.)", lambda match: _ESCAPES.get(match.group(1), match.group(1)), text)
+
+
+def closing_index(tokens: List[Token], start: int, opening: str, closing: str) -> int:
+    """Index of the token closing the one at `start`, or the last index if it is never closed."""
+    nesting = 0
+    for index in range(start, len(tokens)):
+        if tokens[index].text == opening:
+            nesting += 1
+        elif tokens[index].text == closing:
+            nesting -= 1
+            if nesting == 0:
+                return index
+    return len(tokens) - 1
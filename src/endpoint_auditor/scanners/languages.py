@@ -0,0 +1,171 @@
+import fnmatch
+import functools
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Path variables of an endpoint: {id}, {id:[0-9]+}
+_PATH_VARIABLE = re.compile(r"(\{[^/{}]*\})")
+
+# Directories never holding client code of the project: dependencies, VCS and tool caches.
+# Build output (target/, build/) is walked, generated clients live there.
+SKIPPED_DIRECTORIES = frozenset({
+    ".git", ".hg", ".svn", ".idea", ".gradle", ".venv", "venv", ".tox", ".mypy_cache",
+    ".pytest_cache", "__pycache__", "node_modules", "bower_components",
+})
+
+
+@dataclass(frozen=True)
+class LanguageProfile:
+    """
+    How the client files of a language are found and searched
+
+    :var name: Name of the profile, as listed in CLIENT_LANGUAGES
+    :var globs: Patterns of the client file names (fnmatch syntax, case-sensitive)
+    :var extensions: Suffixes of the files of the language
+    :var interpolation: Regex of a value interpolated in a string literal of the language,
+        such as `${id}` in a template literal; it matches a path variable of the endpoint.
+        None when the language has no string interpolation
+    :var compiled_globs: Patterns of the compiled client files, searched in archives only
+    """
+    name: str
+    globs: Tuple[str, ...]
+    extensions: Tuple[str, ...]
+    interpolation: Optional[str] = None
+    compiled_globs: Tuple[str, ...] = ()
+
+    def endpoint_pattern(self, endpoint: str) -> re.Pattern:
+        """
+        Regex matching the endpoint path in a file of the language.
+
+        The path matches as written; a path variable (`{id}`) also matches an interpolated
+        value, so `/api/users/{id}` is found in `` `/api/users/${userId}` ``.
+        """
+        parts = _PATH_VARIABLE.split(endpoint)
+        return re.compile("".join(
+            f"(?:{re.escape(part)}|{self.interpolation})" if index % 2 and self.interpolation else re.escape(part)
+            for index, part in enumerate(parts)
+        ))
+
+
+LANGUAGE_PROFILES: Dict[str, LanguageProfile] = {
+    profile.name: profile
+    for profile in (
+        # String constants of compiled classes are stored as is in the class file
+        LanguageProfile("java", ("*Client*.java",), (".java",), compiled_globs=("*Client*.class",)),
+        LanguageProfile(
+            "kotlin", ("*Client*.kt",), (".kt",),
+            interpolation=r"\$\{[^}\n]*\}|\$[A-Za-z_][A-Za-z0-9_]*",
+            compiled_globs=("*Client*.class",),
+        ),
+        LanguageProfile(
+            "typescript", ("*[Cc]lient*.ts", "*[Cc]lient*.tsx"), (".ts", ".tsx"),
+            interpolation=r"\$\{[^}\n]*\}",
+        ),
+        LanguageProfile(
+            "javascript", ("*[Cc]lient*.js", "*[Cc]lient*.jsx", "*[Cc]lient*.mjs"), (".js", ".jsx", ".mjs"),
+            interpolation=r"\$\{[^}\n]*\}",
+        ),
+        # f-strings: f"/api/users/{user_id}"; .format() placeholders are written the same way
+        LanguageProfile("python", ("*client*.py", "*Client*.py"), (".py",), interpolation=r"\{[^}\n]*\}"),
+    )
+}
+
+DEFAULT_LANGUAGES: Tuple[str, ...] = tuple(LANGUAGE_PROFILES)
+
+
+class ClientFileMatcher:
+    """
+    The client file patterns of several language profiles, combined in one precompiled regex.
+
+    Every file name is matched once, whatever the number of profiles, so the client files
+    of all languages are found in a single walk of each project.
+    """
+
+    def __init__(self, profiles: Iterable[LanguageProfile]):
+        self.profiles: Tuple[LanguageProfile, ...] = tuple(profiles)
+        self._pattern = re.compile("|".join(
+            f"(?P<profile{index}>{'|'.join(fnmatch.translate(glob) for glob in profile.globs)})"
+            for index, profile in enumerate(self.profiles)
+        ))
+        entry_globs = {glob for profile in self.profiles for glob in profile.globs + profile.compiled_globs}
+        self._entry_pattern = re.compile("|".join(fnmatch.translate(glob) for glob in sorted(entry_globs)))
+
+    def profile(self, file_name: str) -> Optional[LanguageProfile]:
+        """Profile of the first language whose patterns match a file name, None if none does."""
+        match = self._pattern.match(file_name)
+        if match is None:
+            return None
+        return self.profiles[int(match.lastgroup[len("profile"):])]
+
+    def matches_entry(self, file_name: str) -> bool:
+        """Whether an archive entry is a client file, source or compiled, of one of the languages."""
+        return self._entry_pattern.match(file_name) is not None
+
+    def find_files(self, project_path: str) -> List[Path]:
+        """
+        Find the client files of every profile in a project, in one walk.
+
+        Dependency, VCS and cache directories (node_modules/, .git/, .venv/, ...) are not walked.
+
+        Raises:
+            ValueError: If the project path does not exist
+        """
+        return find_project_files(project_path, self._pattern.match)
+
+
+def find_project_files(project_path: str, match: Callable[[str], Any]) -> List[Path]:
+    """
+    Find the files of a project whose name matches, without walking the directories of
+    SKIPPED_DIRECTORIES.
+
+    Raises:
+        ValueError: If the project path does not exist
+    """
+    if not os.path.isdir(project_path):
+        raise ValueError(f"project path not found: {project_path}")
+
+    found: List[Path] = []
+    for directory, directories, files in os.walk(project_path):
+        directories[:] = [name for name in directories if name not in SKIPPED_DIRECTORIES]
+        found.extend(Path(directory, name) for name in files if match(name))
+    return found
+
+
+@functools.lru_cache(maxsize=None)
+def client_file_matcher(languages: Optional[Tuple[str, ...]] = None) -> ClientFileMatcher:
+    """
+    Matcher of the client files of some languages, built once per set of languages.
+
+    Args:
+        languages: Names of the language profiles, all of them if None
+
+    Raises:
+        ValueError: If a language has no profile
+    """
+    names = languages if languages is not None else DEFAULT_LANGUAGES
+    unknown = [name for name in names if name not in LANGUAGE_PROFILES]
+    if unknown:
+        raise ValueError(f"unknown client languages: {', '.join(unknown)} (known: {', '.join(LANGUAGE_PROFILES)})")
+    return ClientFileMatcher(LANGUAGE_PROFILES[name] for name in names)
+
+
+def endpoint_literal(endpoint: str) -> str:
+    """
+    The longest part of an endpoint that every match contains as written, in any language.
+
+    A path variable may match an interpolation (`${id}`), the text between path variables
+    is always matched literally.
+    """
+    return max(_PATH_VARIABLE.split(endpoint)[::2], key=len)
+
+
+@functools.lru_cache(maxsize=256)
+def endpoint_pattern(endpoint: str, suffix: str) -> re.Pattern:
+    """Regex matching an endpoint in the files with a suffix, by the rules of their language."""
+    for profile in LANGUAGE_PROFILES.values():
+        if suffix in profile.extensions:
+            return profile.endpoint_pattern(endpoint)
+    return re.compile(re.escape(endpoint))
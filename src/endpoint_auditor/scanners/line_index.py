@@ -0,0 +1,43 @@
+import re
+from typing import List, Tuple
+
+# Characters of the line kept on each side of a match in a snippet: lines of minified or
+# generated code may be thousands of characters long
+_SNIPPET_CONTEXT = 80
+
+# Locations kept per file; the count of matches stays exact beyond them
+MAX_LOCATIONS_PER_FILE = 100
+
+
+def count_and_locate(text: str, pattern: re.Pattern) -> Tuple[int, List[Tuple[int, int, str]]]:
+    """
+    Number of matches of a pattern in a text, with the line, column and snippet of the
+    first ones, in one pass over the text.
+
+    Matches come in text order: newlines are counted up to the last located match only,
+    the rest of the text is not indexed.
+
+    Returns:
+        The number of matches, and (line, column, snippet) of the first MAX_LOCATIONS_PER_FILE of them
+    """
+    locations = []
+    count = 0
+    line = 1
+    line_start = 0
+    counted_to = 0
+    for match in pattern.finditer(text):
+        count += 1
+        if count > MAX_LOCATIONS_PER_FILE:
+            continue
+        start, end = match.span()
+        newlines = text.count("\n", counted_to, start)
+        if newlines:
+            line += newlines
+            line_start = text.rfind("\n", counted_to, start) + 1
+        counted_to = start
+        line_end = text.find("\n", start)
+        if line_end == -1:
+            line_end = len(text)
+        snippet = text[max(line_start, start - _SNIPPET_CONTEXT):min(line_end, end + _SNIPPET_CONTEXT)].strip()
+        locations.append((line, start - line_start + 1, snippet))
+    return count, locations
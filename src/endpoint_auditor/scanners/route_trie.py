@@ -0,0 +1,150 @@
+import re
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+# Variable parts of a path: {id}, {id:[0-9]+}, String.format placeholders
+_PATH_VARIABLE = re.compile(r"\{[^/]*?\}|%[sd]")
+
+VARIABLE = "{}"
+SEGMENT_WILDCARD = "*"
+PATH_WILDCARD = "**"
+
+
+def path_key(path: str) -> str:
+    """
+    Normalized form of a path template: every variable part is '{}', so
+    '/api/v1/orders/{id}' and '/api/v1/orders/' + orderId share their key.
+    """
+    key = _PATH_VARIABLE.sub(VARIABLE, path)
+    key = re.sub(r"/{2,}", "/", key)
+    return key.rstrip("/") or "/"
+
+
+def split_segments(path: str) -> List[str]:
+    """Segments of a normalized path template, the root path having none."""
+    return [segment for segment in path_key(path).split("/") if segment]
+
+
+class _Node(Generic[T]):
+    __slots__ = ("literals", "variable", "patterns", "wildcard", "values")
+
+    def __init__(self) -> None:
+        self.literals: Dict[str, "_Node[T]"] = {}
+        self.variable: Optional["_Node[T]"] = None
+        # Segments mixing literal and variable parts (v{}, {}.json), with the regex matching their values
+        self.patterns: Dict[str, Tuple[re.Pattern, "_Node[T]"]] = {}
+        self.wildcard: Optional["_Node[T]"] = None
+        self.values: List[T] = []
+
+
+class RouteTrie(Generic[T]):
+    """
+    Path templates indexed segment by segment.
+
+    Every segment of an inserted template is a literal, a variable ({} or *), a pattern
+    mixing both (v{}, {}.json) or a '**' wildcard spanning any number of segments. Matching
+    a path walks the trie one segment at a time: a literal segment follows its literal
+    child by dictionary lookup, plus the variable and pattern children that accept it, so
+    resolving a path costs a few lookups per segment whatever the number of templates.
+    """
+
+    def __init__(self) -> None:
+        self._root: _Node[T] = _Node()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, template: str, value: T) -> None:
+        """Add a value under a path template."""
+        node = self._root
+        for segment in split_segments(template):
+            kind = _segment_kind(segment)
+            if kind == "literal":
+                node = node.literals.setdefault(segment, _Node())
+            elif kind == "variable":
+                node.variable = node.variable or _Node()
+                node = node.variable
+            elif kind == "wildcard":
+                node.wildcard = node.wildcard or _Node()
+                node = node.wildcard
+            else:
+                if segment not in node.patterns:
+                    node.patterns[segment] = (_segment_pattern(segment), _Node())
+                node = node.patterns[segment][1]
+        node.values.append(value)
+        self._size += 1
+
+    def match(self, path: str) -> List[T]:
+        """
+        Values of every template that may designate the same route as `path`.
+
+        `path` may itself be a template: a variable segment of it matches any segment of
+        the inserted templates, and a '**' segment any number of segments.
+
+        Returns:
+            The values of the matching templates, each once
+        """
+        matched: Dict[int, _Node[T]] = {}
+        self._match(self._root, split_segments(path), 0, matched)
+        return [value for node in matched.values() for value in node.values]
+
+    def _match(self, node: _Node[T], segments: List[str], index: int, matched: Dict[int, _Node[T]]) -> None:
+        if node.wildcard is not None:
+            # '**' consumes zero or more of the remaining segments
+            for next_index in range(index, len(segments) + 1):
+                self._match(node.wildcard, segments, next_index, matched)
+
+        if index == len(segments):
+            matched[id(node)] = node
+            return
+
+        segment = segments[index]
+        kind = _segment_kind(segment)
+        if kind == "wildcard":
+            self._collect(node, matched)
+            return
+
+        if kind == "literal":
+            child = node.literals.get(segment)
+            if child is not None:
+                self._match(child, segments, index + 1, matched)
+            for pattern, child in node.patterns.values():
+                if pattern.fullmatch(segment):
+                    self._match(child, segments, index + 1, matched)
+        else:
+            # A variable of the path may take the value of any segment, a pattern only the values it accepts
+            pattern = _segment_pattern(segment) if kind == "pattern" else None
+            for literal, child in node.literals.items():
+                if pattern is None or pattern.fullmatch(literal):
+                    self._match(child, segments, index + 1, matched)
+            for _, child in node.patterns.values():
+                self._match(child, segments, index + 1, matched)
+
+        if node.variable is not None:
+            self._match(node.variable, segments, index + 1, matched)
+
+    def _collect(self, node: _Node[T], matched: Dict[int, _Node[T]]) -> None:
+        """Every node of a subtree, for a '**' segment of the matched path."""
+        matched[id(node)] = node
+        children = list(node.literals.values()) + [child for _, child in node.patterns.values()]
+        children += [child for child in (node.variable, node.wildcard) if child is not None]
+        for child in children:
+            self._collect(child, matched)
+
+
+def _segment_kind(segment: str) -> str:
+    if segment == PATH_WILDCARD:
+        return "wildcard"
+    if segment in (VARIABLE, SEGMENT_WILDCARD):
+        return "variable"
+    if VARIABLE in segment or SEGMENT_WILDCARD in segment:
+        return "pattern"
+    return "literal"
+
+
+def _segment_pattern(segment: str) -> re.Pattern:
+    parts = re.split(r"(\{\}|\*)", segment)
+    return re.compile("".join(".+" if part in (VARIABLE, SEGMENT_WILDCARD) else re.escape(part) for part in parts))
@@ -0,0 +1,198 @@
+import base64
+import functools
+import json
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Files given to one run of an external tool, to stay far below the command line limit
+_FILES_PER_RUN = 1000
+
+SEARCH_BACKENDS = ("auto", "python", "git", "ripgrep")
+
+
+class SearchBackend:
+    """
+    How the client files that may reference an endpoint are found before being searched.
+
+    The matches are always counted by the Python regex of each language, so every backend
+    gives the same results: a backend only rules out the files that do not contain the
+    literal part of the endpoint, without Python reading them. This one rules out nothing.
+    """
+
+    name = "python"
+
+    def candidates(self, files_per_project: Dict[str, List[Path]], literal: str) -> Set[Path]:
+        """
+        Files of several projects that may contain a literal.
+
+        Args:
+            files_per_project: Client files of each project directory
+            literal: Text the files must contain, see languages.endpoint_literal()
+
+        Returns:
+            The files the backend did not rule out: every file it cannot tell about
+        """
+        return {file for files in files_per_project.values() for file in files}
+
+
+class GitGrepBackend(SearchBackend):
+    """
+    `git grep -F -c` in the git work trees, searching files with git's optimized fixed-string
+    matcher. Untracked and ignored files are searched too, so generated clients in build
+    output are not missed. The projects of a monorepo are searched in one run of git per
+    work tree; projects outside work trees are left to Python.
+    """
+
+    name = "git"
+
+    def __init__(self) -> None:
+        self._work_trees: Dict[str, Optional[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self, files_per_project: Dict[str, List[Path]], literal: str) -> Set[Path]:
+        if not literal:
+            return super().candidates(files_per_project, literal)
+
+        found: Set[Path] = set()
+        # Path relative to the top level of its work tree of every file, by work tree
+        files_per_work_tree: Dict[str, Dict[str, Path]] = {}
+        for project_path, files in files_per_project.items():
+            work_tree = self._work_tree(project_path) if files else None
+            if work_tree is None:
+                found.update(files)
+                continue
+            top_level, project_prefix = work_tree
+            # The files were found under the project path: cutting it is much cheaper than
+            # os.path.relpath()
+            prefix = os.path.join(project_path, "")
+            relative_paths = files_per_work_tree.setdefault(top_level, {})
+            for file in files:
+                path = str(file)
+                relative = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, project_path)
+                relative_paths[os.path.normpath(project_prefix + relative)] = file
+
+        for top_level, relative_paths in files_per_work_tree.items():
+            chunks = list(relative_paths)
+            for start in range(0, len(chunks), _FILES_PER_RUN):
+                chunk = chunks[start:start + _FILES_PER_RUN]
+                chunk_found = self._grep(top_level, chunk, relative_paths, literal)
+                found.update(chunk_found if chunk_found is not None else (relative_paths[path] for path in chunk))
+        return found
+
+    @staticmethod
+    def _grep(top_level: str, chunk: List[str], relative_paths: Dict[str, Path], literal: str) -> Optional[Set[Path]]:
+        command = [
+            "git", "-C", top_level, "grep", "--untracked", "--no-exclude-standard", "--no-color",
+            "-z", "-c", "-F", "-e", literal, "--", *chunk,
+        ]
+        completed = _run(command)
+        # 1: no file matched; anything else is an error, e.g. a file in a submodule
+        if completed is None or completed.returncode not in (0, 1):
+            return None
+        found = set()
+        for line in completed.stdout.splitlines():
+            path, _, _count = line.rpartition(b"\0")
+            file = relative_paths.get(os.path.normpath(os.fsdecode(path)))
+            if file is None:
+                return None
+            found.add(file)
+        return found
+
+    def _work_tree(self, project_path: str) -> Optional[Tuple[str, str]]:
+        """Top level of the work tree of a project and path of the project in it, None outside work trees."""
+        with self._lock:
+            if project_path in self._work_trees:
+                return self._work_trees[project_path]
+        completed = _run(["git", "-C", project_path, "rev-parse", "--show-toplevel", "--show-prefix"])
+        work_tree = None
+        if completed is not None and completed.returncode == 0:
+            lines = os.fsdecode(completed.stdout).split("\n")
+            # No top level inside a .git directory
+            if len(lines) >= 2 and lines[0]:
+                work_tree = (lines[0], lines[1])
+        with self._lock:
+            self._work_trees[project_path] = work_tree
+        return work_tree
+
+
+class RipgrepBackend(SearchBackend):
+    """
+    `rg --json -F`, searching files in parallel with SIMD literal matching. Its JSON output
+    carries any file name, even one that is not valid UTF-8.
+    """
+
+    name = "ripgrep"
+
+    def candidates(self, files_per_project: Dict[str, List[Path]], literal: str) -> Set[Path]:
+        if not literal:
+            return super().candidates(files_per_project, literal)
+
+        paths = {str(file): file for files in files_per_project.values() for file in files}
+        chunks = list(paths)
+        found: Set[Path] = set()
+        for start in range(0, len(chunks), _FILES_PER_RUN):
+            chunk = chunks[start:start + _FILES_PER_RUN]
+            chunk_found = self._search(chunk, paths, literal)
+            found.update(chunk_found if chunk_found is not None else (paths[path] for path in chunk))
+        return found
+
+    @staticmethod
+    def _search(chunk: List[str], paths: Dict[str, Path], literal: str) -> Optional[Set[Path]]:
+        # Searched as text, without BOM sniffing: as Python reads them
+        command = ["rg", "--json", "--no-config", "--text", "--encoding", "none", "-F", "-e", literal, "--", *chunk]
+        completed = _run(command)
+        if completed is None or completed.returncode not in (0, 1):
+            return None
+        found = set()
+        for line in completed.stdout.splitlines():
+            message = json.loads(line)
+            if message["type"] == "match":
+                file = paths.get(_json_path(message["data"]["path"]))
+                if file is None:
+                    return None
+                found.add(file)
+        return found
+
+
+def _json_path(path: Dict[str, str]) -> str:
+    if "text" in path:
+        return path["text"]
+    return os.fsdecode(base64.b64decode(path["bytes"]))
+
+
+def _run(command: List[str]) -> Optional[subprocess.CompletedProcess]:
+    try:
+        return subprocess.run(command, capture_output=True)
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def search_backend(name: str = "auto") -> SearchBackend:
+    """
+    The search backend of a name, shared by the whole process.
+
+    `auto` picks ripgrep when `rg` is on the PATH, else Python. git grep is opt-in: starting
+    git and matching the paths of the client files costs about as much as the Python search
+    it saves on trees of small clients (see benchmarks/search_backends.py).
+
+    Raises:
+        ValueError: If the name is unknown, or the tool of the backend is not installed
+    """
+    if name not in SEARCH_BACKENDS:
+        raise ValueError(f"unknown search backend: {name} (known: {', '.join(SEARCH_BACKENDS)})")
+    if name == "auto":
+        name = "ripgrep" if shutil.which("rg") else "python"
+    if name == "ripgrep":
+        if not shutil.which("rg"):
+            raise ValueError("search backend 'ripgrep' needs rg on the PATH")
+        return RipgrepBackend()
+    if name == "git":
+        if not shutil.which("git"):
+            raise ValueError("search backend 'git' needs git on the PATH")
+        return GitGrepBackend()
+    return SearchBackend()
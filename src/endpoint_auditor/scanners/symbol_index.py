@@ -0,0 +1,307 @@
+import bisect
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from endpoint_auditor.scanners.archive_scanner import is_archive
+from endpoint_auditor.scanners.java_source import Token, qualified_name, split_operands, tokenize, unquote
+from endpoint_auditor.scanners.languages import find_project_files
+
+
+# `String NAME = <expression>;`, the expression running to the first ';' outside string literals.
+# Starting with a literal lets the regex engine skip to the candidates: no \b in front of it
+_STRING_DECLARATION = re.compile(
+    r'String\s+([A-Za-z_$][\w$]*)\s*=\s*((?:"(?:\\.|[^"\\\n])*"|[^;"])+);'
+)
+_TYPE_DECLARATION = re.compile(r"\b(class|interface|enum|record)\s+([A-Za-z_$][\w$]*)")
+_STATIC_IMPORT = re.compile(r"^\s*import\s+static\s+([\w$.]+)\.([A-Za-z_$][\w$]*|\*)\s*;", re.MULTILINE)
+# Comments and literals, in which declarations and their keywords are only words
+_COMMENT_OR_LITERAL = re.compile(
+    r'//[^\n]*|/\*.*?(?:\*/|\Z)|""".*?"""|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])+\'',
+    re.DOTALL,
+)
+
+
+@dataclass(frozen=True)
+class StringConstant:
+    """
+    A `static final String` field, or a String field of an interface
+
+    :var owner: Simple name of the declaring type
+    :var name: Name of the constant
+    :var operands: Parts of the initializer joined with '+': ("literal", value), ("name", `NAME`
+        or `Type.NAME`) or ("unresolved", "") for anything else (calls, conditionals)
+    """
+    owner: str
+    name: str
+    operands: Tuple[Tuple[str, str], ...]
+
+
+@dataclass(frozen=True)
+class _FileSymbols:
+    constants: Tuple[StringConstant, ...]
+    # `Type.NAME` or `Type.*` of every `import static`
+    imports: Tuple[str, ...]
+
+
+def parse_constants(source: str) -> Tuple[List[StringConstant], List[str]]:
+    """
+    Extract the String constants and the static imports of a Java source file.
+
+    Declarations are found with a regex rather than a full parse: every `String NAME = ...;`
+    declared `static final`, or declared in an interface, is a constant. The declaring type
+    is the last type declared before the constant, which is right for nested types declared
+    after the constants of their outer type, as they usually are. Declarations and type
+    keywords inside comments and literals are ignored.
+
+    Args:
+        source: Java source code
+
+    Returns:
+        The constants in source order, and the statically imported `Type.NAME` or `Type.*`
+    """
+    types: List[Tuple[int, str, str]] = []
+    type_positions: List[int] = []
+    text_blocks = '"""' in source
+    spans: Optional[Tuple[List[int], List[int]]] = None
+    constants: List[StringConstant] = []
+
+    def in_comment_or_literal(position: int) -> bool:
+        nonlocal spans
+        if not text_blocks and not _may_be_in_comment_or_literal(source, position):
+            return False
+        # Only then are the comments and literals found, in one pass over the source
+        if spans is None:
+            spans = _comment_and_literal_spans(source)
+        return _in_spans(spans, position)
+
+    for match in _STRING_DECLARATION.finditer(source):
+        start = match.start()
+        if start and (source[start - 1].isalnum() or source[start - 1] in "_$"):
+            continue
+        if in_comment_or_literal(start):
+            continue
+        if not types:
+            # Most files declare no String at all, their types are not worth finding
+            types = [
+                (found.start(), found.group(1), found.group(2))
+                for found in _TYPE_DECLARATION.finditer(source)
+                if not in_comment_or_literal(found.start())
+            ]
+            type_positions = [position for position, _, _ in types]
+        type_index = bisect.bisect_left(type_positions, start) - 1
+        if type_index < 0:
+            continue
+        _, kind, owner = types[type_index]
+        statement_start = max(source.rfind(character, 0, start) for character in ";{}\n") + 1
+        modifiers = set(source[statement_start:start].split())
+        if kind != "interface" and not {"static", "final"} <= modifiers:
+            continue
+        operands = tuple(_operand(operand) for operand in split_operands(tokenize(match.group(2))))
+        constants.append(StringConstant(owner, match.group(1), operands))
+
+    imports = []
+    if "import static" in source:
+        imports = [f"{match.group(1).rsplit('.', 1)[-1]}.{match.group(2)}" for match in _STATIC_IMPORT.finditer(source)]
+    return constants, imports
+
+
+class SymbolTable:
+    """
+    The String constants of one project, to evaluate the constants code refers to.
+
+    Constants are evaluated on first use and their values kept, including constants built
+    from constants of other files (`USERS = ApiPaths.BASE + "/users"`).
+    """
+
+    def __init__(self, files: Dict[str, _FileSymbols]):
+        self._constants: Dict[str, List[Tuple[str, StringConstant]]] = {}
+        self._keys_by_name: Dict[str, Set[str]] = {}
+        self._imports: Dict[str, Tuple[str, ...]] = {}
+        self._values: Dict[str, Optional[str]] = {}
+
+        digest = hashlib.blake2b(digest_size=16)
+        for file, symbols in sorted(files.items()):
+            for constant in symbols.constants:
+                key = f"{constant.owner}.{constant.name}"
+                self._constants.setdefault(key, []).append((file, constant))
+                self._keys_by_name.setdefault(constant.name, set()).add(key)
+            if symbols.imports:
+                self._imports[file] = symbols.imports
+            constants = [[constant.owner, constant.name, constant.operands] for constant in symbols.constants]
+            digest.update(json.dumps([file, constants, symbols.imports]).encode("utf-8"))
+        self.fingerprint = digest.hexdigest()
+
+    def __len__(self) -> int:
+        return sum(len(definitions) for definitions in self._constants.values())
+
+    def value(self, name: str, file: str = "", owner: str = "") -> Optional[str]:
+        """
+        Value of a constant referenced from some code.
+
+        A qualified name (`ApiPaths.BASE`, `com.acme.ApiPaths.BASE`) designates the constant
+        of that type. A simple name is looked up in the type `owner`, then in the static
+        imports of `file`, then among all the constants of the project if only one type
+        declares it (an inherited interface constant, for instance).
+
+        Args:
+            name: Name of the constant, as written in the code
+            file: Path of the file referencing the constant
+            owner: Simple name of the type referencing the constant
+
+        Returns:
+            The value, None if the constant is unknown, ambiguous or not a constant expression
+        """
+        return self._value(name, file, owner, set())
+
+    def _value(self, name: str, file: str, owner: str, visiting: Set[str]) -> Optional[str]:
+        key = self._key(name, file, owner)
+        if key is None:
+            return None
+        if key in self._values:
+            return self._values[key]
+        if key in visiting:
+            # A constant defined from itself, through other constants: javac rejects it, so do we
+            return None
+
+        visiting.add(key)
+        values = {self._evaluate(definition_file, constant, visiting)
+                  for definition_file, constant in self._constants[key]}
+        visiting.discard(key)
+        # Two types with the same name in the project may declare different values
+        value = values.pop() if len(values) == 1 else None
+        self._values[key] = value
+        return value
+
+    def _key(self, name: str, file: str, owner: str) -> Optional[str]:
+        parts = name.split(".")
+        if len(parts) > 1:
+            key = ".".join(parts[-2:])
+            return key if key in self._constants else None
+
+        if owner and f"{owner}.{name}" in self._constants:
+            return f"{owner}.{name}"
+        for imported in self._imports.get(file, ()):
+            imported_owner, imported_name = imported.split(".")
+            if imported_name in (name, "*") and f"{imported_owner}.{name}" in self._constants:
+                return f"{imported_owner}.{name}"
+        keys = self._keys_by_name.get(name, set())
+        return next(iter(keys)) if len(keys) == 1 else None
+
+    def _evaluate(self, file: str, constant: StringConstant, visiting: Set[str]) -> Optional[str]:
+        parts = []
+        for kind, text in constant.operands:
+            if kind == "literal":
+                parts.append(text)
+                continue
+            value = self._value(text, file, constant.owner, visiting) if kind == "name" else None
+            if value is None:
+                return None
+            parts.append(value)
+        return "".join(parts)
+
+
+class SymbolIndex:
+    """
+    Symbol tables of a set of projects, one per project so that two services declaring the
+    same `ApiPaths.BASE` keep their own value.
+
+    Every Java file of the projects is read once, when the index is first refreshed; refreshing
+    again reads only the files whose size or modification time changed, and rebuilds only the
+    tables of the projects where a constant changed.
+    """
+
+    def __init__(self) -> None:
+        self._files: Dict[str, Tuple[int, int, _FileSymbols]] = {}
+        self._tables: Dict[str, SymbolTable] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, projects_paths: List[str]) -> None:
+        """
+        Index the constants of the Java files of the projects, parsing only new and changed files.
+        Archives are left out, they hold no sources to parse.
+
+        Raises:
+            ValueError: If a project path does not exist
+        """
+        files: Dict[str, Tuple[int, int, _FileSymbols]] = {}
+        tables: Dict[str, SymbolTable] = {}
+        for project_path in projects_paths:
+            if is_archive(project_path):
+                continue
+            project_files: Dict[str, _FileSymbols] = {}
+            for java_file in _find_java_files_in_project(project_path):
+                path = str(java_file)
+                try:
+                    stat = java_file.stat()
+                    entry = self._files.get(path)
+                    if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+                        constants, imports = parse_constants(java_file.read_text(encoding="utf-8", errors="ignore"))
+                        entry = (stat.st_size, stat.st_mtime_ns, _FileSymbols(tuple(constants), tuple(imports)))
+                    files[path] = entry
+                    if entry[2].constants or entry[2].imports:
+                        project_files[path] = entry[2]
+                except OSError as e:
+                    print(f"Error scanning {java_file}: {e}")
+
+            table = SymbolTable(project_files)
+            previous = self._tables.get(project_path)
+            # Keep the table, and the values it evaluated, when no constant of the project changed
+            tables[project_path] = previous if previous is not None and previous.fingerprint == table.fingerprint \
+                else table
+
+        with self._lock:
+            self._files = files
+            self._tables = tables
+
+    def table(self, file: str) -> Optional[SymbolTable]:
+        """Symbol table of the project containing a file, None if it is in none of the indexed projects."""
+        with self._lock:
+            tables = self._tables
+        file_path = Path(file)
+        containing = [project for project in tables if file_path.is_relative_to(project)]
+        return tables[max(containing, key=len)] if containing else None
+
+
+def _find_java_files_in_project(project_path: str) -> List[Path]:
+    return find_project_files(project_path, lambda name: name.endswith(".java"))
+
+
+def _may_be_in_comment_or_literal(source: str, position: int) -> bool:
+    """
+    Whether a `//` or a quote precedes the position on its line, or a `/*` not closed before
+    it. Never false for a position in a comment or a single-line literal, but true too for
+    many positions in neither.
+    """
+    line_start = source.rfind("\n", 0, position) + 1
+    line = source[line_start:position]
+    return "//" in line or '"' in line or "'" in line or source.rfind("/*", 0, position) > source.rfind(
+        "*/", 0, position
+    )
+
+
+def _comment_and_literal_spans(source: str) -> Tuple[List[int], List[int]]:
+    """Start and end positions of the comments and literals of a source, in source order."""
+    starts: List[int] = []
+    ends: List[int] = []
+    for match in _COMMENT_OR_LITERAL.finditer(source):
+        starts.append(match.start())
+        ends.append(match.end())
+    return starts, ends
+
+
+def _in_spans(spans: Tuple[List[int], List[int]], position: int) -> bool:
+    starts, ends = spans
+    index = bisect.bisect_right(starts, position) - 1
+    return index >= 0 and position < ends[index]
+
+
+def _operand(tokens: List[Token]) -> Tuple[str, str]:
+    if len(tokens) == 1 and tokens[0].kind == "string":
+        return "literal", unquote(tokens[0].text)
+    name = qualified_name(tokens)
+    return ("name", name) if name is not None else ("unresolved", "")
@@ -1,111 +1,387 @@
-from endpoint_auditor.models import CodeUsage
-from typing import List, Set
+from endpoint_auditor.models import CodeLocation, CodeUsage
+from endpoint_auditor.profiling import get_tracer
+from endpoint_auditor.scanners.archive_scanner import ArchiveScanCache, is_archive, scan_archives
+from endpoint_auditor.scanners.languages import ClientFileMatcher, client_file_matcher, endpoint_literal, endpoint_pattern
+from endpoint_auditor.scanners.line_index import count_and_locate
+from endpoint_auditor.scanners.search_backends import SearchBackend, search_backend
+from endpoint_auditor.scanners.walk_snapshot import DirectorySnapshot
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-import re
+import hashlib
+import threading
+import time
+
+
+# Read size when hashing file contents
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+# Archive results shared by the scans of the process, archives of the artifact cache rarely change
+_ARCHIVE_CACHE = ArchiveScanCache()
+
+
+@dataclass
+class ScanStats:
+    """
+    Work done by code scans, filled in as they run
+
+    :var files: Client files considered
+    :var searched_files: Files actually searched, one per distinct content
+    :var deduplicated_files: Files whose content had already been searched: its result was reused
+    :var deduplicated_bytes: Bytes not searched thanks to deduplication
+    :var filtered_files: Files the search backend ruled out, without Python reading them
+    """
+    files: int = 0
+    searched_files: int = 0
+    deduplicated_files: int = 0
+    deduplicated_bytes: int = 0
+    filtered_files: int = 0
+
+    @property
+    def dedupe_ratio(self) -> float:
+        """Share of the files that did not need a search."""
+        return self.deduplicated_files / self.files if self.files else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "searched_files": self.searched_files,
+            "deduplicated_files": self.deduplicated_files,
+            "deduplicated_bytes": self.deduplicated_bytes,
+            "dedupe_ratio": round(self.dedupe_ratio, 4),
+            "filtered_files": self.filtered_files,
+        }
+
+
+class ClientFileIndex:
+    """
+    Keeps the client files of each project in memory between audits.
+
+    Used by long-running processes so that audits do not walk every project again.
+    A project is walked again once its entry is older than `max_age_seconds`, so new
+    client files are eventually picked up. With a directory snapshot, these walks, and
+    the first one of the next run, only list the directories that changed.
+    """
+
+    def __init__(
+        self,
+        max_age_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        matcher: Optional[ClientFileMatcher] = None,
+        backend: Optional[SearchBackend] = None,
+        snapshot: Optional[DirectorySnapshot] = None,
+    ):
+        """
+        Args:
+            max_age_seconds: Age after which a project is walked again
+            clock: Source of the time, in seconds
+            matcher: Client file patterns of the languages to scan, every known language if None
+            backend: Search backend of the scans using the index, picked by availability if None
+            snapshot: Directories walked by previous runs; every directory is listed if None
+        """
+        self._max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._matcher = matcher
+        self._backend = backend
+        self._snapshot = snapshot
+        self._entries: Dict[str, Tuple[List[Path], float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def matcher(self) -> ClientFileMatcher:
+        """Client file patterns of the languages scanned."""
+        return self._matcher or client_file_matcher()
+
+    @property
+    def backend(self) -> SearchBackend:
+        """Search backend of the scans using the index."""
+        return self._backend or search_backend()
+
+    def files(self, projects: List[str]) -> List[Path]:
+        """
+        Find all client files of the given projects, walking only stale or unknown projects.
+
+        Raises:
+            ValueError: If a project path does not exist
+        """
+        all_client_files: List[Path] = []
+        for project_path in projects:
+            with self._lock:
+                entry = self._entries.get(project_path)
+            if entry is None or self._clock() - entry[1] > self._max_age_seconds:
+                if self._snapshot is not None:
+                    client_files = self._snapshot.find_files(project_path, self.matcher)
+                else:
+                    client_files = _find_client_files_in_project(project_path, self._matcher)
+                entry = (client_files, self._clock())
+                with self._lock:
+                    self._entries[project_path] = entry
+            all_client_files.extend(entry[0])
+        return all_client_files
+
+    def invalidate(self, project_path: Optional[str] = None) -> None:
+        """Forget one project, or every project when none is given."""
+        with self._lock:
+            if project_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(project_path, None)
 
 
 def scan_code_usage(
     endpoint: str,
-    projects_paths: List[str]
+    projects_paths: List[str],
+    file_index: Optional[ClientFileIndex] = None,
+    stats: Optional[ScanStats] = None,
+    archive_cache: Optional[ArchiveScanCache] = None,
+    backend: Optional[SearchBackend] = None,
 ) -> CodeUsage:
     """
     Scan code usage of an endpoint across multiple projects.
 
-    Searches recursively in all project paths for files matching *Client*.java
-    and finds exact matches of the endpoint.
+    Searches recursively in all project paths for the client files of every language
+    profile (*Client*.java, *Client*.kt, *client*.ts, ...) and finds exact matches of the
+    endpoint. A path variable of the endpoint also matches a value interpolated in a string
+    of the language (`${id}` in Kotlin and TypeScript, `{id}` in Python f-strings).
+
+    Client files vendored in several projects (generated API clients, copied SDKs) are
+    searched once: files sharing their size with another file are hashed, and the result
+    of the first file with a given content is reused for the others.
+
+    The line, column and snippet of the matches are looked up in the files that matched
+    only, so they cost nothing on the files that do not reference the endpoint.
+
+    A search backend (`git grep`, ripgrep) first rules out the files that do not contain the
+    literal part of the endpoint; only the others are read and searched. Every backend gives
+    the same result, the matches being counted by the regex of the file's language.
+
+    A project path may also be a .jar or .zip archive (source jar, shaded client jar): its
+    client entries are searched in memory, archives in parallel, and reported as
+    `<archive>!/<entry>`. Results are kept by archive checksum, an archive already searched
+    for the endpoint is not opened again.
 
     Args:
         endpoint: The endpoint path to search for (e.g., '/api/v1/users')
-        projects_paths: List of absolute paths to project directories
+        projects_paths: List of absolute paths to project directories or archives
+        file_index: In-memory index of the client files to use instead of walking the projects
+        stats: Filled with the number of files searched and deduplicated
+        archive_cache: Results of previous archive searches, shared by the whole process if None
+        backend: Search backend, the one of `file_index` or the one picked by availability if None
 
     Returns:
         CodeUsage with matches count and list of files containing the endpoint
     """
-    matching_files: Set[str] = set()
-    total_matches = 0
+    matches_per_file: Dict[str, int] = {}
+    locations_per_file: Dict[str, List[Tuple[int, int, str]]] = {}
+    stats = stats if stats is not None else ScanStats()
+    tracer = get_tracer()
+    archives_paths = [project_path for project_path in projects_paths if is_archive(project_path)]
+    directories_paths = [project_path for project_path in projects_paths if project_path not in archives_paths]
 
-    all_client_files = _find_client_files(projects=projects_paths)
+    if backend is None:
+        backend = file_index.backend if file_index is not None else search_backend()
 
-    for file_path in all_client_files:
-        try:
-            match_count = _search_endpoint_in_file(file_path, endpoint)
-            if match_count > 0:
-                matching_files.add(str(file_path))
-                total_matches += match_count
-        except Exception as e:
-            print(f"Error scanning {file_path}: {e}")
+    with tracer.span("scan.walk") as span:
+        files_per_project = {
+            project_path: file_index.files([project_path]) if file_index is not None
+            else _find_client_files_in_project(project_path)
+            for project_path in directories_paths
+        }
+        all_client_files = [file_path for files in files_per_project.values() for file_path in files]
+        span.add("files", len(all_client_files))
+
+    # Files that may reference the endpoint: the others are not read
+    with tracer.span("scan.filter") as span:
+        candidates = backend.candidates(files_per_project, endpoint_literal(endpoint))
+        span.add("candidates", len(candidates))
+
+    if archives_paths:
+        with tracer.span("scan.archives") as span:
+            matcher = file_index.matcher if file_index is not None else client_file_matcher()
+            archive_matches, archive_locations, entries, searched_entries = scan_archives(
+                archives_paths, endpoint, matcher, archive_cache if archive_cache is not None else _ARCHIVE_CACHE
+            )
+            matches_per_file.update(archive_matches)
+            locations_per_file.update(archive_locations)
+            stats.files += entries
+            stats.searched_files += searched_entries
+            span.add("archives", len(archives_paths))
+            span.add("entries", entries)
+
+    with tracer.span("scan.files") as span:
+        sizes = _file_sizes(all_client_files)
+        same_size_files = _count_values(sizes.values())
+        matches_per_content: Dict[Tuple[int, bytes, str], Tuple[int, List[Tuple[int, int, str]]]] = {}
+
+        for file_path in all_client_files:
+            size = sizes.get(file_path)
+            stats.files += 1
+            if file_path not in candidates:
+                # The backend found no occurrence of the literal: no match possible
+                stats.filtered_files += 1
+                if tracer.enabled:
+                    span.add("files")
+                    span.add("bytes", size or 0)
+                continue
+            try:
+                # Only files sharing their size with another file may share their content
+                content_key = None
+                if size is not None and same_size_files[size] > 1:
+                    # The suffix too: the same content may be searched by the rules of another language
+                    content_key = (size, _hash_file(file_path), file_path.suffix)
+
+                if content_key is not None and content_key in matches_per_content:
+                    match_count, file_locations = matches_per_content[content_key]
+                    stats.deduplicated_files += 1
+                    stats.deduplicated_bytes += size
+                else:
+                    match_count, file_locations = _search_endpoint_in_file(file_path, endpoint)
+                    stats.searched_files += 1
+                    if content_key is not None:
+                        matches_per_content[content_key] = (match_count, file_locations)
+
+                if match_count > 0:
+                    matches_per_file[str(file_path)] = matches_per_file.get(str(file_path), 0) + match_count
+                    locations_per_file[str(file_path)] = file_locations
+            except Exception as e:
+                print(f"Error scanning {file_path}: {e}")
+                continue
+
+            if tracer.enabled:
+                span.add("files")
+                span.add("bytes", size or 0)
+        span.add("deduplicated_files", stats.deduplicated_files)
 
     return CodeUsage(
         projects_paths=projects_paths,
-        matches_count=total_matches,
-        files=sorted(list(matching_files))
+        matches_count=sum(matches_per_file.values()),
+        files=sorted(matches_per_file),
+        matches_per_file=dict(sorted(matches_per_file.items())),
+        locations=_code_locations(locations_per_file),
     )
 
 
-def _find_client_files(projects: List[str]) -> List[Path]:
+def _code_locations(locations_per_file: Dict[str, List[Tuple[int, int, str]]]) -> List[CodeLocation]:
+    return [
+        CodeLocation(file, line, column, snippet)
+        for file, file_locations in sorted(locations_per_file.items())
+        for line, column, snippet in file_locations
+    ]
+
+
+def fingerprint_project(project_path: str, file_index: Optional[ClientFileIndex] = None) -> str:
     """
-    Find all Java files containing 'Client' in their name.
+    Fingerprint the client files of a project from their paths, sizes and modification times.
+
+    Only file metadata is read, so it is much cheaper than a scan: two equal fingerprints
+    mean the scan of the project would give the same result. An archive is fingerprinted
+    from its own size and modification time.
+
+    Raises:
+        ValueError: If the project path does not exist
+    """
+    if is_archive(project_path):
+        client_files = [Path(project_path)]
+    elif file_index is not None:
+        client_files = file_index.files([project_path])
+    else:
+        client_files = _find_client_files_in_project(project_path)
+
+    digest = hashlib.sha1()
+    for file_path in sorted(client_files):
+        try:
+            stat = file_path.stat()
+        except OSError:
+            continue
+        digest.update(f"{file_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def _file_sizes(files: List[Path]) -> Dict[Path, int]:
+    """Size of each file; files that cannot be stat'ed are left out, their search reports the error."""
+    sizes: Dict[Path, int] = {}
+    for file_path in files:
+        try:
+            sizes[file_path] = file_path.stat().st_size
+        except OSError:
+            continue
+    return sizes
+
+
+def _count_values(values) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def _hash_file(file_path: Path) -> bytes:
+    """Digest of the content of a file, read in chunks so large generated clients are not loaded at once."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _find_client_files(projects: List[str], matcher: Optional[ClientFileMatcher] = None) -> List[Path]:
+    """
+    Find the client files of every language profile.
 
     Args:
         projects: List of root directories to search
+        matcher: Client file patterns of the languages to find, every known language if None
 
     Returns:
         List of Path objects for matching files
     """
     all_client_files = []
     for project_path in projects:
-        client_files = _find_client_files_in_project(project_path)
+        client_files = _find_client_files_in_project(project_path, matcher)
         all_client_files.extend(client_files)
     return all_client_files
 
 
-def _find_client_files_in_project(project_path: str) -> List[Path]:
+def _find_client_files_in_project(project_path: str, matcher: Optional[ClientFileMatcher] = None) -> List[Path]:
     """
-    Find all Java files containing 'Client' in their name for one specific project.
+    Find the client files of every language profile for one specific project.
+
+    The patterns of all the languages are combined in one regex, so the project is walked
+    once whatever the number of languages.
 
     Args:
         project_path: Root directory to search
+        matcher: Client file patterns of the languages to find, every known language if None
 
     Returns:
         List of Path objects for matching files
     """
-    project_dir = Path(project_path)
-
-    if not project_dir.exists() or not project_dir.is_dir():
-        raise ValueError(f"project path not found: {project_path}")
-
-    # Find all .java files recursively that contain 'Client' in the filename
-    client_files = []
-    for java_file in project_dir.rglob("*.java"):
-        if "Client" in java_file.name:
-            client_files.append(java_file)
+    return (matcher or client_file_matcher()).find_files(project_path)
 
-    return client_files
 
-
-def _search_endpoint_in_file(file_path: Path, endpoint: str) -> int:
+def _search_endpoint_in_file(file_path: Path, endpoint: str) -> Tuple[int, List[Tuple[int, int, str]]]:
     """
     Search for exact endpoint matches in a file.
 
+    The file is read and searched once: the line, column and snippet of the matches are
+    taken from the same pass as their count.
+
     Args:
         file_path: Path to the file to search
         endpoint: Endpoint string to search for
 
     Returns:
-        Number of matches found in the file
+        Number of matches found in the file, and (line, column, snippet) of the first ones
+
+    Raises:
+        ValueError: If the file cannot be read
     """
     try:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             content = f.read()
-
-        # Escape special regex characters in endpoint
-        escaped_endpoint = re.escape(endpoint)
-
-        # Search for exact matches (as string literal or in URL)
-        pattern = re.compile(escaped_endpoint)
-        matches = pattern.findall(content)
-
-        return len(matches)
-    except Exception as e:
-        # If file can't be read, raise exception
+    except OSError as e:
         raise ValueError(f"file {file_path} cannot be open: {e}")
+
+    # Search for exact matches (as string literal or in URL), path variables
+    # matching the interpolated values of the file's language
+    return count_and_locate(content, endpoint_pattern(endpoint, file_path.suffix))
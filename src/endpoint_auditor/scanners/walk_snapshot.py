@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from endpoint_auditor.scanners.languages import SKIPPED_DIRECTORIES, ClientFileMatcher
+
+# Bumped when the layout of the snapshots or the walk rules change, so older snapshots are ignored
+_SNAPSHOT_VERSION = 1
+
+# A directory modified this close to its listing may change again within the same mtime tick
+# (up to 2 s on some file systems) without its mtime changing: it is listed again next time
+_RACY_SECONDS = 2.0
+
+# Per directory: mtime (None when it cannot be trusted), subdirectories walked, client file names
+_Directory = List[Any]
+
+
+class DirectorySnapshot:
+    """
+    The directories of each project walked before, persisted between runs.
+
+    A directory's modification time changes whenever an entry is added, removed or renamed in
+    it, so a directory whose mtime did not change since it was listed still holds the same
+    subdirectories and client files: a warm walk stats each directory once and lists again
+    only those that changed. Entries of subdirectories do not change the mtime of their
+    parents, every directory is checked.
+
+    Each project has its own snapshot file per set of languages in `directory`, so processes
+    walking the same projects (audit, batch, the audit service) share them. Snapshots of
+    another version, languages or project are ignored, as are unreadable ones.
+    """
+
+    def __init__(self, directory: str, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            directory: Directory of the snapshot files, created on first save
+            clock: Source of the wall-clock time, in seconds, compared with the mtimes
+        """
+        self._directory = directory
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.listed_directories = 0
+        self.reused_directories = 0
+
+    def find_files(self, project_path: str, matcher: ClientFileMatcher) -> List[Path]:
+        """
+        Find the client files of a project, listing only the directories changed since the last walk.
+
+        Gives the files ClientFileMatcher.find_files() would, in the same order.
+
+        Raises:
+            ValueError: If the project path does not exist
+        """
+        if not os.path.isdir(project_path):
+            raise ValueError(f"project path not found: {project_path}")
+
+        languages = [profile.name for profile in matcher.profiles]
+        snapshot_path = self._snapshot_path(project_path, languages)
+        previous = self._load(snapshot_path, project_path, languages)
+        directories: Dict[str, _Directory] = {}
+        # Directories modified after this instant are listed again next time
+        trusted_before_ns = int((self._clock() - _RACY_SECONDS) * 1_000_000_000)
+        listed = reused = 0
+
+        client_files: List[Path] = []
+        pending = [""]
+        while pending:
+            relative = pending.pop()
+            directory = os.path.join(project_path, relative) if relative else project_path
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except OSError:
+                # Removed since its parent was listed, os.walk() skips it too
+                continue
+
+            entry = previous.get(relative)
+            if isinstance(entry, list) and len(entry) == 3 and entry[0] is not None and entry[0] == mtime_ns:
+                reused += 1
+            else:
+                try:
+                    subdirectories, names = _list_directory(directory, matcher)
+                except OSError:
+                    continue
+                listed += 1
+                entry = [mtime_ns if mtime_ns < trusted_before_ns else None, subdirectories, names]
+            directories[relative] = entry
+
+            client_files.extend(Path(directory, name) for name in entry[2])
+            # Walked in the order of os.walk(), so scans see the same files first
+            pending.extend(os.path.join(relative, name) for name in reversed(entry[1]))
+
+        with self._lock:
+            self.listed_directories += listed
+            self.reused_directories += reused
+        if directories != previous:
+            self._save(snapshot_path, project_path, languages, directories)
+        return client_files
+
+    def _snapshot_path(self, project_path: str, languages: List[str]) -> str:
+        key = f"{os.path.abspath(project_path)}\0{','.join(languages)}"
+        return os.path.join(self._directory, hashlib.sha1(key.encode("utf-8", "surrogateescape")).hexdigest() + ".json")
+
+    @staticmethod
+    def _load(snapshot_path: str, project_path: str, languages: List[str]) -> Dict[str, _Directory]:
+        try:
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != _SNAPSHOT_VERSION \
+                or data.get("project") != os.path.abspath(project_path) or data.get("languages") != languages:
+            return {}
+        directories = data.get("directories")
+        return directories if isinstance(directories, dict) else {}
+
+    def _save(self, snapshot_path: str, project_path: str, languages: List[str], directories: Dict[str, _Directory]) -> None:
+        """Write a snapshot atomically, so a concurrent or interrupted run never reads a truncated file."""
+        data = {
+            "version": _SNAPSHOT_VERSION,
+            "project": os.path.abspath(project_path),
+            "languages": languages,
+            "directories": directories,
+        }
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(temp_path, snapshot_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            # The snapshot only saves time: the walk itself succeeded
+            print(f"Error saving the directory snapshot of {project_path}: {e}")
+
+
+def _list_directory(directory: str, matcher: ClientFileMatcher) -> Tuple[List[str], List[str]]:
+    """Subdirectories to walk and client file names of a directory, by the rules of ClientFileMatcher.find_files()."""
+    subdirectories: List[str] = []
+    names: List[str] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                is_directory = entry.is_dir()
+            except OSError:
+                is_directory = False
+            if is_directory:
+                # As os.walk(): symbolic links to directories are not followed
+                if entry.name not in SKIPPED_DIRECTORIES and not entry.is_symlink():
+                    subdirectories.append(entry.name)
+            elif matcher.profile(entry.name) is not None:
+                names.append(entry.name)
+    return subdirectories, names
@@ -0,0 +1,67 @@
+import json
+import urllib.error
+import urllib.request
+from dataclasses import asdict
+from typing import Any, Dict, List
+
+from endpoint_auditor.models import AuditRequest
+
+
+class AuditServiceClient:
+    """
+    Client for the long-running audit service (see `endpoint-audit serve`).
+    """
+
+    def __init__(self, base_url: str, timeout_seconds: float = 600.0):
+        """
+        Args:
+            base_url: URL of the service, e.g. 'http://127.0.0.1:8765'
+            timeout_seconds: Maximum time to wait for the reports
+        """
+        self._base_url = base_url.rstrip("/")
+        self._timeout_seconds = timeout_seconds
+
+    def audit(self, audit_request: AuditRequest, days: int) -> Dict[str, Any]:
+        """
+        Run one audit on the service.
+
+        Returns:
+            Report dictionary, as produced by generate_base_report()
+        """
+        return self._post("/audit", {**asdict(audit_request), "days": days})
+
+    def audit_batch(self, audit_requests: List[AuditRequest], days: int) -> List[Dict[str, Any]]:
+        """
+        Run several audits on the service.
+
+        Returns:
+            Report dictionaries, in the order of the requests
+        """
+        response = self._post("/audit/batch", {
+            "audits": [asdict(audit_request) for audit_request in audit_requests],
+            "days": days,
+        })
+        return response["reports"]
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Any:
+        """
+        Raises:
+            RuntimeError: If the service is unreachable or answers with an error
+        """
+        request = urllib.request.Request(
+            f"{self._base_url}{path}",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self._timeout_seconds) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", e.reason)
+            except ValueError:
+                message = e.reason
+            raise RuntimeError(f"Audit service error {e.code}: {message}") from e
+        except urllib.error.URLError as e:
+            raise RuntimeError(f"Audit service not reachable at {self._base_url}: {e.reason}") from e
@@ -0,0 +1,247 @@
+import asyncio
+import json
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+
+from endpoint_auditor.config import get_graylog_targets, is_graylog_enabled
+from endpoint_auditor.models import AuditRequest
+from endpoint_auditor.pipline import run_pipeline
+from endpoint_auditor.scanners.usage_scanner import ClientFileIndex
+from endpoint_auditor.integrations.graylog_mcp_client import GraylogSessionPool
+from endpoint_auditor.integrations.graylog_service import create_circuit_breakers
+
+
+# Upper bound of a request body, a batch of thousands of audits fits comfortably
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_HEADER_BYTES = 64 * 1024
+
+
+class ServiceBusyError(Exception):
+    """Raised when the audit queue is full."""
+
+
+class AuditService:
+    """
+    Runs audits for a long-running process, keeping its state warm between requests.
+
+    The client file index, the Graylog stream ID cache and the Graylog sessions live as long
+    as the service, and the circuit breakers are shared by every audit. At most
+    `max_concurrency` audits run at the same time; up to `max_pending` more wait their turn
+    and any further audit is rejected.
+    """
+
+    def __init__(
+        self,
+        projects_paths: List[str],
+        max_concurrency: int = 4,
+        max_pending: int = 100,
+        file_index: Optional[ClientFileIndex] = None,
+    ):
+        self._projects_paths = projects_paths
+        self._max_pending = max_pending
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._queued = 0
+        self._file_index = file_index or ClientFileIndex()
+        self._graylog_sessions = GraylogSessionPool()
+        self._breakers = create_circuit_breakers()
+
+    @property
+    def queued(self) -> int:
+        """Audits running or waiting for a slot."""
+        return self._queued
+
+    async def start(self) -> None:
+        """Warm the caches: index the client files and open the Graylog sessions."""
+        await asyncio.to_thread(self._file_index.files, self._projects_paths)
+
+        if is_graylog_enabled():
+            for target in get_graylog_targets():
+                try:
+                    await self._graylog_sessions.get(target)
+                except Exception as e:
+                    print(f"Graylog cluster '{target.name}' not reachable at startup: {e}")
+
+    async def close(self) -> None:
+        await self._graylog_sessions.close()
+
+    async def audit(self, audit_request: AuditRequest, days: int) -> Dict[str, Any]:
+        """
+        Run one audit once a slot is free.
+
+        Raises:
+            ServiceBusyError: If the queue is full
+        """
+        return (await self.audit_batch([audit_request], days))[0]
+
+    async def audit_batch(self, audit_requests: List[AuditRequest], days: int) -> List[Dict[str, Any]]:
+        """
+        Run several audits, each one taking a slot, and return the reports in request order.
+
+        Raises:
+            ServiceBusyError: If the queue cannot take all the audits
+        """
+        if self._queued + len(audit_requests) > self._max_pending:
+            raise ServiceBusyError(f"Audit queue is full ({self._queued} audits queued)")
+
+        self._queued += len(audit_requests)
+        try:
+            return list(await asyncio.gather(*[
+                self._run(audit_request, days) for audit_request in audit_requests
+            ]))
+        finally:
+            self._queued -= len(audit_requests)
+
+    async def _run(self, audit_request: AuditRequest, days: int) -> Dict[str, Any]:
+        async with self._slots:
+            return await run_pipeline(
+                endpoint=audit_request.endpoint,
+                log=audit_request.log,
+                application_name=audit_request.application_name,
+                projects_paths=self._projects_paths,
+                days=days,
+                http_method=audit_request.http_method,
+                breakers=self._breakers,
+                file_index=self._file_index,
+                graylog_sessions=self._graylog_sessions,
+            )
+
+
+class AuditServer:
+    """
+    Minimal asyncio HTTP/1.1 server exposing the audit service.
+
+    Routes:
+        POST /audit        {"endpoint", "http_method", "log", "application_name", "days"?}
+                           -> the report of generate_base_report()
+        POST /audit/batch  {"audits": [...], "days"?} -> {"reports": [...]}
+        GET  /health       -> {"status": "ok", "queued": n}
+
+    One request is served per connection.
+    """
+
+    def __init__(self, service: AuditService, host: str = "127.0.0.1", port: int = 8765, default_days: int = 30):
+        self._service = service
+        self._host = host
+        self._port = port
+        self._default_days = default_days
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> Tuple[str, int]:
+        """
+        Start listening.
+
+        Returns:
+            The bound (host, port), useful when port 0 was requested
+        """
+        self._server = await asyncio.start_server(
+            self._handle_connection, self._host, self._port, limit=MAX_HEADER_BYTES
+        )
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, payload = await self._handle_request(reader)
+        except Exception as e:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode("ascii") + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, reader: asyncio.StreamReader) -> Tuple[HTTPStatus, Any]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return HTTPStatus.BAD_REQUEST, {"error": "Malformed request"}
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, _ = request_line.split(" ", 2)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}
+
+        headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if path == "/health":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use GET"}
+            return HTTPStatus.OK, {"status": "ok", "queued": self._service.queued}
+
+        if path not in ("/audit", "/audit/batch"):
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown path: {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+            if length < 0:
+                raise ValueError(f"Invalid Content-Length: {length}")
+            if length > MAX_BODY_BYTES:
+                return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"}
+
+            body = json.loads(await reader.readexactly(length)) if length else {}
+            days = int(body.get("days", self._default_days))
+            if path == "/audit":
+                audit_requests = [AuditRequest.from_dict(body)]
+            else:
+                audit_requests = [AuditRequest.from_dict(entry) for entry in body.get("audits", [])]
+        except (ValueError, TypeError, AttributeError, asyncio.IncompleteReadError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e) or "Invalid request body"}
+
+        try:
+            reports = await self._service.audit_batch(audit_requests, days)
+        except ServiceBusyError as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+
+        if path == "/audit":
+            return HTTPStatus.OK, reports[0]
+        return HTTPStatus.OK, {"reports": reports}
+
+
+async def run_server(
+    projects_paths: List[str],
+    host: str,
+    port: int,
+    max_concurrency: int,
+    max_pending: int,
+    default_days: int,
+    file_index: Optional[ClientFileIndex] = None,
+) -> None:
+    """Start the audit service and serve requests until cancelled."""
+    service = AuditService(
+        projects_paths=projects_paths,
+        max_concurrency=max_concurrency,
+        max_pending=max_pending,
+        file_index=file_index,
+    )
+    await service.start()
+
+    server = AuditServer(service=service, host=host, port=port, default_days=default_days)
+    bound_host, bound_port = await server.start()
+    print(f"Audit service listening on http://{bound_host}:{bound_port}")
+
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        await service.close()
@@ -0,0 +1,98 @@
+import pytest
+
+from endpoint_auditor.history.store import HistoryStore, project_of
+
+
+def _report(endpoint="/api/v1/users", method="GET", status="runtime_usage_detected",
+            generated_at="2026-01-19T10:00:00+00:00", occurrences=42, matches_per_file=None):
+    matches_per_file = matches_per_file if matches_per_file is not None else {"/repo/a/UserClient.java": 2}
+    return {
+        "metadata": {"generated_at": generated_at, "version": "0.1.0"},
+        "audit": {"endpoint": endpoint, "http_method": method, "log": "User {}",
+                  "application_name": "svc-a", "jira": None},
+        "log_extraction": {"log_template": ["User "], "extracted": True},
+        "runtime_usage": {"enabled": True, "provider": "Graylog", "days": 30, "total_occurrences": occurrences},
+        "code_usage": {
+            "projects_paths": ["/repo/a", "/repo/b"],
+            "matches_count": sum(matches_per_file.values()),
+            "files": sorted(matches_per_file),
+            "matches_per_file": matches_per_file,
+        },
+        "recommendation": {"status": status, "rationale": "..."},
+        "warnings": [],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(str(tmp_path / "history.db")) as history:
+        yield history
+
+
+def test_latest_returns_most_recent_report_with_fingerprints(store):
+    """Test that the latest audit of an endpoint is read back with its project fingerprints."""
+    store.record(_report(generated_at="2026-01-19T10:00:00+00:00"), project_fingerprints={"/repo/a": "old"})
+    store.record(_report(generated_at="2026-01-20T10:00:00+00:00", occurrences=3), project_fingerprints={"/repo/a": "new"})
+    store.record(_report(endpoint="/api/v1/orders"))
+
+    latest = store.latest("/api/v1/users", "GET")
+
+    assert latest.generated_at == "2026-01-20T10:00:00+00:00"
+    assert latest.report["runtime_usage"]["total_occurrences"] == 3
+    assert latest.project_fingerprints == {"/repo/a": "new"}
+    assert store.latest("/api/v1/users", "POST") is None
+
+
+def test_snapshots_and_get(store):
+    """Test that the two most recent audits of an endpoint can be read back for diffing."""
+    first = store.record(_report(generated_at="2026-01-19T10:00:00+00:00"))
+    store.record(_report(generated_at="2026-01-20T10:00:00+00:00"))
+    store.record(_report(generated_at="2026-01-21T10:00:00+00:00"))
+
+    snapshots = store.snapshots("/api/v1/users", "GET", limit=2)
+
+    assert [snapshot.generated_at for snapshot in snapshots] == ["2026-01-21T10:00:00+00:00", "2026-01-20T10:00:00+00:00"]
+    assert store.get(first).generated_at == "2026-01-19T10:00:00+00:00"
+    assert store.get(9999) is None
+
+
+def test_timeline_filters_and_orders(store):
+    """Test that the timeline is filtered on the indexed columns, most recent first."""
+    store.record(_report(generated_at="2026-01-01T00:00:00+00:00", status="runtime_usage_detected"))
+    store.record(_report(generated_at="2026-02-01T00:00:00+00:00", status="candidate_for_deprecation", occurrences=0))
+    store.record(_report(endpoint="/api/v1/orders", generated_at="2026-03-01T00:00:00+00:00"))
+
+    timeline = store.timeline(endpoint="/api/v1/users")
+    assert [entry["status"] for entry in timeline] == ["candidate_for_deprecation", "runtime_usage_detected"]
+    assert timeline[0]["runtime_occurrences"] == 0
+    assert timeline[0]["runtime_enabled"] is True
+
+    assert len(store.timeline(since="2026-02-01")) == 2
+    assert len(store.timeline(status="runtime_usage_detected")) == 2
+    assert len(store.timeline(limit=1)) == 1
+
+
+def test_files_are_stored_per_audit(store):
+    """Test that the matches of each file are stored with the audit."""
+    audit_id = store.record(_report(matches_per_file={"/repo/a/UserClient.java": 2, "/repo/b/ApiClient.java": 1}))
+
+    assert store.files(audit_id) == {"/repo/a/UserClient.java": 2, "/repo/b/ApiClient.java": 1}
+
+
+def test_history_persists_across_connections(tmp_path):
+    """Test that reports survive closing the store."""
+    path = str(tmp_path / "history.db")
+    with HistoryStore(path) as store:
+        store.record(_report())
+
+    with HistoryStore(path) as store:
+        assert len(store.timeline()) == 1
+
+
+def test_project_of_picks_most_specific_project():
+    assert project_of("/repo/a/sub/Client.java", ["/repo/a", "/repo/a/sub"]) == "/repo/a/sub"
+    assert project_of("/repo/ab/Client.java", ["/repo/a"]) is None
+    assert project_of("/repo/a/Client.java", ["/repo/a/"]) == "/repo/a/"
+    assert project_of("/repo/a", ["/repo/a"]) == "/repo/a"
+    assert project_of("/elsewhere/Client.java", []) is None
+    assert project_of("/cache/sdk.jar!/com/acme/UserClient.java", ["/cache/sdk.jar"]) == "/cache/sdk.jar"
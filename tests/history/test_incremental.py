@@ -0,0 +1,122 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from endpoint_auditor.history.incremental import reusable_runtime_usage, scan_code_usage_incrementally
+from endpoint_auditor.history.store import StoredAudit
+from endpoint_auditor.models import ClusterUsage, CodeLocation
+
+
+CLIENT_SOURCE = 'class UserClient { String url = "/api/v1/users"; }\n'
+
+
+@pytest.fixture
+def projects(tmp_path):
+    """Two projects with one client file each."""
+    paths = []
+    for name in ("a", "b"):
+        project = tmp_path / name
+        project.mkdir()
+        (project / "UserClient.java").write_text(CLIENT_SOURCE)
+        paths.append(str(project))
+    return paths
+
+
+def _stored(report, fingerprints, generated_at="2026-01-19T10:00:00+00:00"):
+    return StoredAudit(id=1, generated_at=generated_at, report=report, project_fingerprints=fingerprints)
+
+
+def test_unchanged_projects_are_not_scanned_again(projects):
+    """Test that only the projects whose client files changed are scanned again."""
+    first, fingerprints, reused = scan_code_usage_incrementally("/api/v1/users", projects, previous=None)
+    assert reused == []
+    assert first.matches_count == 2
+
+    # Change project b only; the stored matches of project a are stale on purpose to
+    # check they are reused instead of scanned
+    report = {"code_usage": {"matches_per_file": {
+        str(Path(projects[0]) / "UserClient.java"): 5,
+        str(Path(projects[1]) / "UserClient.java"): 1,
+    }}}
+    (Path(projects[1]) / "UserClient.java").write_text(CLIENT_SOURCE * 3 + "// changed\n")
+
+    code_usage, new_fingerprints, reused = scan_code_usage_incrementally(
+        "/api/v1/users", projects, previous=_stored(report, fingerprints)
+    )
+
+    assert reused == [projects[0]]
+    assert new_fingerprints[projects[0]] == fingerprints[projects[0]]
+    assert new_fingerprints[projects[1]] != fingerprints[projects[1]]
+    assert code_usage.matches_per_file == {
+        str(Path(projects[0]) / "UserClient.java"): 5,
+        str(Path(projects[1]) / "UserClient.java"): 3,
+    }
+    assert code_usage.matches_count == 8
+
+
+def test_locations_of_unchanged_projects_are_reused(projects):
+    """Test that the stored locations of reused projects are kept, next to those of the scanned ones."""
+    _, fingerprints, _ = scan_code_usage_incrementally("/api/v1/users", projects, previous=None)
+    first_file, second_file = (str(Path(project) / "UserClient.java") for project in projects)
+    report = {"code_usage": {
+        "matches_per_file": {first_file: 1, second_file: 1},
+        "locations": [
+            {"file": first_file, "line": 7, "column": 3, "snippet": "stored"},
+            {"file": second_file, "line": 1, "column": 34, "snippet": "stale"},
+        ],
+    }}
+    (Path(projects[1]) / "UserClient.java").write_text("\n" + CLIENT_SOURCE)
+
+    code_usage, _, reused = scan_code_usage_incrementally(
+        "/api/v1/users", projects, previous=_stored(report, fingerprints)
+    )
+
+    assert reused == [projects[0]]
+    assert code_usage.locations == [
+        CodeLocation(first_file, 7, 3, "stored"),
+        CodeLocation(second_file, 2, 34, 'class UserClient { String url = "/api/v1/users"; }'),
+    ]
+
+
+def test_reports_without_matches_per_file_are_not_reused(projects):
+    """Test that reports stored before per-file matches were recorded trigger a full scan."""
+    _, fingerprints, _ = scan_code_usage_incrementally("/api/v1/users", projects, previous=None)
+    report = {"code_usage": {"files": [], "matches_count": 0}}
+
+    code_usage, _, reused = scan_code_usage_incrementally(
+        "/api/v1/users", projects, previous=_stored(report, fingerprints)
+    )
+
+    assert reused == []
+    assert code_usage.matches_count == 2
+
+
+def test_recent_runtime_usage_is_reused():
+    """Test that runtime usage is reused only when recent and measured on the same range."""
+    report = {
+        "audit": {"application_name": "svc-a"},
+        "runtime_usage": {
+            "enabled": True, "provider": "Graylog", "days": 30, "total_occurrences": 4,
+            "clusters": [{"name": "eu", "total_occurrences": 4}],
+        },
+    }
+    previous = _stored(report, {}, generated_at="2026-01-19T10:00:00+00:00")
+    now = datetime(2026, 1, 19, 20, 0, tzinfo=timezone.utc)
+
+    runtime_usage = reusable_runtime_usage(previous, days=30, application_name="svc-a", max_age_seconds=86400, now=now)
+    assert runtime_usage.total_occurrences == 4
+    assert runtime_usage.clusters == [ClusterUsage(name="eu", total_occurrences=4)]
+
+    assert reusable_runtime_usage(previous, days=30, application_name="svc-a", max_age_seconds=3600, now=now) is None
+    assert reusable_runtime_usage(previous, days=7, application_name="svc-a", max_age_seconds=86400, now=now) is None
+    assert reusable_runtime_usage(previous, days=30, application_name="svc-b", max_age_seconds=86400, now=now) is None
+
+
+def test_skipped_runtime_usage_is_not_reused():
+    """Test that a runtime analysis that did not run is queried again."""
+    report = {"audit": {"application_name": "svc-a"}, "runtime_usage": {"enabled": False, "days": 30}}
+    now = datetime(2026, 1, 19, 11, 0, tzinfo=timezone.utc)
+
+    assert reusable_runtime_usage(_stored(report, {}), days=30, application_name="svc-a",
+                                  max_age_seconds=86400, now=now) is None
@@ -1,8 +1,23 @@
+import asyncio
 import pytest
 import json
 from unittest.mock import MagicMock, AsyncMock, patch
 
-from endpoint_auditor.integrations.graylog_mcp_client import GraylogMCPClient
+from endpoint_auditor.config import GraylogTarget
+from endpoint_auditor.integrations.graylog_mcp_client import (
+    GraylogMCPClient,
+    GraylogSessionPool,
+    StreamIdCache,
+    stream_id_cache
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_stream_id_cache():
+    """Stream IDs are cached per process: start every test with an empty cache."""
+    stream_id_cache.clear()
+    yield
+    stream_id_cache.clear()
 
 
 class TestGraylogMCPClient:
@@ -10,9 +25,10 @@ class TestGraylogMCPClient:
 
     @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
     @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
-    @patch('endpoint_auditor.integrations.graylog_mcp_client.settings')
-    def test_client_initialization_success(self, mock_settings, mock_transport_class, mock_client_class):
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.get_settings')
+    def test_client_initialization_success(self, mock_get_settings, mock_transport_class, mock_client_class):
         """Test successful client initialization."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.graylog_token = "test-token"
         mock_settings.graylog_base_url = "https://graylog.example.com"
         mock_settings.graylog_mcp_base_url = "https://mcp.example.com"
@@ -37,9 +53,32 @@ class TestGraylogMCPClient:
 
     @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
     @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
-    @patch('endpoint_auditor.integrations.graylog_mcp_client.settings')
-    def test_client_initialization_failure(self, mock_settings, mock_transport_class, mock_client_class):
+    def test_client_initialization_with_target(self, mock_transport_class, mock_client_class):
+        """Test client initialization against an explicit Graylog cluster."""
+        target = GraylogTarget(
+            name="eu",
+            base_url="https://eu.graylog.example.com",
+            token="eu-token",
+            mcp_base_url="https://eu.mcp.example.com",
+        )
+
+        GraylogMCPClient(target=target)
+
+        mock_transport_class.assert_called_once_with(
+            url="https://eu.mcp.example.com",
+            headers={
+                "Authorization": "Bearer eu-token",
+                "X-GRAYLOG-API-BASE-URL": "https://eu.graylog.example.com",
+                "X-GRAYLOG-API-TOKEN": "eu-token",
+            },
+        )
+
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.get_settings')
+    def test_client_initialization_failure(self, mock_get_settings, mock_transport_class, mock_client_class):
         """Test client initialization handles exceptions."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.graylog_token = "test-token"
         mock_settings.graylog_base_url = "https://graylog.example.com"
         mock_settings.graylog_mcp_base_url = "https://mcp.example.com"
@@ -52,9 +91,10 @@ class TestGraylogMCPClient:
     @pytest.mark.asyncio
     @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
     @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
-    @patch('endpoint_auditor.integrations.graylog_mcp_client.settings')
-    async def test_find_stream_by_name_success(self, mock_settings, mock_transport_class, mock_client_class):
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.get_settings')
+    async def test_find_stream_by_name_success(self, mock_get_settings, mock_transport_class, mock_client_class):
         """Test finding stream by name when stream exists."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.graylog_token = "test-token"
         mock_settings.graylog_base_url = "https://graylog.example.com"
         mock_settings.graylog_mcp_base_url = "https://mcp.example.com"
@@ -86,9 +126,10 @@ class TestGraylogMCPClient:
     @pytest.mark.asyncio
     @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
     @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
-    @patch('endpoint_auditor.integrations.graylog_mcp_client.settings')
-    async def test_find_stream_by_name_not_found(self, mock_settings, mock_transport_class, mock_client_class):
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.get_settings')
+    async def test_find_stream_by_name_not_found(self, mock_get_settings, mock_transport_class, mock_client_class):
         """Test finding stream by name when stream does not exist."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.graylog_token = "test-token"
         mock_settings.graylog_base_url = "https://graylog.example.com"
         mock_settings.graylog_mcp_base_url = "https://mcp.example.com"
@@ -118,9 +159,10 @@ class TestGraylogMCPClient:
     @pytest.mark.asyncio
     @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
     @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
-    @patch('endpoint_auditor.integrations.graylog_mcp_client.settings')
-    async def test_search_logs_with_results(self, mock_settings, mock_transport_class, mock_client_class):
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.get_settings')
+    async def test_search_logs_with_results(self, mock_get_settings, mock_transport_class, mock_client_class):
         """Test searching logs returns correct count."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.graylog_token = "test-token"
         mock_settings.graylog_base_url = "https://graylog.example.com"
         mock_settings.graylog_mcp_base_url = "https://mcp.example.com"
@@ -160,9 +202,10 @@ class TestGraylogMCPClient:
     @pytest.mark.asyncio
     @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
     @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
-    @patch('endpoint_auditor.integrations.graylog_mcp_client.settings')
-    async def test_search_logs_no_results(self, mock_settings, mock_transport_class, mock_client_class):
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.get_settings')
+    async def test_search_logs_no_results(self, mock_get_settings, mock_transport_class, mock_client_class):
         """Test searching logs with no results returns 0."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.graylog_token = "test-token"
         mock_settings.graylog_base_url = "https://graylog.example.com"
         mock_settings.graylog_mcp_base_url = "https://mcp.example.com"
@@ -189,9 +232,10 @@ class TestGraylogMCPClient:
     @pytest.mark.asyncio
     @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
     @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
-    @patch('endpoint_auditor.integrations.graylog_mcp_client.settings')
-    async def test_get_log_count_by_stream_name_integration(self, mock_settings, mock_transport_class, mock_client_class):
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.get_settings')
+    async def test_get_log_count_by_stream_name_integration(self, mock_get_settings, mock_transport_class, mock_client_class):
         """Test complete flow of getting log count by stream name."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.graylog_token = "test-token"
         mock_settings.graylog_base_url = "https://graylog.example.com"
         mock_settings.graylog_mcp_base_url = "https://mcp.example.com"
@@ -241,3 +285,105 @@ class TestGraylogMCPClient:
 
         assert count == 5
         assert mock_client.call_tool.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.StreamableHttpTransport')
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.get_settings')
+    async def test_stream_id_is_resolved_once_per_process(self, mock_get_settings, mock_transport_class, mock_client_class):
+        """Test that a second query on the same stream skips the get_streams round trip."""
+        mock_settings = mock_get_settings.return_value
+        mock_settings.graylog_token = "test-token"
+        mock_settings.graylog_base_url = "https://graylog.example.com"
+        mock_settings.graylog_mcp_base_url = "https://mcp.example.com"
+
+        mock_client = MagicMock()
+        mock_client_class.return_value = mock_client
+
+        streams_result = MagicMock()
+        streams_result.data = json.dumps([{"id": "prod-stream-id", "title": "Production Logs"}])
+        search_result = MagicMock()
+        search_result.data = json.dumps({"datarows": [{"message": "Log 1"}]})
+
+        async def call_tool_side_effect(tool_name, params):
+            return streams_result if tool_name == "get_streams" else search_result
+
+        mock_client.call_tool = AsyncMock(side_effect=call_tool_side_effect)
+        mock_client.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_client.__aexit__ = AsyncMock(return_value=None)
+
+        for _ in range(2):
+            await GraylogMCPClient().get_log_count_by_stream_name(
+                stream_name="Production Logs",
+                query='"Error occurred"',
+                days=14
+            )
+
+        tool_names = [call.args[0] for call in mock_client.call_tool.call_args_list]
+        assert tool_names == ["get_streams", "search_messages_relative", "search_messages_relative"]
+
+
+class TestStreamIdCache:
+    """Test suite for StreamIdCache class."""
+
+    def test_entry_expires_after_ttl(self):
+        now = [0.0]
+        cache = StreamIdCache(ttl_seconds=10, clock=lambda: now[0])
+        cache.put(("https://mcp", "stream"), "stream-id")
+
+        now[0] = 10
+        assert cache.get(("https://mcp", "stream")) == "stream-id"
+        now[0] = 11
+        assert cache.get(("https://mcp", "stream")) is None
+
+
+class TestGraylogSessionPool:
+    """Test suite for GraylogSessionPool class."""
+
+    @pytest.mark.asyncio
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
+    async def test_session_is_opened_once_and_reused(self, mock_client_class):
+        mock_client = AsyncMock()
+        mock_client_class.return_value = mock_client
+        target = GraylogTarget(name="eu", base_url="https://eu", token="t", mcp_base_url="https://eu/mcp")
+        pool = GraylogSessionPool()
+
+        first = await pool.get(target)
+        second = await pool.get(target)
+
+        assert first is second
+        mock_client.__aenter__.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
+    async def test_discarded_session_is_closed_and_reopened(self, mock_client_class):
+        mock_client = AsyncMock()
+        mock_client_class.return_value = mock_client
+        target = GraylogTarget(name="eu", base_url="https://eu", token="t", mcp_base_url="https://eu/mcp")
+        pool = GraylogSessionPool()
+
+        first = await pool.get(target)
+        await pool.discard("eu")
+        second = await pool.get(target)
+        await pool.close()
+
+        assert first is not second
+        assert mock_client.__aenter__.await_count == 2
+        assert mock_client.__aexit__.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch('endpoint_auditor.integrations.graylog_mcp_client.Client')
+    async def test_concurrent_first_uses_open_one_session(self, mock_client_class):
+        async def slow_handshake(*args):
+            await asyncio.sleep(0.01)
+
+        mock_client = AsyncMock()
+        mock_client.__aenter__.side_effect = slow_handshake
+        mock_client_class.return_value = mock_client
+        target = GraylogTarget(name="eu", base_url="https://eu", token="t", mcp_base_url="https://eu/mcp")
+        pool = GraylogSessionPool()
+
+        clients = await asyncio.gather(*(pool.get(target) for _ in range(3)))
+
+        assert clients[0] is clients[1] is clients[2]
+        mock_client.__aenter__.assert_awaited_once()
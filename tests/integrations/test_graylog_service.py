@@ -1,8 +1,26 @@
 import pytest
 from unittest.mock import patch, AsyncMock, MagicMock
 
-from endpoint_auditor.integrations.graylog_service import count_log_occurrences, _build_query
-from endpoint_auditor.models import LogExtraction, RuntimeUsage
+import asyncio
+
+from endpoint_auditor.config import GraylogTarget
+from endpoint_auditor.integrations.graylog_service import (
+    count_log_occurrences,
+    _build_query,
+    _summarize_rows,
+)
+from endpoint_auditor.integrations.resilience import CircuitBreakerRegistry, Deadline, RetryPolicy
+from endpoint_auditor.models import LogExtraction, RuntimeUsage, ClusterUsage
+
+
+def _target(name="default", timeout_seconds=5.0):
+    return GraylogTarget(
+        name=name,
+        base_url=f"https://{name}.graylog.example.com",
+        token="test-token",
+        mcp_base_url=f"https://{name}.graylog.example.com/mcp/",
+        timeout_seconds=timeout_seconds,
+    )
 
 
 @pytest.mark.asyncio
@@ -26,7 +44,8 @@ async def test_graylog_not_enabled_returns_default_runtime_usage(mock_is_enabled
         enabled=False,
         provider=None,
         days=7,
-        total_occurrences=None
+        total_occurrences=None,
+        skipped_reason="Graylog integration is not configured"
     )
 
     assert actual == expected
@@ -53,7 +72,8 @@ async def test_no_log_extracted_returns_default_runtime_usage(mock_is_enabled):
         enabled=False,
         provider=None,
         days=7,
-        total_occurrences=None
+        total_occurrences=None,
+        skipped_reason="No log template to search for"
     )
 
     assert actual == expected
@@ -80,21 +100,24 @@ async def test_log_template_empty_returns_default_runtime_usage(mock_is_enabled)
         enabled=False,
         provider=None,
         days=7,
-        total_occurrences=None
+        total_occurrences=None,
+        skipped_reason="No log template to search for"
     )
 
     assert actual == expected
 
 
 @pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
 @patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
-@patch('endpoint_auditor.integrations.graylog_service.GraylogMCPClient')
-async def test_client_throws_exception_returns_default_runtime_usage(mock_client_class, mock_is_enabled):
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_client_throws_exception_returns_default_runtime_usage(mock_client_class, mock_is_enabled, mock_targets):
     """Test that when client throws exception, return default RuntimeUsage."""
     mock_is_enabled.return_value = True
+    mock_targets.return_value = [_target()]
 
     mock_client = MagicMock()
-    mock_client.get_log_count_by_stream_name = AsyncMock(side_effect=Exception("Connection error"))
+    mock_client.get_log_rows_by_stream_name = AsyncMock(side_effect=Exception("Connection error"))
     mock_client_class.return_value = mock_client
 
     log_extracted = LogExtraction(
@@ -112,21 +135,26 @@ async def test_client_throws_exception_returns_default_runtime_usage(mock_client
         enabled=False,
         provider=None,
         days=7,
-        total_occurrences=None
+        total_occurrences=None,
+        skipped_reason="No Graylog cluster answered (default: Connection error)",
+        clusters=[ClusterUsage(name="default", total_occurrences=None, error="Connection error")]
     )
 
     assert actual == expected
 
 
 @pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
 @patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
-@patch('endpoint_auditor.integrations.graylog_service.GraylogMCPClient')
-async def test_success_with_log_extracted_returns_correct_runtime_usage(mock_client_class, mock_is_enabled):
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_success_with_log_extracted_returns_correct_runtime_usage(mock_client_class, mock_is_enabled, mock_targets):
     """Test successful log count with proper query construction and result."""
     mock_is_enabled.return_value = True
+    target = _target()
+    mock_targets.return_value = [target]
 
     mock_client = MagicMock()
-    mock_client.get_log_count_by_stream_name = AsyncMock(return_value=42)
+    mock_client.get_log_rows_by_stream_name = AsyncMock(return_value=[{"message": "m"}] * 42)
     mock_client_class.return_value = mock_client
 
     log_extracted = LogExtraction(
@@ -141,20 +169,252 @@ async def test_success_with_log_extracted_returns_correct_runtime_usage(mock_cli
     )
 
     expected_query = '"Downloading Acceptance Document" + "for case:"'
-    mock_client.get_log_count_by_stream_name.assert_called_once_with(
+    mock_client_class.assert_called_once_with(target=target)
+    mock_client.get_log_rows_by_stream_name.assert_called_once_with(
         stream_name="test-stream",
         query=expected_query,
         days=7
     )
 
-    expected = RuntimeUsage(
-        enabled=True,
-        provider="Graylog",
+    assert actual.enabled is True
+    assert actual.provider == "Graylog"
+    assert actual.days == 7
+    assert actual.total_occurrences == 42
+    assert actual.clusters == [ClusterUsage(name="default", total_occurrences=42)]
+
+
+@pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
+@patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_multiple_clusters_are_merged(mock_client_class, mock_is_enabled, mock_targets):
+    """Test that counts, histograms and last seen are merged across clusters."""
+    mock_is_enabled.return_value = True
+    mock_targets.return_value = [_target("eu"), _target("us")]
+
+    rows_by_target = {
+        "eu": [
+            {"message": "m", "timestamp": "2026-01-01T10:00:00.000Z"},
+            {"message": "m", "timestamp": "2026-01-02T10:00:00.000Z"},
+        ],
+        "us": [
+            {"message": "m", "timestamp": "2026-01-02T12:00:00.000Z"},
+        ],
+    }
+
+    def build_client(target):
+        client = MagicMock()
+        client.get_log_rows_by_stream_name = AsyncMock(return_value=rows_by_target[target.name])
+        return client
+
+    mock_client_class.side_effect = build_client
+
+    actual = await count_log_occurrences(
+        log_extracted=LogExtraction(log_template=["Some log"], extracted=True),
         days=7,
-        total_occurrences=42
+        application_name="test-stream"
     )
 
-    assert actual == expected
+    assert actual.enabled is True
+    assert actual.total_occurrences == 3
+    assert actual.last_seen == "2026-01-02T12:00:00.000Z"
+    assert actual.daily_occurrences == {"2026-01-01": 1, "2026-01-02": 2}
+    assert [cluster.name for cluster in actual.clusters] == ["eu", "us"]
+    assert [cluster.total_occurrences for cluster in actual.clusters] == [2, 1]
+
+
+@pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
+@patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_slow_cluster_is_skipped_after_timeout(mock_client_class, mock_is_enabled, mock_targets):
+    """Test that a cluster exceeding its timeout does not fail the whole analysis."""
+    mock_is_enabled.return_value = True
+    mock_targets.return_value = [_target("eu"), _target("us", timeout_seconds=0.01)]
+
+    async def hang(**kwargs):
+        await asyncio.sleep(10)
+
+    def build_client(target):
+        client = MagicMock()
+        if target.name == "us":
+            client.get_log_rows_by_stream_name = AsyncMock(side_effect=hang)
+        else:
+            client.get_log_rows_by_stream_name = AsyncMock(return_value=[{"message": "m"}] * 5)
+        return client
+
+    mock_client_class.side_effect = build_client
+
+    actual = await count_log_occurrences(
+        log_extracted=LogExtraction(log_template=["Some log"], extracted=True),
+        days=7,
+        application_name="test-stream",
+        retry_policy=RetryPolicy(max_attempts=1)
+    )
+
+    assert actual.enabled is True
+    assert actual.total_occurrences == 5
+    assert actual.clusters[0].error is None
+    assert actual.clusters[1].total_occurrences is None
+    assert actual.clusters[1].error == "timed out after 0.01s"
+
+
+@pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.asyncio.sleep', new_callable=AsyncMock)
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
+@patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_transient_error_is_retried_with_backoff(mock_client_class, mock_is_enabled, mock_targets, mock_sleep):
+    """Test that a transient error is retried and the later success is returned."""
+    mock_is_enabled.return_value = True
+    mock_targets.return_value = [_target()]
+
+    mock_client = MagicMock()
+    mock_client.get_log_rows_by_stream_name = AsyncMock(
+        side_effect=[ConnectionError("connection reset"), [{"message": "m"}] * 3]
+    )
+    mock_client_class.return_value = mock_client
+
+    actual = await count_log_occurrences(
+        log_extracted=LogExtraction(log_template=["Some log"], extracted=True),
+        days=7,
+        application_name="test-stream",
+        retry_policy=RetryPolicy(max_attempts=3, base_delay_seconds=0.1)
+    )
+
+    assert actual.enabled is True
+    assert actual.total_occurrences == 3
+    assert mock_client.get_log_rows_by_stream_name.call_count == 2
+    mock_sleep.assert_called_once()
+    assert 0 <= mock_sleep.call_args.args[0] <= 0.1
+
+
+@pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
+@patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_permanent_error_is_not_retried(mock_client_class, mock_is_enabled, mock_targets):
+    """Test that a permanent error ends the query without retrying nor tripping the breaker."""
+    mock_is_enabled.return_value = True
+    mock_targets.return_value = [_target()]
+
+    mock_client = MagicMock()
+    mock_client.get_log_rows_by_stream_name = AsyncMock(side_effect=ValueError("Stream 'test-stream' not found"))
+    mock_client_class.return_value = mock_client
+    breakers = CircuitBreakerRegistry(failure_threshold=1)
+
+    actual = await count_log_occurrences(
+        log_extracted=LogExtraction(log_template=["Some log"], extracted=True),
+        days=7,
+        application_name="test-stream",
+        breakers=breakers,
+        retry_policy=RetryPolicy(max_attempts=3)
+    )
+
+    assert actual.enabled is False
+    assert actual.skipped_reason == "No Graylog cluster answered (default: Stream 'test-stream' not found)"
+    assert mock_client.get_log_rows_by_stream_name.call_count == 1
+    assert breakers.get("default").consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
+@patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_open_circuit_skips_cluster_on_next_audit(mock_client_class, mock_is_enabled, mock_targets):
+    """Test that a shared circuit breaker stops querying a degraded cluster."""
+    mock_is_enabled.return_value = True
+    mock_targets.return_value = [_target()]
+
+    mock_client = MagicMock()
+    mock_client.get_log_rows_by_stream_name = AsyncMock(side_effect=ConnectionError("refused"))
+    mock_client_class.return_value = mock_client
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout_seconds=60)
+    log_extracted = LogExtraction(log_template=["Some log"], extracted=True)
+
+    await count_log_occurrences(
+        log_extracted=log_extracted,
+        days=7,
+        application_name="test-stream",
+        breakers=breakers,
+        retry_policy=RetryPolicy(max_attempts=1)
+    )
+    actual = await count_log_occurrences(
+        log_extracted=log_extracted,
+        days=7,
+        application_name="test-stream",
+        breakers=breakers,
+        retry_policy=RetryPolicy(max_attempts=1)
+    )
+
+    assert mock_client.get_log_rows_by_stream_name.call_count == 1
+    assert actual.clusters[0].error == "circuit open after 1 consecutive failures"
+
+
+@pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
+@patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_half_open_trial_ended_by_permanent_error_is_released(mock_client_class, mock_is_enabled, mock_targets):
+    """Test that a trial failing permanently lets the next audit try the cluster again."""
+    mock_is_enabled.return_value = True
+    mock_targets.return_value = [_target()]
+
+    mock_client = MagicMock()
+    mock_client.get_log_rows_by_stream_name = AsyncMock(side_effect=[
+        ConnectionError("refused"), ValueError("Stream 'test-stream' not found"), [{"message": "m"}],
+    ])
+    mock_client_class.return_value = mock_client
+    # Half-open as soon as it opens
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout_seconds=0)
+    log_extracted = LogExtraction(log_template=["Some log"], extracted=True)
+
+    for _ in range(3):
+        actual = await count_log_occurrences(
+            log_extracted=log_extracted,
+            days=7,
+            application_name="test-stream",
+            breakers=breakers,
+            retry_policy=RetryPolicy(max_attempts=1)
+        )
+
+    assert mock_client.get_log_rows_by_stream_name.call_count == 3
+    assert actual.total_occurrences == 1
+    assert breakers.get("default").state == "closed"
+
+
+@pytest.mark.asyncio
+@patch('endpoint_auditor.integrations.graylog_service.get_graylog_targets')
+@patch('endpoint_auditor.integrations.graylog_service.is_graylog_enabled')
+@patch('endpoint_auditor.integrations.graylog_mcp_client.GraylogMCPClient')
+async def test_exhausted_deadline_skips_query(mock_client_class, mock_is_enabled, mock_targets):
+    """Test that no query is attempted once the runtime budget is exhausted."""
+    mock_is_enabled.return_value = True
+    mock_targets.return_value = [_target()]
+
+    actual = await count_log_occurrences(
+        log_extracted=LogExtraction(log_template=["Some log"], extracted=True),
+        days=7,
+        application_name="test-stream",
+        deadline=Deadline(0)
+    )
+
+    mock_client_class.assert_not_called()
+    assert actual.skipped_reason == "No Graylog cluster answered (default: runtime budget exhausted)"
+
+
+def test_summarize_rows_with_list_rows():
+    """Test that rows returned as lists of field values are summarized by timestamp."""
+    rows = [
+        ["message", "case-1", "2026-01-03T08:00:00.000Z"],
+        ["message", "case-2", "2026-01-01T08:00:00.000Z"],
+    ]
+
+    usage = _summarize_rows(name="eu", rows=rows)
+
+    assert usage.total_occurrences == 2
+    assert usage.last_seen == "2026-01-03T08:00:00.000Z"
+    assert usage.daily_occurrences == {"2026-01-01": 1, "2026-01-03": 1}
 
 
 def test_build_query_with_multiple_templates():
@@ -8,9 +8,10 @@ class TestJiraClient:
     """Test suite for JiraClient class."""
 
     @patch('endpoint_auditor.integrations.jira_mcp_client.Jira')
-    @patch('endpoint_auditor.integrations.jira_mcp_client.settings')
-    def test_client_initialization_success(self, mock_settings, mock_jira_class):
+    @patch('endpoint_auditor.integrations.jira_mcp_client.get_settings')
+    def test_client_initialization_success(self, mock_get_settings, mock_jira_class):
         """Test successful client initialization."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.jira_token = "test-token"
         mock_settings.jira_base_url = "https://jira.example.com"
         mock_settings.jira_email = "user@example.com"
@@ -28,9 +29,10 @@ class TestJiraClient:
         )
 
     @patch('endpoint_auditor.integrations.jira_mcp_client.Jira')
-    @patch('endpoint_auditor.integrations.jira_mcp_client.settings')
-    def test_client_initialization_failure(self, mock_settings, mock_jira_class):
+    @patch('endpoint_auditor.integrations.jira_mcp_client.get_settings')
+    def test_client_initialization_failure(self, mock_get_settings, mock_jira_class):
         """Test client initialization handles exceptions."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.jira_token = "test-token"
         mock_settings.jira_base_url = "https://jira.example.com"
         mock_settings.jira_email = "user@example.com"
@@ -41,9 +43,10 @@ class TestJiraClient:
             JiraClient()
 
     @patch('endpoint_auditor.integrations.jira_mcp_client.Jira')
-    @patch('endpoint_auditor.integrations.jira_mcp_client.settings')
-    def test_add_comment_success(self, mock_settings, mock_jira_class):
+    @patch('endpoint_auditor.integrations.jira_mcp_client.get_settings')
+    def test_add_comment_success(self, mock_get_settings, mock_jira_class):
         """Test adding a comment to a Jira issue."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.jira_token = "test-token"
         mock_settings.jira_base_url = "https://jira.example.com"
         mock_settings.jira_email = "user@example.com"
@@ -67,9 +70,10 @@ class TestJiraClient:
         )
 
     @patch('endpoint_auditor.integrations.jira_mcp_client.Jira')
-    @patch('endpoint_auditor.integrations.jira_mcp_client.settings')
-    def test_add_comment_propagates_exception(self, mock_settings, mock_jira_class):
+    @patch('endpoint_auditor.integrations.jira_mcp_client.get_settings')
+    def test_add_comment_propagates_exception(self, mock_get_settings, mock_jira_class):
         """Test that API errors propagate from add_comment."""
+        mock_settings = mock_get_settings.return_value
         mock_settings.jira_token = "test-token"
         mock_settings.jira_base_url = "https://jira.example.com"
         mock_settings.jira_email = "user@example.com"
@@ -82,3 +86,33 @@ class TestJiraClient:
 
         with pytest.raises(Exception, match="Jira API error"):
             client.add_comment(issue_key="PROJ-123", comment="test")
+
+    @patch('endpoint_auditor.integrations.jira_mcp_client.Jira')
+    @patch('endpoint_auditor.integrations.jira_mcp_client.get_settings')
+    def test_list_comments_follows_pages(self, mock_get_settings, mock_jira_class):
+        """Test that every page of comments is fetched."""
+        mock_settings = mock_get_settings.return_value
+        mock_jira = MagicMock()
+        mock_jira.resource_url.return_value = "rest/api/2/issue"
+        mock_jira.get.side_effect = [
+            {"startAt": 0, "total": 3, "comments": [{"id": "1"}, {"id": "2"}]},
+            {"startAt": 2, "total": 3, "comments": [{"id": "3"}]},
+        ]
+        mock_jira_class.return_value = mock_jira
+
+        comments = JiraClient().list_comments("PROJ-123", page_size=2)
+
+        assert [comment["id"] for comment in comments] == ["1", "2", "3"]
+        assert mock_jira.get.call_args.args == ("rest/api/2/issue/PROJ-123/comment",)
+        assert mock_jira.get.call_args.kwargs["params"] == {"startAt": 2, "maxResults": 2}
+
+    @patch('endpoint_auditor.integrations.jira_mcp_client.Jira')
+    @patch('endpoint_auditor.integrations.jira_mcp_client.get_settings')
+    def test_edit_comment(self, mock_get_settings, mock_jira_class):
+        mock_settings = mock_get_settings.return_value
+        mock_jira = MagicMock()
+        mock_jira_class.return_value = mock_jira
+
+        JiraClient().edit_comment(issue_key="PROJ-123", comment_id="7", comment="updated")
+
+        mock_jira.issue_edit_comment.assert_called_once_with("PROJ-123", "7", "updated")
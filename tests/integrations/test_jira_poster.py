@@ -0,0 +1,159 @@
+import pytest
+import requests
+from unittest.mock import MagicMock
+
+from endpoint_auditor.integrations.jira_poster import JiraCommentPoster, JiraRateLimiter, create_pooled_session
+from endpoint_auditor.integrations.resilience import RetryPolicy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _http_error(status_code, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+
+class TestJiraRateLimiter:
+    """Tests for the pause shared by the Jira workers."""
+
+    def test_retry_after_pauses_every_worker(self):
+        clock = FakeClock()
+        limiter = JiraRateLimiter(clock=clock, sleep=clock.sleep)
+
+        limiter.observe(429, {"Retry-After": "5"})
+
+        assert limiter.paused
+        limiter.wait()
+        assert clock.sleeps == [5.0]
+        assert not limiter.paused
+
+    def test_exhausted_quota_pauses_until_reset(self):
+        clock = FakeClock()
+        limiter = JiraRateLimiter(clock=clock, sleep=clock.sleep)
+
+        limiter.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2000-01-01T00:00:00Z"})
+        assert not limiter.paused  # Reset already passed
+
+        limiter.observe(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "2999-01-01T00:00:00Z"})
+        assert limiter.paused
+
+    def test_near_limit_slows_down(self):
+        clock = FakeClock()
+        limiter = JiraRateLimiter(clock=clock, sleep=clock.sleep)
+
+        limiter.observe(201, {"X-RateLimit-NearLimit": "true"})
+
+        assert limiter.remaining() == 1.0
+
+    def test_plain_response_does_not_pause(self):
+        limiter = JiraRateLimiter()
+
+        limiter.observe(201, {"X-RateLimit-Remaining": "42"})
+
+        assert not limiter.paused
+
+    def test_pooled_session_feeds_the_limiter(self):
+        clock = FakeClock()
+        limiter = JiraRateLimiter(clock=clock, sleep=clock.sleep)
+        session = create_pooled_session(pool_size=8, rate_limiter=limiter)
+
+        response = requests.Response()
+        response.status_code = 429
+        response.headers["Retry-After"] = "3"
+        for hook in session.hooks["response"]:
+            hook(response)
+
+        assert limiter.remaining() == 3.0
+        assert session.get_adapter("https://jira.example.com")._pool_maxsize == 8
+
+
+class TestJiraCommentPoster:
+    """Tests for posting comments with retries of throttled requests."""
+
+    def _poster(self, client, clock, max_attempts=3):
+        limiter = JiraRateLimiter(clock=clock, sleep=clock.sleep)
+        return JiraCommentPoster(
+            client=client,
+            max_workers=2,
+            retry_policy=RetryPolicy(max_attempts=max_attempts, base_delay_seconds=1.0, max_delay_seconds=1.0),
+            rate_limiter=limiter,
+            sleep=clock.sleep,
+        ), limiter
+
+    def test_throttled_request_is_retried(self):
+        clock = FakeClock()
+        client = MagicMock()
+        client.add_comment.side_effect = [_http_error(429), {"id": "1"}]
+        poster, _ = self._poster(client, clock)
+
+        with poster:
+            assert poster.post("PROJ-1", "comment") == {"id": "1"}
+
+        assert client.add_comment.call_count == 2
+        assert len(clock.sleeps) == 1  # Backed off on its own, no Retry-After
+
+    def test_retry_after_is_honoured_instead_of_backoff(self):
+        clock = FakeClock()
+        client = MagicMock()
+        poster, limiter = self._poster(client, clock)
+
+        def throttle_once(**kwargs):
+            if client.add_comment.call_count == 1:
+                limiter.observe(429, {"Retry-After": "7"})  # As the session hook does
+                raise _http_error(429, {"Retry-After": "7"})
+            return {"id": "1"}
+
+        client.add_comment.side_effect = throttle_once
+
+        with poster:
+            poster.post("PROJ-1", "comment")
+
+        assert clock.sleeps == [7.0]
+
+    def test_gives_up_after_max_attempts(self):
+        clock = FakeClock()
+        client = MagicMock()
+        client.add_comment.side_effect = _http_error(429)
+        poster, _ = self._poster(client, clock, max_attempts=3)
+
+        with poster, pytest.raises(requests.HTTPError):
+            poster.post("PROJ-1", "comment")
+
+        assert client.add_comment.call_count == 3
+
+    def test_other_errors_are_not_retried(self):
+        clock = FakeClock()
+        client = MagicMock()
+        client.add_comment.side_effect = _http_error(400)
+        poster, _ = self._poster(client, clock)
+
+        with poster, pytest.raises(requests.HTTPError):
+            poster.post("PROJ-1", "comment")
+
+        assert client.add_comment.call_count == 1
+
+    def test_submit_posts_in_the_background(self):
+        client = MagicMock()
+        client.add_comment.side_effect = lambda issue_key, comment: {"key": issue_key}
+        poster, _ = self._poster(client, FakeClock())
+
+        with poster:
+            futures = [
+                poster.submit(lambda jira, key=f"PROJ-{i}": jira.add_comment(issue_key=key, comment="comment"))
+                for i in range(10)
+            ]
+
+        assert sorted(future.result()["key"] for future in futures) == sorted(f"PROJ-{i}" for i in range(10))
@@ -1,10 +1,22 @@
+import gzip
+import json
+
 import pytest
+import requests
 from unittest.mock import patch, MagicMock
 
 from endpoint_auditor.integrations.jira_service import (
     post_report_to_jira,
     format_report,
+    format_diff,
+    submit_report_to_jira,
+    COMMENT_CREATED,
+    COMMENT_UNCHANGED,
+    COMMENT_UPDATED,
 )
+from endpoint_auditor.integrations.jira_poster import JiraCommentPoster
+from endpoint_auditor.integrations.resilience import RetryPolicy
+from endpoint_auditor.reporters.report_diff import diff_reports
 
 
 def _build_report(
@@ -90,6 +102,17 @@ class TestFormatReport:
         assert "ClientB.java" in result
         assert "ClientC.java" in result
 
+    def test_lines_of_matches_displayed(self):
+        report = _build_report(status="still_referenced_in_code", matches_count=8, files=["ClientA.java", "ClientB.java"])
+        report["code_usage"]["locations"] = [
+            {"file": "ClientA.java", "line": 12, "column": 5, "snippet": ""},
+            *({"file": "ClientB.java", "line": line, "column": 1, "snippet": ""} for line in (3, 3, 7, 9, 11, 15, 20)),
+        ]
+        result = format_report(report)
+
+        assert "* {{ClientA.java}} (line 12)" in result
+        assert "* {{ClientB.java}} (lines 3, 7, 9, 11, 15, ...)" in result
+
     def test_runtime_not_enabled(self):
         report = _build_report(runtime_enabled=False, provider=None)
         result = format_report(report)
@@ -142,6 +165,44 @@ class TestFormatReport:
         assert "2" in result
 
 
+    def test_cluster_breakdown_displayed(self):
+        report = _build_report(status="runtime_usage_detected", total_occurrences=7)
+        report["runtime_usage"]["last_seen"] = "2026-02-18T09:00:00.000Z"
+        report["runtime_usage"]["clusters"] = [
+            {"name": "eu", "total_occurrences": 7, "last_seen": "2026-02-18T09:00:00.000Z", "error": None},
+            {"name": "us", "total_occurrences": None, "last_seen": None, "error": "timed out after 30.0s"},
+        ]
+        result = format_report(report)
+
+        assert "*Last seen:* 2026-02-18T09:00:00.000Z" in result
+        assert "||Cluster||Occurrences||Last Seen||" in result
+        assert "|eu|7|2026-02-18T09:00:00.000Z|" in result
+        assert "|us|(warning) timed out after 30.0s|-|" in result
+
+class TestFormatDiff:
+    """Tests for the delta comment posted instead of a full report."""
+
+    def test_changes_are_listed(self):
+        old = _build_report(status="runtime_usage_detected", total_occurrences=5, matches_count=1,
+                            files=["/app/A.java"])
+        new = _build_report(status="still_referenced_in_code", total_occurrences=0, matches_count=1,
+                            files=["/app/B.java"])
+        new["metadata"]["generated_at"] = "2026-03-01T10:00:00+00:00"
+
+        result = format_diff(diff_reports(old, new))
+
+        assert "_Changes since the audit of 2026-02-19T10:00:00+00:00_" in result
+        assert "|total|5|0|-5|" in result
+        assert "* (+) {{/app/B.java}}" in result
+        assert "* (-) {{/app/A.java}}" in result
+        assert "2026-03-01T10:00:00+00:00" in result
+
+    def test_no_changes(self):
+        report = _build_report()
+
+        assert "No changes since the previous audit." in format_diff(diff_reports(report, report))
+
+
 class TestPostReportToJira:
     """Tests for the post_report_to_jira orchestration."""
 
@@ -179,3 +240,230 @@ class TestPostReportToJira:
 
         with pytest.raises(Exception, match="Jira unavailable"):
             post_report_to_jira("PROJ-123", _build_report())
+
+    @patch('endpoint_auditor.integrations.jira_service.is_jira_enabled')
+    @patch('endpoint_auditor.integrations.jira_service.JiraClient')
+    def test_post_report_with_shared_poster(self, mock_client_class, mock_is_enabled):
+        """Test that a batch poster runs the requests instead of a one-off client."""
+        mock_is_enabled.return_value = True
+        shared_client = MagicMock()
+        poster = MagicMock()
+        poster.run.side_effect = lambda operation: operation(shared_client)
+
+        assert post_report_to_jira("PROJ-123", _build_report(), poster=poster) == COMMENT_CREATED
+
+        mock_client_class.assert_not_called()
+        assert shared_client.add_comment.call_args.kwargs["issue_key"] == "PROJ-123"
+
+    @patch('endpoint_auditor.integrations.jira_service.is_jira_enabled')
+    def test_submit_report_returns_future(self, mock_is_enabled):
+        mock_is_enabled.return_value = True
+        poster = MagicMock()
+
+        future = submit_report_to_jira("PROJ-123", _build_report(), poster)
+
+        assert future is poster.submit.return_value
+        shared_client = MagicMock()
+        assert poster.submit.call_args.args[0](shared_client) == COMMENT_CREATED
+        assert shared_client.add_comment.call_args.kwargs["issue_key"] == "PROJ-123"
+
+
+class TestReportCommentUpdate:
+    """Tests for updating the report comment of an endpoint in place."""
+
+    def _audited_report(self, endpoint="/api/v1/users", total_occurrences=0, generated_at="2026-02-19T10:00:00+00:00"):
+        report = _build_report(total_occurrences=total_occurrences)
+        report["audit"] = {"endpoint": endpoint, "http_method": "GET", "log": "User {}",
+                           "application_name": "svc-a", "jira": "PROJ-123"}
+        report["metadata"]["generated_at"] = generated_at
+        return report
+
+    def _post(self, report, client):
+        with patch('endpoint_auditor.integrations.jira_service.is_jira_enabled', return_value=True), \
+                patch('endpoint_auditor.integrations.jira_service.JiraClient', return_value=client):
+            return post_report_to_jira("PROJ-123", report)
+
+    def _posted_comment(self, report):
+        client = MagicMock()
+        client.list_comments.return_value = []
+        self._post(report, client)
+        return client.add_comment.call_args.kwargs["comment"]
+
+    def test_first_report_is_added_with_marker(self):
+        client = MagicMock()
+        client.list_comments.return_value = [{"id": "1", "body": "Looks good to me"}]
+
+        assert self._post(self._audited_report(), client) == COMMENT_CREATED
+
+        comment = client.add_comment.call_args.kwargs["comment"]
+        assert "{anchor:endpoint-audit-" in comment
+        client.edit_comment.assert_not_called()
+
+    def test_identical_report_is_not_posted_again(self):
+        """Test that a re-run with the same content, but a new timestamp, writes nothing."""
+        previous = self._posted_comment(self._audited_report(generated_at="2026-02-19T10:00:00+00:00"))
+        client = MagicMock()
+        client.list_comments.return_value = [{"id": "7", "body": previous}]
+
+        outcome = self._post(self._audited_report(generated_at="2026-02-20T10:00:00+00:00"), client)
+
+        assert outcome == COMMENT_UNCHANGED
+        client.add_comment.assert_not_called()
+        client.edit_comment.assert_not_called()
+
+    def test_changed_report_edits_the_latest_comment(self):
+        previous = self._posted_comment(self._audited_report(total_occurrences=0))
+        client = MagicMock()
+        client.list_comments.return_value = [
+            {"id": "3", "body": previous},
+            {"id": "5", "body": "Any news?"},
+            {"id": "7", "body": previous},
+        ]
+
+        outcome = self._post(self._audited_report(total_occurrences=12), client)
+
+        assert outcome == COMMENT_UPDATED
+        client.add_comment.assert_not_called()
+        kwargs = client.edit_comment.call_args.kwargs
+        assert kwargs["comment_id"] == "7"
+        assert "|Graylog|30 days|12|" in kwargs["comment"]
+
+    def test_reports_of_other_endpoints_are_left_alone(self):
+        other = self._posted_comment(self._audited_report(endpoint="/api/v1/orders"))
+        client = MagicMock()
+        client.list_comments.return_value = [{"id": "3", "body": other}]
+
+        assert self._post(self._audited_report(), client) == COMMENT_CREATED
+        client.edit_comment.assert_not_called()
+
+
+def _large_report(files_count=120):
+    """A report referencing the endpoint from many files of two projects."""
+    matches_per_file = {f"/app/projects/svc-a/src/File{i:04d}.java": 1 for i in range(files_count)}
+    matches_per_file["/app/projects/svc-b/src/Hot.java"] = 9
+    report = _build_report(
+        status="still_referenced_in_code",
+        matches_count=sum(matches_per_file.values()),
+        files=sorted(matches_per_file),
+        projects_paths=["/app/projects/svc-a", "/app/projects/svc-b"],
+    )
+    report["code_usage"]["matches_per_file"] = matches_per_file
+    report["audit"] = {"endpoint": "/api/v1/users", "http_method": "GET", "log": "User {}",
+                       "application_name": "svc-a", "jira": "PROJ-123"}
+    return report
+
+
+class TestLargeReports:
+    """Tests for reports referencing the endpoint from too many files for one comment."""
+
+    def test_file_list_is_truncated_and_grouped_by_project(self):
+        result = format_report(_large_report(), max_files=10, attachment_name="endpoint-audit-x.json.gz")
+
+        assert "*Files with references:* 121 files, the 10 with the most matches are listed, " \
+               "all of them are in [^endpoint-audit-x.json.gz]" in result
+        assert "*/app/projects/svc-a* (120 files, 120 matches)" in result
+        assert "*/app/projects/svc-b* (1 files, 9 matches)" in result
+        assert "* {{/app/projects/svc-b/src/Hot.java}} (9)" in result
+        assert result.count("\n* {{") == 10
+
+    def test_small_file_list_is_listed_in_full(self):
+        result = format_report(_large_report(files_count=3), max_files=10)
+
+        assert "*Files with references:*\n" in result
+        assert result.count("\n* {{") == 4
+
+    @patch('endpoint_auditor.integrations.jira_service.is_jira_enabled', return_value=True)
+    @patch('endpoint_auditor.integrations.jira_service.JiraClient')
+    def test_full_report_is_attached_compressed(self, mock_client_class, mock_is_enabled):
+        uploads = []
+        client = MagicMock()
+        client.list_comments.return_value = []
+        client.add_attachment.side_effect = lambda issue_key, filename, content, content_type: (
+            uploads.append((filename, content_type, gzip.decompress(content.read()))) or [{"id": "99"}]
+        )
+        client.list_attachments.return_value = [{"filename": "other.png", "attachment_id": "1"}]
+        mock_client_class.return_value = client
+        report = _large_report()
+
+        post_report_to_jira("PROJ-123", report)
+
+        filename, content_type, content = uploads[0]
+        assert filename.startswith("endpoint-audit-") and filename.endswith(".json.gz")
+        assert content_type == "application/gzip"
+        assert json.loads(content) == report
+        assert f"[^{filename}]" in client.add_comment.call_args.kwargs["comment"]
+        client.remove_attachment.assert_not_called()
+
+    @patch('endpoint_auditor.integrations.jira_service.is_jira_enabled', return_value=True)
+    def test_submitted_report_is_attached_as_it_was_submitted(self, mock_is_enabled):
+        """Test that the report is compressed on submission, not kept until the background upload."""
+        uploads = []
+        client = MagicMock()
+        client.list_comments.return_value = []
+        client.add_attachment.side_effect = lambda issue_key, filename, content, content_type: (
+            uploads.append(json.loads(gzip.decompress(content.read()))) or [{"id": "99"}]
+        )
+        poster = MagicMock()
+        report = _large_report()
+        submitted = json.loads(json.dumps(report))
+
+        submit_report_to_jira("PROJ-123", report, poster)
+        report["code_usage"]["files"].clear()
+        poster.submit.call_args.args[0](client)
+
+        assert uploads == [submitted]
+
+    @patch('endpoint_auditor.integrations.jira_service.is_jira_enabled', return_value=True)
+    @patch('endpoint_auditor.integrations.jira_service.JiraClient')
+    def test_updated_report_replaces_its_attachment(self, mock_client_class, mock_is_enabled):
+        """Test that a file change outside the listed top files still updates the comment and attachment."""
+        posted = MagicMock()
+        posted.list_comments.return_value = []
+        posted.add_attachment.return_value = [{"id": "10"}]
+        mock_client_class.return_value = posted
+        post_report_to_jira("PROJ-123", _large_report())
+        previous_comment = posted.add_comment.call_args.kwargs["comment"]
+        filename = posted.add_attachment.call_args.args[1]
+
+        report = _large_report()
+        report["code_usage"]["matches_per_file"]["/app/projects/svc-a/src/File0119.java"] = 2
+        client = MagicMock()
+        client.list_comments.return_value = [{"id": "7", "body": previous_comment}]
+        client.add_attachment.return_value = [{"id": "11"}]
+        client.list_attachments.return_value = [
+            {"filename": filename, "attachment_id": "10"},
+            {"filename": filename, "attachment_id": "11"},
+            {"filename": "screenshot.png", "attachment_id": "12"},
+        ]
+        mock_client_class.return_value = client
+
+        assert post_report_to_jira("PROJ-123", report) == COMMENT_UPDATED
+
+        client.remove_attachment.assert_called_once_with("10")
+
+    @pytest.mark.parametrize("audited", [False, True])
+    @patch('endpoint_auditor.integrations.jira_service.is_jira_enabled', return_value=True)
+    def test_throttled_comment_does_not_upload_the_report_again(self, mock_is_enabled, audited):
+        """Test that the retry of a throttled comment goes on with the attachment of the first attempt."""
+        throttled = requests.Response()
+        throttled.status_code = 429
+        client = MagicMock()
+        client.list_comments.return_value = []
+        client.add_attachment.return_value = [{"id": "10"}]
+        client.add_comment.side_effect = [requests.HTTPError("429 error", response=throttled), {"id": "1"}]
+        report = _large_report()
+        if not audited:
+            del report["audit"]
+        poster = JiraCommentPoster(
+            client=client,
+            max_workers=1,
+            retry_policy=RetryPolicy(max_attempts=3, base_delay_seconds=0.0, max_delay_seconds=0.0),
+            sleep=lambda seconds: None,
+        )
+
+        with poster:
+            assert post_report_to_jira("PROJ-123", report, poster=poster) == COMMENT_CREATED
+
+        assert client.add_comment.call_count == 2
+        client.add_attachment.assert_called_once()
+        client.remove_attachment.assert_not_called()
@@ -0,0 +1,124 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from endpoint_auditor.integrations.resilience import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    Deadline,
+    RetryPolicy,
+    is_transient_error,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_remaining_decreases_and_expires():
+    clock = FakeClock()
+    deadline = Deadline(10, clock=clock)
+
+    assert deadline.remaining() == 10
+    clock.now += 4
+    assert deadline.remaining() == 6
+    clock.now += 10
+    assert deadline.remaining() == 0
+    assert deadline.expired is True
+
+
+def test_backoff_delay_is_bounded_by_exponential_cap():
+    policy = RetryPolicy(base_delay_seconds=0.5, max_delay_seconds=3.0)
+    rng = random.Random(42)
+
+    for attempt, cap in [(0, 0.5), (1, 1.0), (2, 2.0), (3, 3.0), (8, 3.0)]:
+        for _ in range(20):
+            assert 0 <= policy.backoff_delay(attempt, rng=rng) <= cap
+
+
+def test_circuit_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=30, clock=FakeClock())
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() is True
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+
+
+def test_circuit_breaker_half_open_allows_single_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_circuit_breaker_reopens_when_trial_fails():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout_seconds=30, clock=clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_circuit_breaker_released_trial_allows_another():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow_request() is True
+    breaker.release_trial()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request() is True
+
+
+def test_registry_returns_same_breaker_per_name():
+    registry = CircuitBreakerRegistry()
+
+    assert registry.get("eu") is registry.get("eu")
+    assert registry.get("eu") is not registry.get("us")
+
+
+@pytest.mark.parametrize("error, expected", [
+    (asyncio.TimeoutError(), True),
+    (ConnectionError("reset"), True),
+    (httpx.ConnectError("refused"), True),
+    (ValueError("Stream 'x' not found"), False),
+    (KeyError("datarows"), False),
+])
+def test_is_transient_error(error, expected):
+    assert is_transient_error(error) is expected
+
+
+@pytest.mark.parametrize("status_code, expected", [(429, True), (503, True), (401, False), (404, False)])
+def test_is_transient_error_http_status(status_code, expected):
+    request = httpx.Request("POST", "https://graylog.example.com/mcp/")
+    response = httpx.Response(status_code, request=request)
+    error = httpx.HTTPStatusError("error", request=request, response=response)
+
+    assert is_transient_error(error) is expected
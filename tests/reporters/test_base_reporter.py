@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import patch
 
 from endpoint_auditor.reporters.base_reporter import generate_base_report, _generate_warnings
-from endpoint_auditor.models import LogExtraction, RuntimeUsage, CodeUsage
+from endpoint_auditor.models import AuditRequest, LogExtraction, RuntimeUsage, CodeUsage, ClusterUsage
 
 
 @pytest.fixture
@@ -247,3 +247,70 @@ def test_generate_warnings_both_issues():
     assert len(warnings) == 2
     assert "Problems while extracting logs: Skipping log analysis" in warnings
     assert "Problems while connecting to log extractor: Skipping log analysis" in warnings
+
+
+def test_generate_warnings_failed_clusters():
+    """Test _generate_warnings reports every log cluster that was skipped."""
+    warnings = _generate_warnings(
+        is_log_extracted=True,
+        is_runtime_analysis_enabled=True,
+        failed_clusters=[ClusterUsage(name="us", total_occurrences=None, error="timed out after 30.0s")]
+    )
+
+    assert warnings == ["Log cluster 'us' was skipped: timed out after 30.0s"]
+
+
+def test_generate_warnings_runtime_skipped_reason():
+    """Test _generate_warnings carries the reason why runtime analysis was skipped."""
+    warnings = _generate_warnings(
+        is_log_extracted=True,
+        is_runtime_analysis_enabled=False,
+        failed_clusters=[ClusterUsage(name="eu", total_occurrences=None, error="refused")],
+        runtime_skipped_reason="No Graylog cluster answered (eu: refused)"
+    )
+
+    assert warnings == ["Runtime analysis skipped: No Graylog cluster answered (eu: refused)"]
+
+
+def test_generate_report_includes_audit_request(mock_log_extracted):
+    """Test that the audit request is part of the report when provided."""
+    result = generate_base_report(
+        log_extracted=mock_log_extracted,
+        runtime_usage=RuntimeUsage(enabled=True, provider="Graylog", days=30, total_occurrences=0),
+        code_usage=CodeUsage(projects_paths=["/repo/service-a"], matches_count=0, files=[]),
+        audit_request=AuditRequest(
+            endpoint="/api/v1/users",
+            http_method="GET",
+            log="User endpoint accessed",
+            application_name="service-a"
+        )
+    )
+
+    assert result["audit"] == {
+        "endpoint": "/api/v1/users",
+        "http_method": "GET",
+        "log": "User endpoint accessed",
+        "application_name": "service-a",
+        "jira": None,
+    }
+
+
+def test_generate_report_needs_review_when_clusters_were_skipped(mock_log_extracted):
+    """Test that no usage is not a candidate for deprecation when a log cluster did not answer."""
+    runtime_usage = RuntimeUsage(
+        enabled=True,
+        provider="Graylog",
+        days=30,
+        total_occurrences=0,
+        clusters=[
+            ClusterUsage(name="eu", total_occurrences=0),
+            ClusterUsage(name="us", total_occurrences=None, error="timed out after 30s"),
+        ],
+    )
+    code_usage = CodeUsage(projects_paths=["/repo/service-a"], matches_count=0, files=[])
+
+    result = generate_base_report(log_extracted=mock_log_extracted, runtime_usage=runtime_usage, code_usage=code_usage)
+
+    assert result["recommendation"]["status"] == "needs_review"
+    assert "us" in result["recommendation"]["rationale"]
+    assert result["warnings"] == ["Log cluster 'us' was skipped: timed out after 30s"]
@@ -0,0 +1,99 @@
+import pytest
+
+from endpoint_auditor.profiling import Tracer
+from endpoint_auditor.reporters.metrics_exporter import (
+    render_prometheus_metrics,
+    write_prometheus_textfile,
+)
+
+
+def _report(status):
+    return {"recommendation": {"status": status, "rationale": ""}}
+
+
+@pytest.fixture
+def recorded_tracer():
+    """Tracer holding the spans of a small audit run."""
+    tracer = Tracer()
+    with tracer.span("scan.files") as span:
+        span.add("files", 10)
+        span.add("bytes", 2_000_000)
+    with tracer.span("graylog.stream_cache") as span:
+        span.add("misses")
+    with tracer.span("graylog.stream_cache") as span:
+        span.add("hits")
+    with tracer.span("graylog.stream_cache") as span:
+        span.add("hits")
+    with tracer.span("graylog.search") as span:
+        span.add("round_trips")
+    return tracer
+
+
+def _samples(text):
+    """Parse the samples of a metrics text into a {name{labels}: value} dict."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_render_prometheus_metrics(recorded_tracer):
+    reports = [
+        _report("candidate_for_deprecation"),
+        _report("candidate_for_deprecation"),
+        _report("runtime_usage_detected"),
+    ]
+
+    text = render_prometheus_metrics(reports=reports, tracer=recorded_tracer, now=1700000000.0)
+    samples = _samples(text)
+
+    assert samples["endpoint_audit_last_run_timestamp_seconds"] == 1700000000.0
+    assert samples["endpoint_audit_audits"] == 3
+    assert samples["endpoint_audit_files_scanned"] == 10
+    assert samples["endpoint_audit_bytes_scanned"] == 2_000_000
+    assert samples['endpoint_audit_stage_duration_seconds{stage="scan.files"}'] >= 0
+    assert samples["endpoint_audit_stream_cache_hit_ratio"] == pytest.approx(2 / 3, abs=1e-6)
+    assert samples['endpoint_audit_recommendations{status="candidate_for_deprecation"}'] == 2
+    assert samples['endpoint_audit_recommendations{status="still_referenced_in_code"}'] == 0
+    assert samples['endpoint_audit_recommendations{status="runtime_usage_detected"}'] == 1
+    assert samples['endpoint_audit_graylog_request_duration_seconds_bucket{le="+Inf"}'] == 1
+    assert samples["endpoint_audit_graylog_request_duration_seconds_count"] == 1
+    assert "# TYPE endpoint_audit_graylog_request_duration_seconds histogram" in text
+    assert text.endswith("\n")
+
+
+def test_histogram_buckets_are_cumulative():
+    tracer = Tracer()
+    for _ in range(3):
+        with tracer.span("graylog.search") as span:
+            span.add("round_trips")
+
+    samples = _samples(render_prometheus_metrics(reports=[], tracer=tracer))
+
+    assert samples['endpoint_audit_graylog_request_duration_seconds_bucket{le="60.0"}'] == 3
+    assert samples['endpoint_audit_graylog_request_duration_seconds_bucket{le="+Inf"}'] == 3
+
+
+def test_cache_hits_are_not_graylog_requests(recorded_tracer):
+    samples = _samples(render_prometheus_metrics(reports=[], tracer=recorded_tracer))
+
+    assert samples["endpoint_audit_graylog_request_duration_seconds_count"] == 1
+
+
+def test_throughput_is_zero_without_scan():
+    samples = _samples(render_prometheus_metrics(reports=[], tracer=Tracer()))
+
+    assert samples["endpoint_audit_scan_throughput_megabytes_per_second"] == 0
+    assert samples["endpoint_audit_stream_cache_hit_ratio"] == 0
+
+
+def test_write_prometheus_textfile_replaces_file(tmp_path, recorded_tracer):
+    path = tmp_path / "endpoint_audit.prom"
+    path.write_text("stale")
+
+    write_prometheus_textfile(path=str(path), reports=[_report("candidate_for_deprecation")], tracer=recorded_tracer)
+
+    assert path.read_text().startswith("# HELP endpoint_audit_last_run_timestamp_seconds")
+    assert [p.name for p in tmp_path.iterdir()] == ["endpoint_audit.prom"]
@@ -0,0 +1,57 @@
+import io
+import json
+
+from endpoint_auditor.reporters.ndjson_writer import NdjsonReportWriter
+
+
+class _FlushCountingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+def test_each_report_is_one_flushed_line():
+    """Test that every report is written on its own line and flushed immediately."""
+    stream = _FlushCountingStream()
+    writer = NdjsonReportWriter(stream)
+
+    writer.write_report({"recommendation": {"status": "runtime_usage_detected"}, "audit": {"endpoint": "/a"}})
+    assert stream.flushes == 1
+    writer.write_report({"recommendation": {"status": "candidate_for_deprecation"}, "audit": {"endpoint": "/b"}})
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line)["audit"]["endpoint"] for line in lines] == ["/a", "/b"]
+    assert stream.flushes == 2
+
+
+def test_summary_line_counts_statuses():
+    """Test that the summary line counts the reports per recommendation status."""
+    now = [10.0]
+    stream = io.StringIO()
+    writer = NdjsonReportWriter(stream, clock=lambda: now[0])
+
+    for status in ("runtime_usage_detected", "candidate_for_deprecation", "runtime_usage_detected"):
+        writer.write_report({"recommendation": {"status": status}})
+    now[0] = 12.5
+    summary = writer.write_summary()
+
+    assert summary == {
+        "audits": 3,
+        "statuses": {"candidate_for_deprecation": 1, "runtime_usage_detected": 2},
+        "duration_seconds": 2.5,
+    }
+    assert json.loads(stream.getvalue().splitlines()[-1]) == {"summary": summary}
+
+
+def test_summary_line_reports_error():
+    """Test that a batch stopped by an error says so in its summary line."""
+    stream = io.StringIO()
+    writer = NdjsonReportWriter(stream)
+
+    writer.write_summary(error="project path not found: /repo")
+
+    assert json.loads(stream.getvalue())["summary"]["error"] == "project path not found: /repo"
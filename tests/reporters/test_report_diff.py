@@ -0,0 +1,101 @@
+import json
+
+from endpoint_auditor.reporters.report_diff import diff_reports, diff_to_dict, format_diff_text
+
+
+def _report(matches_per_file, occurrences=42, status="runtime_usage_detected", clusters=None,
+            generated_at="2026-01-19T10:00:00+00:00"):
+    return {
+        "metadata": {"generated_at": generated_at, "version": "0.1.0"},
+        "audit": {"endpoint": "/api/v1/users", "http_method": "GET"},
+        "runtime_usage": {
+            "enabled": True, "provider": "Graylog", "days": 30,
+            "total_occurrences": occurrences, "clusters": clusters or [],
+        },
+        "code_usage": {
+            "projects_paths": ["/repo"],
+            "matches_count": sum(matches_per_file.values()),
+            "files": sorted(matches_per_file),
+            "matches_per_file": matches_per_file,
+        },
+        "recommendation": {"status": status, "rationale": "..."},
+    }
+
+
+def test_diff_classifies_file_changes():
+    """Test that new, removed and changed references are detected."""
+    old = _report({"/repo/A.java": 1, "/repo/B.java": 2, "/repo/C.java": 1})
+    new = _report({"/repo/B.java": 3, "/repo/C.java": 1, "/repo/D.java": 1}, generated_at="2026-02-01T10:00:00+00:00")
+
+    diff = diff_reports(old, new)
+
+    assert [change.path for change in diff.added_files] == ["/repo/D.java"]
+    assert [change.path for change in diff.removed_files] == ["/repo/A.java"]
+    assert [(change.path, change.old_matches, change.new_matches) for change in diff.changed_files] == [
+        ("/repo/B.java", 2, 3)
+    ]
+    assert (diff.old_matches, diff.new_matches) == (4, 5)
+    assert diff.has_changes
+
+
+def test_diff_runtime_deltas_per_cluster():
+    """Test that runtime deltas are computed for the total and each changed cluster."""
+    old = _report({}, occurrences=42, clusters=[
+        {"name": "eu", "total_occurrences": 40}, {"name": "us", "total_occurrences": 2}
+    ])
+    new = _report({}, occurrences=2, status="still_referenced_in_code", clusters=[
+        {"name": "eu", "total_occurrences": 0}, {"name": "us", "total_occurrences": 2}
+    ])
+
+    diff = diff_reports(old, new)
+
+    assert [(change.name, change.old, change.new, change.delta) for change in diff.runtime] == [
+        ("total", 42, 2, -40),
+        ("eu", 40, 0, -40),
+    ]
+    text = format_diff_text(diff)
+    assert "Status: runtime_usage_detected -> still_referenced_in_code" in text
+    assert "Runtime occurrences: 42 -> 2 (-40)" in text
+
+
+def test_identical_reports_have_no_changes():
+    report = _report({"/repo/A.java": 1})
+
+    diff = diff_reports(report, report)
+
+    assert not diff.has_changes
+    assert format_diff_text(diff).endswith("No changes.")
+
+
+def test_reports_without_per_file_matches_compare_file_presence():
+    """Test that reports listing files only are compared on presence."""
+    old = {"code_usage": {"matches_count": 2, "files": ["/repo/A.java", "/repo/B.java"]}}
+    new = {"code_usage": {"matches_count": 2, "files": ["/repo/B.java", "/repo/C.java"]}}
+
+    diff = diff_reports(old, new)
+
+    assert [change.path for change in diff.added_files] == ["/repo/C.java"]
+    assert [change.path for change in diff.removed_files] == ["/repo/A.java"]
+    assert diff.changed_files == []
+
+
+def test_diff_of_large_file_lists():
+    """Test the sorted merge on tens of thousands of files."""
+    old = _report({f"/repo/f{i:06d}/Client.java": 1 for i in range(0, 40000)})
+    new = _report({f"/repo/f{i:06d}/Client.java": 1 if i % 1000 else 2 for i in range(10, 40010)})
+
+    diff = diff_reports(old, new)
+
+    assert len(diff.added_files) == 10
+    assert len(diff.removed_files) == 10
+    assert len(diff.changed_files) == 39
+
+
+def test_diff_to_dict_is_json_serializable():
+    old = _report({"/repo/A.java": 1}, occurrences=5)
+    new = _report({"/repo/A.java": 2}, occurrences=7)
+
+    result = json.loads(json.dumps(diff_to_dict(diff_reports(old, new))))
+
+    assert result["changed_files"] == {"/repo/A.java": {"old": 1, "new": 2}}
+    assert result["runtime"]["total"] == {"old": 5, "new": 7, "delta": 2}
@@ -0,0 +1,120 @@
+import zipfile
+from unittest.mock import patch
+
+from endpoint_auditor.scanners.archive_scanner import ArchiveScanCache, is_archive, scan_archives
+from endpoint_auditor.scanners.languages import client_file_matcher
+from endpoint_auditor.scanners.usage_scanner import ScanStats, fingerprint_project, scan_code_usage
+
+
+def _jar(path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in entries.items():
+            archive.writestr(name, content)
+    return str(path)
+
+
+def test_scan_archives_searches_client_entries_in_memory(tmp_path):
+    """Test that client sources and compiled classes are searched, other entries are not."""
+    jar = _jar(tmp_path / "user-client-sources.jar", {
+        "com/acme/UserClient.java": 'get("/api/users/" + id); post("/api/users/{id}");',
+        "com/acme/UserClient.class": b"\xca\xfe\xba\xbe\x00\x10/api/users/{id}\x01",
+        "com/acme/UserService.java": 'get("/api/users/{id}");',
+        "META-INF/MANIFEST.MF": "Manifest-Version: 1.0\n",
+    })
+
+    matches, locations, entries, searched = scan_archives([jar], "/api/users/{id}", client_file_matcher())
+
+    assert matches == {f"{jar}!/com/acme/UserClient.java": 1, f"{jar}!/com/acme/UserClient.class": 1}
+    # Compiled classes have no lines
+    assert locations == {f"{jar}!/com/acme/UserClient.java": [(1, 32, 'get("/api/users/" + id); post("/api/users/{id}");')]}
+    assert (entries, searched) == (2, 2)
+    assert not (tmp_path / "com").exists()
+
+
+def test_source_entries_are_counted_in_the_text_they_are_located_in(tmp_path):
+    """Test that a source entry with invalid UTF-8 has as many matches as locations, as a file would."""
+    jar = _jar(tmp_path / "user-client-sources.jar", {
+        "com/acme/UserClient.java": b'get("/api/us\xffers/{id}");\nget("/api/users/{id}");',
+    })
+
+    matches, locations, _, _ = scan_archives([jar], "/api/users/{id}", client_file_matcher())
+
+    entry = f"{jar}!/com/acme/UserClient.java"
+    assert matches == {entry: 2}
+    assert [(line, column) for line, column, _ in locations[entry]] == [(1, 6), (2, 6)]
+
+
+def test_scan_archives_reuses_results_by_checksum(tmp_path):
+    """Test that an archive copied under another path is not opened again for the same endpoint."""
+    entries = {"UserClient.java": '"/api/users"'}
+    first = _jar(tmp_path / "a" / "client.jar", entries)
+    cache = ArchiveScanCache()
+    scan_archives([first], "/api/users", client_file_matcher(), cache)
+    copy = tmp_path / "b" / "client.jar"
+    copy.parent.mkdir()
+    copy.write_bytes((tmp_path / "a" / "client.jar").read_bytes())
+
+    with patch("endpoint_auditor.scanners.archive_scanner._scan_archive") as scan_archive:
+        matches, _, entries_count, searched = scan_archives([str(copy)], "/api/users", client_file_matcher(), cache)
+
+    scan_archive.assert_not_called()
+    assert matches == {f"{copy}!/UserClient.java": 1}
+    assert (entries_count, searched) == (1, 0)
+
+
+def test_scan_archives_scans_several_archives_and_reports_unreadable_ones(tmp_path, capsys):
+    """Test that every archive is searched, and a corrupt archive is reported without failing the scan."""
+    archives = [_jar(tmp_path / f"client{index}.jar", {"OrderClient.java": '"/api/orders"'}) for index in range(4)]
+    corrupt = tmp_path / "corrupt.jar"
+    corrupt.write_bytes(b"not a zip")
+
+    matches, _, entries, _ = scan_archives(archives + [str(corrupt)], "/api/orders", client_file_matcher())
+
+    assert sorted(matches) == sorted(f"{archive}!/OrderClient.java" for archive in archives)
+    assert entries == 4
+    assert "Error scanning" in capsys.readouterr().out
+
+
+def test_scan_archives_reports_unreadable_entries_and_searches_the_others(tmp_path, capsys):
+    """Test that encrypted entries and entries of unsupported compression methods are skipped and reported."""
+    path = tmp_path / "client.jar"
+    _jar(path, {"EncryptedClient.java": '"/api/orders"', "OrderClient.java": '"/api/orders"', "Lzma2Client.java": '"/api/orders"'})
+    data = bytearray(path.read_bytes())
+    with zipfile.ZipFile(path) as archive:
+        infos = {info.filename: info for info in archive.infolist()}
+    central_directory = data.find(b"PK\x01\x02")
+    for name, offset, value in (("EncryptedClient.java", 6, b"\x01\x00"), ("Lzma2Client.java", 8, b"\x63\x00")):
+        # Flags (encrypted) or compression method (99, AE-x), in the local and central headers
+        local_header = infos[name].header_offset
+        data[local_header + offset:local_header + offset + 2] = value
+        central_header = data.find(b"PK\x01\x02", central_directory)
+        while data[central_header + 46:central_header + 46 + len(name)] != name.encode():
+            central_header = data.find(b"PK\x01\x02", central_header + 4)
+        data[central_header + offset + 2:central_header + offset + 4] = value
+    path.write_bytes(bytes(data))
+
+    matches, _, entries, _ = scan_archives([str(path)], "/api/orders", client_file_matcher())
+
+    assert matches == {f"{path}!/OrderClient.java": 1}
+    assert entries == 3
+    output = capsys.readouterr().out
+    assert f"Error scanning {path}!/EncryptedClient.java" in output
+    assert f"Error scanning {path}!/Lzma2Client.java" in output
+
+
+def test_scan_code_usage_mixes_directories_and_archives(tmp_path):
+    """Test that archives given as projects are scanned with the directories and fingerprinted cheaply."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "UserClient.java").write_text('get("/api/users");')
+    jar = _jar(tmp_path / "cache" / "user-client.jar", {"com/acme/UserClient.java": 'get("/api/users");'})
+    stats = ScanStats()
+
+    usage = scan_code_usage("/api/users", [str(project), jar], stats=stats, archive_cache=ArchiveScanCache())
+
+    assert usage.files == sorted([str(project / "UserClient.java"), f"{jar}!/com/acme/UserClient.java"])
+    assert usage.matches_count == 2
+    assert stats.files == 2
+    assert is_archive(jar) and not is_archive(str(project))
+    assert fingerprint_project(jar) == fingerprint_project(jar)
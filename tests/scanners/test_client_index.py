@@ -0,0 +1,183 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from endpoint_auditor.scanners.client_index import ClientReferenceIndex, parse_client_source
+
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "clients"
+
+
+def _calls(references):
+    return [(reference.http_method, reference.path, reference.kind) for reference in references]
+
+
+def test_parse_client_source_resolves_concatenated_urls():
+    """Test that URLs built from constants, variables and parameters become path templates."""
+    source = (FIXTURES_DIR / "UserClient.java").read_text()
+
+    assert _calls(parse_client_source(source)) == [
+        ("GET", "/api/v1/users/{}", "rest_template"),
+        ("GET", "/api/v1/users", "rest_template"),
+        ("DELETE", "/api/v2/users/{}", "rest_template"),
+    ]
+
+
+def test_parse_rest_template_and_web_client_calls():
+    """Test the RestTemplate methods, exchange() and the WebClient chains."""
+    source = '''
+    class InvoiceClient {
+        private static final String INVOICES = "/api/invoices";
+        private final String baseUrl;
+
+        Invoice get(String id) {
+            return restTemplate.getForObject(baseUrl + INVOICES + "/{id}", Invoice.class, id);
+        }
+
+        void update(Invoice invoice) {
+            restTemplate.exchange(this.INVOICES + "/" + invoice.getId(), HttpMethod.PUT, entity, Void.class);
+        }
+
+        Mono<Invoice> create(Invoice invoice) {
+            return webClient.post().uri(INVOICES + "?notify=true").bodyValue(invoice).retrieve().bodyToMono(Invoice.class);
+        }
+
+        Mono<Void> cancel(String id) {
+            return webClient.method(HttpMethod.DELETE).uri("/api/invoices/{id}", id).retrieve().bodyToMono(Void.class);
+        }
+
+        String ignored(String path) {
+            // "/api/not-a-call" in a comment, and calls whose URL is not a path
+            return restTemplate.getForObject(path, String.class) + restTemplate.postForObject(buildUrl(), body, String.class);
+        }
+    }
+    '''
+
+    assert _calls(parse_client_source(source)) == [
+        ("GET", "/api/invoices/{id}", "rest_template"),
+        ("PUT", "/api/invoices/{}", "rest_template"),
+        ("POST", "/api/invoices", "web_client"),
+        ("DELETE", "/api/invoices/{id}", "web_client"),
+    ]
+
+
+def test_parse_feign_client_interface():
+    """Test that the mappings of a @FeignClient interface are prefixed by its path, not its name."""
+    source = '''
+    @FeignClient(name = "orders", path = "/api/v1/orders")
+    public interface OrdersFeignClient {
+        @GetMapping("/{id}")
+        Order get(@PathVariable("id") String id);
+
+        @RequestMapping(method = RequestMethod.POST)
+        Order create(@RequestBody Order order);
+    }
+    '''
+
+    assert _calls(parse_client_source(source)) == [
+        ("GET", "/api/v1/orders/{id}", "feign"),
+        ("POST", "/api/v1/orders", "feign"),
+    ]
+
+
+def test_parse_string_format_urls():
+    """Test that String.format() placeholders become path variables."""
+    source = '''
+    class VerificationClient {
+        private static final String VERIFY = "/v1/users/%s/verify";
+
+        void verify(String id) { restTemplate.postForObject(String.format(VERIFY, id), null, Void.class); }
+    }
+    '''
+
+    assert _calls(parse_client_source(source)) == [("POST", "/v1/users/%s/verify", "rest_template")]
+
+
+def test_index_matches_http_method_and_path_template():
+    """Test that lookups match the path template and filter on the HTTP method."""
+    index = ClientReferenceIndex()
+    index.refresh([str(FIXTURES_DIR)])
+
+    order_client = str(FIXTURES_DIR / "OrderClient.java")
+    assert index.references("/api/v1/orders/{orderId}", "GET") == {order_client: 1}
+    assert index.references("/api/v1/orders/{orderId}", "POST") == {}
+    # The text search counts /api/v1/users inside /api/v1/users/{id} and in logs, the index does not
+    users = index.code_usage("/api/v1/users", "GET")
+    assert users.matches_per_file == {
+        str(FIXTURES_DIR / "UserClient.java"): 1,
+        str(FIXTURES_DIR / "nested" / "ApiClient.java"): 1,
+    }
+    assert users.matches_count == 2
+    assert users.projects_paths == [str(FIXTURES_DIR)]
+    assert index.references("/api/v2/users/{id}") == {str(FIXTURES_DIR / "UserClient.java"): 1}
+
+
+def test_refresh_parses_only_changed_files(tmp_path):
+    """Test that a refresh parses new and changed client files only."""
+    client = tmp_path / "OrderClient.java"
+    client.write_text('class OrderClient { void a() { restTemplate.getForObject("/orders", O.class); } }')
+    index = ClientReferenceIndex()
+    index.refresh([str(tmp_path)])
+
+    with patch("endpoint_auditor.scanners.client_index.parse_client_source") as parse:
+        index.refresh([str(tmp_path)])
+    parse.assert_not_called()
+
+    client.write_text('class OrderClient { void a() { restTemplate.delete("/orders/" + id); } }')
+    os.utime(client, ns=(0, client.stat().st_mtime_ns + 1_000_000_000))
+    index.refresh([str(tmp_path)])
+
+    assert index.references("/orders") == {}
+    assert index.references("/orders/{id}", "DELETE") == {str(client): 1}
+
+
+def test_index_matches_templates_against_concrete_and_templated_calls(tmp_path):
+    """Test that templated endpoints match concatenations, format strings and concrete paths."""
+    (tmp_path / "UserClient.java").write_text(
+        'class UserClient {\n'
+        '    void a(String id) { restTemplate.postForObject("/v1/users/" + id + "/verify", null, Void.class); }\n'
+        '    void b(String id) { restTemplate.postForObject(String.format("/v1/users/%s/verify", id), null, V.class); }\n'
+        '    void c() { restTemplate.postForObject("/v1/users/42/verify", null, Void.class); }\n'
+        '    void d(String id) { restTemplate.postForObject("/v1/users/" + id, null, Void.class); }\n'
+        '    void e(String path) { restTemplate.postForObject("/" + path, null, Void.class); }\n'
+        '}\n'
+    )
+    index = ClientReferenceIndex()
+    index.refresh([str(tmp_path)])
+    client = str(tmp_path / "UserClient.java")
+
+    assert index.references("/v1/users/{id}/verify", "POST") == {client: 3}
+    assert index.references("/v1/users/42/verify", "POST") == {client: 3}
+    assert index.references("/v1/users/7/verify", "POST") == {client: 2}
+    # '/' + path has no literal segment and is not indexed
+    assert index.references("/v1") == {}
+
+
+def test_index_resolves_constants_of_other_files(tmp_path):
+    """Test that base URLs declared in constant classes are resolved, and re-resolved when they change."""
+    paths = tmp_path / "ApiPaths.java"
+    paths.write_text('public final class ApiPaths { public static final String PAYMENT = "/api/payment"; }')
+    (tmp_path / "PaymentClient.java").write_text(
+        'import static com.acme.ApiPaths.PAYMENT;\n'
+        'class PaymentClient {\n'
+        '    void a() { restTemplate.postForObject(ApiPaths.PAYMENT + "/confirmation", body, V.class); }\n'
+        '    void b() { restTemplate.delete(PAYMENT + "/cancel"); }\n'
+        '}\n'
+    )
+    (tmp_path / "PaymentFeignClient.java").write_text(
+        '@FeignClient(name = "payment", path = ApiPaths.PAYMENT)\n'
+        'interface PaymentFeignClient { @GetMapping("/status") Status status(); }\n'
+    )
+    index = ClientReferenceIndex()
+    index.refresh([str(tmp_path)])
+
+    assert index.references("/api/payment/confirmation", "POST") == {str(tmp_path / "PaymentClient.java"): 1}
+    assert index.references("/api/payment/cancel", "DELETE") == {str(tmp_path / "PaymentClient.java"): 1}
+    assert index.references("/api/payment/status", "GET") == {str(tmp_path / "PaymentFeignClient.java"): 1}
+
+    paths.write_text('public final class ApiPaths { public static final String PAYMENT = "/api/v2/payment"; }')
+    os.utime(paths, ns=(0, paths.stat().st_mtime_ns + 1_000_000_000))
+    index.refresh([str(tmp_path)])
+
+    assert index.references("/api/payment/cancel") == {}
+    assert index.references("/api/v2/payment/cancel", "DELETE") == {str(tmp_path / "PaymentClient.java"): 1}
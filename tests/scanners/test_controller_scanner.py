@@ -0,0 +1,205 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from endpoint_auditor.models import AuditRequest, ControllerEndpoint
+from endpoint_auditor.scanners.controller_scanner import parse_controller_source, scan_controllers
+
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "controllers"
+
+
+def _routes(endpoints):
+    return [(endpoint.http_method, endpoint.path, endpoint.handler, endpoint.log) for endpoint in endpoints]
+
+
+def test_scan_controllers_builds_catalog_of_fixtures():
+    """Test that class and method mappings are joined and the handler logs extracted."""
+    endpoints = scan_controllers([str(FIXTURES_DIR)])
+
+    assert _routes(endpoints) == [
+        ("DELETE", "/api/payment/cancel", "cancelPayment", "Payment cancellation requested"),
+        ("POST", "/api/payment/confirmation", "confirmPayment",
+         "Confirming payment. Transaction id: '{}'. Provider: '{}'"),
+        ("GET", "/api/payment/status", "getPaymentStatus", "Getting payment status"),
+        ("PUT", "/api/payment/update", "updatePayment", "Updating payment for id: {}"),
+        ("GET", "/health", "healthCheck", None),
+    ]
+    confirm = endpoints[1]
+    assert confirm.controller == "PaymentController"
+    assert confirm.file == str(FIXTURES_DIR / "PaymentController.java")
+    assert confirm.line == 27
+
+
+def test_parse_request_mapping_variants():
+    """Test path arrays, named elements, HTTP methods of @RequestMapping and concatenated literals."""
+    source = '''
+    @RestController
+    @RequestMapping(path = {"/v1/orders", "/v2/orders/"})
+    public class OrderController {
+        @RequestMapping(value = "/{id}", method = {RequestMethod.GET, RequestMethod.HEAD})
+        public Order get(@PathVariable("id") String id) { return null; }
+
+        @PostMapping
+        public Order create(@RequestBody Order order) {
+            log.info("Creating order " + "for {}", order.getCustomer());
+            return order;
+        }
+
+        @GetMapping(OrderPaths.SEARCH)
+        public List<Order> search() { return List.of(); }
+    }
+    '''
+
+    assert _routes(parse_controller_source(source)) == [
+        ("GET", "/v1/orders/{id}", "get", None),
+        ("HEAD", "/v1/orders/{id}", "get", None),
+        ("GET", "/v2/orders/{id}", "get", None),
+        ("HEAD", "/v2/orders/{id}", "get", None),
+        ("POST", "/v1/orders", "create", "Creating order for {}"),
+        ("POST", "/v2/orders", "create", "Creating order for {}"),
+    ]
+
+
+def test_parse_ignores_comments_strings_and_nested_blocks():
+    """Test that mappings in comments, braces in strings and lambdas do not confuse the parser."""
+    source = '''
+    @RestController
+    class UserController {
+        // @GetMapping("/commented")
+        /* @DeleteMapping("/also-commented") */
+        private static final String BRACES = "}{";
+        private final Map<String, String> defaults = Map.of("a", "b");
+
+        @GetMapping("/users/{id}")
+        ResponseEntity<User> get(@PathVariable String id) {
+            return repository.find(id).map(user -> {
+                LOGGER.debug("Found user {}", id);
+                return ResponseEntity.ok(user);
+            }).orElseGet(() -> {
+                LOGGER.warn("Unknown user {}", id);
+                return ResponseEntity.notFound().build();
+            });
+        }
+
+        static class Helper {
+            @GetMapping("/inner")
+            void inner() { }
+        }
+
+        @PatchMapping(value = "/users/{id}")
+        void patch() throws IOException {
+            String type = User.class.getName();
+        }
+    }
+    '''
+
+    assert _routes(parse_controller_source(source)) == [
+        ("GET", "/users/{id}", "get", "Found user {}"),
+        ("GET", "/inner", "inner", None),
+        ("PATCH", "/users/{id}", "patch", None),
+    ]
+
+
+def test_parse_controller_interface():
+    """Test that abstract handlers of an API interface are listed without a log."""
+    source = '''
+    @RequestMapping("/api/documents")
+    public interface DocumentApi {
+        @GetMapping("/{id}")
+        Document get(@PathVariable("id") String id);
+
+        @DeleteMapping("/{id}")
+        void delete(String id);
+    }
+    '''
+
+    assert _routes(parse_controller_source(source)) == [
+        ("GET", "/api/documents/{id}", "get", None),
+        ("DELETE", "/api/documents/{id}", "delete", None),
+    ]
+
+
+def test_request_mapping_without_method_accepts_every_method():
+    """Test that a mapping without HTTP method has none, so that audits are not restricted to one."""
+    source = '@RestController class PingController { @RequestMapping("/ping") String ping() { return "pong"; } }'
+
+    assert _routes(parse_controller_source(source)) == [(None, "/ping", "ping", None)]
+
+
+def test_scan_controllers_reuses_cache_for_unchanged_files(tmp_path):
+    """Test that cached controllers are not parsed again until they change."""
+    project = tmp_path / "service"
+    project.mkdir()
+    controller = project / "UserController.java"
+    controller.write_text('@RestController class UserController { @GetMapping("/users") void list() { } }')
+    (project / "UserService.java").write_text('@GetMapping("/not-a-controller") void x() { }')
+    cache = str(tmp_path / "catalog.json")
+
+    first = scan_controllers([str(project)], cache_path=cache)
+    with patch("endpoint_auditor.scanners.controller_scanner.parse_controller_source") as parse:
+        assert scan_controllers([str(project)], cache_path=cache) == first
+    parse.assert_not_called()
+
+    controller.write_text('@RestController class UserController { @PostMapping("/users") void create() { } }')
+    os.utime(controller, ns=(0, controller.stat().st_mtime_ns + 1_000_000_000))
+
+    assert _routes(scan_controllers([str(project)], cache_path=cache)) == [("POST", "/users", "create", None)]
+
+
+def test_scan_controllers_resolves_paths_built_from_constants(tmp_path):
+    """Test that mapping paths using constants of other files are resolved, and parsed again when they change."""
+    paths = tmp_path / "ApiPaths.java"
+    paths.write_text('public interface ApiPaths { String PAYMENT = "/api/payment"; }')
+    (tmp_path / "PaymentController.java").write_text(
+        '@RestController @RequestMapping(ApiPaths.PAYMENT)\n'
+        'class PaymentController {\n'
+        '    private static final String CONFIRMATION = "/confirmation";\n'
+        '    @PostMapping(CONFIRMATION) void confirm() { }\n'
+        '    @GetMapping(CONFIRMATION + "/{id}") void status() { }\n'
+        '    @GetMapping(Unknown.PATH) void unknown() { }\n'
+        '}\n'
+    )
+    cache = str(tmp_path / "catalog.json")
+
+    assert _routes(scan_controllers([str(tmp_path)], cache_path=cache)) == [
+        ("POST", "/api/payment/confirmation", "confirm", None),
+        ("GET", "/api/payment/confirmation/{id}", "status", None),
+    ]
+
+    paths.write_text('public interface ApiPaths { String PAYMENT = "/api/v2/payment"; }')
+    os.utime(paths, ns=(0, paths.stat().st_mtime_ns + 1_000_000_000))
+
+    assert [endpoint.path for endpoint in scan_controllers([str(tmp_path)], cache_path=cache)] == [
+        "/api/v2/payment/confirmation", "/api/v2/payment/confirmation/{id}",
+    ]
+
+
+def test_scan_controllers_skips_dependency_and_vcs_directories(tmp_path):
+    """Test that controllers are looked for in the directories walked for client files only."""
+    source = '@RestController class {name} {{ @GetMapping("/{path}") void get() {{ }} }}'
+    for directory, name in (("src", "UserController"), ("node_modules/lib", "LibController"), (".git/x", "GitController")):
+        (tmp_path / directory).mkdir(parents=True)
+        (tmp_path / directory / f"{name}.java").write_text(source.format(name=name, path=name.lower()))
+
+    assert [endpoint.controller for endpoint in scan_controllers([str(tmp_path)])] == ["UserController"]
+
+
+def test_scan_controllers_raises_on_missing_project(tmp_path):
+    """Test that a missing project path is reported."""
+    with pytest.raises(ValueError, match="project path not found"):
+        scan_controllers([str(tmp_path / "missing")])
+
+
+def test_controller_endpoint_to_audit_request():
+    """Test that a catalog entry becomes an audit request, with an empty log when the handler logs nothing."""
+    endpoint = ControllerEndpoint(
+        http_method="GET", path="/health", log=None, controller="SimpleController",
+        handler="healthCheck", file="SimpleController.java", line=17,
+    )
+
+    assert endpoint.to_audit_request("svc") == AuditRequest(
+        endpoint="/health", http_method="GET", log="", application_name="svc"
+    )
@@ -0,0 +1,109 @@
+import json
+import subprocess
+
+import pytest
+
+from endpoint_auditor.scanners.diff_guard import (
+    DeprecatedEndpoint,
+    DeprecatedEndpointMatcher,
+    git_diff,
+    guard_diff,
+    load_registry,
+    parse_added_lines,
+)
+from endpoint_auditor.scanners.languages import client_file_matcher
+
+DIFF = """diff --git a/src/UserClient.java b/src/UserClient.java
+index 1111111..2222222 100644
+--- a/src/UserClient.java
++++ b/src/UserClient.java
+@@ -10,0 +11,2 @@ class UserClient {
++    @GetMapping("/api/v1/users/{id}")
++++counter;
+@@ -20 +22 @@ class UserClient {
+-    get("/api/v1/legacy");
++    get("/api/v1/legacy/" + id);
+diff --git a/web/orderClient.ts b/web/orderClient.ts
+new file mode 100644
+--- /dev/null
++++ b/web/orderClient.ts
+@@ -0,0 +1,2 @@
++const url = `/api/v1/orders/${orderId}`;
++\\ No newline at end of file
+diff --git a/src/OldClient.java b/src/OldClient.java
+deleted file mode 100644
+--- a/src/OldClient.java
++++ /dev/null
+@@ -1 +0,0 @@
+-get("/api/v1/users/{id}");
+diff --git a/docs/api.md b/docs/api.md
+--- a/docs/api.md
++++ b/docs/api.md
+@@ -1,0 +2 @@
++Call /api/v1/users/{id} to get a user
+"""
+
+ENDPOINTS = [
+    DeprecatedEndpoint("/api/v1/users/{id}", "GET", "API-12"),
+    DeprecatedEndpoint("/api/v1/users/{id}", "DELETE"),
+    DeprecatedEndpoint("/api/v1/orders/{id}"),
+]
+
+
+def test_parse_added_lines_numbers_lines_of_the_new_files():
+    """Test that added lines get their number in the new file, and deleted files are left out."""
+    added = parse_added_lines(DIFF)
+
+    assert added["src/UserClient.java"] == [
+        (11, '    @GetMapping("/api/v1/users/{id}")'), (12, "++counter;"), (22, '    get("/api/v1/legacy/" + id);'),
+    ]
+    assert added["web/orderClient.ts"] == [(1, "const url = `/api/v1/orders/${orderId}`;"), (2, "\\ No newline at end of file")]
+    assert "src/OldClient.java" not in added
+
+
+def test_guard_diff_reports_added_references_in_client_files():
+    """Test that references are found with the interpolations of each language, in client files only."""
+    violations = guard_diff(DIFF, ENDPOINTS, client_file_matcher())
+
+    assert [(violation.file, violation.line, violation.endpoint.endpoint) for violation in violations] == [
+        ("src/UserClient.java", 11, "/api/v1/users/{id}"),
+        ("web/orderClient.ts", 1, "/api/v1/orders/{id}"),
+    ]
+    # Listed once per HTTP method, reported once
+    assert violations[0].endpoint == ENDPOINTS[0]
+
+
+def test_guard_diff_checks_every_file_without_file_matcher():
+    """Test that other changed files are searched for the endpoint as written."""
+    violations = guard_diff(DIFF, ENDPOINTS)
+
+    assert ("docs/api.md", 2) in [(violation.file, violation.line) for violation in violations]
+
+
+def test_matcher_reports_the_longest_endpoint_at_a_position():
+    """Test that one regex finds every endpoint, the most specific one winning at a position."""
+    matcher = DeprecatedEndpointMatcher([DeprecatedEndpoint("/api/users"), DeprecatedEndpoint("/api/users/{id}/roles")])
+
+    found = matcher.find("a(`/api/users/${id}/roles`); b('/api/users/42/roles'); c('/api/users')", ".ts")
+
+    assert [endpoint.endpoint for endpoint in found] == ["/api/users/{id}/roles", "/api/users", "/api/users"]
+    assert DeprecatedEndpointMatcher([]).find("/api/users", ".java") == []
+
+
+def test_load_registry_reads_batch_files(tmp_path):
+    """Test that a batch file is a valid registry, and entries without endpoint are rejected."""
+    registry = tmp_path / "deprecated.json"
+    registry.write_text(json.dumps([{"endpoint": "/api/v1/users", "http_method": "GET", "log": "Users listed"}]))
+    assert load_registry(str(registry)) == [DeprecatedEndpoint("/api/v1/users", "GET")]
+
+    registry.write_text(json.dumps([{"http_method": "GET"}]))
+    with pytest.raises(ValueError, match="without endpoint"):
+        load_registry(str(registry))
+
+
+def test_git_diff_raises_on_unknown_revision(tmp_path):
+    """Test that a git failure is reported as a ValueError."""
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+
+    with pytest.raises(ValueError, match="git diff"):
+        git_diff(str(tmp_path), "unknown...HEAD")
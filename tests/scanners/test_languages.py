@@ -0,0 +1,90 @@
+import pytest
+
+from endpoint_auditor.scanners.languages import LANGUAGE_PROFILES, client_file_matcher, endpoint_literal, endpoint_pattern
+from endpoint_auditor.scanners.usage_scanner import scan_code_usage
+
+
+def _write(directory, name, content=""):
+    path = directory / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return path
+
+
+def test_matcher_finds_client_files_of_every_language_in_one_walk(tmp_path):
+    """Test that the combined patterns find the clients of each language and skip dependency directories."""
+    expected = [
+        _write(tmp_path, "service/src/main/java/UserClient.java"),
+        _write(tmp_path, "service/src/main/kotlin/OrderClient.kt"),
+        _write(tmp_path, "frontend/src/api/paymentClient.ts"),
+        _write(tmp_path, "frontend/src/api/LegacyClient.js"),
+        _write(tmp_path, "tools/billing_client.py"),
+        _write(tmp_path, "service/target/generated-sources/GeneratedApiClient.java"),
+    ]
+    _write(tmp_path, "service/src/main/java/UserService.java")
+    _write(tmp_path, "frontend/node_modules/axios/lib/httpClient.js")
+    _write(tmp_path, "tools/.venv/lib/site-packages/client.py")
+
+    matcher = client_file_matcher()
+
+    assert sorted(matcher.find_files(str(tmp_path))) == sorted(expected)
+    assert [matcher.profile(path.name).name for path in expected] == [
+        "java", "kotlin", "typescript", "javascript", "python", "java",
+    ]
+
+
+def test_matcher_restricted_to_some_languages(tmp_path):
+    """Test that only the files of the configured languages are found."""
+    java = _write(tmp_path, "UserClient.java")
+    _write(tmp_path, "userClient.ts")
+
+    matcher = client_file_matcher(("java",))
+
+    assert matcher.find_files(str(tmp_path)) == [java]
+    assert matcher.profile("userClient.ts") is None
+
+
+def test_matcher_rejects_unknown_languages_and_missing_projects(tmp_path):
+    """Test that unknown language names and missing project paths are reported."""
+    with pytest.raises(ValueError, match="unknown client languages: cobol"):
+        client_file_matcher(("java", "cobol"))
+    with pytest.raises(ValueError, match="project path not found"):
+        client_file_matcher().find_files(str(tmp_path / "missing"))
+
+
+@pytest.mark.parametrize("suffix, text, matches", [
+    (".ts", "http.get(`/api/v1/users/${userId}/orders`)", 1),
+    (".kt", 'client.get("/api/v1/users/$userId/orders")', 1),
+    (".kt", 'client.get("/api/v1/users/${user.id}/orders")', 1),
+    (".py", 'session.get(f"/api/v1/users/{user_id}/orders")', 1),
+    (".java", 'restTemplate.getForObject("/api/v1/users/{id}/orders", O.class)', 1),
+    # Java has no string interpolation: '+' concatenations are matched by --match-calls
+    (".java", 'restTemplate.getForObject("/api/v1/users/" + id + "/orders", O.class)', 0),
+    (".ts", "http.get(`/api/v1/users/${userId}/items`)", 0),
+])
+def test_endpoint_pattern_matches_interpolated_path_variables(suffix, text, matches):
+    """Test that path variables match the interpolations of each language."""
+    assert len(endpoint_pattern("/api/v1/users/{id}/orders", suffix).findall(text)) == matches
+
+
+def test_endpoint_literal_is_the_longest_part_between_path_variables():
+    assert endpoint_literal("/api/v1/users") == "/api/v1/users"
+    assert endpoint_literal("/api/v1/users/{id}/orders") == "/api/v1/users/"
+    assert endpoint_literal("/v1/{tenant}/users/{id:[0-9]+}/verification-status") == "/verification-status"
+
+
+def test_endpoint_pattern_of_plain_path_is_the_escaped_path():
+    """Test that an endpoint without variables is searched as plain text in every language."""
+    for profile in LANGUAGE_PROFILES.values():
+        assert profile.endpoint_pattern("/api/v1/users.json").pattern == r"/api/v1/users\.json"
+
+
+def test_scan_code_usage_searches_clients_of_every_language(tmp_path):
+    """Test that a scan reports the clients of all languages referencing the endpoint."""
+    java = _write(tmp_path, "UserClient.java", 'String url = "/api/v1/users/{id}";')
+    typescript = _write(tmp_path, "web/usersClient.ts", "fetch(`/api/v1/users/${id}`); fetch(`/api/v1/users/${other}`);")
+    _write(tmp_path, "web/node_modules/lib/someClient.ts", "fetch(`/api/v1/users/${id}`);")
+
+    code_usage = scan_code_usage("/api/v1/users/{id}", [str(tmp_path)])
+
+    assert code_usage.matches_per_file == {str(java): 1, str(typescript): 2}
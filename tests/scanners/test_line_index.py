@@ -0,0 +1,37 @@
+import re
+
+from endpoint_auditor.scanners.line_index import MAX_LOCATIONS_PER_FILE, count_and_locate
+
+_USERS = re.compile(re.escape("/api/users"))
+
+
+def test_count_and_locate_positions_matches():
+    """Test 1-based lines and columns, on the first line, after newlines and at the end of the text."""
+    text = "/api/users\nsecond /api/users\n\n/api/users"
+
+    count, locations = count_and_locate(text, _USERS)
+
+    assert count == 3
+    assert [(line, column) for line, column, _ in locations] == [(1, 1), (2, 8), (4, 1)]
+    assert count_and_locate("no match", _USERS) == (0, [])
+
+
+def test_snippet_is_cut_around_matches_on_long_lines():
+    """Test that the snippet is the stripped line, cut on lines of generated code."""
+    text = "  get('/api/users');\n" + "x" * 500 + "/api/users" + "y" * 500
+
+    _, locations = count_and_locate(text, _USERS)
+
+    assert [snippet for _, _, snippet in locations] == ["get('/api/users');", "x" * 80 + "/api/users" + "y" * 80]
+
+
+def test_count_and_locate_counts_every_match_and_locates_the_first_ones():
+    """Test that locations are given in order, at most MAX_LOCATIONS_PER_FILE of them, and the count stays exact."""
+    text = "\n".join(f'call("/api/users/{index}");' for index in range(MAX_LOCATIONS_PER_FILE + 5))
+
+    count, locations = count_and_locate(text, _USERS)
+
+    assert count == MAX_LOCATIONS_PER_FILE + 5
+    assert len(locations) == MAX_LOCATIONS_PER_FILE
+    assert locations[:2] == [(1, 7, 'call("/api/users/0");'), (2, 7, 'call("/api/users/1");')]
+    assert locations[-1] == (MAX_LOCATIONS_PER_FILE, 7, f'call("/api/users/{MAX_LOCATIONS_PER_FILE - 1}");')
@@ -0,0 +1,58 @@
+from endpoint_auditor.scanners.route_trie import RouteTrie, path_key, split_segments
+
+
+def _trie(*templates):
+    trie = RouteTrie()
+    for template in templates:
+        trie.insert(template, template)
+    return trie
+
+
+def test_path_key_ignores_variable_names():
+    """Test that named, typed and format variables share the same key."""
+    assert path_key("/api/v1/orders/{id}") == path_key("/api/v1/orders/{}") == "/api/v1/orders/{}"
+    assert path_key("/api/{id:[0-9]+}/items/") == "/api/{}/items"
+    assert path_key("/api//v1/%s") == "/api/v1/{}"
+    assert path_key("/") == "/"
+    assert split_segments("/") == []
+
+
+def test_match_literal_path_against_templates():
+    """Test that a concrete path matches the literal, variable and pattern templates accepting it."""
+    trie = _trie("/v1/users/{}/verify", "/v1/users/me/verify", "/v1/users/{}", "/v1/users/{}.json/verify", "/v2/users/{}")
+
+    assert sorted(trie.match("/v1/users/me/verify")) == ["/v1/users/me/verify", "/v1/users/{}/verify"]
+    assert sorted(trie.match("/v1/users/42.json/verify")) == ["/v1/users/{}.json/verify", "/v1/users/{}/verify"]
+    assert trie.match("/v1/users") == []
+    assert len(trie) == 5
+
+
+def test_match_templated_path():
+    """Test that a variable of the matched path accepts any segment, a pattern only the ones it fits."""
+    trie = _trie("/v1/users/{}/verify", "/v1/users/me/verify", "/v1/users/report.csv/verify", "/v1/users/{}")
+
+    assert sorted(trie.match("/v1/users/{id}/verify")) == [
+        "/v1/users/me/verify", "/v1/users/report.csv/verify", "/v1/users/{}/verify",
+    ]
+    assert sorted(trie.match("/v1/users/{name}.csv/verify")) == [
+        "/v1/users/report.csv/verify", "/v1/users/{}/verify",
+    ]
+
+
+def test_match_wildcards():
+    """Test '*' and '**' segments, in templates and in the matched path."""
+    trie = _trie("/static/**", "/api/*/health", "/api/v1/users/{}")
+
+    assert trie.match("/static") == ["/static/**"]
+    assert trie.match("/static/css/site.css") == ["/static/**"]
+    assert trie.match("/api/v3/health") == ["/api/*/health"]
+    assert sorted(trie.match("/api/**")) == ["/api/*/health", "/api/v1/users/{}"]
+
+
+def test_match_returns_each_value_once():
+    """Test that a template reached through several branches is returned once, with all its values."""
+    trie = RouteTrie()
+    trie.insert("/a/**", 1)
+    trie.insert("/a/**", 2)
+
+    assert trie.match("/a/b/c") == [1, 2]
@@ -0,0 +1,111 @@
+import json
+import shutil
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from endpoint_auditor.scanners import search_backends
+from endpoint_auditor.scanners.search_backends import (
+    GitGrepBackend,
+    RipgrepBackend,
+    SearchBackend,
+    search_backend,
+)
+from endpoint_auditor.scanners.usage_scanner import ScanStats, scan_code_usage
+
+ENDPOINT = "/api/v1/users/{id}"
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A git work tree with tracked, untracked and ignored client files, some referencing ENDPOINT."""
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / ".gitignore").write_text("build/\n")
+    files = {
+        "src/UserClient.java": 'get("/api/v1/users/{id}");\nget("/api/v1/users/{id}");\n',
+        "src/OrderClient.java": 'get("/api/v1/orders/{id}");\n',
+        "src/UserClient.kt": 'get("/api/v1/users/$userId")\n',
+        "web/userClient.ts": "fetch(`/api/v1/users/${user.id}`);\n",
+        "build/generated/GeneratedUserClient.java": 'String url = "/api/v1/users/{id}";\n',
+    }
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(content)
+    subprocess.run(["git", "-C", str(tmp_path), "add", "src"], check=True)
+    return tmp_path
+
+
+def test_git_grep_finds_tracked_untracked_and_ignored_files(project):
+    """Test that git grep rules out the files without the literal, whatever their git status."""
+    files = sorted(path for path in project.rglob("*") if path.is_file() and ".git" not in path.parts)
+
+    candidates = GitGrepBackend().candidates({str(project): files}, "/api/v1/users/")
+
+    assert sorted(path.relative_to(project).as_posix() for path in candidates) == [
+        "build/generated/GeneratedUserClient.java", "src/UserClient.java", "src/UserClient.kt", "web/userClient.ts",
+    ]
+
+
+def test_git_grep_searches_the_projects_of_a_work_tree_together(project):
+    """Test that projects in subdirectories of one work tree are searched in one run of git."""
+    files_per_project = {
+        str(project / "src"): [project / "src/UserClient.java", project / "src/OrderClient.java"],
+        str(project / "web"): [project / "web/userClient.ts"],
+    }
+
+    with patch("endpoint_auditor.scanners.search_backends._run", wraps=search_backends._run) as run:
+        candidates = GitGrepBackend().candidates(files_per_project, "/api/v1/users/")
+
+    assert candidates == {project / "src/UserClient.java", project / "web/userClient.ts"}
+    assert [command[3] for command in (call.args[0] for call in run.call_args_list)].count("grep") == 1
+
+
+def test_git_grep_leaves_projects_outside_work_trees_to_python(tmp_path):
+    (tmp_path / "UserClient.java").write_text('"/api/v1/users"')
+    (tmp_path / "OrderClient.java").write_text('"/api/v1/orders"')
+    files = [tmp_path / "UserClient.java", tmp_path / "OrderClient.java"]
+
+    assert GitGrepBackend().candidates({str(tmp_path): files}, "/api/v1/users") == set(files)
+
+
+def test_ripgrep_reads_matching_files_from_json_output(tmp_path):
+    """Test that the files of the 'match' messages are the candidates, file names in bytes included."""
+    files = [tmp_path / "UserClient.java", tmp_path / "OrderClient.java"]
+    messages = [
+        {"type": "begin", "data": {"path": {"text": str(files[0])}}},
+        {"type": "match", "data": {"path": {"text": str(files[0])}, "lines": {"text": "x"}, "submatches": []}},
+        {"type": "end", "data": {"path": {"text": str(files[0])}}},
+        {"type": "summary", "data": {}},
+    ]
+    output = "\n".join(json.dumps(message) for message in messages).encode()
+
+    with patch("endpoint_auditor.scanners.search_backends._run") as run:
+        run.return_value = subprocess.CompletedProcess([], 0, stdout=output)
+        assert RipgrepBackend().candidates({str(tmp_path): files}, "/api/v1/users") == {files[0]}
+
+        run.return_value = subprocess.CompletedProcess([], 2, stdout=b"")
+        assert RipgrepBackend().candidates({str(tmp_path): files}, "/api/v1/users") == set(files)
+
+
+@pytest.mark.parametrize("backend", [
+    GitGrepBackend(),
+    pytest.param(RipgrepBackend(), marks=pytest.mark.skipif(shutil.which("rg") is None, reason="rg is not installed")),
+])
+def test_backends_give_the_results_of_the_python_search(project, backend):
+    """Test that a backend changes which files are read, not the code usage."""
+    stats = ScanStats()
+
+    expected = scan_code_usage(ENDPOINT, [str(project)], backend=SearchBackend())
+    result = scan_code_usage(ENDPOINT, [str(project)], backend=backend, stats=stats)
+
+    assert result == expected
+    assert result.matches_count == 5
+    assert stats.filtered_files == 1
+
+
+def test_search_backend_by_name():
+    assert type(search_backend("python")) is SearchBackend
+    assert search_backend("git") is search_backend("git")
+    with pytest.raises(ValueError, match="unknown search backend"):
+        search_backend("ack")
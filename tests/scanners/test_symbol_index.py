@@ -0,0 +1,170 @@
+import os
+
+import pytest
+
+from endpoint_auditor.scanners.symbol_index import StringConstant, SymbolIndex, parse_constants
+
+
+def _write(directory, name, source):
+    path = directory / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(source)
+    return path
+
+
+def test_parse_constants_keeps_static_final_and_interface_fields():
+    """Test that only constants are kept, with their declaring type and the parts of their value."""
+    source = '''
+    package com.acme.payment;
+
+    import static com.acme.common.CommonPaths.API;
+    import static com.acme.common.Versions.*;
+
+    public class PaymentPaths {
+        public static final String BASE = API + "/payment";
+        private final static String CONFIRMATION = BASE + "/confirmation";
+        // private static final String OLD = "/old";
+        private static final String URL = System.getenv("URL") + ";";
+        private final String instanceField = "/not-a-constant";
+
+        void method() { String local = "/not-a-constant-either"; }
+
+        interface Nested {
+            String STATUS = PaymentPaths.BASE + "/status";
+        }
+    }
+    '''
+
+    constants, imports = parse_constants(source)
+
+    assert constants == [
+        StringConstant("PaymentPaths", "BASE", (("name", "API"), ("literal", "/payment"))),
+        StringConstant("PaymentPaths", "CONFIRMATION", (("name", "BASE"), ("literal", "/confirmation"))),
+        StringConstant("PaymentPaths", "URL", (("unresolved", ""), ("literal", ";"))),
+        StringConstant("Nested", "STATUS", (("name", "PaymentPaths.BASE"), ("literal", "/status"))),
+    ]
+    assert imports == ["CommonPaths.API", "Versions.*"]
+
+
+def test_parse_constants_tells_comments_from_literals():
+    """Test that `//` or `/*` inside a string literal does not hide the constants after it."""
+    source = '''
+    class Urls {
+        static final String SITE = "https://acme.com"; static final String USERS = SITE + "/users";
+        static final String GLOB = "/api/*"; static final String ORDERS = "/orders";
+        /* static final String OLD = "/old"; */ static final String NEW = "/new";
+        static final String PATTERN = "*/"; // static final String COMMENTED = "/commented";
+    }
+    '''
+
+    constants, _ = parse_constants(source)
+
+    assert [constant.name for constant in constants] == ["SITE", "USERS", "GLOB", "ORDERS", "NEW", "PATTERN"]
+
+
+def test_parse_constants_ignores_type_keywords_in_comments_and_literals():
+    """Test that `class`, `interface` or `record` in a comment or string does not declare a type."""
+    source = '''
+    public class ApiPaths {
+        /**
+         * Base of the payment API, see the interface docs.
+         */
+        public static final String PAYMENT = "/payment";
+        // record types below
+        public static final String USERS = "/users";
+        public static final String HELP = "see the interface Help";
+        private final String instanceField = "/not-a-constant";
+    }
+    '''
+
+    constants, _ = parse_constants(source)
+
+    assert [(constant.owner, constant.name) for constant in constants] == [
+        ("ApiPaths", "PAYMENT"),
+        ("ApiPaths", "USERS"),
+        ("ApiPaths", "HELP"),
+    ]
+
+
+def test_symbol_table_resolves_constants_across_files(tmp_path):
+    """Test qualified names, static imports, inherited names and chains of constants of other files."""
+    _write(tmp_path, "common/CommonPaths.java", 'class CommonPaths { static final String API = "/api"; }')
+    _write(tmp_path, "common/Versions.java", 'class Versions { static final String V1 = "/v1"; }')
+    paths = _write(
+        tmp_path, "payment/PaymentPaths.java",
+        'import static com.acme.CommonPaths.API;\nimport static com.acme.Versions.*;\n'
+        'interface PaymentPaths { String BASE = API + V1 + "/payment"; String BROKEN = BASE + url(); }',
+    )
+    index = SymbolIndex()
+    index.refresh([str(tmp_path)])
+    table = index.table(str(paths))
+
+    assert len(table) == 4
+    assert table.value("PaymentPaths.BASE") == "/api/v1/payment"
+    assert table.value("com.acme.payment.PaymentPaths.BASE") == "/api/v1/payment"
+    # Unique in the project: a class implementing PaymentPaths may use it unqualified
+    assert table.value("BASE") == "/api/v1/payment"
+    assert table.value("PaymentPaths.BROKEN") is None
+    assert table.value("Unknown.BASE") is None
+    assert index.table(str(tmp_path.parent / "Elsewhere.java")) is None
+
+
+def test_symbol_table_prefers_the_referencing_type_and_rejects_ambiguities(tmp_path):
+    """Test that a simple name declared by several types resolves only from the type declaring it."""
+    _write(tmp_path, "UserPaths.java", 'class UserPaths { static final String BASE = "/users"; }')
+    _write(tmp_path, "OrderPaths.java", 'class OrderPaths { static final String BASE = "/orders"; }')
+    _write(tmp_path, "Cycle.java", 'class Cycle { static final String A = B + "/a"; static final String B = A; }')
+    index = SymbolIndex()
+    index.refresh([str(tmp_path)])
+    table = index.table(str(tmp_path / "UserPaths.java"))
+
+    assert table.value("BASE") is None
+    assert table.value("BASE", owner="OrderPaths") == "/orders"
+    assert table.value("Cycle.A") is None
+
+
+def test_each_project_has_its_own_symbol_table(tmp_path):
+    """Test that the same constant declared by two projects keeps the value of each project."""
+    first = _write(tmp_path, "billing/ApiPaths.java", 'class ApiPaths { static final String BASE = "/billing"; }')
+    second = _write(tmp_path, "orders/ApiPaths.java", 'class ApiPaths { static final String BASE = "/orders"; }')
+    index = SymbolIndex()
+    index.refresh([str(tmp_path / "billing"), str(tmp_path / "orders")])
+
+    assert index.table(str(first)).value("ApiPaths.BASE") == "/billing"
+    assert index.table(str(second)).value("ApiPaths.BASE") == "/orders"
+
+
+def test_refresh_keeps_tables_of_projects_whose_constants_did_not_change(tmp_path):
+    """Test that a refresh rebuilds the table of a project only when one of its constants changed."""
+    paths = _write(tmp_path, "ApiPaths.java", 'class ApiPaths { static final String BASE = "/api"; }')
+    service = _write(tmp_path, "UserService.java", "class UserService { }")
+    index = SymbolIndex()
+    index.refresh([str(tmp_path)])
+    table = index.table(str(paths))
+
+    service.write_text("class UserService { void changed() { } }")
+    os.utime(service, ns=(0, service.stat().st_mtime_ns + 1_000_000_000))
+    index.refresh([str(tmp_path)])
+    assert index.table(str(paths)) is table
+
+    paths.write_text('class ApiPaths { static final String BASE = "/api/v2"; }')
+    os.utime(paths, ns=(0, paths.stat().st_mtime_ns + 1_000_000_000))
+    index.refresh([str(tmp_path)])
+    assert index.table(str(paths)) is not table
+    assert index.table(str(paths)).value("ApiPaths.BASE") == "/api/v2"
+
+
+def test_refresh_skips_dependency_and_vcs_directories(tmp_path):
+    """Test that the constants of the directories not walked for client files are left out."""
+    paths = _write(tmp_path, "src/ApiPaths.java", 'class ApiPaths { static final String BASE = "/api"; }')
+    _write(tmp_path, "node_modules/lib/ApiPaths.java", 'class ApiPaths { static final String BASE = "/lib"; }')
+    index = SymbolIndex()
+    index.refresh([str(tmp_path)])
+
+    assert index.table(str(paths)).value("ApiPaths.BASE") == "/api"
+
+
+def test_refresh_raises_on_missing_project(tmp_path):
+    """Test that a missing project path is reported."""
+    with pytest.raises(ValueError, match="project path not found"):
+        SymbolIndex().refresh([str(tmp_path / "missing")])
@@ -3,11 +3,15 @@ from pathlib import Path
 from unittest.mock import patch
 
 from endpoint_auditor.scanners.usage_scanner import (
+    ClientFileIndex,
+    ScanStats,
     scan_code_usage,
     _find_client_files_in_project,
     _search_endpoint_in_file
 )
-from endpoint_auditor.models import CodeUsage
+from endpoint_auditor.models import CodeLocation, CodeUsage
+from endpoint_auditor.scanners.search_backends import SearchBackend
+from endpoint_auditor.profiling import Tracer, use_tracer
 
 
 FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "clients"
@@ -38,16 +42,17 @@ def test_search_endpoint_in_user_client():
     """Test searching for /api/v1/users in UserClient.java."""
     user_client = FIXTURES_DIR / "UserClient.java"
 
-    matches = _search_endpoint_in_file(user_client, "/api/v1/users")
+    matches, locations = _search_endpoint_in_file(user_client, "/api/v1/users")
 
-    # Exact count: 6 occurrences in the file
+    # Exact count: 6 occurrences in the file, each located
     assert matches == 6
+    assert len(locations) == 6
 
 def test_search_endpoint_in_payment_client():
     """Test searching for /api/v1/payment in PaymentClient.java."""
     payment_client = FIXTURES_DIR / "PaymentClient.java"
 
-    matches = _search_endpoint_in_file(payment_client, "/api/v1/payment")
+    matches, _ = _search_endpoint_in_file(payment_client, "/api/v1/payment")
 
     # Exact count: 6 occurrences in the file
     assert matches == 6
@@ -56,9 +61,10 @@ def test_search_endpoint_no_matches():
     """Test searching for non-existent endpoint."""
     user_client = FIXTURES_DIR / "UserClient.java"
 
-    matches = _search_endpoint_in_file(user_client, "/api/v9/nonexistent")
+    matches, locations = _search_endpoint_in_file(user_client, "/api/v9/nonexistent")
 
     assert matches == 0
+    assert locations == []
 
 def test_search_endpoint_file_not_readable():
     """Test searching in a non-readable file raises ValueError."""
@@ -105,7 +111,7 @@ def test_scan_code_usage_handles_file_errors(mock_search):
     def side_effect(file_path, endpoint):
         if "UserClient.java" in str(file_path):
             raise ValueError("cannot be open: test error")
-        return 0  # No matches for other files
+        return 0, []  # No matches for other files
 
     mock_search.side_effect = side_effect
 
@@ -115,3 +121,109 @@ def test_scan_code_usage_handles_file_errors(mock_search):
     # Should complete successfully
     assert isinstance(result, CodeUsage)
     assert result.matches_count == 0
+
+def test_scan_code_usage_records_profiling_measures():
+    """Test that the walk and file scan stages record files and bytes when profiling."""
+    tracer = Tracer()
+
+    with use_tracer(tracer):
+        scan_code_usage("/api/v1/users", [str(FIXTURES_DIR)])
+
+    stages = tracer.summary()["stages"]
+    assert stages["scan.walk"]["files"] == 4
+    assert stages["scan.files"]["files"] == 4
+    assert stages["scan.files"]["bytes"] == sum(
+        path.stat().st_size for path in FIXTURES_DIR.rglob("*Client*.java")
+    )
+
+
+@patch('endpoint_auditor.scanners.usage_scanner._find_client_files_in_project')
+def test_client_file_index_walks_project_again_only_when_stale(mock_find):
+    """Test that the file index reuses the walk of a project until it expires."""
+    mock_find.return_value = [FIXTURES_DIR / "UserClient.java"]
+    now = [0.0]
+    index = ClientFileIndex(max_age_seconds=60, clock=lambda: now[0])
+
+    index.files([str(FIXTURES_DIR)])
+    now[0] = 60
+    files = index.files([str(FIXTURES_DIR)])
+    assert mock_find.call_count == 1
+    assert files == [FIXTURES_DIR / "UserClient.java"]
+
+    now[0] = 61
+    index.files([str(FIXTURES_DIR)])
+    assert mock_find.call_count == 2
+
+    index.invalidate(str(FIXTURES_DIR))
+    index.files([str(FIXTURES_DIR)])
+    assert mock_find.call_count == 3
+
+def test_scan_code_usage_with_file_index():
+    """Test that scanning through the file index gives the same result as walking."""
+    index = ClientFileIndex()
+
+    assert scan_code_usage("/api/v1/users", [str(FIXTURES_DIR)], file_index=index) == \
+        scan_code_usage("/api/v1/users", [str(FIXTURES_DIR)])
+
+
+def test_scan_code_usage_searches_identical_files_once(tmp_path):
+    """Test that a client vendored in several projects is searched once and its matches fanned out."""
+    vendored = 'get("/api/v1/users");\npost("/api/v1/users");\n'
+    projects = []
+    for name in ("service-a", "service-b", "service-c"):
+        (tmp_path / name / "gen").mkdir(parents=True)
+        (tmp_path / name / "gen" / "ApiClient.java").write_text(vendored)
+        projects.append(str(tmp_path / name))
+    # Same size as the vendored client, different content
+    (tmp_path / "service-a" / "UserClient.java").write_text(vendored.replace("post", "puts"))
+    stats = ScanStats()
+
+    with patch(
+        "endpoint_auditor.scanners.usage_scanner._search_endpoint_in_file",
+        wraps=_search_endpoint_in_file,
+    ) as search:
+        result = scan_code_usage("/api/v1/users", projects, stats=stats)
+
+    assert search.call_count == 2
+    assert result.matches_count == 8
+    assert result.matches_per_file == {
+        **{str(tmp_path / name / "gen" / "ApiClient.java"): 2 for name in ("service-a", "service-b", "service-c")},
+        str(tmp_path / "service-a" / "UserClient.java"): 2,
+    }
+    assert stats == ScanStats(files=4, searched_files=2, deduplicated_files=2, deduplicated_bytes=2 * len(vendored))
+    assert stats.to_dict()["dedupe_ratio"] == 0.5
+
+
+def test_scan_code_usage_locates_matches_in_matching_files_only(tmp_path):
+    """Test that matches get their line, column and snippet, found once per distinct content."""
+    vendored = 'class ApiClient {\n    String users = "/api/v1/users";\n}\n'
+    for name in ("service-a", "service-b"):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "ApiClient.java").write_text(vendored)
+    (tmp_path / "service-a" / "OrderClient.java").write_text('String orders = "/api/v1/orders";\n')
+
+    with patch(
+        "endpoint_auditor.scanners.usage_scanner._search_endpoint_in_file",
+        wraps=_search_endpoint_in_file,
+    ) as search:
+        result = scan_code_usage(
+            "/api/v1/users", [str(tmp_path / "service-a"), str(tmp_path / "service-b")], backend=SearchBackend()
+        )
+
+    # One read per distinct content: OrderClient.java, and one of the copies of ApiClient.java
+    assert search.call_count == 2
+    assert result.locations == [
+        CodeLocation(str(tmp_path / name / "ApiClient.java"), 2, 21, 'String users = "/api/v1/users";')
+        for name in ("service-a", "service-b")
+    ]
+
+
+def test_scan_code_usage_does_not_hash_files_of_unique_size(tmp_path):
+    """Test that files whose size no other file has are searched without being hashed."""
+    with patch("endpoint_auditor.scanners.usage_scanner._hash_file") as hash_file:
+        stats = ScanStats()
+        scan_code_usage("/api/v1/users", [str(FIXTURES_DIR)], stats=stats, backend=SearchBackend())
+
+    hash_file.assert_not_called()
+    assert stats.searched_files == stats.files == 4
+    assert stats.dedupe_ratio == 0.0
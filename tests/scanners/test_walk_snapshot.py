@@ -0,0 +1,125 @@
+import os
+import time
+
+import pytest
+
+from endpoint_auditor.scanners.languages import client_file_matcher
+from endpoint_auditor.scanners.usage_scanner import ClientFileIndex
+from endpoint_auditor.scanners.walk_snapshot import DirectorySnapshot
+
+
+def _later():
+    """A clock ahead of the mtimes of the files just written, so that no directory looks racy."""
+    return time.time() + 60
+
+
+def _touch_later(path, seconds=10):
+    """Move the mtime of a directory forward, as a change on a coarse-grained file system would."""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def project(tmp_path):
+    files = [
+        "service/src/main/java/com/acme/UserClient.java",
+        "service/src/main/java/com/acme/UserService.java",
+        "service/web/src/api/userClient.ts",
+        "service/target/generated/ApiClient.java",
+        "service/node_modules/lib/HttpClient.js",
+        "service/.git/hooks/PreClient.java",
+    ]
+    for name in files:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+    return tmp_path / "service"
+
+
+def test_snapshot_walk_finds_the_files_of_a_walk(project, tmp_path):
+    """Test that the files and their order are those of ClientFileMatcher.find_files()."""
+    matcher = client_file_matcher()
+    snapshot = DirectorySnapshot(str(tmp_path / "snapshots"), clock=_later)
+
+    cold = snapshot.find_files(str(project), matcher)
+    warm = snapshot.find_files(str(project), matcher)
+
+    assert cold == warm == matcher.find_files(str(project))
+    assert len(cold) == 3
+
+
+def test_warm_walk_lists_only_changed_directories(project, tmp_path):
+    """Test that a directory whose mtime did not change is not listed again, and that a changed one is."""
+    matcher = client_file_matcher()
+    snapshot = DirectorySnapshot(str(tmp_path / "snapshots"), clock=_later)
+    snapshot.find_files(str(project), matcher)
+    directories = snapshot.listed_directories
+
+    snapshot.find_files(str(project), matcher)
+    assert snapshot.listed_directories == directories
+    assert snapshot.reused_directories == directories
+
+    package = project / "src/main/java/com/acme"
+    (package / "OrderClient.java").write_text("")
+    _touch_later(package)
+    files = snapshot.find_files(str(project), matcher)
+
+    assert snapshot.listed_directories == directories + 1
+    assert package / "OrderClient.java" in files
+    assert files == matcher.find_files(str(project))
+
+
+def test_directories_modified_during_the_walk_are_listed_again(project, tmp_path):
+    """Test that a directory modified within the mtime granularity of its listing is not trusted."""
+    matcher = client_file_matcher()
+    snapshot = DirectorySnapshot(str(tmp_path / "snapshots"), clock=time.time)
+
+    snapshot.find_files(str(project), matcher)
+    # Same second: a file added now might leave the mtime unchanged on coarse file systems
+    (project / "web/src/api/orderClient.ts").write_text("")
+    files = snapshot.find_files(str(project), matcher)
+
+    assert snapshot.reused_directories == 0
+    assert project / "web/src/api/orderClient.ts" in files
+
+
+def test_snapshot_is_kept_per_project_and_languages(project, tmp_path):
+    """Test that snapshots are shared across instances, and not across sets of languages."""
+    directory = str(tmp_path / "snapshots")
+    DirectorySnapshot(directory, clock=_later).find_files(str(project), client_file_matcher())
+
+    java = DirectorySnapshot(directory, clock=_later)
+    files = java.find_files(str(project), client_file_matcher(("java",)))
+    assert sorted(path.name for path in files) == ["ApiClient.java", "UserClient.java"]
+    assert java.reused_directories == 0
+
+    shared = DirectorySnapshot(directory, clock=_later)
+    shared.find_files(str(project), client_file_matcher())
+    assert shared.listed_directories == 0
+
+
+def test_unreadable_snapshot_is_ignored(project, tmp_path):
+    matcher = client_file_matcher()
+    directory = tmp_path / "snapshots"
+    DirectorySnapshot(str(directory), clock=_later).find_files(str(project), matcher)
+    for snapshot_file in directory.iterdir():
+        snapshot_file.write_text('{"version": 1, "directories": ')
+
+    snapshot = DirectorySnapshot(str(directory), clock=_later)
+    assert snapshot.find_files(str(project), matcher) == matcher.find_files(str(project))
+    assert snapshot.reused_directories == 0
+
+
+def test_snapshot_walk_of_missing_project(tmp_path):
+    with pytest.raises(ValueError, match="project path not found"):
+        DirectorySnapshot(str(tmp_path / "snapshots")).find_files(str(tmp_path / "missing"), client_file_matcher())
+
+
+def test_file_index_walks_with_the_snapshot(project, tmp_path):
+    """Test that the file index of a new run reuses the directories walked by a previous one."""
+    DirectorySnapshot(str(tmp_path / "snapshots"), clock=_later).find_files(str(project), client_file_matcher())
+    snapshot = DirectorySnapshot(str(tmp_path / "snapshots"), clock=_later)
+
+    files = ClientFileIndex(snapshot=snapshot).files([str(project)])
+
+    assert files == client_file_matcher().find_files(str(project))
+    assert snapshot.listed_directories == 0
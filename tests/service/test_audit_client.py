@@ -0,0 +1,73 @@
+import io
+import json
+import urllib.error
+import pytest
+from unittest.mock import MagicMock, patch
+
+from endpoint_auditor.models import AuditRequest
+from endpoint_auditor.service.client import AuditServiceClient
+
+
+AUDIT_REQUEST = AuditRequest(
+    endpoint="/api/v1/users",
+    http_method="GET",
+    log="User endpoint accessed",
+    application_name="user-service",
+)
+
+
+def _response(payload):
+    response = MagicMock()
+    response.__enter__.return_value.read.return_value = json.dumps(payload).encode("utf-8")
+    return response
+
+
+@patch("endpoint_auditor.service.client.urllib.request.urlopen")
+def test_audit_posts_request_and_returns_report(mock_urlopen):
+    mock_urlopen.return_value = _response({"recommendation": {"status": "runtime_usage_detected"}})
+
+    report = AuditServiceClient("http://localhost:8765/").audit(AUDIT_REQUEST, days=7)
+
+    request = mock_urlopen.call_args.args[0]
+    assert request.full_url == "http://localhost:8765/audit"
+    assert request.get_method() == "POST"
+    assert json.loads(request.data) == {
+        "endpoint": "/api/v1/users",
+        "http_method": "GET",
+        "log": "User endpoint accessed",
+        "application_name": "user-service",
+        "jira": None,
+        "days": 7,
+    }
+    assert report == {"recommendation": {"status": "runtime_usage_detected"}}
+
+
+@patch("endpoint_auditor.service.client.urllib.request.urlopen")
+def test_audit_batch_returns_reports(mock_urlopen):
+    mock_urlopen.return_value = _response({"reports": [{"id": 1}, {"id": 2}]})
+
+    reports = AuditServiceClient("http://localhost:8765").audit_batch([AUDIT_REQUEST] * 2, days=30)
+
+    request = mock_urlopen.call_args.args[0]
+    assert request.full_url == "http://localhost:8765/audit/batch"
+    assert len(json.loads(request.data)["audits"]) == 2
+    assert reports == [{"id": 1}, {"id": 2}]
+
+
+@patch("endpoint_auditor.service.client.urllib.request.urlopen")
+def test_service_error_is_raised(mock_urlopen):
+    mock_urlopen.side_effect = urllib.error.HTTPError(
+        "http://localhost:8765/audit", 503, "Service Unavailable", {},
+        io.BytesIO(b'{"error": "Audit queue is full (100 audits queued)"}')
+    )
+
+    with pytest.raises(RuntimeError, match="Audit service error 503: Audit queue is full"):
+        AuditServiceClient("http://localhost:8765").audit(AUDIT_REQUEST, days=30)
+
+
+@patch("endpoint_auditor.service.client.urllib.request.urlopen")
+def test_unreachable_service_is_raised(mock_urlopen):
+    mock_urlopen.side_effect = urllib.error.URLError("Connection refused")
+
+    with pytest.raises(RuntimeError, match="not reachable"):
+        AuditServiceClient("http://localhost:8765").audit(AUDIT_REQUEST, days=30)
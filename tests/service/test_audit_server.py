@@ -0,0 +1,148 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+
+from endpoint_auditor.models import AuditRequest
+from endpoint_auditor.service.server import AuditServer, AuditService, ServiceBusyError
+
+
+AUDIT = {
+    "endpoint": "/api/v1/users",
+    "http_method": "get",
+    "log": "User endpoint accessed",
+    "application_name": "user-service",
+}
+
+
+async def _request(port: int, method: str, path: str, payload=None):
+    """Send one HTTP request to the server and return (status, json body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+    )
+    await writer.drain()
+
+    response = await reader.read()
+    writer.close()
+
+    head, _, content = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, json.loads(content)
+
+
+@pytest.fixture
+def fake_pipeline():
+    """Replace the pipeline with one echoing the audit in a report."""
+    async def run(**kwargs):
+        await asyncio.sleep(0)
+        return {"audit": {"endpoint": kwargs["endpoint"], "http_method": kwargs["http_method"]}, "days": kwargs["days"]}
+
+    with patch("endpoint_auditor.service.server.run_pipeline", side_effect=run) as mock_run, \
+            patch("endpoint_auditor.service.server.is_graylog_enabled", return_value=False):
+        yield mock_run
+
+
+@pytest_asyncio.fixture
+async def server(fake_pipeline, tmp_path):
+    service = AuditService(projects_paths=[str(tmp_path)], max_concurrency=2, max_pending=3)
+    await service.start()
+    audit_server = AuditServer(service=service, port=0, default_days=14)
+    _, port = await audit_server.start()
+    yield port
+    await audit_server.close()
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_audit_returns_report(server, fake_pipeline):
+    status, report = await _request(server, "POST", "/audit", AUDIT)
+
+    assert status == 200
+    assert report == {"audit": {"endpoint": "/api/v1/users", "http_method": "GET"}, "days": 14}
+
+
+@pytest.mark.asyncio
+async def test_audits_share_warm_state(server, fake_pipeline):
+    await _request(server, "POST", "/audit", AUDIT)
+    await _request(server, "POST", "/audit", {**AUDIT, "days": 7})
+
+    first, second = (call.kwargs for call in fake_pipeline.call_args_list)
+    assert first["file_index"] is second["file_index"]
+    assert first["graylog_sessions"] is second["graylog_sessions"]
+    assert first["breakers"] is second["breakers"]
+    assert second["days"] == 7
+
+
+@pytest.mark.asyncio
+async def test_batch_returns_reports_in_request_order(server):
+    audits = [{**AUDIT, "endpoint": f"/api/v1/{name}"} for name in ("a", "b", "c")]
+
+    status, body = await _request(server, "POST", "/audit/batch", {"audits": audits})
+
+    assert status == 200
+    assert [report["audit"]["endpoint"] for report in body["reports"]] == ["/api/v1/a", "/api/v1/b", "/api/v1/c"]
+
+
+@pytest.mark.asyncio
+async def test_batch_larger_than_queue_is_rejected(server):
+    status, body = await _request(server, "POST", "/audit/batch", {"audits": [AUDIT] * 4})
+
+    assert status == 503
+    assert "queue is full" in body["error"]
+
+
+@pytest.mark.asyncio
+async def test_invalid_audit_is_rejected(server):
+    status, body = await _request(server, "POST", "/audit", {"endpoint": "/api/v1/users"})
+
+    assert status == 400
+    assert "missing" in body["error"]
+
+
+@pytest.mark.asyncio
+async def test_malformed_content_length_is_rejected(server):
+    for length in ("abc", "-1"):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server)
+        writer.write(f"POST /audit HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n".encode("ascii"))
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+
+        head, _, content = response.partition(b"\r\n\r\n")
+        assert int(head.split(b" ")[1]) == 400
+        assert "error" in json.loads(content)
+
+
+@pytest.mark.asyncio
+async def test_health_and_unknown_routes(server):
+    assert await _request(server, "GET", "/health") == (200, {"status": "ok", "queued": 0})
+    assert (await _request(server, "GET", "/audit"))[0] == 405
+    assert (await _request(server, "GET", "/unknown"))[0] == 404
+
+
+@pytest.mark.asyncio
+async def test_service_bounds_concurrency(fake_pipeline, tmp_path):
+    running = 0
+    peak = 0
+
+    async def run(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {}
+
+    fake_pipeline.side_effect = run
+    service = AuditService(projects_paths=[str(tmp_path)], max_concurrency=2, max_pending=10)
+    request = AuditRequest.from_dict(AUDIT)
+
+    await service.audit_batch([request] * 6, days=30)
+
+    assert peak == 2
+    assert service.queued == 0
+    with pytest.raises(ServiceBusyError):
+        await service.audit_batch([request] * 11, days=30)
@@ -0,0 +1,118 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from endpoint_auditor.cli import cli
+from endpoint_auditor.models import AuditRequest
+
+
+def test_cli_import_does_not_load_heavy_integrations():
+    """Test that importing the CLI neither loads the settings nor the integration clients."""
+    code = (
+        "import sys\n"
+        "import endpoint_auditor.cli\n"
+        "import endpoint_auditor.config as config\n"
+        "heavy = [m for m in ('fastmcp', 'atlassian', 'httpx') if m in sys.modules]\n"
+        "print(heavy, config.settings is not None)\n"
+    )
+    env = {key: value for key, value in os.environ.items() if key != "DEFAULT_PROJECTS_PATHS"}
+
+    completed = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True)
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "[] False"
+
+
+def test_catalog_json_can_be_used_as_batch_file():
+    """Test that the JSON catalog lists audits readable by 'batch --file'."""
+    controllers = Path(__file__).parent / "fixtures" / "controllers"
+    result = CliRunner().invoke(cli, ["catalog", str(controllers), "--application-name", "payments", "--output", "json"])
+
+    assert result.exit_code == 0, result.output
+    entries = json.loads(result.output)
+    assert entries[0]["controller"] == "PaymentController"
+    assert AuditRequest.from_dict(entries[0]) == AuditRequest(
+        endpoint="/api/payment/cancel", http_method="DELETE",
+        log="Payment cancellation requested", application_name="payments",
+    )
+    # Handlers without a log, or mappings without a method, are audited as with --controllers
+    audits = [AuditRequest.from_dict(entry) for entry in entries]
+    assert AuditRequest(endpoint="/health", http_method="GET", log="", application_name="payments") in audits
+    assert AuditRequest.from_dict({"endpoint": "/api/any", "http_method": None, "log": None, "application_name": "payments"}) \
+        == AuditRequest(endpoint="/api/any", http_method=None, log="", application_name="payments")
+
+
+def test_batch_names_the_malformed_entry_of_the_file(tmp_path):
+    """Test that an invalid audit of --file is a usage error naming it, not a traceback."""
+    requests_file = tmp_path / "audits.json"
+    requests_file.write_text(json.dumps([
+        {"endpoint": "/api/users", "http_method": "GET", "log": "Listing users", "application_name": "users"},
+        {"endpoint": "/api/orders", "http_method": "FETCH", "log": "Listing orders", "application_name": "orders"},
+    ]))
+
+    result = CliRunner().invoke(cli, ["batch", "--file", str(requests_file)])
+
+    assert result.exit_code == 2
+    assert "entry 1 (/api/orders)" in result.output
+    assert "Traceback" not in result.output
+
+
+def test_unknown_client_language_is_reported_by_the_command(tmp_path, monkeypatch):
+    """Test that CLIENT_LANGUAGES is checked against the language profiles when the scan is set up."""
+    from endpoint_auditor import config
+    monkeypatch.setenv("DEFAULT_PROJECTS_PATHS", str(tmp_path))
+    monkeypatch.setenv("CLIENT_LANGUAGES", "java,cobol")
+    monkeypatch.setattr(config, "settings", None)
+
+    result = CliRunner().invoke(cli, ["audit", "--endpoint", "/api/users", "--http-method", "GET", "--log", "Listing users",
+                                      "--application-name", "users"])
+
+    assert result.exit_code == 1
+    assert "unknown client languages: cobol" in result.output
+
+
+def test_history_rejects_an_unknown_http_method(tmp_path):
+    result = CliRunner().invoke(cli, ["history", "--history-db", str(tmp_path / "history.db"), "--http-method", "FOO"])
+
+    assert result.exit_code == 2
+    assert "Invalid HTTP method: FOO" in result.output
+
+
+def test_diff_rejects_an_unknown_http_method(tmp_path):
+    result = CliRunner().invoke(cli, ["diff", "--history-db", str(tmp_path / "history.db"), "--endpoint", "/api/users",
+                                      "--http-method", "FOO"])
+
+    assert result.exit_code == 2
+    assert "Invalid HTTP method: FOO" in result.output
+
+
+def test_guard_fails_on_added_references_to_deprecated_endpoints(tmp_path):
+    """Test that 'guard' exits with 1 and file:line locations for references added by a git range."""
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path), "-c", "user.name=ci", "-c", "user.email=ci@example.com", *args],
+                       check=True, capture_output=True)
+
+    client = tmp_path / "UserClient.java"
+    client.write_text('class UserClient {\n    String OLD = "/api/v1/users/{id}";\n}\n')
+    git("init", "-q")
+    git("add", ".")
+    git("commit", "-q", "-m", "base")
+    client.write_text(
+        'class UserClient {\n    String OLD = "/api/v1/users/{id}";\n    String NEW = "/api/v1/users/{id}";\n}\n'
+    )
+    git("commit", "-q", "-am", "change")
+    registry = tmp_path / "deprecated.json"
+    registry.write_text(json.dumps([{"endpoint": "/api/v1/users/{id}", "http_method": "GET"}]))
+
+    result = CliRunner().invoke(cli, ["guard", "--registry", str(registry), "--range", "HEAD~1...HEAD", "--repo", str(tmp_path)])
+
+    assert result.exit_code == 1, result.output
+    assert "UserClient.java:3: deprecated endpoint GET /api/v1/users/{id}" in result.output
+    assert "UserClient.java:2" not in result.output
+
+    result = CliRunner().invoke(cli, ["guard", "--registry", str(registry), "--range", "HEAD~1...HEAD~1", "--repo", str(tmp_path)])
+    assert result.exit_code == 0, result.output
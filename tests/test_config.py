@@ -103,3 +103,82 @@ def test_missing_required_default_projects_paths(monkeypatch):
 
     # Verify the error is about the missing required field
     assert "default_projects_paths" in str(exc_info.value)
+
+def test_graylog_targets_from_json(monkeypatch):
+    """Test if multiple Graylog clusters are loaded from a JSON list."""
+    monkeypatch.setenv("DEFAULT_PROJECTS_PATHS", "/repo/test")
+    monkeypatch.setenv(
+        "GRAYLOG_TARGETS",
+        '[{"name": "eu", "base_url": "https://eu.graylog", "token": "t-eu", "mcp_base_url": "https://eu.graylog/mcp/"},'
+        ' {"name": "us", "base_url": "https://us.graylog", "token": "t-us", "mcp_base_url": "https://us.graylog/mcp/",'
+        ' "timeout_seconds": 5}]'
+    )
+    monkeypatch.setenv("GRAYLOG_TARGET_TIMEOUT_SECONDS", "12")
+
+    from endpoint_auditor import config
+    monkeypatch.setattr(config, "settings", config.Settings())
+
+    targets = config.get_graylog_targets()
+
+    assert [target.name for target in targets] == ["eu", "us"]
+    assert targets[0].timeout_seconds == 12
+    assert targets[1].timeout_seconds == 5
+    assert config.is_graylog_enabled() is True
+
+def test_graylog_targets_fall_back_to_single_cluster(mock_env, monkeypatch):
+    """Test if the single-cluster variables are exposed as one default target."""
+    from endpoint_auditor import config
+    monkeypatch.setattr(config, "settings", mock_env)
+
+    targets = config.get_graylog_targets()
+
+    assert len(targets) == 1
+    assert targets[0].name == "default"
+    assert targets[0].mcp_base_url == "http://localhost:8000/mcp"
+    assert targets[0].timeout_seconds == 30.0
+
+def test_settings_are_loaded_on_first_use(monkeypatch):
+    """Test that settings are loaded lazily and then reused."""
+    from endpoint_auditor import config
+    monkeypatch.setattr(config, "settings", None)
+    monkeypatch.setenv("DEFAULT_PROJECTS_PATHS", "/repo/lazy")
+
+    loaded = config.get_settings()
+
+    assert loaded.default_projects_paths == "/repo/lazy"
+    assert config.get_settings() is loaded
+    assert config.settings is loaded
+
+def test_client_languages(monkeypatch):
+    """Test that client languages default to every profile and that names are normalized."""
+    from endpoint_auditor import config
+
+    monkeypatch.setenv("DEFAULT_PROJECTS_PATHS", "/repo/test")
+    monkeypatch.setattr(config, "settings", config.Settings())
+    assert config.get_client_languages() is None
+
+    monkeypatch.setenv("CLIENT_LANGUAGES", "java, kotlin")
+    monkeypatch.setattr(config, "settings", config.Settings())
+    assert config.get_client_languages() == ("java", "kotlin")
+
+
+def test_search_backend(monkeypatch):
+    """Test that the search backend is picked by availability by default and that names are normalized."""
+    from endpoint_auditor import config
+
+    monkeypatch.setenv("DEFAULT_PROJECTS_PATHS", "/repo/test")
+    assert config.Settings().search_backend == "auto"
+
+    monkeypatch.setenv("SEARCH_BACKEND", " Git ")
+    assert config.Settings().search_backend == "git"
+
+
+def test_config_does_not_import_the_scanners():
+    """Test that the configuration is loaded without the scanners, which validate their own settings."""
+    import subprocess
+    import sys
+
+    code = "import sys, endpoint_auditor.config; print(any(m.startswith('endpoint_auditor.scanners') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "False"
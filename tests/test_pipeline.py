@@ -1,7 +1,9 @@
+import asyncio
 import pytest
-from unittest.mock import patch, AsyncMock
-from endpoint_auditor.pipline import run_pipeline
-from endpoint_auditor.models import LogExtraction, RuntimeUsage, CodeUsage
+from unittest.mock import ANY, patch, AsyncMock
+from endpoint_auditor.pipline import run_pipeline, run_batch_pipeline, iter_batch_pipeline
+from endpoint_auditor.models import AuditRequest, LogExtraction, RuntimeUsage, CodeUsage
+from endpoint_auditor.profiling import Tracer, use_tracer
 
 
 @pytest.fixture
@@ -104,7 +106,8 @@ async def test_run_pipeline_success(mock_pipeline_components):
         log=log,
         application_name="test-service",
         projects_paths=projects_paths,
-        days=days
+        days=days,
+        http_method="GET"
     )
 
     mocks["extract_log"].assert_called_once_with(
@@ -114,21 +117,193 @@ async def test_run_pipeline_success(mock_pipeline_components):
     mocks["count_log"].assert_called_once_with(
         log_extracted=expected["log_extraction"],
         days=days,
-        application_name="test-service"
+        application_name="test-service",
+        breakers=None,
+        sessions=None
     )
 
     mocks["scan_usage"].assert_called_once_with(
         endpoint=endpoint,
-        projects_paths=projects_paths
+        projects_paths=projects_paths,
+        file_index=None,
+        stats=ANY
     )
 
     mocks["generate_report"].assert_called_once_with(
         log_extracted=expected["log_extraction"],
         runtime_usage=expected["runtime_usage"],
-        code_usage=expected["code_usage"]
+        code_usage=expected["code_usage"],
+        audit_request=AuditRequest(
+            endpoint=endpoint,
+            http_method="GET",
+            log=log,
+            application_name="test-service"
+        )
     )
 
     assert result == expected["report"]
     assert result["runtime_usage"]["total_occurrences"] == 42
     assert result["code_usage"]["matches_count"] == 3
     assert result["recommendation"]["status"] == "runtime_usage_detected"
+
+
+@pytest.mark.asyncio
+async def test_run_batch_pipeline_shares_circuit_breakers(mock_pipeline_components):
+    """Test that every audit of a batch receives the same circuit breaker registry."""
+    mocks = mock_pipeline_components["mocks"]
+    audit_requests = [
+        AuditRequest(endpoint="/api/v1/users", http_method="GET", log="User {}", application_name="svc-a"),
+        AuditRequest(endpoint="/api/v1/orders", http_method="POST", log="Order {}", application_name="svc-b"),
+    ]
+
+    reports = await run_batch_pipeline(
+        audit_requests=audit_requests,
+        projects_paths=mock_pipeline_components["projects_paths"],
+        days=7
+    )
+
+    assert len(reports) == 2
+    assert mocks["count_log"].call_count == 2
+    first_breakers = mocks["count_log"].call_args_list[0].kwargs["breakers"]
+    second_breakers = mocks["count_log"].call_args_list[1].kwargs["breakers"]
+    assert first_breakers is not None
+    assert first_breakers is second_breakers
+    assert [c.kwargs["audit_request"].endpoint for c in mocks["generate_report"].call_args_list] == [
+        "/api/v1/users", "/api/v1/orders"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_adds_profile_to_metadata(mock_pipeline_components):
+    """Test that stage timings are added to the report metadata when profiling is enabled."""
+    tracer = Tracer()
+
+    with use_tracer(tracer):
+        result = await run_pipeline(
+            endpoint=mock_pipeline_components["endpoint"],
+            log=mock_pipeline_components["log"],
+            application_name="test-service",
+            projects_paths=mock_pipeline_components["projects_paths"],
+            days=30
+        )
+
+    stages = result["metadata"]["profile"]["stages"]
+    assert set(stages) == {"audit", "log_extraction", "runtime", "scan", "report"}
+
+
+@pytest.mark.asyncio
+async def test_iter_batch_pipeline_bounds_concurrency_and_yields_every_report():
+    """Test that streamed batches keep at most max_concurrency audits in flight."""
+    running = 0
+    peak = 0
+
+    async def fake_run_pipeline(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 if kwargs["endpoint"] == "/slow" else 0)
+        running -= 1
+        return {"endpoint": kwargs["endpoint"]}
+
+    audit_requests = [
+        AuditRequest(endpoint=endpoint, http_method="GET", log="Log {}", application_name="svc")
+        for endpoint in ("/slow", "/a", "/b", "/c")
+    ]
+
+    with patch("endpoint_auditor.pipline.run_pipeline", side_effect=fake_run_pipeline):
+        results = [
+            (audit_request.endpoint, report["endpoint"])
+            async for audit_request, report in iter_batch_pipeline(
+                audit_requests=audit_requests, projects_paths=["/repo"], days=7, max_concurrency=2
+            )
+        ]
+
+    assert peak == 2
+    assert results[-1] == ("/slow", "/slow")
+    assert sorted(results) == [("/a", "/a"), ("/b", "/b"), ("/c", "/c"), ("/slow", "/slow")]
+
+
+@pytest.mark.asyncio
+async def test_incremental_audit_reuses_stored_report(tmp_path):
+    """Test that an incremental audit reuses the stored runtime usage and unchanged projects."""
+    from endpoint_auditor.history.store import HistoryStore
+
+    project = tmp_path / "service-a"
+    project.mkdir()
+    (project / "UserClient.java").write_text('String url = "/api/v1/users";\n')
+    runtime_usage = RuntimeUsage(enabled=True, provider="Graylog", days=30, total_occurrences=42)
+
+    with HistoryStore(str(tmp_path / "history.db")) as history, \
+            patch("endpoint_auditor.pipline.count_log_occurrences", new_callable=AsyncMock) as count_log:
+        count_log.return_value = runtime_usage
+        audit = dict(
+            endpoint="/api/v1/users", log="User endpoint accessed", application_name="svc-a",
+            projects_paths=[str(project)], days=30, http_method="GET", history=history,
+        )
+
+        first = await run_pipeline(**audit)
+        second = await run_pipeline(**audit, incremental=True)
+
+        assert count_log.await_count == 1
+        assert first["code_usage"] == second["code_usage"]
+        assert second["runtime_usage"]["total_occurrences"] == 42
+        assert second["metadata"]["incremental"] == {
+            "reused_projects": [str(project)],
+            "runtime_reused_from": first["metadata"]["generated_at"],
+        }
+        assert len(history.timeline(endpoint="/api/v1/users")) == 2
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_adds_scan_stats_to_metadata(tmp_path):
+    """Test that files vendored in several projects are searched once and reported as deduplicated."""
+    content = 'String url = "/api/v1/users";\n'
+    projects = []
+    for name in ("service-a", "service-b", "service-c"):
+        project = tmp_path / name
+        project.mkdir()
+        (project / "ApiClient.java").write_text(content)
+        projects.append(str(project))
+
+    with patch("endpoint_auditor.pipline.count_log_occurrences", new_callable=AsyncMock) as count_log:
+        count_log.return_value = RuntimeUsage(enabled=False, provider="Graylog", days=30, total_occurrences=0)
+        result = await run_pipeline(
+            endpoint="/api/v1/users", log="User endpoint accessed", application_name="svc-a",
+            projects_paths=projects, days=30,
+        )
+
+    assert result["code_usage"]["matches_count"] == 3
+    assert result["metadata"]["scan"] == {
+        "files": 3,
+        "searched_files": 1,
+        "deduplicated_files": 2,
+        "deduplicated_bytes": 2 * len(content),
+        "dedupe_ratio": 0.6667,
+        "filtered_files": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_pipeline_looks_up_code_usage_in_reference_index(tmp_path):
+    """Test that with a reference index only the calls with the endpoint's method are counted."""
+    from endpoint_auditor.scanners.client_index import ClientReferenceIndex
+
+    (tmp_path / "OrderClient.java").write_text(
+        'class OrderClient {\n'
+        '    void get(String id) { restTemplate.getForObject("/api/v1/orders/" + id, Order.class); }\n'
+        '    void delete(String id) { restTemplate.delete("/api/v1/orders/" + id); }\n'
+        '}\n'
+    )
+    reference_index = ClientReferenceIndex()
+    reference_index.refresh([str(tmp_path)])
+
+    with patch("endpoint_auditor.pipline.count_log_occurrences", new_callable=AsyncMock) as count_log, \
+            patch("endpoint_auditor.pipline.scan_code_usage") as scan_usage:
+        count_log.return_value = RuntimeUsage(enabled=False, provider="Graylog", days=30, total_occurrences=0)
+        result = await run_pipeline(
+            endpoint="/api/v1/orders/{id}", log="", application_name="svc-a", projects_paths=[str(tmp_path)],
+            days=30, http_method="DELETE", reference_index=reference_index,
+        )
+
+    scan_usage.assert_not_called()
+    assert result["code_usage"]["matches_per_file"] == {str(tmp_path / "OrderClient.java"): 1}
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import pstats
+import threading
+
+import pytest
+
+from endpoint_auditor.profiling import NULL_TRACER, Tracer, get_tracer, use_tracer
+
+
+def test_get_tracer_defaults_to_null_tracer():
+    """Test that profiling is disabled unless a tracer is installed."""
+    tracer = get_tracer()
+
+    assert tracer is NULL_TRACER
+    assert tracer.enabled is False
+    with tracer.span("scan", files=1) as span:
+        span.add("bytes", 10)
+    assert tracer.summary() == {"stages": {}}
+
+
+def test_use_tracer_installs_and_restores_tracer():
+    tracer = Tracer()
+
+    with use_tracer(tracer):
+        assert get_tracer() is tracer
+
+    assert get_tracer() is NULL_TRACER
+
+
+def test_summary_aggregates_spans_per_stage():
+    tracer = Tracer()
+
+    for size in (100, 200):
+        with tracer.span("scan.files") as span:
+            span.add("files")
+            span.add("bytes", size)
+    with tracer.span("report"):
+        pass
+
+    summary = tracer.summary()
+
+    assert summary["stages"]["scan.files"]["calls"] == 2
+    assert summary["stages"]["scan.files"]["files"] == 2
+    assert summary["stages"]["scan.files"]["bytes"] == 300
+    assert summary["stages"]["scan.files"]["seconds"] >= 0
+    assert summary["stages"]["report"]["calls"] == 1
+
+
+def test_collect_only_includes_spans_of_its_own_tasks():
+    tracer = Tracer()
+    with tracer.span("first"):
+        pass
+
+    def scan(name):
+        with tracer.span(f"{name}.scan"):
+            pass
+
+    async def audit(name):
+        with tracer.collect() as spans:
+            with tracer.span(name):
+                await asyncio.sleep(0)
+            await asyncio.to_thread(scan, name)
+        return spans
+
+    async def run_concurrently():
+        return await asyncio.gather(audit("a"), audit("b"))
+
+    spans_a, spans_b = asyncio.run(run_concurrently())
+
+    assert sorted(tracer.summary(spans=spans_a)["stages"]) == ["a", "a.scan"]
+    assert sorted(tracer.summary(spans=spans_b)["stages"]) == ["b", "b.scan"]
+    assert sorted(tracer.summary()["stages"]) == ["a", "a.scan", "b", "b.scan", "first"]
+
+
+def test_chrome_trace_export(tmp_path):
+    tracer = Tracer()
+    with tracer.span("graylog.search") as span:
+        span.add("round_trips")
+
+    path = tmp_path / "trace.json"
+    tracer.dump_chrome_trace(str(path))
+    trace = json.loads(path.read_text())
+
+    assert len(trace["traceEvents"]) == 1
+    event = trace["traceEvents"][0]
+    assert event["name"] == "graylog.search"
+    assert event["ph"] == "X"
+    assert event["dur"] >= 0
+    assert event["args"] == {"round_trips": 1}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tasks_get_separate_tracks():
+    tracer = Tracer()
+
+    async def query(name):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+
+    with use_tracer(tracer):
+        await asyncio.gather(query("eu"), query("us"))
+
+    tracks = {event["name"]: event["tid"] for event in tracer.to_chrome_trace()["traceEvents"]}
+    assert tracks["eu"] != tracks["us"]
+
+
+def test_profiled_writes_cprofile_stats(tmp_path):
+    path = tmp_path / "scan.prof"
+    tracer = Tracer(cprofile_output=str(path))
+
+    with tracer.profiled():
+        sorted(range(1000), reverse=True)
+
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_profiled_is_noop_without_output():
+    tracer = Tracer()
+
+    with tracer.profiled():
+        pass
+
+
+def test_profiled_sections_of_concurrent_threads_run_one_at_a_time(tmp_path):
+    path = tmp_path / "scan.prof"
+    tracer = Tracer(cprofile_output=str(path))
+    barrier = threading.Barrier(4)
+    active = []
+    overlaps = []
+
+    def scan():
+        barrier.wait()
+        for _ in range(5):
+            with tracer.span("scan"), tracer.profiled():
+                active.append(threading.get_ident())
+                if len(active) > 1:
+                    overlaps.append(list(active))
+                sorted(range(1000), reverse=True)
+                active.remove(threading.get_ident())
+
+    threads = [threading.Thread(target=scan) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == []
+    assert tracer.summary()["stages"]["scan"]["calls"] == 20
+    assert len({span.track for span in tracer.spans("scan")}) == 4
+    assert pstats.Stats(str(path)).total_calls > 0